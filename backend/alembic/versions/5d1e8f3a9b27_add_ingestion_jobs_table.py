@@ -0,0 +1,55 @@
+"""Add ingestion jobs table
+
+Revision ID: 5d1e8f3a9b27
+Revises: c23b4c2df5e4
+Create Date: 2026-01-08 10:14:22.481903
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '5d1e8f3a9b27'
+down_revision: Union[str, Sequence[str], None] = 'c23b4c2df5e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Create enum type for PostgreSQL idempotently
+    op.execute("DO $$ BEGIN IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'ingestionjobstatus') THEN CREATE TYPE ingestionjobstatus AS ENUM ('QUEUED', 'RUNNING', 'SUCCEEDED', 'FAILED', 'CANCELLED'); END IF; END $$;")
+
+    op.create_table('ingestion_jobs',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('document_id', sa.Uuid(), nullable=False),
+    sa.Column('created_by_id', sa.Uuid(), nullable=False),
+    sa.Column('status', postgresql.ENUM('QUEUED', 'RUNNING', 'SUCCEEDED', 'FAILED', 'CANCELLED', name='ingestionjobstatus', create_type=False), nullable=False),
+    sa.Column('namespace', sa.String(length=255), nullable=True),
+    sa.Column('chunks_total', sa.Integer(), nullable=False),
+    sa.Column('chunks_embedded', sa.Integer(), nullable=False),
+    sa.Column('chunks_upserted', sa.Integer(), nullable=False),
+    sa.Column('cancel_requested', sa.Boolean(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['created_by_id'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_ingestion_jobs_document_id'), 'ingestion_jobs', ['document_id'], unique=False)
+    op.create_index(op.f('ix_ingestion_jobs_status'), 'ingestion_jobs', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_ingestion_jobs_status'), table_name='ingestion_jobs')
+    op.drop_index(op.f('ix_ingestion_jobs_document_id'), table_name='ingestion_jobs')
+    op.drop_table('ingestion_jobs')
+
+    # Drop enum type
+    postgresql.ENUM(name='ingestionjobstatus').drop(op.get_bind(), checkfirst=True)
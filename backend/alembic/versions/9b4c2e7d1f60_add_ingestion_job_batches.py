@@ -0,0 +1,30 @@
+"""Add batch id to ingestion jobs
+
+Revision ID: 9b4c2e7d1f60
+Revises: 5d1e8f3a9b27
+Create Date: 2026-01-12 16:42:08.205117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b4c2e7d1f60'
+down_revision: Union[str, Sequence[str], None] = '5d1e8f3a9b27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('ingestion_jobs', sa.Column('batch_id', sa.Uuid(), nullable=True))
+    op.create_index(op.f('ix_ingestion_jobs_batch_id'), 'ingestion_jobs', ['batch_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_ingestion_jobs_batch_id'), table_name='ingestion_jobs')
+    op.drop_column('ingestion_jobs', 'batch_id')
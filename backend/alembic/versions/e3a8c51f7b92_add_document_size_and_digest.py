@@ -0,0 +1,32 @@
+"""Add size and digest to documents
+
+Revision ID: e3a8c51f7b92
+Revises: 9b4c2e7d1f60
+Create Date: 2026-01-15 09:27:51.663410
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a8c51f7b92'
+down_revision: Union[str, Sequence[str], None] = '9b4c2e7d1f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('documents', sa.Column('file_size', sa.BigInteger(), nullable=True))
+    op.add_column('documents', sa.Column('file_sha256', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_documents_file_sha256'), 'documents', ['file_sha256'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_documents_file_sha256'), table_name='documents')
+    op.drop_column('documents', 'file_sha256')
+    op.drop_column('documents', 'file_size')
@@ -9,8 +9,9 @@ Provides common functionality for all TWG agents including:
 - Logging
 """
 
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, AsyncIterator
 from loguru import logger
+import asyncio
 
 from backend.app.services.llm_service import get_llm_service
 from backend.app.agents.prompts import get_prompt
@@ -85,6 +86,53 @@ class BaseAgent:
 
         logger.info(f"Agent '{agent_id}' initialized successfully")
 
+    def _session_info(self) -> str:
+        return f"[{self.agent_id}:{self.session_id}]" if self.use_redis else f"[{self.agent_id}]"
+
+    def _begin_turn(self, message: str) -> Optional[List[Dict[str, str]]]:
+        """
+        Pick how to call the LLM for a user message.
+
+        History is not changed until the turn ends, so turns that run
+        concurrently on one agent never see each other's unanswered
+        messages.
+
+        Returns:
+            Messages to send with history, or None for a single-prompt chat
+        """
+        if not self.keep_history:
+            return None
+
+        # Snapshot of the history plus the new message, trimmed like history
+        messages = self.history[-(self.max_history * 2 - 1):] + [{"role": "user", "content": message}]
+
+        # Use history if we have messages; first message uses simple chat
+        return messages if len(messages) > 1 else None
+
+    def _end_turn(self, message: str, response: str):
+        """Add the user message and the response to history together."""
+        if not self.keep_history:
+            return
+
+        self.history.extend([
+            {"role": "user", "content": message},
+            {"role": "assistant", "content": response}
+        ])
+
+        # Trim history if too long
+        if len(self.history) > self.max_history * 2:  # *2 for user+assistant pairs
+            self.history = self.history[-(self.max_history * 2):]
+
+    def _save_history(self):
+        """Save history to Redis if enabled."""
+        if self.keep_history and self.use_redis and self.redis_memory:
+            self.redis_memory.save_conversation_history(
+                agent_id=self.agent_id,
+                session_id=self.session_id,
+                history=list(self.history),
+                ttl=self.memory_ttl
+            )
+
     def chat(self, message: str, temperature: Optional[float] = None) -> str:
         """
         Send a message to the agent and get a response.
@@ -98,51 +146,67 @@ class BaseAgent:
             str: Agent response
         """
         try:
-            session_info = f"[{self.agent_id}:{self.session_id}]" if self.use_redis else f"[{self.agent_id}]"
+            session_info = self._session_info()
             logger.info(f"{session_info} Received message: {message[:100]}...")
 
-            if self.keep_history:
-                # Add user message to history
-                self.history.append({"role": "user", "content": message})
+            messages = self._begin_turn(message)
+            if messages is not None:
+                response = self.llm.chat_with_history(
+                    messages=messages,
+                    system_prompt=self.system_prompt,
+                    temperature=temperature
+                )
+            else:
+                response = self.llm.chat(
+                    prompt=message,
+                    system_prompt=self.system_prompt,
+                    temperature=temperature
+                )
+            self._end_turn(message, response)
+            self._save_history()
+
+            logger.info(f"{session_info} Generated response: {response[:100]}...")
+            return response
 
-                # Trim history if too long
-                if len(self.history) > self.max_history * 2:  # *2 for user+assistant pairs
-                    self.history = self.history[-(self.max_history * 2):]
+        except Exception as e:
+            error_msg = f"Error in {self.agent_id} agent: {str(e)}"
+            logger.error(error_msg)
+            return f"I apologize, but I encountered an error: {str(e)}"
 
-                # Use history if we have messages
-                if len(self.history) > 1:
-                    response = self.llm.chat_with_history(
-                        messages=self.history,
-                        system_prompt=self.system_prompt,
-                        temperature=temperature
-                    )
-                else:
-                    # First message - use simple chat
-                    response = self.llm.chat(
-                        prompt=message,
-                        system_prompt=self.system_prompt,
-                        temperature=temperature
-                    )
+    async def achat(self, message: str, temperature: Optional[float] = None) -> str:
+        """
+        Async version of chat.
 
-                # Add response to history
-                self.history.append({"role": "assistant", "content": response})
+        The LLM call is awaited on the service's pooled async client, so
+        one worker can serve many conversations while generations run.
+        Redis history is saved in a worker thread.
 
-                # Save to Redis if enabled
-                if self.use_redis and self.redis_memory:
-                    self.redis_memory.save_conversation_history(
-                        agent_id=self.agent_id,
-                        session_id=self.session_id,
-                        history=self.history,
-                        ttl=self.memory_ttl
-                    )
+        Args:
+            message: User message/question
+            temperature: Optional temperature override (0-1)
+
+        Returns:
+            str: Agent response
+        """
+        try:
+            session_info = self._session_info()
+            logger.info(f"{session_info} Received message: {message[:100]}...")
 
+            messages = self._begin_turn(message)
+            if messages is not None:
+                response = await self.llm.achat_with_history(
+                    messages=messages,
+                    system_prompt=self.system_prompt,
+                    temperature=temperature
+                )
             else:
-                # No history - simple chat
-                response = self.llm.chat(
+                response = await self.llm.achat(
                     prompt=message,
                     system_prompt=self.system_prompt,
                     temperature=temperature
                 )
+            self._end_turn(message, response)
+            await asyncio.to_thread(self._save_history)
 
             logger.info(f"{session_info} Generated response: {response[:100]}...")
             return response
@@ -152,6 +216,54 @@ class BaseAgent:
             logger.error(error_msg)
             return f"I apologize, but I encountered an error: {str(e)}"
 
+    async def astream_chat(self, message: str, temperature: Optional[float] = None) -> AsyncIterator[str]:
+        """
+        Stream the agent's response as text deltas while it is generated.
+
+        History is updated with the full response once the stream ends.
+        If generation fails, the apology that chat would return is yielded
+        (after any deltas already sent).
+
+        Args:
+            message: User message/question
+            temperature: Optional temperature override (0-1)
+
+        Yields:
+            Consecutive pieces of the response
+        """
+        session_info = self._session_info()
+        logger.info(f"{session_info} Received message (streaming): {message[:100]}...")
+
+        pieces = []
+        try:
+            messages = self._begin_turn(message)
+            if messages is not None:
+                stream = self.llm.astream_with_history(
+                    messages=messages,
+                    system_prompt=self.system_prompt,
+                    temperature=temperature
+                )
+            else:
+                stream = self.llm.astream(
+                    prompt=message,
+                    system_prompt=self.system_prompt,
+                    temperature=temperature
+                )
+
+            async for piece in stream:
+                pieces.append(piece)
+                yield piece
+
+        except Exception as e:
+            logger.error(f"Error in {self.agent_id} agent: {str(e)}")
+            yield f"I apologize, but I encountered an error: {str(e)}"
+            return
+
+        response = "".join(pieces).strip()
+        self._end_turn(message, response)
+        await asyncio.to_thread(self._save_history)
+        logger.info(f"{session_info} Streamed response: {response[:100]}...")
+
     def reset_history(self):
         """Clear the conversation history (both in-memory and Redis)"""
         self.history = []
@@ -163,8 +275,7 @@ class BaseAgent:
                 session_id=self.session_id
             )
 
-        session_info = f"[{self.agent_id}:{self.session_id}]" if self.use_redis else f"[{self.agent_id}]"
-        logger.info(f"{session_info} Conversation history cleared")
+        logger.info(f"{self._session_info()} Conversation history cleared")
 
     def get_history(self) -> List[Dict[str, str]]:
         """
@@ -0,0 +1,162 @@
+"""
+Concurrent Agent Fan-Out
+
+Sends one query to several agents at once, with a limit on how many run
+in parallel and a timeout per agent, and returns whatever responses came
+back in time. Multi-TWG operations then take about as long as the slowest
+agent instead of the sum of all of them.
+"""
+
+from typing import Dict, Optional, Tuple, Any
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+import asyncio
+import math
+import time
+from loguru import logger
+
+# Failure reason recorded for agents that did not answer in time
+TIMEOUT = "timeout"
+
+
+def _timeout_reason(timeout: Optional[float]) -> str:
+    return f"{TIMEOUT} after {timeout}s"
+
+
+async def afan_out(
+    agents: Dict[str, Any],
+    query: str,
+    max_parallel: int = 3,
+    timeout: Optional[float] = None,
+    temperature: Optional[float] = None
+) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """
+    Ask several agents the same question concurrently (async agents).
+
+    Each agent's timeout starts when it starts running, not while it
+    waits for a free slot. A timed-out generation is cancelled.
+
+    Args:
+        agents: Agents to ask, by agent ID (anything with achat(query, temperature))
+        query: Question sent to every agent
+        max_parallel: Maximum agents generating at the same time
+        timeout: Seconds each agent may take (None waits indefinitely)
+        temperature: Temperature override for every agent (None uses the default)
+
+    Returns:
+        Tuple of (responses by agent ID, in the order of `agents`;
+        failure reasons by agent ID for agents that timed out or failed)
+    """
+    semaphore = asyncio.Semaphore(max(1, max_parallel))
+
+    async def ask(agent_id: str) -> str:
+        async with semaphore:
+            return await asyncio.wait_for(agents[agent_id].achat(query, temperature=temperature), timeout)
+
+    agent_ids = list(agents)
+    outcomes = await asyncio.gather(*(ask(agent_id) for agent_id in agent_ids), return_exceptions=True)
+
+    responses: Dict[str, str] = {}
+    failures: Dict[str, str] = {}
+    for agent_id, outcome in zip(agent_ids, outcomes):
+        if isinstance(outcome, asyncio.TimeoutError):
+            failures[agent_id] = _timeout_reason(timeout)
+        elif isinstance(outcome, BaseException):
+            failures[agent_id] = str(outcome)
+        elif outcome:
+            responses[agent_id] = outcome
+
+    _log_failures(failures)
+    return responses, failures
+
+
+def fan_out(
+    agents: Dict[str, Any],
+    query: str,
+    max_parallel: int = 3,
+    timeout: Optional[float] = None,
+    temperature: Optional[float] = None
+) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """
+    Ask several agents the same question concurrently (sync agents).
+
+    Agents run in a thread pool. A blocking generation cannot be
+    interrupted, so an agent that exceeds its timeout is abandoned and
+    keeps its worker busy; agents still queued behind it are given up
+    once the whole fan-out has taken as long as its waves of `timeout`
+    would (ceil(agents / max_parallel) * timeout).
+
+    Args:
+        agents: Agents to ask, by agent ID (anything with chat(query, temperature))
+        query: Question sent to every agent
+        max_parallel: Maximum agents generating at the same time
+        timeout: Seconds each agent may take (None waits indefinitely)
+        temperature: Temperature override for every agent (None uses the default)
+
+    Returns:
+        Tuple of (responses by agent ID, in the order of `agents`;
+        failure reasons by agent ID for agents that timed out or failed)
+    """
+    if not agents:
+        return {}, {}
+
+    max_parallel = max(1, max_parallel)
+    started: Dict[str, float] = {}
+
+    def ask(agent_id: str) -> str:
+        started[agent_id] = time.monotonic()
+        return agents[agent_id].chat(query, temperature=temperature)
+
+    executor = ThreadPoolExecutor(max_workers=min(max_parallel, len(agents)), thread_name_prefix="agent-fan-out")
+    futures: Dict[Future, str] = {executor.submit(ask, agent_id): agent_id for agent_id in agents}
+    deadline = None
+    if timeout is not None:
+        deadline = time.monotonic() + math.ceil(len(agents) / max_parallel) * timeout
+
+    outcomes: Dict[str, Tuple[bool, str]] = {}
+    pending = set(futures)
+    try:
+        while pending:
+            wait_for = None
+            if timeout is not None:
+                now = time.monotonic()
+                expiries = [deadline] + [
+                    started[futures[future]] + timeout
+                    for future in pending if futures[future] in started
+                ]
+                wait_for = max(0.0, min(expiries) - now)
+
+            done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    outcomes[futures[future]] = (True, future.result())
+                except Exception as e:
+                    outcomes[futures[future]] = (False, str(e))
+
+            if timeout is not None:
+                now = time.monotonic()
+                expired = {
+                    future for future in pending
+                    if now >= deadline or (futures[future] in started and now - started[futures[future]] >= timeout)
+                }
+                for future in expired:
+                    outcomes[futures[future]] = (False, _timeout_reason(timeout))
+                pending -= expired
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    responses: Dict[str, str] = {}
+    failures: Dict[str, str] = {}
+    for agent_id in agents:
+        ok, value = outcomes[agent_id]
+        if not ok:
+            failures[agent_id] = value
+        elif value:
+            responses[agent_id] = value
+
+    _log_failures(failures)
+    return responses, failures
+
+
+def _log_failures(failures: Dict[str, str]):
+    for agent_id, reason in failures.items():
+        logger.warning(f"Fan-out: no response from {agent_id} ({reason})")
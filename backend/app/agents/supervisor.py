@@ -5,11 +5,13 @@ Central coordinator and orchestrator for all TWG agents.
 Routes requests, synthesizes outputs, and maintains global consistency.
 """
 
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Union, Tuple
 from loguru import logger
 from uuid import UUID
 
 from backend.app.agents.base_agent import BaseAgent
+from backend.app.agents.fan_out import fan_out, afan_out, TIMEOUT
+from backend.app.core.config import settings
 from backend.app.services.broadcast_service import BroadcastService
 from backend.app.services.conflict_detector import ConflictDetector
 from backend.app.services.negotiation_service import NegotiationService
@@ -33,6 +35,11 @@ from backend.app.tools import email_tools
 class SupervisorAgent(BaseAgent):
     """Supervisor agent for coordinating all TWG agents"""
 
+    # Temperature of the repeatable cross-TWG workflows (status collection,
+    # syntheses, assessments); greedy decoding lets the LLM response cache
+    # serve a repeated run
+    WORKFLOW_TEMPERATURE = 0.0
+
     def __init__(
         self,
         keep_history: bool = True,
@@ -61,6 +68,10 @@ class SupervisorAgent(BaseAgent):
         # Registry of all TWG agents
         self._agent_registry: Dict[str, BaseAgent] = {}
 
+        # Limits for consulting several agents at once
+        self.max_parallel_agents = settings.ROUTING_MAX_PARALLEL_AGENTS
+        self.agent_timeout: Optional[float] = settings.AGENT_RESPONSE_TIMEOUT or None
+
         # Initialize broadcast and conflict management services
         self.broadcast_service = BroadcastService()
         self.conflict_detector = ConflictDetector(llm_client=self.llm)
@@ -191,13 +202,14 @@ class SupervisorAgent(BaseAgent):
 
         return relevant
 
-    def delegate_to_agent(self, agent_id: str, query: str) -> Optional[str]:
+    def delegate_to_agent(self, agent_id: str, query: str, temperature: Optional[float] = None) -> Optional[str]:
         """
         Delegate a query to a specific TWG agent.
 
         Args:
             agent_id: ID of the agent to delegate to
             query: The query to send to the agent
+            temperature: Optional temperature override
 
         Returns:
             Agent's response or None if agent not found
@@ -210,12 +222,92 @@ class SupervisorAgent(BaseAgent):
         logger.info(f"Supervisor: Delegating to {agent_id} agent")
 
         try:
-            response = agent.chat(query)
+            response = agent.chat(query, temperature=temperature)
             return response
         except Exception as e:
             logger.error(f"Supervisor: Error delegating to {agent_id}: {e}")
             return f"Error from {agent_id} agent: {str(e)}"
 
+    async def adelegate_to_agent(self, agent_id: str, query: str, temperature: Optional[float] = None) -> Optional[str]:
+        """
+        Async version of delegate_to_agent.
+
+        Args:
+            agent_id: ID of the agent to delegate to
+            query: The query to send to the agent
+            temperature: Optional temperature override
+
+        Returns:
+            Agent's response or None if agent not found
+        """
+        if agent_id not in self._agent_registry:
+            logger.warning(f"Supervisor: Agent '{agent_id}' not registered")
+            return None
+
+        agent = self._agent_registry[agent_id]
+        logger.info(f"Supervisor: Delegating to {agent_id} agent")
+
+        try:
+            return await agent.achat(query, temperature=temperature)
+        except Exception as e:
+            logger.error(f"Supervisor: Error delegating to {agent_id}: {e}")
+            return f"Error from {agent_id} agent: {str(e)}"
+
+    def _registered(self, agent_ids: List[str]) -> Dict[str, BaseAgent]:
+        agents = {}
+        for agent_id in agent_ids:
+            if agent_id in self._agent_registry:
+                agents[agent_id] = self._agent_registry[agent_id]
+            else:
+                logger.warning(f"Supervisor: Agent '{agent_id}' not registered")
+        return agents
+
+    def delegate_to_agents(
+        self,
+        query: str,
+        agent_ids: List[str],
+        temperature: Optional[float] = None
+    ) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """
+        Send a query to several TWG agents concurrently.
+
+        At most `max_parallel_agents` agents generate at once and each has
+        `agent_timeout` seconds; agents that time out or fail are left out
+        of the responses, so callers get partial results.
+
+        Args:
+            query: The query to send to all agents
+            agent_ids: List of agent IDs to consult
+            temperature: Optional temperature override for every agent
+
+        Returns:
+            Tuple of (responses by agent ID, failure reasons by agent ID)
+        """
+        agents = self._registered(agent_ids)
+        logger.info(f"Supervisor: Fanning out to {list(agents)} (parallel={self.max_parallel_agents}, timeout={self.agent_timeout})")
+        return fan_out(agents, query, self.max_parallel_agents, self.agent_timeout, temperature)
+
+    async def adelegate_to_agents(
+        self,
+        query: str,
+        agent_ids: List[str],
+        temperature: Optional[float] = None
+    ) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """
+        Async version of delegate_to_agents.
+
+        Args:
+            query: The query to send to all agents
+            agent_ids: List of agent IDs to consult
+            temperature: Optional temperature override for every agent
+
+        Returns:
+            Tuple of (responses by agent ID, failure reasons by agent ID)
+        """
+        agents = self._registered(agent_ids)
+        logger.info(f"Supervisor: Fanning out to {list(agents)} (parallel={self.max_parallel_agents}, timeout={self.agent_timeout})")
+        return await afan_out(agents, query, self.max_parallel_agents, self.agent_timeout, temperature)
+
     def consult_multiple_agents(self, query: str, agent_ids: List[str]) -> Dict[str, str]:
         """
         Consult multiple TWG agents and collect their responses.
@@ -227,31 +319,25 @@ class SupervisorAgent(BaseAgent):
         Returns:
             Dictionary mapping agent IDs to their responses
         """
-        responses = {}
-
-        for agent_id in agent_ids:
-            response = self.delegate_to_agent(agent_id, query)
-            if response:
-                responses[agent_id] = response
-
+        responses, _ = self.delegate_to_agents(query, agent_ids)
         return responses
 
-    def synthesize_responses(self, query: str, responses: Dict[str, str]) -> str:
+    async def aconsult_multiple_agents(self, query: str, agent_ids: List[str]) -> Dict[str, str]:
         """
-        Synthesize multiple agent responses into a coherent answer.
-
-        Now displays individual agent responses clearly before synthesis.
+        Async version of consult_multiple_agents.
 
         Args:
-            query: Original query
-            responses: Dictionary of agent responses
+            query: The query to send to all agents
+            agent_ids: List of agent IDs to consult
 
         Returns:
-            Synthesized response with clear agent attribution
+            Dictionary mapping agent IDs to their responses
         """
-        if not responses:
-            return "I couldn't get responses from the relevant agents."
+        responses, _ = await self.adelegate_to_agents(query, agent_ids)
+        return responses
 
+    def _format_consultation(self, responses: Dict[str, str]) -> str:
+        """Show each consulted agent's response with clear attribution."""
         # Build header showing which agents were consulted
         agent_list = ", ".join([agent_id.upper() for agent_id in responses.keys()])
         output = f"[Consulted {len(responses)} TWGs: {agent_list}]\n\n"
@@ -267,8 +353,10 @@ class SupervisorAgent(BaseAgent):
                 output += "\n" + "=" * 70 + "\n"
 
         output += "\n" + "=" * 70 + "\n"
+        return output
 
-        # Build synthesis prompt for the supervisor
+    def _synthesis_prompt(self, query: str, responses: Dict[str, str]) -> str:
+        """Build the prompt asking the supervisor to synthesize agent responses."""
         synthesis_prompt = f"""Original Question: {query}
 
 I have consulted {len(responses)} TWG agents and received these responses:
@@ -278,17 +366,57 @@ I have consulted {len(responses)} TWG agents and received these responses:
             synthesis_prompt += f"\n{agent_id.upper()} TWG:\n{response}\n"
 
         synthesis_prompt += "\n\nAs the Supervisor, provide a brief (2-3 sentence) strategic synthesis that highlights how these TWG perspectives complement each other and what the key takeaways are."
+        return synthesis_prompt
 
-        # Get supervisor's synthesis
-        synthesis = super().chat(synthesis_prompt)
-
-        # Add synthesis at the end
+    @staticmethod
+    def _append_synthesis(output: str, synthesis: str) -> str:
         output += f"\n🎯 SUPERVISOR'S SYNTHESIS:\n"
         output += "-" * 70 + "\n"
         output += synthesis + "\n"
-
         return output
 
+    def synthesize_responses(self, query: str, responses: Dict[str, str]) -> str:
+        """
+        Synthesize multiple agent responses into a coherent answer.
+
+        Now displays individual agent responses clearly before synthesis.
+
+        Args:
+            query: Original query
+            responses: Dictionary of agent responses
+
+        Returns:
+            Synthesized response with clear agent attribution
+        """
+        if not responses:
+            return "I couldn't get responses from the relevant agents."
+
+        output = self._format_consultation(responses)
+
+        # Get supervisor's synthesis
+        synthesis = super().chat(self._synthesis_prompt(query, responses))
+
+        # Add synthesis at the end
+        return self._append_synthesis(output, synthesis)
+
+    async def asynthesize_responses(self, query: str, responses: Dict[str, str]) -> str:
+        """
+        Async version of synthesize_responses.
+
+        Args:
+            query: Original query
+            responses: Dictionary of agent responses
+
+        Returns:
+            Synthesized response with clear agent attribution
+        """
+        if not responses:
+            return "I couldn't get responses from the relevant agents."
+
+        output = self._format_consultation(responses)
+        synthesis = await super().achat(self._synthesis_prompt(query, responses))
+        return self._append_synthesis(output, synthesis)
+
     def smart_chat(self, message: str, auto_delegate: bool = True) -> str:
         """
         Enhanced chat method with automatic agent delegation.
@@ -328,6 +456,37 @@ I have consulted {len(responses)} TWG agents and received these responses:
             responses = self.consult_multiple_agents(message, relevant_agents)
             return self.synthesize_responses(message, responses)
 
+    async def asmart_chat(self, message: str, auto_delegate: bool = True, temperature: Optional[float] = None) -> str:
+        """
+        Async version of smart_chat.
+
+        Args:
+            message: User message
+            auto_delegate: If True, automatically delegate to relevant TWG agents
+            temperature: Optional temperature override when the supervisor answers itself
+
+        Returns:
+            Response (either direct or synthesized from multiple agents)
+        """
+        if not auto_delegate or not self._agent_registry:
+            return await super().achat(message, temperature)
+
+        relevant_agents = self.identify_relevant_agents(message)
+
+        if not relevant_agents:
+            logger.info("Supervisor: No specific TWG identified, using general knowledge")
+            return await super().achat(message, temperature)
+
+        if len(relevant_agents) == 1:
+            agent_id = relevant_agents[0]
+            logger.info(f"Supervisor: Delegating to single agent: {agent_id}")
+            response = await self.adelegate_to_agent(agent_id, message)
+            return f"[Consulted {agent_id.upper()} TWG]\n\n{response}"
+
+        logger.info(f"Supervisor: Consulting multiple agents: {relevant_agents}")
+        responses = await self.aconsult_multiple_agents(message, relevant_agents)
+        return await self.asynthesize_responses(message, responses)
+
     def get_registered_agents(self) -> List[str]:
         """
         Get list of all registered agent IDs.
@@ -377,17 +536,17 @@ I have consulted {len(responses)} TWG agents and received these responses:
         else:
             status_query = "Provide a brief status update covering: current priorities, recent progress, upcoming milestones, and any blockers or dependencies on other TWGs."
 
+        responses, failures = self.delegate_to_agents(status_query, agent_ids, self.WORKFLOW_TEMPERATURE)
+
         statuses = {}
         for agent_id in agent_ids:
-            try:
-                logger.info(f"Querying {agent_id} TWG...")
-                response = self.delegate_to_agent(agent_id, status_query)
-                if response:
-                    statuses[agent_id] = response
-                    logger.info(f"✓ Got response from {agent_id}")
-            except Exception as e:
-                logger.error(f"✗ Failed to collect from {agent_id}: {e}")
-                statuses[agent_id] = f"[Error: {str(e)[:100]}]"
+            if agent_id in responses:
+                statuses[agent_id] = responses[agent_id]
+                logger.info(f"✓ Got response from {agent_id}")
+            elif agent_id in failures:
+                logger.error(f"✗ Failed to collect from {agent_id}: {failures[agent_id]}")
+                label = "Timed out" if failures[agent_id].startswith(TIMEOUT) else "Error"
+                statuses[agent_id] = f"[{label}: {failures[agent_id][:100]}]"
 
         return statuses
 
@@ -414,7 +573,7 @@ I have consulted {len(responses)} TWG agents and received these responses:
 4. Critical success factors
 5. Main risks and dependencies"""
 
-        twg_input = self.delegate_to_agent(pillar_agent_id, pillar_query)
+        twg_input = self.delegate_to_agent(pillar_agent_id, pillar_query, self.WORKFLOW_TEMPERATURE)
 
         if not twg_input:
             return f"Could not generate overview for {pillar_agent_id} - agent not available"
@@ -435,7 +594,7 @@ I have consulted {len(responses)} TWG agents and received these responses:
 
         # Generate synthesis
         logger.info(f"Generating pillar overview for {pillar_agent_id}")
-        return super().chat(prompt)
+        return super().chat(prompt, self.WORKFLOW_TEMPERATURE)
 
     def generate_cross_pillar_synthesis(self, agent_ids: List[str]) -> str:
         """
@@ -458,11 +617,7 @@ I have consulted {len(responses)} TWG agents and received these responses:
         # Collect inputs from all specified TWGs
         query = "Describe your pillar's priorities, key projects, and any dependencies or synergies with other pillars (energy, agriculture, minerals, digital)."
 
-        twg_inputs = {}
-        for agent_id in agent_ids:
-            response = self.delegate_to_agent(agent_id, query)
-            if response:
-                twg_inputs[agent_id] = response
+        twg_inputs, _ = self.delegate_to_agents(query, agent_ids, self.WORKFLOW_TEMPERATURE)
 
         if not twg_inputs:
             return "Could not collect TWG inputs for synthesis"
@@ -486,7 +641,7 @@ I have consulted {len(responses)} TWG agents and received these responses:
         )
 
         logger.info(f"Generating cross-pillar synthesis for: {pillars_list}")
-        return super().chat(prompt)
+        return super().chat(prompt, self.WORKFLOW_TEMPERATURE)
 
     def generate_strategic_priorities(self) -> str:
         """
@@ -513,7 +668,7 @@ I have consulted {len(responses)} TWG agents and received these responses:
         )
 
         logger.info("Generating strategic priorities synthesis across all TWGs")
-        return super().chat(prompt)
+        return super().chat(prompt, self.WORKFLOW_TEMPERATURE)
 
     def generate_policy_coherence_check(self) -> str:
         """
@@ -530,11 +685,7 @@ I have consulted {len(responses)} TWG agents and received these responses:
         # Query TWGs about their policy recommendations
         policy_query = "List your key policy recommendations and regulatory proposals for the summit."
 
-        twg_inputs = {}
-        for agent_id in self.get_registered_agents():
-            response = self.delegate_to_agent(agent_id, policy_query)
-            if response:
-                twg_inputs[agent_id] = response
+        twg_inputs, _ = self.delegate_to_agents(policy_query, self.get_registered_agents(), self.WORKFLOW_TEMPERATURE)
 
         if not twg_inputs:
             return "Could not collect policy inputs from TWGs"
@@ -546,7 +697,7 @@ I have consulted {len(responses)} TWG agents and received these responses:
         )
 
         logger.info("Generating policy coherence check across all TWGs")
-        return super().chat(prompt)
+        return super().chat(prompt, self.WORKFLOW_TEMPERATURE)
 
     def generate_summit_readiness_assessment(self) -> str:
         """
@@ -563,11 +714,7 @@ I have consulted {len(responses)} TWG agents and received these responses:
         # Collect comprehensive status from all TWGs including protocol
         readiness_query = "Provide a readiness assessment covering: deliverables status, timeline adherence, resource needs, stakeholder engagement, and any critical issues."
 
-        twg_inputs = {}
-        for agent_id in self.get_registered_agents():
-            response = self.delegate_to_agent(agent_id, readiness_query)
-            if response:
-                twg_inputs[agent_id] = response
+        twg_inputs, _ = self.delegate_to_agents(readiness_query, self.get_registered_agents(), self.WORKFLOW_TEMPERATURE)
 
         if not twg_inputs:
             return "Could not collect readiness inputs from TWGs"
@@ -579,7 +726,7 @@ I have consulted {len(responses)} TWG agents and received these responses:
         )
 
         logger.info("Generating summit readiness assessment")
-        return super().chat(prompt)
+        return super().chat(prompt, self.WORKFLOW_TEMPERATURE)
 
     # =========================================================================
     # BROADCAST AND CONTEXT MANAGEMENT
@@ -755,14 +902,7 @@ I have consulted {len(responses)} TWG agents and received these responses:
                 query = "What are your current policy recommendations and key targets?"
 
             logger.info("Collecting TWG outputs for conflict detection...")
-            twg_outputs = {}
-            for agent_id in self.get_registered_agents():
-                try:
-                    response = self.delegate_to_agent(agent_id, query)
-                    if response:
-                        twg_outputs[agent_id] = response
-                except Exception as e:
-                    logger.error(f"Failed to collect from {agent_id}: {e}")
+            twg_outputs, _ = self.delegate_to_agents(query, self.get_registered_agents(), self.WORKFLOW_TEMPERATURE)
 
         # Run conflict detection
         conflicts = self.conflict_detector.detect_conflicts(twg_outputs)
@@ -1002,8 +1142,6 @@ I have consulted {len(responses)} TWG agents and received these responses:
 
     def _collect_declaration_sections(self) -> Dict[str, str]:
         """Collect Declaration draft sections from all TWGs"""
-        sections = {}
-
         query = """Please provide your draft section for the ECOWAS Summit 2026 Declaration.
 
 Include:
@@ -1014,17 +1152,13 @@ Include:
 
 Format: 2-3 paragraphs in formal ministerial voice."""
 
-        for agent_id in self.get_registered_agents():
-            try:
-                logger.info(f"Collecting Declaration section from {agent_id}...")
-                response = self.delegate_to_agent(agent_id, query)
-
-                if response:
-                    sections[agent_id] = response
-                    logger.info(f"✓ Received section from {agent_id}")
+        logger.info("Collecting Declaration sections from all TWGs...")
+        sections, failures = self.delegate_to_agents(query, self.get_registered_agents(), self.WORKFLOW_TEMPERATURE)
 
-            except Exception as e:
-                logger.error(f"Failed to collect from {agent_id}: {e}")
+        for agent_id in sections:
+            logger.info(f"✓ Received section from {agent_id}")
+        for agent_id, reason in failures.items():
+            logger.error(f"Failed to collect from {agent_id}: {reason}")
 
         return sections
 
@@ -8,7 +8,7 @@ from LLM responses, even without native function calling support.
 import re
 import asyncio
 import json
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, AsyncIterator
 from loguru import logger
 
 from backend.app.agents.supervisor import SupervisorAgent
@@ -104,7 +104,7 @@ class SupervisorWithTools(SupervisorAgent):
             Response with tool results integrated
         """
         if not self.tool_execution_enabled:
-            return self.chat(message, temperature)
+            return await self.asmart_chat(message, temperature=temperature)
 
         # Detect if this is an email-related request
         tool_call = self._detect_email_request(message)
@@ -170,8 +170,34 @@ class SupervisorWithTools(SupervisorAgent):
                 logger.error(f"Error executing tool: {e}")
                 return f"I encountered an error while trying to access Gmail: {str(e)}"
 
-        # No tool detected, use regular chat
-        return self.chat(message, temperature)
+        # No tool detected; delegate to the relevant TWG agents, if any are registered
+        return await self.asmart_chat(message, temperature=temperature)
+
+    async def stream_chat_with_tools(self, message: str, temperature: Optional[float] = None) -> AsyncIterator[str]:
+        """
+        Streaming version of chat_with_tools.
+
+        Plain chat responses are streamed token by token; when the message
+        triggers an email tool or is delegated to TWG agents, the formatted
+        result is yielded whole.
+
+        Args:
+            message: User message
+            temperature: Optional temperature override
+
+        Yields:
+            Consecutive pieces of the response
+        """
+        if self.tool_execution_enabled and self._detect_email_request(message):
+            yield await self.chat_with_tools(message, temperature)
+            return
+
+        if self._agent_registry and self.identify_relevant_agents(message):
+            yield await self.asmart_chat(message, temperature=temperature)
+            return
+
+        async for piece in self.astream_chat(message, temperature):
+            yield piece
 
     def _detect_email_request(self, message: str) -> Optional[Dict[str, Any]]:
         """
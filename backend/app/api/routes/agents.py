@@ -1,8 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.responses import StreamingResponse
-from typing import List, AsyncGenerator
+from typing import List, AsyncGenerator, Optional
 import uuid
-import asyncio
 import json
 
 from backend.app.api.deps import get_current_active_user
@@ -43,16 +42,16 @@ def get_supervisor() -> SupervisorWithTools:
 
 # Command and Mention Handlers (Phase 2)
 
-async def handle_command(supervisor: SupervisorWithTools, parsed: dict, original_message: str) -> str:
-    """Handle slash command execution."""
+def command_query(parsed: dict) -> Optional[str]:
+    """Build the supervisor query for a slash command (None if the command has no handler)."""
     command = parsed["command"]
     params = parsed["parameters"]
     clean_query = parsed["clean_query"]
 
-    # Map commands to supervisor methods
+    # Map commands to supervisor queries
     if command == "/search":
         query = params.get("query", clean_query)
-        return await supervisor.chat_with_tools(f"Search the knowledge base for: {query}")
+        return f"Search the knowledge base for: {query}"
 
     elif command == "/email":
         # Check if it's a send or search operation
@@ -62,61 +61,80 @@ async def handle_command(supervisor: SupervisorWithTools, parsed: dict, original
             subject = params.get("subject", "Message from ECOWAS TWG System")
             body = params.get("body", clean_query)
             cc = params.get("cc")
-            return await supervisor.chat_with_tools(
+            return (
                 f"Send an email to {to} with subject '{subject}' and message: {body}" +
                 (f" and CC {cc}" if cc else "")
             )
         else:
             # Search emails
             search_term = params.get("search", clean_query)
-            return await supervisor.chat_with_tools(f"Search my emails for: {search_term}")
+            return f"Search my emails for: {search_term}"
 
     elif command == "/schedule":
-        return await supervisor.chat_with_tools(f"Help me with scheduling: {clean_query}")
+        return f"Help me with scheduling: {clean_query}"
 
     elif command == "/draft":
         doc_type = params.get("type", "document")
         topic = params.get("topic", clean_query)
-        return await supervisor.chat_with_tools(f"Draft a {doc_type} about: {topic}")
+        return f"Draft a {doc_type} about: {topic}"
 
     elif command == "/analyze":
         target = params.get("target", clean_query)
-        return await supervisor.chat_with_tools(f"Analyze: {target}")
+        return f"Analyze: {target}"
 
     elif command == "/broadcast":
         message = params.get("message", clean_query)
-        return await supervisor.chat_with_tools(f"Broadcast this message to all TWGs: {message}")
+        return f"Broadcast this message to all TWGs: {message}"
 
     elif command == "/summarize":
         target = params.get("target", clean_query)
-        return await supervisor.chat_with_tools(f"Summarize: {target}")
+        return f"Summarize: {target}"
 
-    else:
-        return f"Command {command} recognized but handler not implemented yet. Query: {clean_query}"
+    return None
 
 
-async def handle_mention(supervisor: SupervisorWithTools, parsed: dict) -> str:
-    """Handle @mention routing to specific agents."""
+def mention_query(parsed: dict) -> str:
+    """Build the supervisor query for @mention routing (the message has a query)."""
     agent_ids = parsed["agent_mentions"]
     clean_query = parsed["clean_query"]
 
-    if not clean_query:
-        # No query, just return info about mentioned agents
-        agent_names = [command_parser.AGENT_MENTIONS[f"@{aid.title()}Agent"]["name"]
-                      for aid in agent_ids if f"@{aid.title()}Agent" in command_parser.AGENT_MENTIONS]
-        return f"You mentioned: {', '.join(agent_names)}. How can they help you?"
-
     # For now, route to supervisor with context about which agent was mentioned
     # TODO: Implement actual agent delegation in supervisor_with_tools.py
     if len(agent_ids) == 1:
-        agent_id = agent_ids[0]
-        return await supervisor.chat_with_tools(
-            f"[ROUTING TO {agent_id.upper()} TWG AGENT] {clean_query}"
-        )
-    else:
-        return await supervisor.chat_with_tools(
-            f"[ROUTING TO MULTIPLE AGENTS: {', '.join(agent_ids)}] {clean_query}"
-        )
+        return f"[ROUTING TO {agent_ids[0].upper()} TWG AGENT] {clean_query}"
+    return f"[ROUTING TO MULTIPLE AGENTS: {', '.join(agent_ids)}] {clean_query}"
+
+
+def unhandled_command_reply(parsed: dict) -> str:
+    return f"Command {parsed['command']} recognized but handler not implemented yet. Query: {parsed['clean_query']}"
+
+
+def mention_info_reply(parsed: dict) -> str:
+    """Reply to a mention without a query: who was mentioned."""
+    agent_names = [command_parser.AGENT_MENTIONS[f"@{aid.title()}Agent"]["name"]
+                  for aid in parsed["agent_mentions"] if f"@{aid.title()}Agent" in command_parser.AGENT_MENTIONS]
+    return f"You mentioned: {', '.join(agent_names)}. How can they help you?"
+
+
+async def handle_command(supervisor: SupervisorWithTools, parsed: dict, original_message: str) -> str:
+    """Handle slash command execution."""
+    query = command_query(parsed)
+    if query is None:
+        return unhandled_command_reply(parsed)
+    return await supervisor.chat_with_tools(query)
+
+
+async def handle_mention(supervisor: SupervisorWithTools, parsed: dict) -> str:
+    """Handle @mention routing to specific agents."""
+    if not parsed["clean_query"]:
+        # No query, just return info about mentioned agents
+        return mention_info_reply(parsed)
+    return await supervisor.chat_with_tools(mention_query(parsed))
+
+
+def sse_event(data: dict) -> str:
+    """Format one Server-Sent Event (UUIDs and datetimes as strings)."""
+    return f"data: {json.dumps(data, default=str)}\n\n"
 
 
 @router.post("/chat", response_model=AgentChatResponse)
@@ -254,7 +272,7 @@ async def stream_chat(
     Returns Server-Sent Events (SSE) stream with:
     - Agent thinking status
     - Tool execution progress
-    - Intermediate results
+    - 'delta' events carrying response tokens as the LLM generates them
     - Final response
     """
 
@@ -297,7 +315,8 @@ async def stream_chat(
                     yield f"data: {json.dumps({'type': 'tool_start', 'tool': 'analyzer', 'status': 'Analyzing data...'})}\n\n"
 
                 # Execute command
-                response_text = await handle_command(supervisor, parsed, chat_in.message)
+                query = command_query(parsed)
+                reply = unhandled_command_reply(parsed) if query is None else None
                 message_type = ChatMessageType.COMMAND_RESULT
 
             elif parsed["type"] == MessageParseType.MENTION:
@@ -307,26 +326,36 @@ async def stream_chat(
                 yield f"data: {json.dumps({'type': 'agent_routing', 'agents': agent_ids, 'status': status_msg})}\n\n"
 
                 # Execute with mentioned agent
-                response_text = await handle_mention(supervisor, parsed)
+                if parsed["clean_query"]:
+                    query, reply = mention_query(parsed), None
+                else:
+                    query, reply = None, mention_info_reply(parsed)
                 message_type = ChatMessageType.AGENT_TEXT
 
             elif parsed["type"] == MessageParseType.MIXED:
                 yield f"data: {json.dumps({'type': 'mixed_execution', 'status': 'Processing command with agent mention...'})}\n\n"
-                response_text = await handle_command(supervisor, parsed, chat_in.message)
+                query = command_query(parsed)
+                reply = unhandled_command_reply(parsed) if query is None else None
                 message_type = ChatMessageType.COMMAND_RESULT
 
             else:
                 # Natural language - show thinking
                 yield f"data: {json.dumps({'type': 'thinking', 'status': 'Processing your request...'})}\n\n"
 
-                # Simulate LLM thinking
-                await asyncio.sleep(0.5)
-                yield f"data: {json.dumps({'type': 'thinking', 'status': 'Analyzing context...'})}\n\n"
-
-                # Execute
-                response_text = await supervisor.chat_with_tools(chat_in.message)
+                query, reply = chat_in.message, None
                 message_type = ChatMessageType.AGENT_TEXT
 
+            # Forward tokens as they are generated
+            if reply is None:
+                pieces = []
+                async for delta in supervisor.stream_chat_with_tools(query):
+                    pieces.append(delta)
+                    yield sse_event({'type': 'delta', 'content': delta})
+                response_text = "".join(pieces).strip()
+            else:
+                response_text = reply
+                yield sse_event({'type': 'delta', 'content': reply})
+
             # Send completion event
             yield f"data: {json.dumps({'type': 'tool_complete', 'status': 'Completed'})}\n\n"
 
@@ -342,7 +371,7 @@ async def stream_chat(
             )
 
             # Send final response
-            yield f"data: {json.dumps({'type': 'response', 'message': agent_message.dict()})}\n\n"
+            yield sse_event({'type': 'response', 'message': agent_message.dict()})
 
             # Send done event
             yield f"data: {json.dumps({'type': 'done'})}\n\n"
@@ -403,6 +432,17 @@ async def get_agent_swarm_status(
     }
 
 
+@router.get("/llm/stats")
+async def get_llm_stats(
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Get LLM service statistics (response cache and request coalescing).
+    """
+    from backend.app.services.llm_service import get_llm_service
+    return get_llm_service().get_stats()
+
+
 # Phase 2: Command Autocomplete Endpoints
 
 @router.get("/commands/autocomplete")
@@ -1,26 +1,43 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Request
+from fastapi.responses import FileResponse, StreamingResponse, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, delete
-from typing import List, Optional
+from typing import List, Optional, Literal
 import uuid
 import os
-import shutil
-from datetime import datetime
+import json
+import asyncio
 
-from backend.app.core.database import get_db
-from backend.app.models.models import Document, User, UserRole
-from backend.app.schemas.schemas import DocumentRead
+from backend.app.core.config import settings
+from backend.app.core.database import get_db, AsyncSessionLocal
+from backend.app.models.models import Document, User, UserRole, IngestionJob
+from backend.app.schemas.schemas import DocumentRead, IngestionJobRead, BulkIngestRead
 from backend.app.api.deps import get_current_active_user, has_twg_access
-from backend.app.core.knowledge_base import get_knowledge_base
-from backend.app.utils.document_processor import get_document_processor
+from backend.app.core.async_knowledge_base import get_async_knowledge_base
+from backend.app.services.ingestion_jobs import get_ingestion_runner, TERMINAL_STATUSES
+from backend.app.services.vector_gc import purge_document_vectors, reconcile_vectors
+from backend.app.utils.blob_store import BlobStore
+from backend.app.utils.upload_writer import UploadTooLarge
+from backend.app.utils.download import (
+    DownloadAccessCache, RangeNotSatisfiable, content_disposition, http_date,
+    is_not_modified, iter_file_range, make_etag, parse_range
+)
 
 router = APIRouter(prefix="/documents", tags=["Documents"])
 
 UPLOAD_DIR = "uploads"
+
+# Seconds between job status reads when streaming ingestion progress
+JOB_EVENTS_POLL_INTERVAL = 1.0
 if not os.path.exists(UPLOAD_DIR):
     os.makedirs(UPLOAD_DIR)
 
+# Uploads are stored once per content digest, shared by duplicate documents
+blob_store = BlobStore(os.path.join(UPLOAD_DIR, "blobs"))
+
+# Per-user download permissions, so repeat downloads skip the document lookup
+download_access_cache = DownloadAccessCache(ttl=settings.DOWNLOAD_ACCESS_CACHE_TTL)
+
 @router.post("/upload", response_model=DocumentRead, status_code=status.HTTP_201_CREATED)
 async def upload_document(
     file: UploadFile = File(...),
@@ -32,6 +49,11 @@ async def upload_document(
     """
     Upload a document.
     
+    The file is stored by content digest: uploading bytes that are already
+    stored reuses the existing file, records the earlier document in
+    metadata_json['duplicate_of'], and ingestion later copies that
+    document's vectors instead of extracting and embedding again.
+    
     twg_id can be either:
     - A UUID string (for backward compatibility)
     - A pillar key: energy, agriculture, minerals, digital, protocol, resource_mobilization
@@ -75,34 +97,48 @@ async def upload_document(
     if resolved_twg_id and not has_twg_access(current_user, resolved_twg_id):
         raise HTTPException(status_code=403, detail="You do not have access to upload to this TWG")
 
-    # Generate safe filename
-    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-    safe_filename = f"{timestamp}_{file.filename}"
-    file_path = os.path.join(UPLOAD_DIR, safe_filename)
-    
-    # Save file
+    # Workaround: Explicitly truncate file_type to 50 chars to avoid persistent DBAPIError
+    safe_file_type = (file.content_type or "unknown")[:50]
+    created = []
+
+    async def create_record(file_path: str, file_size: int, file_sha256: str, duplicate: bool):
+        # Runs under the blob's lock, so a concurrent delete cannot remove the
+        # blob between finding it stored and this row referencing it
+        metadata_json = None
+        if duplicate:
+            result = await db.execute(
+                select(Document.id).where(Document.file_path == file_path).order_by(Document.created_at).limit(1)
+            )
+            original_id = result.scalar_one_or_none()
+            if original_id:
+                metadata_json = {"duplicate_of": str(original_id)}
+        
+        db_doc = Document(
+            twg_id=resolved_twg_id,
+            file_name=file.filename,
+            file_path=file_path,
+            file_type=safe_file_type,
+            file_size=file_size,
+            file_sha256=file_sha256,
+            uploaded_by_id=current_user.id,
+            is_confidential=is_confidential,
+            metadata_json=metadata_json
+        )
+        
+        db.add(db_doc)
+        await db.commit()
+        created.append(db_doc)
+
+    # Stream file into the blob store, measuring and hashing it in the same
+    # pass, and create the DB record
     try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        await blob_store.store_upload(file, settings.MAX_UPLOAD_SIZE, register=create_record)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Could not save file: {str(e)}")
         
-    # Create DB record
-    # Create DB record
-    # Workaround: Explicitly truncate file_type to 50 chars to avoid persistent DBAPIError
-    safe_file_type = (file.content_type or "unknown")[:50]
-    
-    db_doc = Document(
-        twg_id=resolved_twg_id,
-        file_name=file.filename,
-        file_path=file_path,
-        file_type=safe_file_type,
-        uploaded_by_id=current_user.id,
-        is_confidential=is_confidential
-    )
-    
-    db.add(db_doc)
-    await db.commit()
+    db_doc = created[0]
     await db.refresh(db_doc)
     
     
@@ -151,34 +187,90 @@ async def list_documents(
 @router.get("/{doc_id}/download")
 async def download_document(
     doc_id: uuid.UUID,
+    request: Request,
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Download a document.
-    """
-    result = await db.execute(select(Document).where(Document.id == doc_id))
-    db_doc = result.scalar_one_or_none()
     
-    if not db_doc:
-        raise HTTPException(status_code=404, detail="Document not found")
+    Responses carry a strong ETag (the content digest) and Last-Modified,
+    answer If-None-Match / If-Modified-Since with 304, and serve a single
+    byte range with 206 so interrupted downloads can resume.
+    """
+    info = download_access_cache.get(current_user.id, doc_id)
+    if info is None:
+        result = await db.execute(select(Document).where(Document.id == doc_id))
+        db_doc = result.scalar_one_or_none()
         
-    if db_doc.twg_id and not has_twg_access(current_user, db_doc.twg_id):
-        raise HTTPException(status_code=403, detail="Access denied")
+        if not db_doc:
+            raise HTTPException(status_code=404, detail="Document not found")
+            
+        if db_doc.twg_id and not has_twg_access(current_user, db_doc.twg_id):
+            raise HTTPException(status_code=403, detail="Access denied")
         
-    if not os.path.exists(db_doc.file_path):
-        raise HTTPException(status_code=404, detail="File on disk not found")
+        info = {
+            "file_path": db_doc.file_path,
+            "file_name": db_doc.file_name,
+            "file_type": db_doc.file_type,
+            "etag": make_etag(db_doc.file_sha256) if db_doc.file_sha256 else None,
+            "last_modified": db_doc.created_at
+        }
+        download_access_cache.put(current_user.id, doc_id, info)
         
-    return FileResponse(path=db_doc.file_path, filename=db_doc.file_name, media_type=db_doc.file_type)
+    if not os.path.exists(info["file_path"]):
+        raise HTTPException(status_code=404, detail="File on disk not found")
+    
+    headers = {"Accept-Ranges": "bytes", "Last-Modified": http_date(info["last_modified"])}
+    if info["etag"]:
+        headers["ETag"] = info["etag"]
+    
+    if is_not_modified(request.headers, info["etag"], info["last_modified"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    size = os.path.getsize(info["file_path"])
+    try:
+        byte_range = parse_range(request.headers, size, info["etag"], info["last_modified"])
+    except RangeNotSatisfiable:
+        return Response(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            headers={**headers, "Content-Range": f"bytes */{size}"}
+        )
+    
+    if byte_range is None:
+        return FileResponse(
+            path=info["file_path"],
+            filename=info["file_name"],
+            media_type=info["file_type"],
+            headers=headers
+        )
+    
+    start, end = byte_range
+    return StreamingResponse(
+        iter_file_range(info["file_path"], start, end),
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type=info["file_type"],
+        headers={
+            **headers,
+            "Content-Range": f"bytes {start}-{end}/{size}",
+            "Content-Length": str(end - start + 1),
+            "Content-Disposition": content_disposition(info["file_name"])
+        }
+    )
 
-@router.post("/{doc_id}/ingest", status_code=status.HTTP_200_OK)
+@router.post("/{doc_id}/ingest", response_model=IngestionJobRead, status_code=status.HTTP_202_ACCEPTED)
 async def ingest_document(
     doc_id: uuid.UUID,
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Ingest a document into the vector database (Pinecone).
+    Queue a document for ingestion into the vector database.
+
+    Extraction, embedding and upsert run in a background job; poll
+    /documents/ingest-jobs/{job_id} or stream its /events for progress.
+    If the document already has a queued or running job, that job is
+    returned instead of a new one.
     """
     result = await db.execute(select(Document).where(Document.id == doc_id))
     db_doc = result.scalar_one_or_none()
@@ -189,70 +281,237 @@ async def ingest_document(
     if not has_twg_access(current_user, db_doc.twg_id):
         raise HTTPException(status_code=403, detail="Access denied")
 
-    processor = get_document_processor()
-    kb = get_knowledge_base()
+    result = await db.execute(
+        select(IngestionJob).where(
+            IngestionJob.document_id == doc_id,
+            get_ingestion_runner().active_condition()
+        )
+    )
+    active_job = result.scalars().first()
+    if active_job:
+        return active_job
 
-    try:
-        # Process document
-        processed = processor.process_document(
-            db_doc.file_path,
-            additional_metadata={
-                'twg_id': str(db_doc.twg_id),
-                'doc_id': str(db_doc.id),
-                'file_name': db_doc.file_name
-            }
+    job = IngestionJob(document_id=doc_id, created_by_id=current_user.id)
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+
+    await get_ingestion_runner().submit(job.id)
+    return job
+
+@router.post("/bulk-ingest", response_model=BulkIngestRead, status_code=status.HTTP_202_ACCEPTED)
+async def bulk_ingest_documents(
+    doc_ids: List[uuid.UUID],
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Queue many documents for ingestion as one batch.
+
+    The batch's jobs run together: documents are extracted concurrently
+    and their chunks are packed per namespace into full embedding and
+    upsert batches, with repeated chunks embedded once. Each document
+    gets its own job (and outcome); documents that cannot be queued are
+    listed in 'rejected'.
+    """
+    batch_id = uuid.uuid4()
+    rejected = []
+
+    result = await db.execute(select(Document).where(Document.id.in_(doc_ids)))
+    documents = {doc.id: doc for doc in result.scalars().all()}
+
+    result = await db.execute(
+        select(IngestionJob.document_id).where(
+            IngestionJob.document_id.in_(doc_ids),
+            get_ingestion_runner().active_condition()
         )
-        
-        if processed['status'] != 'success':
-            raise HTTPException(status_code=500, detail=f"Processing failed: {processed.get('error')}")
-
-        # Prepare chunks for Pinecone
-        documents = []
-        for i, chunk in enumerate(processed['chunks']):
-            documents.append({
-                'id': f"{db_doc.id}_chunk_{i}",
-                'text': chunk['text'],
-                'metadata': chunk['metadata']
-            })
-
-        # Upsert to Pinecone
-        namespace = f"twg-{db_doc.twg_id}" if db_doc.twg_id else "twg-general"
-        upsert_result = kb.upsert_documents(documents=documents, namespace=namespace)
-
-        return {
-            "status": "success",
-            "chunks_ingested": upsert_result['total_upserted'],
-            "namespace": namespace
+    )
+    active = set(result.scalars().all())
+
+    jobs = []
+    for doc_id in dict.fromkeys(doc_ids):
+        db_doc = documents.get(doc_id)
+        if not db_doc:
+            rejected.append({"document_id": doc_id, "reason": "Document not found"})
+        elif not has_twg_access(current_user, db_doc.twg_id):
+            rejected.append({"document_id": doc_id, "reason": "Access denied"})
+        elif doc_id in active:
+            rejected.append({"document_id": doc_id, "reason": "Ingestion already queued or running"})
+        else:
+            jobs.append(IngestionJob(document_id=doc_id, created_by_id=current_user.id, batch_id=batch_id))
+
+    db.add_all(jobs)
+    await db.commit()
+    for job in jobs:
+        await db.refresh(job)
+
+    if jobs:
+        # One worker claims the whole batch; the other queued IDs are skipped
+        await get_ingestion_runner().submit(jobs[0].id)
+
+    return {"batch_id": batch_id, "jobs": jobs, "rejected": rejected}
+
+@router.get("/ingest-batches/{batch_id}", response_model=List[IngestionJobRead])
+async def get_ingestion_batch(
+    batch_id: uuid.UUID,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get the per-document jobs of a bulk ingest.
+    """
+    result = await db.execute(
+        select(IngestionJob).where(IngestionJob.batch_id == batch_id).order_by(IngestionJob.created_at)
+    )
+    jobs = result.scalars().all()
+    if not jobs:
+        raise HTTPException(status_code=404, detail="Ingestion batch not found")
+
+    result = await db.execute(
+        select(Document.twg_id).where(Document.id.in_([job.document_id for job in jobs]))
+    )
+    if any(twg_id and not has_twg_access(current_user, twg_id) for twg_id in result.scalars().all()):
+        raise HTTPException(status_code=403, detail="Access denied")
+    return jobs
+
+async def get_authorized_job(job_id: uuid.UUID, current_user: User, db: AsyncSession) -> IngestionJob:
+    """Load an ingestion job the user may see (via its document's TWG)."""
+    job = await db.get(IngestionJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Ingestion job not found")
+
+    db_doc = await db.get(Document, job.document_id)
+    if db_doc and db_doc.twg_id and not has_twg_access(current_user, db_doc.twg_id):
+        raise HTTPException(status_code=403, detail="Access denied")
+    return job
+
+@router.get("/ingest-jobs/{job_id}", response_model=IngestionJobRead)
+async def get_ingestion_job(
+    job_id: uuid.UUID,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get the status and progress of an ingestion job.
+    """
+    return await get_authorized_job(job_id, current_user, db)
+
+@router.post("/ingest-jobs/{job_id}/cancel", response_model=IngestionJobRead)
+async def cancel_ingestion_job(
+    job_id: uuid.UUID,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Cancel an ingestion job. Queued jobs are cancelled immediately,
+    running jobs after their current batch.
+    """
+    job = await get_authorized_job(job_id, current_user, db)
+    return await get_ingestion_runner().cancel(db, job)
+
+@router.get("/ingest-jobs/{job_id}/events")
+async def stream_ingestion_job(
+    job_id: uuid.UUID,
+    request: Request,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Stream ingestion job progress as Server-Sent Events.
+
+    A 'progress' event is sent whenever the job changes, and a final
+    'done' event once it succeeds, fails or is cancelled.
+    """
+    await get_authorized_job(job_id, current_user, db)
+
+    async def event_generator():
+        last = None
+        while not await request.is_disconnected():
+            async with AsyncSessionLocal() as session:
+                job = await session.get(IngestionJob, job_id)
+            if job is None:
+                yield f"data: {json.dumps({'type': 'error', 'error': 'Ingestion job not found'})}\n\n"
+                return
+
+            payload = IngestionJobRead.model_validate(job).model_dump(mode="json")
+            if payload != last:
+                yield f"data: {json.dumps({'type': 'progress', 'job': payload})}\n\n"
+                last = payload
+
+            if job.status in TERMINAL_STATUSES:
+                yield f"data: {json.dumps({'type': 'done', 'status': job.status.value})}\n\n"
+                return
+
+            await asyncio.sleep(JOB_EVENTS_POLL_INTERVAL)
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no"
         }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Ingestion failed: {str(e)}")
+    )
 
 @router.get("/search", response_model=List[dict])
 async def search_documents_content(
     query: str,
     twg_id: Optional[uuid.UUID] = None,
     limit: int = 5,
+    mode: Literal["vector", "lexical", "hybrid"] = "vector",
+    min_score: Optional[float] = None,
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Search document content using vector similarity.
+    Search document content using vector similarity, keyword (BM25)
+    matching, or both fused ('hybrid').
+
+    Without twg_id, non-admin users search every TWG they belong to plus
+    the general namespace in one concurrent query; results are merged by
+    score and carry their 'namespace'.
     """
-    kb = get_knowledge_base()
+    kb = await get_async_knowledge_base()
     
-    namespace = None
     if twg_id:
         if not has_twg_access(current_user, twg_id):
             raise HTTPException(status_code=403, detail="Access denied to this TWG")
-        namespace = f"twg-{str(twg_id)}"
+        namespaces = [f"twg-{str(twg_id)}"]
+    elif current_user.role != UserRole.ADMIN:
+        namespaces = [f"twg-{twg.id}" for twg in current_user.twgs] + ["twg-general"]
+    else:
+        namespaces = [None]
+
+    try:
+        return await kb.search_namespaces(
+            query=query,
+            namespaces=namespaces,
+            top_k=limit,
+            mode=mode,
+            min_score=min_score
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def release_files(db: AsyncSession, db_docs: List[Document]):
+    """Remove the files of deleted documents that no remaining document references."""
+    paths = {db_doc.file_path for db_doc in db_docs}
+    if not paths:
+        return
 
-    # If no TWG specified, we could search across all user's TWGs
-    # But for now, require twg_id or admin (simpler)
-    if not twg_id and current_user.role != UserRole.ADMIN:
-        raise HTTPException(status_code=400, detail="twg_id is required for non-admin search")
+    result = await db.execute(select(Document.file_path).where(Document.file_path.in_(paths)))
+    for file_path in paths - set(result.scalars().all()):
+        async def is_referenced(file_path=file_path) -> bool:
+            # Re-checked under the blob's lock: an upload of the same content
+            # may have added a reference since the query above
+            result = await db.execute(select(Document.id).where(Document.file_path == file_path).limit(1))
+            return result.scalar_one_or_none() is not None
 
-    results = kb.search(query=query, namespace=namespace, top_k=limit)
-    return results
+        try:
+            await blob_store.release(file_path, is_referenced)
+        except Exception as e:
+            print(f"Error deleting file {file_path}: {e}")
 
 @router.delete("/{doc_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_document(
@@ -261,7 +520,7 @@ async def delete_document(
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Delete a document and its file.
+    Delete a document, its file and its vectors.
     """
     result = await db.execute(select(Document).where(Document.id == doc_id))
     db_doc = result.scalar_one_or_none()
@@ -273,16 +532,16 @@ async def delete_document(
     if current_user.role != UserRole.ADMIN and db_doc.uploaded_by_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to delete this document")
 
-    # Delete file from disk
-    if os.path.exists(db_doc.file_path):
-        try:
-            os.remove(db_doc.file_path)
-        except Exception as e:
-            print(f"Error deleting file {db_doc.file_path}: {e}")
+    # Delete vectors while the document's ingestion jobs still exist
+    await purge_document_vectors(db, [db_doc])
+    download_access_cache.invalidate(doc_id)
 
     # Delete from DB
     await db.delete(db_doc)
     await db.commit()
+
+    # Delete file from disk unless a duplicate upload still uses it
+    await release_files(db, [db_doc])
     
     return None
 
@@ -293,29 +552,44 @@ async def bulk_delete_documents(
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Delete multiple documents.
+    Delete multiple documents, their files and their vectors.
     """
     if not doc_ids:
         return None
 
     # Get documents to delete
     result = await db.execute(select(Document).where(Document.id.in_(doc_ids)))
-    db_docs = result.scalars().all()
+    db_docs = [
+        db_doc for db_doc in result.scalars().all()
+        # Check permissions for each (unless admin)
+        if current_user.role == UserRole.ADMIN or db_doc.uploaded_by_id == current_user.id
+    ]
+    
+    # Delete vectors in batches per namespace
+    await purge_document_vectors(db, db_docs)
     
     for db_doc in db_docs:
-        # Check permissions for each (unless admin)
-        if current_user.role != UserRole.ADMIN and db_doc.uploaded_by_id != current_user.id:
-            continue
-            
-        # Delete file from disk
-        if os.path.exists(db_doc.file_path):
-            try:
-                os.remove(db_doc.file_path)
-            except Exception as e:
-                print(f"Error deleting file {db_doc.file_path}: {e}")
-
         # Delete from DB
+        download_access_cache.invalidate(db_doc.id)
         await db.delete(db_doc)
     
     await db.commit()
+    
+    # Delete files from disk unless duplicate uploads still use them
+    await release_files(db, db_docs)
     return None
+
+@router.post("/reconcile-vectors", response_model=dict)
+async def reconcile_document_vectors(
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Purge vectors of documents that no longer exist (admin only).
+
+    The same reconciliation runs periodically in the background
+    (VECTOR_GC_INTERVAL); this runs it now and reports what was reclaimed.
+    """
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+    return await reconcile_vectors()
@@ -0,0 +1,374 @@
+"""
+Async Knowledge Base Facade
+
+This module exposes the knowledge base to async code (FastAPI handlers) without
+blocking the event loop: embeddings go through a non-blocking HTTP client and
+vector store calls, which use synchronous SDKs, run in worker threads.
+"""
+
+from typing import List, Dict, Any, Optional, Callable, Awaitable
+from collections import deque
+import asyncio
+import time
+import logging
+
+from backend.app.core.knowledge_base import KnowledgeBase, RepeatedTextMemo, get_knowledge_base
+from backend.app.core.embeddings import AsyncOllamaEmbeddingClient
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncKnowledgeBase:
+    """
+    Async facade over a KnowledgeBase.
+
+    Shares the wrapped knowledge base's vector store, embedding cache and
+    search cache, so sync callers (agent tools, scripts) and async callers
+    see the same data and cache state.
+    """
+
+    def __init__(self, kb: KnowledgeBase, embedding_client: AsyncOllamaEmbeddingClient):
+        """
+        Initialize async knowledge base.
+
+        Args:
+            kb: Knowledge base providing storage and caches
+            embedding_client: Non-blocking embedding client
+        """
+        self.kb = kb
+        self.embedding_client = embedding_client
+
+    async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generate embeddings for a list of texts.
+
+        Args:
+            texts: List of text strings to embed
+
+        Returns:
+            List of embedding vectors
+        """
+        cache = self.kb.embedding_cache
+        uses_redis = cache is not None and cache.redis is not None
+
+        if uses_redis:
+            embeddings, pending = await asyncio.to_thread(self.kb.lookup_cached_embeddings, texts)
+        else:
+            embeddings, pending = self.kb.lookup_cached_embeddings(texts)
+
+        if pending:
+            new_embeddings = await self.embedding_client.embed(list(pending.keys()))
+            if uses_redis:
+                await asyncio.to_thread(self.kb.store_new_embeddings, embeddings, pending, new_embeddings)
+            else:
+                self.kb.store_new_embeddings(embeddings, pending, new_embeddings)
+
+        return embeddings
+
+    async def search(
+        self,
+        query: str,
+        namespace: Optional[str] = None,
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None,
+        include_metadata: bool = True,
+        mode: str = "vector"
+    ) -> List[Dict[str, Any]]:
+        """
+        Search the knowledge base.
+
+        Modes are those of KnowledgeBase.search; 'lexical' makes no
+        embedding call.
+
+        Args:
+            query: Search query text
+            namespace: Optional namespace to search in
+            top_k: Number of results to return
+            filter: Metadata filter (e.g., {'twg': 'energy'})
+            include_metadata: Whether to include metadata in results
+            mode: 'vector', 'lexical' or 'hybrid'
+
+        Returns:
+            List of search results with scores and metadata
+        """
+        mode = self.kb.resolve_search_mode(mode)
+
+        try:
+            query_embedding = None if mode == "lexical" else (await self.generate_embeddings([query]))[0]
+            results = await asyncio.to_thread(
+                self.kb.search_with_embedding,
+                query, query_embedding, namespace, top_k, filter, include_metadata, mode
+            )
+            logger.info(f"Search ({mode}) returned {len(results)} results")
+            return results
+
+        except Exception as e:
+            logger.error(f"Error searching: {e}")
+            raise
+
+    async def search_namespaces(
+        self,
+        query: str,
+        namespaces: List[Optional[str]],
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None,
+        include_metadata: bool = True,
+        mode: str = "vector",
+        min_score: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Search several namespaces concurrently and merge the results.
+
+        Like KnowledgeBase.search_namespaces: one query embedding, one
+        concurrent search per namespace, heap merge into a global top_k.
+
+        Args:
+            query: Search query text
+            namespaces: Namespaces to search (duplicates are searched once)
+            top_k: Number of results to return overall
+            filter: Metadata filter applied in every namespace
+            include_metadata: Whether to include metadata in results
+            mode: 'vector', 'lexical' or 'hybrid'
+            min_score: Optional global score cutoff
+
+        Returns:
+            Merged results, best first, each with its 'namespace'
+        """
+        mode = self.kb.resolve_search_mode(mode)
+        namespaces = list(dict.fromkeys(namespaces))
+        if not namespaces:
+            return []
+
+        try:
+            query_embedding = None if mode == "lexical" else (await self.generate_embeddings([query]))[0]
+            per_namespace = await asyncio.gather(*(
+                asyncio.to_thread(
+                    self.kb.search_with_embedding,
+                    query, query_embedding, namespace, top_k, filter, include_metadata, mode
+                )
+                for namespace in namespaces
+            ))
+
+            results = self.kb.merge_results(dict(zip(namespaces, per_namespace)), top_k, mode, min_score)
+            logger.info(f"Search ({mode}) over {len(namespaces)} namespaces returned {len(results)} results")
+            return results
+
+        except Exception as e:
+            logger.error(f"Error searching namespaces: {e}")
+            raise
+
+    async def upsert(
+        self,
+        documents: List[Dict[str, Any]],
+        namespace: Optional[str] = None,
+        batch_size: int = 100,
+        pipeline_window: Optional[int] = None,
+        on_progress: Optional[Callable[[Dict[str, int]], Awaitable[None]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Upsert documents into the vector store.
+
+        Like KnowledgeBase.upsert_documents, embedding of the next batch
+        overlaps with upserts of earlier ones, with at most `pipeline_window`
+        batches in flight to the vector store, and repeated texts are
+        embedded once.
+
+        `on_progress` is awaited after every embedded batch and every
+        completed upsert with cumulative {'embedded': n, 'upserted': n}
+        chunk counts. An exception raised by it aborts the upsert.
+
+        Args:
+            documents: List of dicts with 'id', 'text', and 'metadata'
+            namespace: Optional namespace (e.g., 'twg-energy')
+            batch_size: Number of vectors to upsert per batch
+            pipeline_window: Embedded batches allowed in flight to the vector
+                store; 0 runs strictly in sequence
+            on_progress: Optional progress callback
+
+        Returns:
+            Dict with upsert statistics and per-stage timings in seconds
+        """
+        window = self.kb.pipeline_window if pipeline_window is None else pipeline_window
+        timings = {"embed": 0.0, "upsert": 0.0, "backpressure_wait": 0.0}
+        started = time.perf_counter()
+        upsert_lock = asyncio.Lock()
+
+        async def upsert_batch(vectors: List[Dict[str, Any]], batch_num: int) -> int:
+            # One upsert at a time, in batch order, like the sync worker
+            async with upsert_lock:
+                stage_start = time.perf_counter()
+                upserted = await asyncio.to_thread(
+                    self.kb.vector_store.upsert,
+                    vectors=vectors,
+                    namespace=namespace
+                )
+                if self.kb.lexical_index is not None:
+                    await asyncio.to_thread(self.kb.lexical_index.upsert, vectors, namespace)
+                timings["upsert"] += time.perf_counter() - stage_start
+
+            if self.kb.search_cache:
+                self.kb.search_cache.invalidate_namespace(namespace)
+
+            logger.info(f"Upserted batch {batch_num}: {len(vectors)} vectors")
+            return upserted
+
+        in_flight: deque = deque()
+        progress = {"embedded": 0, "upserted": 0}
+        memo = RepeatedTextMemo(doc['text'] for doc in documents)
+
+        async def report(embedded: int = 0, upserted: int = 0):
+            progress["embedded"] += embedded
+            progress["upserted"] += upserted
+            if on_progress is not None:
+                await on_progress(dict(progress))
+
+        try:
+            total_upserted = 0
+
+            for i in range(0, len(documents), batch_size):
+                batch = documents[i:i + batch_size]
+                batch_num = i // batch_size + 1
+
+                stage_start = time.perf_counter()
+                texts = [doc['text'] for doc in batch]
+                missing = memo.missing(texts)
+                embeddings = memo.fill(texts, missing, await self.generate_embeddings(missing) if missing else [])
+                vectors = self.kb._build_vectors(batch, embeddings)
+                timings["embed"] += time.perf_counter() - stage_start
+                await report(embedded=len(batch))
+
+                if window <= 0:
+                    upserted = await upsert_batch(vectors, batch_num)
+                    total_upserted += upserted
+                    await report(upserted=upserted)
+                    continue
+
+                while len(in_flight) >= window:
+                    stage_start = time.perf_counter()
+                    upserted = await in_flight.popleft()
+                    timings["backpressure_wait"] += time.perf_counter() - stage_start
+                    total_upserted += upserted
+                    await report(upserted=upserted)
+
+                in_flight.append(asyncio.ensure_future(upsert_batch(vectors, batch_num)))
+
+            while in_flight:
+                stage_start = time.perf_counter()
+                upserted = await in_flight.popleft()
+                timings["backpressure_wait"] += time.perf_counter() - stage_start
+                total_upserted += upserted
+                await report(upserted=upserted)
+
+            timings["total"] = time.perf_counter() - started
+            return {
+                "total_upserted": total_upserted,
+                "namespace": namespace,
+                "batches": (len(documents) + batch_size - 1) // batch_size,
+                "embeddings_reused": memo.reused,
+                "pipeline_window": window,
+                "timings": {stage: round(seconds, 3) for stage, seconds in timings.items()}
+            }
+
+        except BaseException as e:
+            for task in in_flight:
+                task.cancel()
+            logger.error(f"Error upserting documents: {e!r}")
+            raise
+
+    async def delete(
+        self,
+        ids: List[str],
+        namespace: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Delete documents from the vector store (and the lexical index).
+
+        Args:
+            ids: List of document IDs to delete
+            namespace: Optional namespace
+
+        Returns:
+            Dict with deletion status
+        """
+        return await asyncio.to_thread(self.kb.delete_documents, ids, namespace)
+
+    async def purge_documents(self, doc_ids: List[str], namespace: Optional[str] = None) -> int:
+        """
+        Delete every chunk vector of the given documents.
+
+        Args:
+            doc_ids: Document IDs
+            namespace: Namespace the documents were ingested into
+
+        Returns:
+            Number of vectors deleted
+        """
+        return await asyncio.to_thread(self.kb.purge_documents, doc_ids, namespace)
+
+    async def copy_document(
+        self,
+        source_doc_id: str,
+        target_doc_id: str,
+        source_namespace: Optional[str] = None,
+        target_namespace: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> int:
+        """
+        Copy a document's chunk vectors to another document ID.
+
+        See KnowledgeBase.copy_document.
+
+        Returns:
+            Number of vectors copied
+        """
+        return await asyncio.to_thread(
+            self.kb.copy_document, source_doc_id, target_doc_id, source_namespace, target_namespace, metadata
+        )
+
+    async def aclose(self):
+        """Close the embedding client's pooled connections."""
+        await self.embedding_client.aclose()
+
+
+# Singleton instance
+_async_knowledge_base_instance: Optional[AsyncKnowledgeBase] = None
+
+
+async def get_async_knowledge_base() -> AsyncKnowledgeBase:
+    """
+    Get singleton instance of AsyncKnowledgeBase.
+
+    The wrapped knowledge base is created in a worker thread because the
+    Pinecone backend contacts the service during initialization.
+
+    Returns:
+        AsyncKnowledgeBase instance
+    """
+    global _async_knowledge_base_instance
+
+    if _async_knowledge_base_instance is None:
+        from backend.app.core.config import settings
+
+        kb = await asyncio.to_thread(get_knowledge_base)
+        if _async_knowledge_base_instance is None:
+            _async_knowledge_base_instance = AsyncKnowledgeBase(
+                kb=kb,
+                embedding_client=AsyncOllamaEmbeddingClient(
+                    base_url=settings.OLLAMA_BASE_URL,
+                    model=settings.EMBEDDING_MODEL,
+                    batch_size=settings.EMBEDDING_BATCH_SIZE,
+                    max_concurrency=settings.EMBEDDING_MAX_CONCURRENCY,
+                    timeout=settings.EMBEDDING_TIMEOUT
+                )
+            )
+
+    return _async_knowledge_base_instance
+
+
+async def close_async_knowledge_base():
+    """Close the singleton's connections (called on application shutdown)."""
+    global _async_knowledge_base_instance
+
+    if _async_knowledge_base_instance is not None:
+        await _async_knowledge_base_instance.aclose()
+        _async_knowledge_base_instance = None
@@ -64,6 +64,17 @@ class Settings(BaseSettings):
         default=600,
         description="LLM request timeout in seconds"
     )
+    LLM_MAX_CONNECTIONS: int = Field(
+        default=20,
+        ge=1,
+        description="Pooled HTTP connections to the LLM provider shared by concurrent requests"
+    )
+    LLM_CACHE_TTL: int = Field(default=3600, ge=0, description="TTL for cached LLM responses in seconds (0 disables)")
+    LLM_CACHE_MAX_ENTRIES: int = Field(default=1024, ge=1, description="LLM responses kept in the in-process cache")
+    LLM_CACHE_USE_REDIS: bool = Field(default=True, description="Share cached LLM responses through Redis")
+    LLM_CACHE_MAX_TEMPERATURE: float = Field(default=0.0, ge=0, description="Calls sampled above this temperature are never cached (0.0 = deterministic calls only)")
+    LLM_COALESCE_REQUESTS: bool = Field(default=True, description="Share one generation among concurrent identical LLM calls")
+    LLM_COALESCE_MAX_TEMPERATURE: float = Field(default=0.7, ge=0, description="Calls sampled above this temperature are never coalesced")
     
     # OpenAI (from Auth implementation)
     LLM_PROVIDER: str = Field(default="openai", description="AI provider (openai or ollama)")
@@ -180,12 +191,27 @@ class Settings(BaseSettings):
             return [i.strip() for i in v.split(",")]
         return v
 
+    # Vector Store
+    VECTOR_STORE_BACKEND: str = Field(default="pinecone", description="Vector store backend (pinecone or local)")
+    LOCAL_VECTOR_STORE_PATH: str = Field(default="./data/vector_store", description="Directory for the local vector index")
+    LOCAL_VECTOR_STORE_DTYPE: str = Field(default="float32", description="Local vector precision (float32 or float16)")
+    LEXICAL_INDEX_ENABLED: bool = Field(default=False, description="Keep a BM25 index alongside the vectors for keyword and hybrid search (needs a persistent disk shared by the API and ingestion)")
+    LEXICAL_INDEX_PATH: str = Field(default="./data/lexical_index", description="Directory for the lexical index")
+
     # PINECONE
     PINECONE_API_KEY: str = Field(default="test-key", description="Pinecone API key")
     PINECONE_ENVIRONMENT: str = Field(default="gcp-starter", description="Pinecone environment")
     PINECONE_INDEX_NAME: str = Field(default="ecowas-summit-knowledge-nomic", description="Pinecone index name")
     EMBEDDING_MODEL: str = Field(default="nomic-embed-text", description="Embedding model name")
     EMBEDDING_DIMENSION: int = Field(default=768, description="Embedding dimension")
+    EMBEDDING_BATCH_SIZE: int = Field(default=64, ge=1, description="Texts sent per embedding request")
+    EMBEDDING_MAX_CONCURRENCY: int = Field(default=4, ge=1, description="Embedding requests in flight at once")
+    EMBEDDING_TIMEOUT: int = Field(default=60, description="Embedding request timeout in seconds")
+    EMBEDDING_CACHE_MAX_ENTRIES: int = Field(default=50000, ge=1, description="Embeddings kept in the in-process cache")
+    EMBEDDING_CACHE_USE_REDIS: bool = Field(default=True, description="Share cached embeddings through Redis")
+    EMBEDDING_CACHE_TTL: int = Field(default=2592000, description="Redis TTL for cached embeddings in seconds (30 days)")
+    SEARCH_CACHE_TTL: int = Field(default=300, ge=0, description="TTL for cached search results in seconds (0 disables)")
+    SEARCH_CACHE_MAX_ENTRIES: int = Field(default=2048, ge=1, description="Maximum cached search result sets")
     
     # Email
     SMTP_SERVER: str = Field(default="localhost", description="SMTP server host")
@@ -201,6 +227,18 @@ class Settings(BaseSettings):
     CHUNK_SIZE: int = Field(default=500, description="Document chunk size")
     CHUNK_OVERLAP: int = Field(default=50, description="Document chunk overlap")
     MAX_CHUNKS_PER_DOC: int = Field(default=1000, description="Maximum chunks per document")
+    CHUNK_TOKENIZER: str = Field(default="", description="tiktoken encoding for token-accurate chunking, e.g. cl100k_base (empty = word estimate)")
+    CONTEXT_TOKENIZER: str = Field(default="cl100k_base", description="tiktoken encoding used to count agent context tokens (empty = estimate)")
+    CONTEXT_MMR_LAMBDA: float = Field(default=0.7, ge=0, le=1, description="Relevance weight against source diversity when packing agent context")
+    INGEST_PIPELINE_WINDOW: int = Field(default=2, ge=0, description="Embedded batches in flight to the vector store during upsert (0 = sequential)")
+    DOCUMENT_EXTRACTION_WORKERS: int = Field(default=2, ge=1, description="Processes used for text extraction")
+    DOCUMENT_EXTRACTION_TIMEOUT: int = Field(default=300, ge=1, description="Per-file timeout in seconds for batch extraction in worker processes")
+    EXTRACTION_CACHE_DIR: str = Field(default="./data/extraction_cache", description="Directory of the compressed extracted-text cache (empty disables)")
+    EXTRACTION_CACHE_MAX_BYTES: int = Field(default=2147483648, ge=0, description="Maximum size of the extracted-text cache in bytes")
+    INGESTION_JOB_WORKERS: int = Field(default=2, ge=1, description="Background ingestion jobs run concurrently per API process")
+    INGESTION_JOB_PROGRESS_INTERVAL: float = Field(default=1.0, ge=0, description="Minimum seconds between ingestion job progress writes")
+    INGESTION_JOB_STALE_AFTER: float = Field(default=3600.0, gt=0, description="Seconds after which a still-running ingestion job is treated as orphaned and requeued")
+    VECTOR_GC_INTERVAL: float = Field(default=3600.0, ge=0, description="Seconds between purges of vectors of deleted documents (0 disables)")
     
     @property
     def cors_origins_list(self) -> list:
@@ -249,6 +287,11 @@ class Settings(BaseSettings):
         default=10485760,  # 10MB
         description="Maximum upload size in bytes"
     )
+    DOWNLOAD_ACCESS_CACHE_TTL: int = Field(
+        default=60,
+        ge=0,
+        description="Seconds a user's permission to download a document is cached (0 disables)"
+    )
     model_config = SettingsConfigDict(
         env_file=str(Path(__file__).parent.parent.parent / ".env"),
         case_sensitive=True,
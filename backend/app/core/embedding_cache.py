@@ -0,0 +1,178 @@
+"""
+Embedding Cache
+
+This module provides a content-addressed cache for embeddings so unchanged
+chunks are never sent to the embedding model twice. It has a bounded
+in-process LRU tier and an optional shared Redis tier.
+"""
+
+from typing import List, Dict, Any, Optional
+from collections import OrderedDict
+from array import array
+import hashlib
+import threading
+import unicodedata
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache keyed by hash(model, dimension, normalized text).
+
+    Features:
+    - Bounded in-process LRU tier
+    - Optional Redis tier shared across workers and ingest runs
+    - Hit/miss counters for monitoring
+    """
+
+    REDIS_KEY_PREFIX = "ecowas:embedding"
+
+    def __init__(
+        self,
+        model: str,
+        dimension: int,
+        max_entries: int = 50000,
+        redis_client: Optional[Any] = None,
+        redis_ttl: Optional[int] = None
+    ):
+        """
+        Initialize embedding cache.
+
+        Args:
+            model: Embedding model name (part of the cache key)
+            dimension: Embedding dimension (part of the cache key)
+            max_entries: Maximum entries kept in the in-process tier
+            redis_client: Optional Redis client (decode_responses=False)
+            redis_ttl: TTL for Redis entries in seconds (None for no expiry)
+        """
+        self.model = model
+        self.dimension = dimension
+        self.max_entries = max(1, max_entries)
+        self.redis = redis_client
+        self.redis_ttl = redis_ttl
+
+        self._entries: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.redis_errors = 0
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Normalize text so insignificant whitespace/encoding changes still hit."""
+        return " ".join(unicodedata.normalize("NFC", text).split())
+
+    def make_key(self, text: str) -> str:
+        """Build the content-addressed key for a text."""
+        payload = f"{self.model}\x00{self.dimension}\x00{self.normalize(text)}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get_many(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Look up embeddings for a list of texts.
+
+        Args:
+            texts: Texts to look up
+
+        Returns:
+            List aligned with `texts`; None where the embedding is not cached
+        """
+        keys = [self.make_key(text) for text in texts]
+        results: List[Optional[List[float]]] = [None] * len(keys)
+        missing = []
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                embedding = self._entries.get(key)
+                if embedding is not None:
+                    self._entries.move_to_end(key)
+                    results[i] = embedding
+                    self.hits += 1
+                else:
+                    missing.append(i)
+
+        if missing and self.redis is not None:
+            try:
+                values = self.redis.mget([self._redis_key(keys[i]) for i in missing])
+                still_missing = []
+                for i, value in zip(missing, values):
+                    if value is None:
+                        still_missing.append(i)
+                        continue
+                    embedding = array("f", value).tolist()
+                    results[i] = embedding
+                    self._store_local(keys[i], embedding)
+                with self._lock:
+                    self.redis_hits += len(missing) - len(still_missing)
+                missing = still_missing
+            except Exception as e:
+                self.redis_errors += 1
+                logger.warning(f"Embedding cache Redis lookup failed: {e}")
+
+        with self._lock:
+            self.misses += len(missing)
+
+        return results
+
+    def set_many(self, texts: List[str], embeddings: List[List[float]]):
+        """
+        Store embeddings for a list of texts.
+
+        Args:
+            texts: Texts that were embedded
+            embeddings: Embeddings aligned with `texts`
+        """
+        keys = [self.make_key(text) for text in texts]
+
+        for key, embedding in zip(keys, embeddings):
+            self._store_local(key, embedding)
+
+        if self.redis is not None:
+            try:
+                pipe = self.redis.pipeline(transaction=False)
+                for key, embedding in zip(keys, embeddings):
+                    pipe.set(self._redis_key(key), array("f", embedding).tobytes(), ex=self.redis_ttl)
+                pipe.execute()
+            except Exception as e:
+                self.redis_errors += 1
+                logger.warning(f"Embedding cache Redis write failed: {e}")
+
+    def _store_local(self, key: str, embedding: List[float]):
+        """Insert into the LRU tier, evicting the oldest entries if full."""
+        with self._lock:
+            self._entries[key] = embedding
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.REDIS_KEY_PREFIX}:{key}"
+
+    def clear(self):
+        """Clear the in-process tier (Redis entries expire on their own)."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dict with hit/miss counters and current size
+        """
+        with self._lock:
+            lookups = self.hits + self.redis_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "redis_hits": self.redis_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.redis_hits) / lookups, 4) if lookups else 0.0,
+                "redis_enabled": self.redis is not None,
+                "redis_errors": self.redis_errors
+            }
@@ -0,0 +1,350 @@
+"""
+Embedding Client
+
+This module provides a pooled, batched and concurrent client for generating
+embeddings with Ollama, used by the knowledge base for ingestion and search.
+"""
+
+from typing import List, Dict, Any, Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import threading
+import time
+import logging
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from tenacity import retry, stop_after_attempt, wait_exponential
+
+logger = logging.getLogger(__name__)
+
+
+class _BatchLatencyStats:
+    """Per-batch latency bookkeeping shared by the sync and async clients."""
+
+    def _init_stats(self, stats_window: int):
+        self._stats_lock = threading.Lock()
+        self._recent_batches = deque(maxlen=stats_window)
+        self._total_batches = 0
+        self._total_texts = 0
+        self._total_seconds = 0.0
+
+    def _record_batch(self, size: int, seconds: float):
+        """Record latency for a completed batch."""
+        with self._stats_lock:
+            self._recent_batches.append({"size": size, "latency_ms": round(seconds * 1000, 2)})
+            self._total_batches += 1
+            self._total_texts += size
+            self._total_seconds += seconds
+
+        logger.debug(f"Embedded batch of {size} texts in {seconds * 1000:.1f} ms")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get embedding latency statistics.
+
+        Returns:
+            Dict with totals, average batch latency and the most recent batches
+        """
+        with self._stats_lock:
+            recent = list(self._recent_batches)
+            avg_ms = (self._total_seconds / self._total_batches * 1000) if self._total_batches else 0.0
+            return {
+                "model": self.model,
+                "total_batches": self._total_batches,
+                "total_texts": self._total_texts,
+                "avg_batch_latency_ms": round(avg_ms, 2),
+                "recent_batches": recent
+            }
+
+
+def _ollama_error(response, model: str) -> Optional[str]:
+    """Extract the error message from a failed Ollama response."""
+    if response.status_code == 200:
+        return None
+
+    try:
+        error_msg = response.json().get("error", response.text)
+    except ValueError:
+        error_msg = response.text
+    logger.error(f"Ollama error for model {model}: {error_msg}")
+    return error_msg
+
+
+class OllamaEmbeddingClient(_BatchLatencyStats):
+    """
+    Generates embeddings through Ollama's batch `/api/embed` endpoint.
+
+    Features:
+    - Keep-alive connection pool shared by all requests
+    - Many texts per request (batching)
+    - Configurable number of requests in flight at once
+    - Per-batch latency reporting
+    - Fallback to the legacy single-text `/api/embeddings` endpoint
+    """
+
+    # nomic-embed-text accepts ~2048 tokens; truncate to a safe length
+    MAX_TEXT_CHARS = 8000
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:11434",
+        model: str = "nomic-embed-text",
+        batch_size: int = 64,
+        max_concurrency: int = 4,
+        timeout: int = 60,
+        stats_window: int = 100
+    ):
+        """
+        Initialize the embedding client.
+
+        Args:
+            base_url: Ollama server URL
+            model: Embedding model name
+            batch_size: Number of texts sent per request
+            max_concurrency: Maximum number of requests in flight at once
+            timeout: Request timeout in seconds
+            stats_window: Number of recent batches kept for latency reporting
+        """
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.batch_size = max(1, batch_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout = timeout
+
+        # One pooled session; pool size matches the concurrency limit so
+        # every in-flight request reuses a kept-alive connection.
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.max_concurrency
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._use_legacy_endpoint = False
+        self._init_stats(stats_window)
+
+        logger.info(
+            f"Initialized OllamaEmbeddingClient: {model} @ {self.base_url} "
+            f"(batch_size={self.batch_size}, max_concurrency={self.max_concurrency})"
+        )
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Lazily create the worker pool used for concurrent batches."""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrency,
+                    thread_name_prefix="embed"
+                )
+            return self._executor
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generate embeddings for a list of texts.
+
+        Texts are split into batches of `batch_size` and up to
+        `max_concurrency` batches are embedded at the same time.
+
+        Args:
+            texts: List of text strings to embed
+
+        Returns:
+            List of embedding vectors, in the same order as `texts`
+        """
+        if not texts:
+            return []
+
+        safe_texts = [text[:self.MAX_TEXT_CHARS] for text in texts]
+        batches = [
+            safe_texts[i:i + self.batch_size]
+            for i in range(0, len(safe_texts), self.batch_size)
+        ]
+
+        if len(batches) == 1 or self.max_concurrency == 1:
+            results = [self._embed_batch(batch) for batch in batches]
+        else:
+            results = list(self._get_executor().map(self._embed_batch, batches))
+
+        embeddings = [embedding for batch in results for embedding in batch]
+        logger.debug(f"Generated {len(embeddings)} embeddings in {len(batches)} batches using {self.model}")
+        return embeddings
+
+    @retry(stop=stop_after_attempt(3), wait=wait_exponential(min=1, max=10), reraise=True)
+    def _embed_batch(self, batch: List[str]) -> List[List[float]]:
+        """Embed one batch with a single request and record its latency."""
+        start = time.perf_counter()
+
+        if self._use_legacy_endpoint:
+            embeddings = [self._embed_single(text) for text in batch]
+        else:
+            response = self.session.post(
+                f"{self.base_url}/api/embed",
+                json={"model": self.model, "input": batch},
+                timeout=self.timeout
+            )
+
+            if response.status_code == 404 and "model" not in response.text.lower():
+                # Ollama < 0.3 has no batch endpoint
+                logger.warning("Ollama /api/embed not available, falling back to /api/embeddings")
+                self._use_legacy_endpoint = True
+                embeddings = [self._embed_single(text) for text in batch]
+            else:
+                self._raise_for_error(response)
+                embeddings = response.json()["embeddings"]
+
+        if len(embeddings) != len(batch):
+            raise Exception(f"Ollama returned {len(embeddings)} embeddings for {len(batch)} texts")
+
+        self._record_batch(len(batch), time.perf_counter() - start)
+        return embeddings
+
+    def _embed_single(self, text: str) -> List[float]:
+        """Embed one text through the legacy `/api/embeddings` endpoint."""
+        response = self.session.post(
+            f"{self.base_url}/api/embeddings",
+            json={"model": self.model, "prompt": text},
+            timeout=self.timeout
+        )
+        self._raise_for_error(response)
+        return response.json()["embedding"]
+
+    def _raise_for_error(self, response: requests.Response):
+        """Raise a descriptive error for a failed Ollama response."""
+        error_msg = _ollama_error(response, self.model)
+        if error_msg is not None:
+            raise Exception(f"Ollama embedding failed: {error_msg}")
+
+    def close(self):
+        """Shut down the worker pool and close pooled connections."""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+        self.session.close()
+
+
+class AsyncOllamaEmbeddingClient(_BatchLatencyStats):
+    """
+    Non-blocking counterpart of OllamaEmbeddingClient for use on the event loop.
+
+    Uses a pooled httpx.AsyncClient and an asyncio semaphore to keep at
+    most `max_concurrency` batch requests in flight.
+    """
+
+    MAX_TEXT_CHARS = OllamaEmbeddingClient.MAX_TEXT_CHARS
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:11434",
+        model: str = "nomic-embed-text",
+        batch_size: int = 64,
+        max_concurrency: int = 4,
+        timeout: int = 60,
+        stats_window: int = 100
+    ):
+        """
+        Initialize the async embedding client.
+
+        Args:
+            base_url: Ollama server URL
+            model: Embedding model name
+            batch_size: Number of texts sent per request
+            max_concurrency: Maximum number of requests in flight at once
+            timeout: Request timeout in seconds
+            stats_window: Number of recent batches kept for latency reporting
+        """
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.batch_size = max(1, batch_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout = timeout
+
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency
+            )
+        )
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._use_legacy_endpoint = False
+        self._init_stats(stats_window)
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generate embeddings for a list of texts without blocking the event loop.
+
+        Args:
+            texts: List of text strings to embed
+
+        Returns:
+            List of embedding vectors, in the same order as `texts`
+        """
+        if not texts:
+            return []
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        safe_texts = [text[:self.MAX_TEXT_CHARS] for text in texts]
+        batches = [
+            safe_texts[i:i + self.batch_size]
+            for i in range(0, len(safe_texts), self.batch_size)
+        ]
+
+        results = await asyncio.gather(*(self._embed_batch(batch) for batch in batches))
+        return [embedding for batch in results for embedding in batch]
+
+    @retry(stop=stop_after_attempt(3), wait=wait_exponential(min=1, max=10), reraise=True)
+    async def _embed_batch(self, batch: List[str]) -> List[List[float]]:
+        """Embed one batch with a single request and record its latency."""
+        async with self._semaphore:
+            start = time.perf_counter()
+
+            if self._use_legacy_endpoint:
+                embeddings = [await self._embed_single(text) for text in batch]
+            else:
+                response = await self.client.post(
+                    "/api/embed",
+                    json={"model": self.model, "input": batch}
+                )
+
+                if response.status_code == 404 and "model" not in response.text.lower():
+                    logger.warning("Ollama /api/embed not available, falling back to /api/embeddings")
+                    self._use_legacy_endpoint = True
+                    embeddings = [await self._embed_single(text) for text in batch]
+                else:
+                    self._raise_for_error(response)
+                    embeddings = response.json()["embeddings"]
+
+            if len(embeddings) != len(batch):
+                raise Exception(f"Ollama returned {len(embeddings)} embeddings for {len(batch)} texts")
+
+            self._record_batch(len(batch), time.perf_counter() - start)
+            return embeddings
+
+    async def _embed_single(self, text: str) -> List[float]:
+        """Embed one text through the legacy `/api/embeddings` endpoint."""
+        response = await self.client.post(
+            "/api/embeddings",
+            json={"model": self.model, "prompt": text}
+        )
+        self._raise_for_error(response)
+        return response.json()["embedding"]
+
+    def _raise_for_error(self, response: httpx.Response):
+        """Raise a descriptive error for a failed Ollama response."""
+        error_msg = _ollama_error(response, self.model)
+        if error_msg is not None:
+            raise Exception(f"Ollama embedding failed: {error_msg}")
+
+    async def aclose(self):
+        """Close pooled connections."""
+        await self.client.aclose()
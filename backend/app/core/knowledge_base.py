@@ -1,111 +1,147 @@
 """
-Pinecone Vector Database Integration
+Vector Database Integration
 
-This module provides the core integration with Pinecone for knowledge base management,
-including document ingestion, vector storage, and semantic search for RAG.
+This module provides the core knowledge base management, including document
+ingestion, vector storage (Pinecone or a local NumPy index), and semantic
+search for RAG.
 """
 
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Iterable
 import os
+import heapq
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import logging
-from pinecone import Pinecone, ServerlessSpec
-from tenacity import retry, stop_after_attempt, wait_exponential
+
+from backend.app.core.vector_store import VectorStore, PineconeVectorStore, LocalVectorStore
+from backend.app.core.embeddings import OllamaEmbeddingClient
+from backend.app.core.embedding_cache import EmbeddingCache
+from backend.app.core.search_cache import SearchResultCache
+from backend.app.core.lexical_index import LexicalIndex, reciprocal_rank_fusion
 
 logger = logging.getLogger(__name__)
 
+SEARCH_MODES = ("vector", "lexical", "hybrid")
+
+# Pinecone accepts at most 1000 IDs per delete request
+DELETE_BATCH_SIZE = 1000
+
+
+class RepeatedTextMemo:
+    """
+    Embeddings of texts that occur more than once in one upsert call.
+    
+    Chunks repeated across documents (shared annexes, boilerplate) are
+    embedded once per call even when they land in different batches.
+    Texts that occur only once are never kept.
+    """
+    
+    def __init__(self, texts: Iterable[str]):
+        self.repeated = {text for text, count in Counter(texts).items() if count > 1}
+        self.embeddings: Dict[str, List[float]] = {}
+        self.reused = 0
+    
+    def missing(self, texts: List[str]) -> List[str]:
+        """Distinct texts of a batch that still need embedding."""
+        return [text for text in dict.fromkeys(texts) if text not in self.embeddings]
+    
+    def fill(
+        self,
+        texts: List[str],
+        missing: List[str],
+        new_embeddings: List[List[float]]
+    ) -> List[List[float]]:
+        """Combine new and remembered embeddings, aligned with texts."""
+        fresh = dict(zip(missing, new_embeddings))
+        for text, embedding in fresh.items():
+            if text in self.repeated:
+                self.embeddings[text] = embedding
+        
+        self.reused += len(texts) - len(missing)
+        return [fresh[text] if text in fresh else self.embeddings[text] for text in texts]
+
 
-class PineconeKnowledgeBase:
+class KnowledgeBase:
     """
-    Manages Pinecone vector database operations for the knowledge base.
+    Manages vector database operations for the knowledge base.
+    
+    Storage is delegated to a VectorStore backend (Pinecone or the local
+    NumPy index), so embedding, caching and search logic are shared.
     
     Features:
-    - Index initialization and health checks
+    - Index health checks
     - Document embedding and indexing
     - Semantic search with metadata filtering
+    - Lexical (BM25) and hybrid search when a lexical index is attached
     - Batch operations for efficiency
     - TWG namespace isolation
     """
     
+    # Hybrid search ranks this many times top_k candidates from each side
+    HYBRID_CANDIDATE_FACTOR = 4
+    
+    # Upper bound on namespaces searched at once by search_namespaces
+    MAX_PARALLEL_NAMESPACES = 8
+    
     def __init__(
         self,
-        api_key: str,
-        environment: str,
-        index_name: str,
-        embedding_model: str = "text-embedding-3-small",
-        dimension: int = 1536,
-        namespace_prefix: str = "twg"
+        vector_store: VectorStore,
+        embedding_model: str = "nomic-embed-text",
+        dimension: int = 768,
+        namespace_prefix: str = "twg",
+        embedding_client: Optional[OllamaEmbeddingClient] = None,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        search_cache: Optional[SearchResultCache] = None,
+        pipeline_window: int = 2,
+        lexical_index: Optional[LexicalIndex] = None
     ):
         """
-        Initialize Pinecone knowledge base.
+        Initialize knowledge base.
         
         Args:
-            api_key: Pinecone API key
-            environment: Pinecone environment (e.g., 'us-east-1')
-            index_name: Name of the Pinecone index
-            embedding_model: OpenAI embedding model name
-            dimension: Embedding dimension (1536 for text-embedding-3-small)
+            vector_store: Storage backend for vectors and metadata
+            embedding_model: Embedding model name
+            dimension: Embedding dimension
             namespace_prefix: Prefix for TWG namespaces
+            embedding_client: Optional pre-configured embedding client
+            embedding_cache: Optional cache consulted before embedding
+            search_cache: Optional cache for search results
+            pipeline_window: Default upsert pipeline window (0 disables pipelining)
+            lexical_index: Optional BM25 index kept in step with the vectors
         """
-        self.api_key = api_key
-        self.environment = environment
-        self.index_name = index_name
+        self.vector_store = vector_store
         self.embedding_model = embedding_model
         self.dimension = dimension
         self.namespace_prefix = namespace_prefix
+        self.embedding_client = embedding_client or OllamaEmbeddingClient(model=embedding_model)
+        self.embedding_cache = embedding_cache
+        self.search_cache = search_cache
+        self.pipeline_window = pipeline_window
+        self.lexical_index = lexical_index
         
-        # Initialize Pinecone client
-        self.pc = Pinecone(api_key=api_key)
-        
-        # Get or create index
-        self.index = self._get_or_create_index()
-        
-        logger.info(f"Initialized PineconeKnowledgeBase with index: {index_name}")
-    
-    def _get_or_create_index(self):
-        """Get existing index or create new one."""
-        try:
-            # Check if index exists
-            existing_indexes = self.pc.list_indexes()
-            index_names = [idx.name for idx in existing_indexes]
-            
-            if self.index_name not in index_names:
-                logger.info(f"Creating new Pinecone index: {self.index_name}")
-                
-                # Create serverless index
-                self.pc.create_index(
-                    name=self.index_name,
-                    dimension=self.dimension,
-                    metric="cosine",
-                    spec=ServerlessSpec(
-                        cloud="aws",
-                        region=self.environment
-                    )
-                )
-                logger.info(f"Index {self.index_name} created successfully")
-            
-            # Connect to index
-            return self.pc.Index(self.index_name)
-            
-        except Exception as e:
-            logger.error(f"Error getting/creating index: {e}")
-            raise
+        logger.info(f"Initialized {type(self).__name__} with {type(vector_store).__name__}")
     
     def health_check(self) -> Dict[str, Any]:
         """
-        Check Pinecone connection and index health.
+        Check vector store connection and index health.
         
         Returns:
             Dict with health status information
         """
         try:
-            stats = self.index.describe_index_stats()
+            stats = self.vector_store.describe_stats()
             return {
                 "status": "healthy",
-                "index_name": self.index_name,
-                "total_vectors": stats.total_vector_count,
-                "dimension": stats.dimension,
-                "namespaces": stats.namespaces
+                "backend": type(self.vector_store).__name__,
+                "index_name": getattr(self.vector_store, "index_name", None),
+                "total_vectors": stats["total_vectors"],
+                "dimension": stats["dimension"],
+                "namespaces": stats["namespaces"],
+                "embedding_cache": self.embedding_cache.get_stats() if self.embedding_cache else None,
+                "search_cache": self.search_cache.get_stats() if self.search_cache else None,
+                "lexical_index": self.lexical_index.get_stats() if self.lexical_index else None
             }
         except Exception as e:
             logger.error(f"Health check failed: {e}")
@@ -114,11 +150,15 @@ class PineconeKnowledgeBase:
                 "error": str(e)
             }
     
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(min=1, max=10))
     def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
         """
         Generate embeddings for a list of texts using Ollama (nomic-embed-text).
         
+        Texts are sent in batches over pooled connections, with several
+        batches in flight at once (see OllamaEmbeddingClient). When an
+        embedding cache is configured, only texts not already cached are
+        sent to the model, and each distinct text is embedded once.
+        
         Args:
             texts: List of text strings to embed
             
@@ -126,101 +166,224 @@ class PineconeKnowledgeBase:
             List of embedding vectors
         """
         try:
-            import requests
-            embeddings = []
+            embeddings, pending = self.lookup_cached_embeddings(texts)
             
-            for text in texts:
-                # Ensure text is not too long for Ollama (nomic-embed-text limit is ~2048 tokens)
-                # Truncate to a safe length (~8000 chars) if needed
-                safe_text = text[:8000]
-                
-                response = requests.post(
-                    'http://localhost:11434/api/embeddings',
-                    json={
-                        'model': self.embedding_model,
-                        'prompt': safe_text
-                    }
-                )
-                
-                if response.status_code == 200:
-                    embedding = response.json()['embedding']
-                    embeddings.append(embedding)
-                else:
-                    error_msg = response.json().get('error', response.text)
-                    logger.error(f"Ollama error for model {self.embedding_model}: {error_msg}")
-                    raise Exception(f"Ollama embedding failed: {error_msg}")
+            if pending:
+                new_embeddings = self.embedding_client.embed(list(pending.keys()))
+                self.store_new_embeddings(embeddings, pending, new_embeddings)
             
-            logger.debug(f"Generated {len(embeddings)} embeddings using {self.embedding_model}")
+            logger.debug(
+                f"Generated {len(pending)} embeddings using {self.embedding_model} "
+                f"({len(texts) - sum(len(idx) for idx in pending.values())} cached)"
+            )
             return embeddings
             
         except Exception as e:
             logger.error(f"Error generating embeddings: {e}")
             raise
     
+    def lookup_cached_embeddings(
+        self,
+        texts: List[str]
+    ) -> Tuple[List[Optional[List[float]]], Dict[str, List[int]]]:
+        """
+        Look up texts in the embedding cache.
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            Tuple of (embeddings aligned with texts, None where not cached;
+            dict of each distinct uncached text to its positions)
+        """
+        if self.embedding_cache is not None:
+            embeddings = self.embedding_cache.get_many(texts)
+        else:
+            embeddings = [None] * len(texts)
+        
+        pending: Dict[str, List[int]] = {}
+        for i, embedding in enumerate(embeddings):
+            if embedding is None:
+                pending.setdefault(texts[i], []).append(i)
+        
+        return embeddings, pending
+    
+    def store_new_embeddings(
+        self,
+        embeddings: List[Optional[List[float]]],
+        pending: Dict[str, List[int]],
+        new_embeddings: List[List[float]]
+    ):
+        """
+        Fill freshly generated embeddings into place and cache them.
+        
+        Args:
+            embeddings: Embeddings from lookup_cached_embeddings (filled in place)
+            pending: Uncached texts from lookup_cached_embeddings
+            new_embeddings: Embeddings for pending texts, in key order
+        """
+        new_texts = list(pending.keys())
+        if self.embedding_cache is not None:
+            self.embedding_cache.set_many(new_texts, new_embeddings)
+        
+        for text, embedding in zip(new_texts, new_embeddings):
+            for i in pending[text]:
+                embeddings[i] = embedding
+    
     def upsert_documents(
         self,
         documents: List[Dict[str, Any]],
         namespace: Optional[str] = None,
-        batch_size: int = 100
-    ) -> Dict[str, int]:
+        batch_size: int = 100,
+        pipeline_window: Optional[int] = None
+    ) -> Dict[str, Any]:
         """
-        Upsert documents into Pinecone index.
+        Upsert documents into the vector store.
+        
+        With a pipeline window above 0, embedding of the next batch overlaps
+        with the upsert of the current one: upserts run on a background
+        worker, and at most `pipeline_window` embedded batches may be queued
+        for or in the middle of an upsert. When the window is full,
+        embedding waits (backpressure) instead of piling vectors up in memory.
+        
+        Texts repeated within `documents` are embedded once, so callers can
+        pack chunks of many documents into one call (see RepeatedTextMemo).
         
         Args:
             documents: List of dicts with 'id', 'text', and 'metadata'
             namespace: Optional namespace (e.g., 'twg-energy')
             batch_size: Number of vectors to upsert per batch
+            pipeline_window: Embedded batches allowed in flight to the vector
+                store; 0 runs strictly in sequence. Defaults to the
+                instance's pipeline_window.
             
         Returns:
-            Dict with upsert statistics
+            Dict with upsert statistics and per-stage timings in seconds
         """
+        window = self.pipeline_window if pipeline_window is None else pipeline_window
+        timings = {"embed": 0.0, "upsert": 0.0, "backpressure_wait": 0.0}
+        started = time.perf_counter()
+        
+        memo = RepeatedTextMemo(doc['text'] for doc in documents)
+        
         try:
             total_upserted = 0
+            in_flight: deque = deque()
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="upsert") if window > 0 else None
             
-            # Process in batches
-            for i in range(0, len(documents), batch_size):
-                batch = documents[i:i + batch_size]
+            try:
+                # Process in batches
+                for i in range(0, len(documents), batch_size):
+                    batch = documents[i:i + batch_size]
+                    batch_num = i // batch_size + 1
+                    
+                    # Extract texts and generate embeddings
+                    stage_start = time.perf_counter()
+                    texts = [doc['text'] for doc in batch]
+                    missing = memo.missing(texts)
+                    embeddings = memo.fill(texts, missing, self.generate_embeddings(missing) if missing else [])
+                    vectors = self._build_vectors(batch, embeddings)
+                    timings["embed"] += time.perf_counter() - stage_start
+                    
+                    if executor is None:
+                        total_upserted += self._upsert_batch(vectors, namespace, batch_num, timings)
+                        continue
+                    
+                    # Backpressure: wait for the oldest upsert when the window is full
+                    while len(in_flight) >= window:
+                        stage_start = time.perf_counter()
+                        total_upserted += in_flight.popleft().result()
+                        timings["backpressure_wait"] += time.perf_counter() - stage_start
+                    
+                    in_flight.append(executor.submit(self._upsert_batch, vectors, namespace, batch_num, timings))
                 
-                # Extract texts and generate embeddings
-                texts = [doc['text'] for doc in batch]
-                embeddings = self.generate_embeddings(texts)
-                
-                # Prepare vectors for upsert
-                vectors = []
-                for doc, embedding in zip(batch, embeddings):
-                    vector = {
-                        'id': doc['id'],
-                        'values': embedding,
-                        'metadata': doc.get('metadata', {})
-                    }
-                    vectors.append(vector)
-                
-                # Upsert to Pinecone
-                self.index.upsert(vectors=vectors, namespace=namespace)
-                total_upserted += len(vectors)
-                
-                logger.info(f"Upserted batch {i//batch_size + 1}: {len(vectors)} vectors")
+                while in_flight:
+                    stage_start = time.perf_counter()
+                    total_upserted += in_flight.popleft().result()
+                    timings["backpressure_wait"] += time.perf_counter() - stage_start
+            finally:
+                if executor is not None:
+                    executor.shutdown(wait=True)
             
+            timings["total"] = time.perf_counter() - started
             return {
                 "total_upserted": total_upserted,
                 "namespace": namespace,
-                "batches": (len(documents) + batch_size - 1) // batch_size
+                "batches": (len(documents) + batch_size - 1) // batch_size,
+                "embeddings_reused": memo.reused,
+                "pipeline_window": window,
+                "timings": {stage: round(seconds, 3) for stage, seconds in timings.items()}
             }
             
         except Exception as e:
             logger.error(f"Error upserting documents: {e}")
             raise
     
+    @staticmethod
+    def _build_vectors(
+        batch: List[Dict[str, Any]],
+        embeddings: List[List[float]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Pair documents with their embeddings in vector store format.
+        
+        The chunk text is stored in the metadata, so search results (vector
+        or lexical) can be turned into context without another lookup.
+        """
+        return [
+            {
+                'id': doc['id'],
+                'values': embedding,
+                'metadata': {'text': doc['text'], **doc.get('metadata', {})}
+            }
+            for doc, embedding in zip(batch, embeddings)
+        ]
+    
+    def _upsert_batch(
+        self,
+        vectors: List[Dict[str, Any]],
+        namespace: Optional[str],
+        batch_num: int,
+        timings: Dict[str, float]
+    ) -> int:
+        """Write one batch to the vector store and invalidate cached searches."""
+        stage_start = time.perf_counter()
+        upserted = self.vector_store.upsert(vectors=vectors, namespace=namespace)
+        if self.lexical_index is not None:
+            self.lexical_index.upsert(vectors, namespace)
+        timings["upsert"] += time.perf_counter() - stage_start
+        
+        if self.search_cache:
+            self.search_cache.invalidate_namespace(namespace)
+        
+        logger.info(f"Upserted batch {batch_num}: {len(vectors)} vectors")
+        return upserted
+    
     def search(
         self,
         query: str,
         namespace: Optional[str] = None,
         top_k: int = 5,
         filter: Optional[Dict[str, Any]] = None,
-        include_metadata: bool = True
+        include_metadata: bool = True,
+        mode: str = "vector"
     ) -> List[Dict[str, Any]]:
         """
-        Semantic search in the knowledge base.
+        Search the knowledge base.
+        
+        Modes:
+        - 'vector': semantic search; results are served from the search
+          cache when the same query embedding, namespace, filter and top_k
+          were searched recently and the namespace has not been written to
+        - 'lexical': BM25 over the lexical index; no embedding is generated
+        - 'hybrid': vector and lexical rankings fused with reciprocal rank
+          fusion; 'score' is the fused score, and 'vector_score' and
+          'lexical_score' hold the original ones (None if not ranked).
+          Fused scores are rank-based and small (at most 2/61), so
+          similarity cutoffs must be applied to 'vector_score' (see
+          passes_min_score)
+        
+        Without a lexical index, 'hybrid' falls back to 'vector'.
         
         Args:
             query: Search query text
@@ -228,47 +391,266 @@ class PineconeKnowledgeBase:
             top_k: Number of results to return
             filter: Metadata filter (e.g., {'twg': 'energy'})
             include_metadata: Whether to include metadata in results
-            
+            mode: 'vector', 'lexical' or 'hybrid'
+        
         Returns:
             List of search results with scores and metadata
         """
+        mode = self.resolve_search_mode(mode)
+        
         try:
-            # Generate query embedding
-            query_embedding = self.generate_embeddings([query])[0]
-            
-            # Search Pinecone
-            results = self.index.query(
-                vector=query_embedding,
-                top_k=top_k,
-                namespace=namespace,
-                filter=filter,
-                include_metadata=include_metadata
+            query_embedding = None if mode == "lexical" else self.generate_embeddings([query])[0]
+            results = self.search_with_embedding(
+                query, query_embedding, namespace, top_k, filter, include_metadata, mode
             )
+            logger.info(f"Search ({mode}) returned {len(results)} results")
+            return results
             
-            # Format results
-            formatted_results = []
-            for match in results.matches:
-                result = {
-                    'id': match.id,
-                    'score': match.score,
-                    'metadata': match.metadata if include_metadata else {}
-                }
-                formatted_results.append(result)
+        except Exception as e:
+            logger.error(f"Error searching: {e}")
+            raise
+    
+    def search_namespaces(
+        self,
+        query: str,
+        namespaces: List[Optional[str]],
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None,
+        include_metadata: bool = True,
+        mode: str = "vector",
+        min_score: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Search several namespaces concurrently and merge the results.
+        
+        The query is embedded once and every namespace is searched in its
+        own thread, so the call takes as long as the slowest namespace.
+        Each namespace's top_k results are merged with a heap into a global
+        top_k, after applying `min_score` (see passes_min_score).
+        
+        Args:
+            query: Search query text
+            namespaces: Namespaces to search (duplicates are searched once)
+            top_k: Number of results to return overall
+            filter: Metadata filter applied in every namespace
+            include_metadata: Whether to include metadata in results
+            mode: 'vector', 'lexical' or 'hybrid'
+            min_score: Optional global score cutoff
+            
+        Returns:
+            Merged results, best first, each with its 'namespace'
+        """
+        mode = self.resolve_search_mode(mode)
+        namespaces = list(dict.fromkeys(namespaces))
+        if not namespaces:
+            return []
+        
+        try:
+            query_embedding = None if mode == "lexical" else self.generate_embeddings([query])[0]
+            
+            def search_one(namespace: Optional[str]) -> List[Dict[str, Any]]:
+                return self.search_with_embedding(
+                    query, query_embedding, namespace, top_k, filter, include_metadata, mode
+                )
+            
+            with ThreadPoolExecutor(
+                max_workers=min(len(namespaces), self.MAX_PARALLEL_NAMESPACES),
+                thread_name_prefix="search"
+            ) as executor:
+                per_namespace = dict(zip(namespaces, executor.map(search_one, namespaces)))
             
-            logger.info(f"Search returned {len(formatted_results)} results")
-            return formatted_results
+            results = self.merge_results(per_namespace, top_k, mode, min_score)
+            logger.info(f"Search ({mode}) over {len(namespaces)} namespaces returned {len(results)} results")
+            return results
             
         except Exception as e:
-            logger.error(f"Error searching: {e}")
+            logger.error(f"Error searching namespaces: {e}")
             raise
     
+    def search_with_embedding(
+        self,
+        query: str,
+        query_embedding: Optional[List[float]],
+        namespace: Optional[str],
+        top_k: int,
+        filter: Optional[Dict[str, Any]],
+        include_metadata: bool,
+        mode: str
+    ) -> List[Dict[str, Any]]:
+        """
+        Search one namespace with an already generated query embedding.
+        
+        Args:
+            query: Search query text (used by lexical and hybrid modes)
+            query_embedding: Query embedding (unused in lexical mode)
+            namespace: Namespace to search in
+            top_k: Number of results to return
+            filter: Metadata filter
+            include_metadata: Whether to include metadata in results
+            mode: Resolved search mode (see resolve_search_mode)
+            
+        Returns:
+            List of search results with scores and metadata
+        """
+        if mode == "lexical":
+            return self.lexical_index.search(query, namespace, top_k, filter, include_metadata)
+        
+        candidates = top_k * self.HYBRID_CANDIDATE_FACTOR if mode == "hybrid" else top_k
+        vector_results = self._query_vectors(query_embedding, namespace, candidates, filter, include_metadata)
+        if mode == "vector":
+            return vector_results
+        
+        return self.fuse_results(
+            vector_results,
+            self.lexical_index.search(query, namespace, candidates, filter, include_metadata),
+            top_k
+        )
+    
+    def resolve_search_mode(self, mode: str) -> str:
+        """
+        Validate a search mode against the configured indexes.
+        
+        Args:
+            mode: Requested mode
+        
+        Returns:
+            Mode to run ('hybrid' becomes 'vector' without a lexical index)
+        """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode: {mode}")
+        if self.lexical_index is None and mode != "vector":
+            if mode == "lexical":
+                raise ValueError("Lexical search requires a lexical index")
+            return "vector"
+        return mode
+    
+    @staticmethod
+    def fuse_results(
+        vector_results: List[Dict[str, Any]],
+        lexical_results: List[Dict[str, Any]],
+        top_k: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Fuse vector and lexical rankings of the same namespace.
+        
+        Args:
+            vector_results: Vector search results, best first
+            lexical_results: Lexical search results, best first
+            top_k: Number of results to return
+        
+        Returns:
+            Fused results with 'score', 'vector_score' and 'lexical_score'
+        """
+        return reciprocal_rank_fusion({"vector": vector_results, "lexical": lexical_results}, top_k)
+    
+    @staticmethod
+    def passes_min_score(result: Dict[str, Any], min_score: float, mode: str) -> bool:
+        """
+        Check a result against a similarity cutoff.
+        
+        The cutoff applies to vector similarity: lexical results (BM25
+        scores are unbounded) always pass, and hybrid results pass if they
+        matched lexically or their vector score reaches the cutoff.
+        
+        Args:
+            result: Search result
+            min_score: Minimum similarity score
+            mode: Resolved search mode that produced the result
+        
+        Returns:
+            True if the result should be kept
+        """
+        if mode == "lexical":
+            return True
+        if mode == "hybrid":
+            return result["lexical_score"] is not None or result["vector_score"] >= min_score
+        return result["score"] >= min_score
+    
+    @classmethod
+    def merge_results(
+        cls,
+        per_namespace: Dict[Optional[str], List[Dict[str, Any]]],
+        top_k: int,
+        mode: str,
+        min_score: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Merge per-namespace results into one ranking.
+        
+        Args:
+            per_namespace: Results of each namespace
+            top_k: Number of results to return
+            mode: Resolved search mode that produced the results
+            min_score: Optional cutoff (see passes_min_score)
+        
+        Returns:
+            Best top_k results overall, each with its 'namespace'
+        """
+        candidates = (
+            {**result, "namespace": namespace}
+            for namespace, results in per_namespace.items()
+            for result in results
+            if min_score is None or cls.passes_min_score(result, min_score, mode)
+        )
+        return heapq.nlargest(top_k, candidates, key=lambda r: r["score"])
+    
+    def _query_vectors(
+        self,
+        query_embedding: List[float],
+        namespace: Optional[str],
+        top_k: int,
+        filter: Optional[Dict[str, Any]],
+        include_metadata: bool
+    ) -> List[Dict[str, Any]]:
+        """Semantic search through the search cache and the vector store."""
+        cache_key = self.search_cache_key(query_embedding, top_k, filter, include_metadata)
+        if cache_key is not None:
+            cached = self.search_cache.get(namespace, cache_key)
+            if cached is not None:
+                logger.debug(f"Search cache hit ({len(cached)} results)")
+                return cached
+            generation = self.search_cache.generation(namespace)
+        
+        # Search the vector store
+        formatted_results = self.vector_store.query(
+            vector=query_embedding,
+            top_k=top_k,
+            namespace=namespace,
+            filter=filter,
+            include_metadata=include_metadata
+        )
+        
+        if cache_key is not None:
+            self.search_cache.set(namespace, cache_key, formatted_results, generation)
+        
+        return formatted_results
+    
+    def search_cache_key(
+        self,
+        query_embedding: List[float],
+        top_k: int,
+        filter: Optional[Dict[str, Any]],
+        include_metadata: bool
+    ) -> Optional[str]:
+        """
+        Build the search cache key for a query, or None if caching is off.
+        """
+        if not self.search_cache or not self.search_cache.enabled:
+            return None
+        return SearchResultCache.make_key(
+            query_embedding,
+            top_k,
+            filter,
+            include_metadata=include_metadata
+        )
+    
     def delete_documents(
         self,
         ids: List[str],
         namespace: Optional[str] = None
     ) -> Dict[str, Any]:
         """
-        Delete documents from Pinecone index.
+        Delete documents from the vector store (and the lexical index).
         
         Args:
             ids: List of document IDs to delete
@@ -278,7 +660,13 @@ class PineconeKnowledgeBase:
             Dict with deletion status
         """
         try:
-            self.index.delete(ids=ids, namespace=namespace)
+            self.vector_store.delete(ids=ids, namespace=namespace)
+            if self.lexical_index is not None:
+                self.lexical_index.delete(ids, namespace)
+            
+            if self.search_cache:
+                self.search_cache.invalidate_namespace(namespace)
+            
             logger.info(f"Deleted {len(ids)} documents from namespace: {namespace}")
             
             return {
@@ -291,6 +679,102 @@ class PineconeKnowledgeBase:
             logger.error(f"Error deleting documents: {e}")
             raise
     
+    def list_ids(self, namespace: Optional[str] = None, prefix: Optional[str] = None) -> List[str]:
+        """
+        List vector IDs in a namespace.
+        
+        Args:
+            namespace: Optional namespace
+            prefix: Only IDs starting with this prefix
+        
+        Returns:
+            List of vector IDs
+        """
+        return list(self.vector_store.list_ids(namespace=namespace, prefix=prefix))
+    
+    def purge_documents(
+        self,
+        doc_ids: List[str],
+        namespace: Optional[str] = None,
+        batch_size: int = DELETE_BATCH_SIZE
+    ) -> int:
+        """
+        Delete every chunk vector of the given documents.
+        
+        Chunk IDs are '{doc_id}_chunk_{i}', so the vectors are found by ID
+        prefix and deleted in batches, without knowing the chunk counts.
+        
+        Args:
+            doc_ids: Document IDs
+            namespace: Namespace the documents were ingested into
+            batch_size: Maximum IDs per delete request
+        
+        Returns:
+            Number of vectors deleted
+        """
+        ids = [
+            vector_id
+            for doc_id in doc_ids
+            for vector_id in self.vector_store.list_ids(namespace=namespace, prefix=f"{doc_id}_chunk_")
+        ]
+        for i in range(0, len(ids), batch_size):
+            self.delete_documents(ids[i:i + batch_size], namespace=namespace)
+        return len(ids)
+    
+    def copy_document(
+        self,
+        source_doc_id: str,
+        target_doc_id: str,
+        source_namespace: Optional[str] = None,
+        target_namespace: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        batch_size: int = 100
+    ) -> int:
+        """
+        Copy a document's chunk vectors to another document ID.
+        
+        Used for duplicate uploads: the stored embeddings (and chunk text)
+        are reused, so nothing is extracted or embedded again.
+        
+        Args:
+            source_doc_id: Document whose '{id}_chunk_{i}' vectors are copied
+            target_doc_id: Document ID of the copies
+            source_namespace: Namespace of the source vectors
+            target_namespace: Namespace of the copies
+            metadata: Metadata overriding the source metadata (e.g. doc_id, twg_id)
+            batch_size: Vectors fetched and upserted per batch
+            
+        Returns:
+            Number of vectors copied
+        """
+        ids = self.list_ids(source_namespace, prefix=f"{source_doc_id}_chunk_")
+        timings = {"upsert": 0.0}
+        copied = 0
+        
+        for i in range(0, len(ids), batch_size):
+            vectors = [
+                {
+                    'id': f"{target_doc_id}{vector['id'][len(str(source_doc_id)):]}",
+                    'values': vector['values'],
+                    'metadata': {**vector['metadata'], **(metadata or {})}
+                }
+                for vector in self.vector_store.fetch(ids[i:i + batch_size], namespace=source_namespace)
+            ]
+            if vectors:
+                copied += self._upsert_batch(vectors, target_namespace, i // batch_size + 1, timings)
+        
+        logger.info(f"Copied {copied} vectors of {source_doc_id} to {target_doc_id} in {target_namespace}")
+        return copied
+    
+    def compact(self, namespace: Optional[str] = None):
+        """
+        Reclaim storage held by deleted vectors.
+        
+        Args:
+            namespace: Optional namespace
+        """
+        self.vector_store.compact(namespace=namespace)
+    
     def get_namespace_stats(self, namespace: str) -> Dict[str, Any]:
         """
         Get statistics for a specific namespace.
@@ -302,8 +786,8 @@ class PineconeKnowledgeBase:
             Dict with namespace statistics
         """
         try:
-            stats = self.index.describe_index_stats()
-            namespace_stats = stats.namespaces.get(namespace, {})
+            stats = self.vector_store.describe_stats()
+            namespace_stats = stats["namespaces"].get(namespace, {})
             
             return {
                 "namespace": namespace,
@@ -322,45 +806,158 @@ class PineconeKnowledgeBase:
             List of namespace names
         """
         try:
-            stats = self.index.describe_index_stats()
-            return list(stats.namespaces.keys())
+            return self.vector_store.list_namespaces()
         except Exception as e:
             logger.error(f"Error listing namespaces: {e}")
             return []
 
 
+class PineconeKnowledgeBase(KnowledgeBase):
+    """
+    Knowledge base stored in a Pinecone serverless index.
+    """
+    
+    def __init__(
+        self,
+        api_key: str,
+        environment: str,
+        index_name: str,
+        embedding_model: str = "text-embedding-3-small",
+        dimension: int = 1536,
+        namespace_prefix: str = "twg",
+        embedding_client: Optional[OllamaEmbeddingClient] = None,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        search_cache: Optional[SearchResultCache] = None,
+        pipeline_window: int = 2,
+        lexical_index: Optional[LexicalIndex] = None
+    ):
+        """
+        Initialize Pinecone knowledge base.
+        
+        Args:
+            api_key: Pinecone API key
+            environment: Pinecone environment (e.g., 'us-east-1')
+            index_name: Name of the Pinecone index
+            embedding_model: Embedding model name
+            dimension: Embedding dimension (1536 for text-embedding-3-small)
+            namespace_prefix: Prefix for TWG namespaces
+            embedding_client: Optional pre-configured embedding client
+            embedding_cache: Optional cache consulted before embedding
+            search_cache: Optional cache for search results
+            pipeline_window: Default upsert pipeline window (0 disables pipelining)
+            lexical_index: Optional BM25 index kept in step with the vectors
+        """
+        self.environment = environment
+        self.index_name = index_name
+        
+        super().__init__(
+            vector_store=PineconeVectorStore(
+                api_key=api_key,
+                environment=environment,
+                index_name=index_name,
+                dimension=dimension
+            ),
+            embedding_model=embedding_model,
+            dimension=dimension,
+            namespace_prefix=namespace_prefix,
+            embedding_client=embedding_client,
+            embedding_cache=embedding_cache,
+            search_cache=search_cache,
+            pipeline_window=pipeline_window,
+            lexical_index=lexical_index
+        )
+    
+    @property
+    def index(self):
+        """Underlying Pinecone index."""
+        return self.vector_store.index
+
+
 # Singleton instance
-_knowledge_base_instance: Optional[PineconeKnowledgeBase] = None
+_knowledge_base_instance: Optional[KnowledgeBase] = None
 
 
 from backend.app.core.config import settings
 
-def get_knowledge_base() -> PineconeKnowledgeBase:
+def get_knowledge_base() -> KnowledgeBase:
     """
-    Get singleton instance of PineconeKnowledgeBase.
+    Get singleton instance of the knowledge base.
+    
+    The storage backend is chosen by VECTOR_STORE_BACKEND: 'pinecone'
+    (default) or 'local' for the on-disk NumPy index.
     
     Returns:
-        PineconeKnowledgeBase instance
+        KnowledgeBase instance
     """
     global _knowledge_base_instance
     
     if _knowledge_base_instance is None:
         # Initialize from settings
-        api_key = settings.PINECONE_API_KEY
-        environment = settings.PINECONE_ENVIRONMENT
-        index_name = settings.PINECONE_INDEX_NAME
+        backend = settings.VECTOR_STORE_BACKEND.lower()
         embedding_model = settings.EMBEDDING_MODEL
         dimension = settings.EMBEDDING_DIMENSION
         
-        if not api_key:
+        if backend not in ("pinecone", "local"):
+            raise ValueError(f"Unknown VECTOR_STORE_BACKEND: {settings.VECTOR_STORE_BACKEND}")
+        
+        if backend == "pinecone" and not settings.PINECONE_API_KEY:
             raise ValueError("PINECONE_API_KEY environment variable not set")
         
-        _knowledge_base_instance = PineconeKnowledgeBase(
-            api_key=api_key,
-            environment=environment,
-            index_name=index_name,
-            embedding_model=embedding_model,
-            dimension=dimension
+        embedding_client = OllamaEmbeddingClient(
+            base_url=settings.OLLAMA_BASE_URL,
+            model=embedding_model,
+            batch_size=settings.EMBEDDING_BATCH_SIZE,
+            max_concurrency=settings.EMBEDDING_MAX_CONCURRENCY,
+            timeout=settings.EMBEDDING_TIMEOUT
         )
+        
+        redis_client = None
+        if settings.EMBEDDING_CACHE_USE_REDIS:
+            from backend.app.services.redis_factory import create_redis_client_from_config
+            redis_client = create_redis_client_from_config(decode_responses=False)
+        
+        embedding_cache = EmbeddingCache(
+            model=embedding_model,
+            dimension=dimension,
+            max_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES,
+            redis_client=redis_client,
+            redis_ttl=settings.EMBEDDING_CACHE_TTL
+        )
+        
+        search_cache = SearchResultCache(
+            ttl=settings.SEARCH_CACHE_TTL,
+            max_entries=settings.SEARCH_CACHE_MAX_ENTRIES
+        )
+        
+        lexical_index = LexicalIndex(settings.LEXICAL_INDEX_PATH) if settings.LEXICAL_INDEX_ENABLED else None
+        
+        if backend == "local":
+            _knowledge_base_instance = KnowledgeBase(
+                vector_store=LocalVectorStore(
+                    path=settings.LOCAL_VECTOR_STORE_PATH,
+                    dimension=dimension,
+                    dtype=settings.LOCAL_VECTOR_STORE_DTYPE
+                ),
+                embedding_model=embedding_model,
+                dimension=dimension,
+                embedding_client=embedding_client,
+                embedding_cache=embedding_cache,
+                search_cache=search_cache,
+                pipeline_window=settings.INGEST_PIPELINE_WINDOW,
+                lexical_index=lexical_index
+            )
+        else:
+            _knowledge_base_instance = PineconeKnowledgeBase(
+                api_key=settings.PINECONE_API_KEY,
+                environment=settings.PINECONE_ENVIRONMENT,
+                index_name=settings.PINECONE_INDEX_NAME,
+                embedding_model=embedding_model,
+                dimension=dimension,
+                embedding_client=embedding_client,
+                embedding_cache=embedding_cache,
+                search_cache=search_cache,
+                pipeline_window=settings.INGEST_PIPELINE_WINDOW,
+                lexical_index=lexical_index
+            )
     
     return _knowledge_base_instance
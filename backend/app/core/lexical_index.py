@@ -0,0 +1,418 @@
+"""
+Lexical (BM25) Index
+
+This module provides a per-namespace inverted index kept alongside the
+vector store, so exact-term lookups (acronyms, protocol numbers, project
+names) can be answered without an embedding call, and fused with vector
+rankings for hybrid search.
+"""
+
+from typing import List, Dict, Any, Optional, Iterable
+from collections import Counter
+from pathlib import Path
+import heapq
+import json
+import math
+import os
+import re
+import threading
+import logging
+
+from backend.app.core.vector_store import matches_filter, file_lock
+
+logger = logging.getLogger(__name__)
+
+# Words, keeping identifiers such as "A/SP.1/12/01" or "WAPP-2025" whole
+_TOKEN = re.compile(r"\w+(?:[-/.]\w+)*")
+_WORD = re.compile(r"\w+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have how in is it of on or that the "
+    "this to was were what when where which who why will with".split()
+)
+
+# Constant of reciprocal rank fusion; 60 is the value from the original paper
+RRF_K = 60
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into index terms.
+
+    Terms are lower-cased; compound identifiers are indexed both whole and
+    as their parts, so "A/SP.1/12/01" matches itself and "SP".
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        List of terms (with repeats)
+    """
+    terms = []
+    for token in _TOKEN.findall(text.lower()):
+        if token not in STOPWORDS:
+            terms.append(token)
+        if not token.isalnum():
+            terms.extend(word for word in _WORD.findall(token) if word not in STOPWORDS)
+    return terms
+
+
+def is_keyword_query(query: str) -> bool:
+    """
+    Decide whether a query is an exact-term lookup rather than a question.
+
+    Quoted queries, single terms and short queries containing an
+    identifier-like token (acronym, number, code) count as keyword queries.
+
+    Args:
+        query: Search query
+
+    Returns:
+        True if lexical search alone should answer the query
+    """
+    stripped = query.strip()
+    if len(stripped) > 2 and stripped[0] == stripped[-1] and stripped[0] in "\"'":
+        return True
+
+    tokens = [t for t in _TOKEN.findall(stripped) if t.lower() not in STOPWORDS]
+    if not tokens or len(tokens) > 4:
+        return False
+    if len(tokens) == 1:
+        return True
+
+    return any(
+        any(c.isdigit() for c in token)
+        or not token.isalnum()
+        or (token.isupper() and len(token) >= 2)
+        for token in tokens
+    )
+
+
+def reciprocal_rank_fusion(
+    rankings: Dict[str, List[Dict[str, Any]]],
+    top_k: int,
+    k: int = RRF_K
+) -> List[Dict[str, Any]]:
+    """
+    Fuse ranked result lists with reciprocal rank fusion.
+
+    Each result's fused score is the sum of 1 / (k + rank) over the lists
+    it appears in. The original per-list scores are kept as
+    '<name>_score' (None when the result is missing from that list).
+
+    Args:
+        rankings: Ranked results per retriever, e.g. {'vector': [...], 'lexical': [...]}
+        top_k: Number of results to return
+        k: RRF constant
+
+    Returns:
+        Fused results, best first
+    """
+    fused: Dict[str, Dict[str, Any]] = {}
+
+    for name, results in rankings.items():
+        for rank, result in enumerate(results, 1):
+            entry = fused.get(result["id"])
+            if entry is None:
+                entry = {
+                    "id": result["id"],
+                    "score": 0.0,
+                    "metadata": result.get("metadata", {}),
+                    **{f"{other}_score": None for other in rankings}
+                }
+                fused[result["id"]] = entry
+            entry["score"] += 1.0 / (k + rank)
+            entry[f"{name}_score"] = result["score"]
+
+    return heapq.nlargest(top_k, fused.values(), key=lambda r: r["score"])
+
+
+class _LexicalNamespace:
+    """
+    BM25 index of one namespace.
+
+    Postings, document lengths and metadata are kept in memory and
+    persisted as an append-only JSON-lines log, rewritten when more than
+    half of it is superseded records. Several processes (the API and the
+    ingestion script) may share the log: writes and compaction hold a
+    file lock, and every operation first replays records other processes
+    appended since it last read the log (or reloads it after a rewrite).
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.lock = threading.RLock()
+        self.log_path = self.path / "lexical.jsonl"
+        self.lock_path = self.path / "lexical.lock"
+
+        self._reset()
+        self._refresh()
+
+    def _reset(self):
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.doc_terms: Dict[str, Dict[str, int]] = {}
+        self.doc_lengths: Dict[str, int] = {}
+        self.metadata: Dict[str, Dict[str, Any]] = {}
+        self.total_length = 0
+        self.log_records = 0
+        # Identity of the log file read so far and how far it was read
+        self._log_id = None
+        self._offset = 0
+
+    def _refresh(self):
+        """Apply log records written since the last read (by any process)."""
+        try:
+            f = open(self.log_path, "rb")
+        except FileNotFoundError:
+            if self._log_id is not None:
+                self._reset()
+            return
+
+        with f:
+            stat = os.fstat(f.fileno())
+            log_id = (stat.st_dev, stat.st_ino)
+            if log_id != self._log_id or stat.st_size < self._offset:
+                # Rewritten by a compaction: read it from the start
+                self._reset()
+                self._log_id = log_id
+            if stat.st_size == self._offset:
+                return
+            f.seek(self._offset)
+            data = f.read()
+
+        # A line still being written is picked up by a later refresh
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            self.log_records += 1
+            if record["op"] == "upsert":
+                self._add(record["id"], record["terms"], record.get("metadata") or {})
+            elif record["op"] == "delete":
+                self._remove(record["id"])
+        self._offset += end
+
+    def _add(self, doc_id: str, terms: Dict[str, int], metadata: Dict[str, Any]):
+        self._remove(doc_id)
+        for term, tf in terms.items():
+            self.postings.setdefault(term, {})[doc_id] = tf
+        length = sum(terms.values())
+        self.doc_terms[doc_id] = terms
+        self.doc_lengths[doc_id] = length
+        self.metadata[doc_id] = metadata
+        self.total_length += length
+
+    def _remove(self, doc_id: str) -> bool:
+        terms = self.doc_terms.pop(doc_id, None)
+        if terms is None:
+            return False
+        for term in terms:
+            docs = self.postings.get(term)
+            if docs is not None:
+                docs.pop(doc_id, None)
+                if not docs:
+                    del self.postings[term]
+        self.total_length -= self.doc_lengths.pop(doc_id)
+        self.metadata.pop(doc_id, None)
+        return True
+
+    def _append(self, records: List[Dict[str, Any]]):
+        """Write records to the log (file lock held and log refreshed)."""
+        with open(self.log_path, "ab") as f:
+            for record in records:
+                f.write((json.dumps(record) + "\n").encode("utf-8"))
+            stat = os.fstat(f.fileno())
+            self._log_id = (stat.st_dev, stat.st_ino)
+            self._offset = f.tell()
+        self.log_records += len(records)
+
+        if self.log_records > 2 * max(len(self.doc_terms), 1024):
+            self._rewrite()
+
+    def upsert(self, documents: Iterable[Dict[str, Any]]) -> int:
+        with self.lock, file_lock(self.lock_path):
+            self._refresh()
+            records = []
+            for doc in documents:
+                metadata = doc.get("metadata") or {}
+                terms = dict(Counter(tokenize(doc.get("text") or metadata.get("text", ""))))
+                self._add(doc["id"], terms, metadata)
+                records.append({"op": "upsert", "id": doc["id"], "terms": terms, "metadata": metadata})
+            self._append(records)
+            return len(records)
+
+    def delete(self, ids: List[str]):
+        with self.lock, file_lock(self.lock_path):
+            self._refresh()
+            records = [{"op": "delete", "id": doc_id} for doc_id in ids if self._remove(doc_id)]
+            if records:
+                self._append(records)
+
+    def compact(self):
+        """Rewrite the log with one record per live document."""
+        with self.lock, file_lock(self.lock_path):
+            # Include what other processes appended, so none of it is lost
+            self._refresh()
+            self._rewrite()
+
+    def _rewrite(self):
+        """Replace the log by the live documents (file lock held and log refreshed)."""
+        tmp_path = self.log_path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            for doc_id, terms in self.doc_terms.items():
+                f.write((json.dumps({
+                    "op": "upsert",
+                    "id": doc_id,
+                    "terms": terms,
+                    "metadata": self.metadata[doc_id]
+                }) + "\n").encode("utf-8"))
+            stat = os.fstat(f.fileno())
+            size = f.tell()
+        os.replace(tmp_path, self.log_path)
+        self._log_id = (stat.st_dev, stat.st_ino)
+        self._offset = size
+        self.log_records = len(self.doc_terms)
+
+    def search(
+        self,
+        terms: List[str],
+        top_k: int,
+        filter: Optional[Dict[str, Any]],
+        k1: float,
+        b: float
+    ) -> List[Dict[str, Any]]:
+        with self.lock:
+            self._refresh()
+            n_docs = len(self.doc_terms)
+            if not n_docs:
+                return []
+            avg_length = self.total_length / n_docs
+
+            scores: Dict[str, float] = {}
+            for term, query_tf in Counter(terms).items():
+                docs = self.postings.get(term)
+                if not docs:
+                    continue
+                idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+                for doc_id, tf in docs.items():
+                    norm = k1 * (1 - b + b * self.doc_lengths[doc_id] / avg_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + query_tf * idf * tf * (k1 + 1) / (tf + norm)
+
+            if filter:
+                scores = {
+                    doc_id: score for doc_id, score in scores.items()
+                    if matches_filter(self.metadata[doc_id], filter)
+                }
+
+            best = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+            return [
+                {"id": doc_id, "score": score, "metadata": self.metadata[doc_id]}
+                for doc_id, score in best
+            ]
+
+
+class LexicalIndex:
+    """
+    BM25 inverted index with one directory per namespace.
+
+    Documents are indexed under the same IDs and namespaces as their
+    vectors, so lexical and vector results refer to the same chunks.
+    """
+
+    DEFAULT_NAMESPACE = "__default__"
+
+    def __init__(self, path: str, k1: float = 1.5, b: float = 0.75):
+        """
+        Initialize lexical index.
+
+        Args:
+            path: Directory holding one sub-directory per namespace
+            k1: BM25 term frequency saturation
+            b: BM25 document length normalization
+        """
+        self.path = Path(path)
+        self.k1 = k1
+        self.b = b
+        self._namespaces: Dict[str, _LexicalNamespace] = {}
+        self._lock = threading.Lock()
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        logger.info(f"Initialized LexicalIndex at {self.path}")
+
+    def _namespace(self, namespace: Optional[str]) -> _LexicalNamespace:
+        name = namespace or self.DEFAULT_NAMESPACE
+        with self._lock:
+            ns = self._namespaces.get(name)
+            if ns is None:
+                ns = _LexicalNamespace(self.path / name)
+                self._namespaces[name] = ns
+            return ns
+
+    def upsert(self, documents: List[Dict[str, Any]], namespace: Optional[str] = None) -> int:
+        """
+        Index documents, replacing any with the same IDs.
+
+        Args:
+            documents: Dicts with 'id' and 'text' (or metadata['text']) and 'metadata'
+            namespace: Optional namespace
+
+        Returns:
+            Number of documents indexed
+        """
+        return self._namespace(namespace).upsert(documents)
+
+    def delete(self, ids: List[str], namespace: Optional[str] = None):
+        """
+        Remove documents from the index.
+
+        Args:
+            ids: Document IDs
+            namespace: Optional namespace
+        """
+        self._namespace(namespace).delete(ids)
+
+    def search(
+        self,
+        query: str,
+        namespace: Optional[str] = None,
+        top_k: int = 5,
+        filter: Optional[Dict[str, Any]] = None,
+        include_metadata: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Rank documents by BM25 score.
+
+        Args:
+            query: Search query text
+            namespace: Optional namespace to search in
+            top_k: Number of results to return
+            filter: Metadata filter (same syntax as the vector store)
+            include_metadata: Whether to include metadata in results
+
+        Returns:
+            List of results with 'id', raw BM25 'score' and 'metadata'
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        results = self._namespace(namespace).search(terms, top_k, filter, self.k1, self.b)
+        if not include_metadata:
+            for result in results:
+                result["metadata"] = {}
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get index statistics.
+
+        Returns:
+            Dict with document and term counts per loaded namespace
+        """
+        with self._lock:
+            namespaces = dict(self._namespaces)
+        return {
+            name: {"documents": len(ns.doc_terms), "terms": len(ns.postings)}
+            for name, ns in namespaces.items()
+        }
@@ -0,0 +1,241 @@
+"""
+LLM Response Cache
+
+This module caches LLM responses keyed by a fingerprint of everything that
+determines the output: provider, model, system prompt, messages,
+temperature and max_tokens. It has a bounded in-process tier and an
+optional shared Redis tier, both with a TTL.
+"""
+
+from typing import List, Dict, Any, Optional, Tuple
+from collections import OrderedDict
+import asyncio
+import hashlib
+import json
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Two-tier TTL cache of LLM responses.
+
+    Features:
+    - Bounded in-process LRU tier
+    - Optional Redis tier shared across workers
+    - Calls sampled above `max_temperature` bypass the cache, so
+      deliberately varied generations are never replayed
+    - Hit/miss counters for monitoring
+    """
+
+    REDIS_KEY_PREFIX = "ecowas:llm"
+
+    def __init__(
+        self,
+        ttl: int = 3600,
+        max_entries: int = 1024,
+        max_temperature: float = 0.0,
+        redis_client: Optional[Any] = None
+    ):
+        """
+        Initialize LLM response cache.
+
+        Args:
+            ttl: Time-to-live of cached responses in seconds (0 disables caching)
+            max_entries: Maximum responses kept in the in-process tier
+            max_temperature: Highest sampling temperature whose responses are
+                cached (0.0 caches deterministic calls only)
+            redis_client: Optional Redis client (decode_responses=True)
+        """
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self.max_temperature = max_temperature
+        self.redis = redis_client
+
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.redis_errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    @staticmethod
+    def make_key(
+        provider: str,
+        model: str,
+        system_prompt: Optional[str],
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: Optional[int]
+    ) -> str:
+        """
+        Fingerprint an LLM call.
+
+        Args:
+            provider: LLM provider (e.g. 'ollama', 'openai')
+            model: Model name
+            system_prompt: System prompt
+            messages: Conversation messages (a single prompt is one user message)
+            temperature: Effective sampling temperature
+            max_tokens: Generation limit (None for the service default)
+
+        Returns:
+            Hex digest identifying the call
+        """
+        messages_json = json.dumps(
+            [{"role": m.get("role", "user"), "content": m.get("content", "")} for m in messages],
+            sort_keys=True
+        )
+        return _sha256(json.dumps({
+            "provider": provider,
+            "model": model,
+            "system": _sha256(system_prompt or ""),
+            "messages": _sha256(messages_json),
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }, sort_keys=True))
+
+    def cacheable(self, temperature: float) -> bool:
+        """Whether a call at this temperature may use the cache (counts bypasses)."""
+        if not self.enabled:
+            return False
+        if temperature > self.max_temperature:
+            with self._lock:
+                self.bypassed += 1
+            return False
+        return True
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Get a cached response.
+
+        Args:
+            key: Key from make_key()
+
+        Returns:
+            Cached response, or None on a miss
+        """
+        response = self._get_local(key)
+        if response is not None:
+            return response
+        return self._get_redis(key)
+
+    async def aget(self, key: str) -> Optional[str]:
+        """Async get; the Redis lookup runs in a worker thread."""
+        response = self._get_local(key)
+        if response is not None:
+            return response
+        if self.redis is None:
+            return self._get_redis(key)
+        return await asyncio.to_thread(self._get_redis, key)
+
+    def set(self, key: str, response: str):
+        """
+        Store a response.
+
+        Args:
+            key: Key from make_key()
+            response: LLM response
+        """
+        self._store_local(key, response)
+        self._set_redis(key, response)
+
+    async def aset(self, key: str, response: str):
+        """Async set; the Redis write runs in a worker thread."""
+        self._store_local(key, response)
+        if self.redis is not None:
+            await asyncio.to_thread(self._set_redis, key, response)
+
+    def _get_local(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def _get_redis(self, key: str) -> Optional[str]:
+        if self.redis is not None:
+            try:
+                response = self.redis.get(self._redis_key(key))
+                if response is not None:
+                    if isinstance(response, bytes):
+                        response = response.decode("utf-8")
+                    self._store_local(key, response)
+                    with self._lock:
+                        self.redis_hits += 1
+                    return response
+            except Exception as e:
+                with self._lock:
+                    self.redis_errors += 1
+                logger.warning(f"LLM cache Redis lookup failed: {e}")
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def _set_redis(self, key: str, response: str):
+        if self.redis is None:
+            return
+        try:
+            self.redis.set(self._redis_key(key), response, ex=self.ttl)
+        except Exception as e:
+            with self._lock:
+                self.redis_errors += 1
+            logger.warning(f"LLM cache Redis write failed: {e}")
+
+    def _store_local(self, key: str, response: str):
+        """Insert into the LRU tier, evicting the oldest entries if full."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.REDIS_KEY_PREFIX}:{key}"
+
+    def clear(self):
+        """Clear the in-process tier (Redis entries expire on their own)."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dict with hit/miss counters and current size
+        """
+        with self._lock:
+            lookups = self.hits + self.redis_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "max_temperature": self.max_temperature,
+                "hits": self.hits,
+                "redis_hits": self.redis_hits,
+                "misses": self.misses,
+                "bypassed": self.bypassed,
+                "hit_rate": round((self.hits + self.redis_hits) / lookups, 4) if lookups else 0.0,
+                "redis_enabled": self.redis is not None,
+                "redis_errors": self.redis_errors
+            }
@@ -0,0 +1,185 @@
+"""
+Search Result Cache
+
+This module provides a TTL cache for knowledge base search results, keyed by
+(query embedding hash, namespace, filter, top_k) and invalidated per
+namespace whenever documents in that namespace are upserted or deleted.
+"""
+
+from typing import List, Dict, Any, Optional, Tuple
+from collections import OrderedDict
+from array import array
+import copy
+import hashlib
+import json
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SearchResultCache:
+    """
+    In-process TTL cache for search results with per-namespace invalidation.
+
+    Each namespace has a generation counter. A search records the generation
+    before querying the vector store and its results are only stored if no
+    write touched the namespace in the meantime, so a slow query can never
+    re-insert results from before an upsert or delete.
+
+    Invalidation is local to the process; in multi-worker deployments the
+    TTL bounds how long another worker can serve results from before a write.
+    """
+
+    def __init__(self, ttl: int = 300, max_entries: int = 2048):
+        """
+        Initialize search result cache.
+
+        Args:
+            ttl: Time-to-live for cached results in seconds (0 disables caching)
+            max_entries: Maximum number of cached result sets
+        """
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+
+        self._entries: "OrderedDict[Tuple[Optional[str], str], Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        self._generations: Dict[Optional[str], int] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    @staticmethod
+    def make_key(
+        query_embedding: List[float],
+        top_k: int,
+        filter: Optional[Dict[str, Any]] = None,
+        **options: Any
+    ) -> str:
+        """
+        Build the cache key for a query within a namespace.
+
+        Args:
+            query_embedding: Query embedding vector
+            top_k: Number of results requested
+            filter: Metadata filter
+            **options: Any other options that change the results
+
+        Returns:
+            Hex digest identifying the query
+        """
+        digest = hashlib.sha256(array("f", query_embedding).tobytes())
+        digest.update(json.dumps(
+            {"top_k": top_k, "filter": filter, **options},
+            sort_keys=True,
+            default=str
+        ).encode("utf-8"))
+        return digest.hexdigest()
+
+    def generation(self, namespace: Optional[str]) -> int:
+        """Get the current write generation of a namespace."""
+        with self._lock:
+            return self._generations.get(namespace, 0)
+
+    def get(self, namespace: Optional[str], key: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get cached results for a query.
+
+        Args:
+            namespace: Namespace searched
+            key: Key from make_key()
+
+        Returns:
+            Copy of the cached results, or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[(namespace, key)]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end((namespace, key))
+            self.hits += 1
+            results = entry[1]
+
+        return copy.deepcopy(results)
+
+    def set(
+        self,
+        namespace: Optional[str],
+        key: str,
+        results: List[Dict[str, Any]],
+        generation: int
+    ):
+        """
+        Store results for a query.
+
+        Args:
+            namespace: Namespace searched
+            key: Key from make_key()
+            results: Search results
+            generation: Namespace generation read before the query ran
+        """
+        if not self.enabled:
+            return
+
+        with self._lock:
+            if self._generations.get(namespace, 0) != generation:
+                return
+
+            self._entries[(namespace, key)] = (time.monotonic() + self.ttl, copy.deepcopy(results))
+            self._entries.move_to_end((namespace, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_namespace(self, namespace: Optional[str]):
+        """
+        Drop all cached results for a namespace.
+
+        Args:
+            namespace: Namespace that was written to
+        """
+        with self._lock:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            stale = [entry_key for entry_key in self._entries if entry_key[0] == namespace]
+            for entry_key in stale:
+                del self._entries[entry_key]
+            self.invalidations += 1
+
+        logger.debug(f"Invalidated {len(stale)} cached searches for namespace: {namespace}")
+
+    def clear(self):
+        """Drop all cached results."""
+        with self._lock:
+            for namespace in {entry_key[0] for entry_key in self._entries}:
+                self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dict with hit/miss counters and current size
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations
+            }
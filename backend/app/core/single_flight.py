@@ -0,0 +1,249 @@
+"""
+Single-Flight Call Coalescing
+
+This module lets concurrent callers that ask for the same thing share one
+in-flight call instead of each starting their own. It covers blocking
+calls (threads), coroutines and token streams; a stream subscriber that
+joins late first receives the pieces already produced.
+"""
+
+from typing import Dict, Any, Callable, Awaitable, AsyncIterator, List, Optional
+import asyncio
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class StreamCancelled(RuntimeError):
+    """Raised to subscribers of a shared stream that was cancelled midway."""
+
+
+class _Call:
+    """A blocking call shared by several threads."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class _Flight:
+    """A coroutine shared by several awaiting callers."""
+
+    def __init__(self, task: "asyncio.Future"):
+        self.task = task
+        self.waiters = 0
+
+
+class _Stream:
+    """A token stream shared by several subscribers."""
+
+    def __init__(self):
+        self.pieces: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.updated = asyncio.Event()
+        self.subscribers = 0
+        self.task: Optional["asyncio.Future"] = None
+
+    def notify(self):
+        # Wake every subscriber waiting on the current event
+        updated, self.updated = self.updated, asyncio.Event()
+        updated.set()
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls by key.
+
+    Features:
+    - The first caller for a key runs the call; callers arriving while it
+      is in flight wait for and share its result (or its exception)
+    - Nothing is kept once a call finishes, so later callers start afresh
+    - A shared coroutine or stream is cancelled once every caller waiting
+      on it has gone away
+    - Counters of calls run, calls shared and calls abandoned
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._flights: Dict[str, _Flight] = {}
+        self._streams: Dict[str, _Stream] = {}
+
+        self.calls = 0
+        self.shared_calls = 0
+        self.streams = 0
+        self.shared_streams = 0
+        self.abandoned = 0
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        Run a blocking call, or wait for the identical call already running.
+
+        Args:
+            key: Identity of the call
+            fn: Function making the call
+
+        Returns:
+            Result of the (shared) call
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                self.shared_calls += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    async def ado(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await a call, or join the identical call already in flight.
+
+        Args:
+            key: Identity of the call
+            factory: Function returning the awaitable making the call
+
+        Returns:
+            Result of the (shared) call
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = self._flights[key] = _Flight(asyncio.ensure_future(factory()))
+            flight.task.add_done_callback(lambda _: self._forget(self._flights, key, flight))
+            self._count("calls")
+        else:
+            self._count("shared_calls")
+
+        flight.waiters += 1
+        try:
+            # Shielded, so one caller going away does not cancel the others' call
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Forget it first, so a caller arriving now starts afresh
+                self._forget(self._flights, key, flight)
+                flight.task.cancel()
+                self._count("abandoned")
+
+    async def astream(self, key: str, factory: Callable[[], AsyncIterator[str]]) -> AsyncIterator[str]:
+        """
+        Subscribe to a stream, starting it unless an identical one is running.
+
+        Args:
+            key: Identity of the stream
+            factory: Function returning the async iterator producing the pieces
+
+        Yields:
+            Every piece of the (shared) stream, from its first
+        """
+        stream = self._streams.get(key)
+        if stream is None:
+            stream = self._streams[key] = _Stream()
+            stream.task = asyncio.ensure_future(self._pump(key, stream, factory()))
+            stream.task.add_done_callback(lambda _: self._end_stream(key, stream))
+            self._count("streams")
+        else:
+            self._count("shared_streams")
+
+        stream.subscribers += 1
+        index = 0
+        try:
+            while True:
+                while index >= len(stream.pieces) and not stream.done:
+                    await stream.updated.wait()
+
+                pieces = stream.pieces[index:]
+                done = stream.done
+                for piece in pieces:
+                    yield piece
+                index += len(pieces)
+
+                if done:
+                    if stream.error is not None:
+                        raise stream.error
+                    return
+        finally:
+            stream.subscribers -= 1
+            if stream.subscribers == 0 and not stream.task.done():
+                self._forget(self._streams, key, stream)
+                stream.task.cancel()
+                self._count("abandoned")
+
+    async def _pump(self, key: str, stream: _Stream, source: AsyncIterator[str]):
+        """Read the source stream into `stream`, waking subscribers on each piece."""
+        try:
+            async for piece in source:
+                stream.pieces.append(piece)
+                stream.notify()
+        except Exception as e:
+            stream.error = e
+        finally:
+            aclose = getattr(source, "aclose", None)
+            if aclose is not None:
+                # Stops the generation upstream if the stream was abandoned
+                await aclose()
+
+    def _end_stream(self, key: str, stream: _Stream):
+        """Mark a stream done once its pump has finished, however it finished."""
+        self._forget(self._streams, key, stream)
+        if stream.task.cancelled():
+            # Anyone still attached must not take the pieces so far for the whole answer
+            stream.error = StreamCancelled("Shared stream was cancelled before it finished")
+        stream.done = True
+        stream.notify()
+
+    @staticmethod
+    def _forget(flights: Dict[str, Any], key: str, flight: Any):
+        if flights.get(key) is flight:
+            del flights[key]
+
+    def in_flight(self) -> int:
+        """Number of distinct calls and streams currently running."""
+        with self._lock:
+            return len(self._calls) + len(self._flights) + len(self._streams)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get coalescing statistics.
+
+        Returns:
+            Dict with counters of calls run, shared and abandoned
+        """
+        in_flight = self.in_flight()
+        with self._lock:
+            started = self.calls + self.streams
+            shared = self.shared_calls + self.shared_streams
+            return {
+                "in_flight": in_flight,
+                "calls": self.calls,
+                "shared_calls": self.shared_calls,
+                "streams": self.streams,
+                "shared_streams": self.shared_streams,
+                "abandoned": self.abandoned,
+                "coalesce_rate": round(shared / (started + shared), 4) if started + shared else 0.0
+            }
@@ -0,0 +1,700 @@
+"""
+Vector Store Backends
+
+This module defines the storage interface used by the knowledge base and its
+implementations: Pinecone (managed, remote) and a local NumPy index that keeps
+one memory-mapped matrix per namespace on disk.
+"""
+
+from typing import List, Dict, Any, Optional, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+import json
+import os
+import re
+import threading
+import logging
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def file_lock(path: Path):
+    """Hold an exclusive advisory lock on `path` across processes."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class VectorStore:
+    """
+    Interface for vector storage backends.
+
+    Vectors are dicts with 'id', 'values' and optional 'metadata'. Query
+    results are dicts with 'id', 'score' and 'metadata'.
+    """
+
+    def upsert(self, vectors: List[Dict[str, Any]], namespace: Optional[str] = None) -> int:
+        """Insert or replace vectors. Returns the number written."""
+        raise NotImplementedError
+
+    def query(
+        self,
+        vector: List[float],
+        top_k: int = 5,
+        namespace: Optional[str] = None,
+        filter: Optional[Dict[str, Any]] = None,
+        include_metadata: bool = True
+    ) -> List[Dict[str, Any]]:
+        """Return the top_k most similar vectors, best first."""
+        raise NotImplementedError
+
+    def delete(self, ids: List[str], namespace: Optional[str] = None) -> None:
+        """Delete vectors by ID."""
+        raise NotImplementedError
+
+    def list_ids(self, namespace: Optional[str] = None, prefix: Optional[str] = None) -> Iterator[str]:
+        """Iterate vector IDs in a namespace, optionally by ID prefix."""
+        raise NotImplementedError
+
+    def fetch(self, ids: List[str], namespace: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return stored vectors ('id', 'values', 'metadata') by ID; missing IDs are skipped."""
+        raise NotImplementedError
+
+    def compact(self, namespace: Optional[str] = None):
+        """Reclaim storage held by deleted vectors (no-op for managed stores)."""
+
+    def describe_stats(self) -> Dict[str, Any]:
+        """
+        Return index statistics as
+        {'total_vectors': int, 'dimension': int, 'namespaces': {name: {'vector_count': int}}}.
+        """
+        raise NotImplementedError
+
+    def list_namespaces(self) -> List[str]:
+        """List namespace names."""
+        return list(self.describe_stats()["namespaces"].keys())
+
+
+class PineconeVectorStore(VectorStore):
+    """Vector store backed by a Pinecone serverless index."""
+
+    def __init__(self, api_key: str, environment: str, index_name: str, dimension: int):
+        """
+        Initialize Pinecone vector store.
+
+        Args:
+            api_key: Pinecone API key
+            environment: Pinecone environment (e.g., 'us-east-1')
+            index_name: Name of the Pinecone index
+            dimension: Embedding dimension
+        """
+        from pinecone import Pinecone
+
+        self.environment = environment
+        self.index_name = index_name
+        self.dimension = dimension
+
+        # Initialize Pinecone client
+        self.pc = Pinecone(api_key=api_key)
+
+        # Get or create index
+        self.index = self._get_or_create_index()
+
+    def _get_or_create_index(self):
+        """Get existing index or create new one."""
+        from pinecone import ServerlessSpec
+
+        try:
+            # Check if index exists
+            existing_indexes = self.pc.list_indexes()
+            index_names = [idx.name for idx in existing_indexes]
+
+            if self.index_name not in index_names:
+                logger.info(f"Creating new Pinecone index: {self.index_name}")
+
+                # Create serverless index
+                self.pc.create_index(
+                    name=self.index_name,
+                    dimension=self.dimension,
+                    metric="cosine",
+                    spec=ServerlessSpec(
+                        cloud="aws",
+                        region=self.environment
+                    )
+                )
+                logger.info(f"Index {self.index_name} created successfully")
+
+            # Connect to index
+            return self.pc.Index(self.index_name)
+
+        except Exception as e:
+            logger.error(f"Error getting/creating index: {e}")
+            raise
+
+    def upsert(self, vectors: List[Dict[str, Any]], namespace: Optional[str] = None) -> int:
+        self.index.upsert(vectors=vectors, namespace=namespace)
+        return len(vectors)
+
+    def query(
+        self,
+        vector: List[float],
+        top_k: int = 5,
+        namespace: Optional[str] = None,
+        filter: Optional[Dict[str, Any]] = None,
+        include_metadata: bool = True
+    ) -> List[Dict[str, Any]]:
+        results = self.index.query(
+            vector=vector,
+            top_k=top_k,
+            namespace=namespace,
+            filter=filter,
+            include_metadata=include_metadata
+        )
+        return [
+            {
+                'id': match.id,
+                'score': match.score,
+                'metadata': match.metadata if include_metadata else {}
+            }
+            for match in results.matches
+        ]
+
+    def delete(self, ids: List[str], namespace: Optional[str] = None) -> None:
+        self.index.delete(ids=ids, namespace=namespace)
+
+    def list_ids(self, namespace: Optional[str] = None, prefix: Optional[str] = None) -> Iterator[str]:
+        # Paginated listing; only available on serverless indexes
+        for ids in self.index.list(prefix=prefix, namespace=namespace or ""):
+            yield from ids
+
+    def fetch(self, ids: List[str], namespace: Optional[str] = None) -> List[Dict[str, Any]]:
+        response = self.index.fetch(ids=ids, namespace=namespace or "")
+        return [
+            {'id': vector_id, 'values': list(vector.values), 'metadata': vector.metadata or {}}
+            for vector_id, vector in response.vectors.items()
+        ]
+
+    def describe_stats(self) -> Dict[str, Any]:
+        stats = self.index.describe_index_stats()
+        namespaces = {}
+        for name, summary in stats.namespaces.items():
+            count = summary.get('vector_count', 0) if isinstance(summary, dict) else getattr(summary, 'vector_count', 0)
+            namespaces[name] = {"vector_count": count}
+        return {
+            "total_vectors": stats.total_vector_count,
+            "dimension": stats.dimension,
+            "namespaces": namespaces
+        }
+
+
+def matches_filter(metadata: Dict[str, Any], filter: Optional[Dict[str, Any]]) -> bool:
+    """
+    Evaluate a Pinecone-style metadata filter against a metadata dict.
+
+    Supports plain equality, $eq, $ne, $in, $nin, $gt, $gte, $lt, $lte,
+    $exists, and $and/$or combinations.
+    """
+    if not filter:
+        return True
+
+    for key, condition in filter.items():
+        if key == "$and":
+            if not all(matches_filter(metadata, sub) for sub in condition):
+                return False
+            continue
+        if key == "$or":
+            if not any(matches_filter(metadata, sub) for sub in condition):
+                return False
+            continue
+
+        present = key in metadata
+        value = metadata.get(key)
+
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+
+        for op, operand in condition.items():
+            if op == "$eq":
+                ok = present and (operand in value if isinstance(value, list) else value == operand)
+            elif op == "$ne":
+                ok = not present or value != operand
+            elif op == "$in":
+                ok = present and (any(v in operand for v in value) if isinstance(value, list) else value in operand)
+            elif op == "$nin":
+                ok = not present or (not any(v in operand for v in value) if isinstance(value, list) else value not in operand)
+            elif op == "$exists":
+                ok = present == bool(operand)
+            elif op in ("$gt", "$gte", "$lt", "$lte"):
+                try:
+                    ok = present and {
+                        "$gt": value > operand,
+                        "$gte": value >= operand,
+                        "$lt": value < operand,
+                        "$lte": value <= operand
+                    }[op]
+                except TypeError:
+                    ok = False
+            else:
+                raise ValueError(f"Unsupported filter operator: {op}")
+
+            if not ok:
+                return False
+
+    return True
+
+
+class _LocalNamespace:
+    """
+    One namespace of the local index.
+
+    Vectors live in a memory-mapped (capacity x dimension) matrix, unit
+    normalized so cosine similarity is a dot product. IDs and metadata are
+    kept in memory and persisted as an append-only JSON-lines log that is
+    replayed on load and rewritten by compaction.
+
+    Several processes (the API and the ingestion script) may share a
+    namespace: writes and compaction hold a file lock, and every operation
+    first replays records other processes appended since it last read the
+    log, so rows are never allocated twice. A log rewritten by another
+    process's compaction is reloaded with its matrix.
+    """
+
+    INITIAL_CAPACITY = 1024
+    SCORE_BLOCK_ROWS = 65536
+
+    def __init__(self, path: Path, dimension: int, dtype: np.dtype):
+        self.path = path
+        self.dimension = dimension
+        self.dtype = dtype
+        self.lock = threading.RLock()
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.matrix_path = self.path / f"vectors.{np.dtype(dtype).name}.bin"
+        self.log_path = self.path / "records.jsonl"
+        self.lock_path = self.path / "records.lock"
+
+        self.matrix: Optional[np.memmap] = None
+        self._load()
+
+    # --- persistence ---
+
+    def _open_matrix(self, capacity: int):
+        """Open (growing if needed) the memory-mapped matrix file."""
+        row_bytes = self.dimension * np.dtype(self.dtype).itemsize
+        if self.matrix is not None:
+            self.matrix.flush()
+            self.matrix = None
+
+        with open(self.matrix_path, "ab") as f:
+            if f.tell() < capacity * row_bytes:
+                f.truncate(capacity * row_bytes)
+
+        self.capacity = capacity
+        self.matrix = np.memmap(self.matrix_path, dtype=self.dtype, mode="r+", shape=(capacity, self.dimension))
+
+        live = np.zeros(capacity, dtype=bool)
+        live[:len(self.live)] = self.live[:capacity]
+        self.live = live
+
+    def _file_rows(self) -> int:
+        row_bytes = self.dimension * np.dtype(self.dtype).itemsize
+        return self.matrix_path.stat().st_size // row_bytes if self.matrix_path.exists() else 0
+
+    def _load(self):
+        """Open the matrix and replay the record log from the start."""
+        if self.matrix is not None:
+            self.matrix.flush()
+            self.matrix = None
+
+        self.ids: List[Optional[str]] = []
+        self.metadata: List[Optional[Dict[str, Any]]] = []
+        self.id_to_row: Dict[str, int] = {}
+        self.capacity = 0
+        self.live = np.zeros(0, dtype=bool)
+        # Identity of the log file read so far and how far it was read
+        self._log_id = None
+        self._offset = 0
+
+        self._open_matrix(max(self.INITIAL_CAPACITY, self._file_rows()))
+        self._refresh()
+
+    def _refresh(self):
+        """Apply log records written since the last read (by any process)."""
+        try:
+            f = open(self.log_path, "rb")
+        except FileNotFoundError:
+            return
+
+        with f:
+            stat = os.fstat(f.fileno())
+            log_id = (stat.st_dev, stat.st_ino)
+            if self._log_id is not None and (log_id != self._log_id or stat.st_size < self._offset):
+                # Rewritten by another process's compaction: reload it
+                self._load()
+                return
+            self._log_id = log_id
+            if stat.st_size == self._offset:
+                return
+            f.seek(self._offset)
+            data = f.read()
+
+        # A line still being written is picked up by a later refresh
+        end = data.rfind(b"\n") + 1
+        records = [json.loads(line) for line in data[:end].splitlines() if line.strip()]
+
+        needed = max((record["row"] + 1 for record in records if record["op"] == "upsert"), default=0)
+        if needed > self.capacity:
+            # Grown by another process
+            self._open_matrix(max(needed, self._file_rows()))
+
+        for record in records:
+            self._apply(record)
+        self._offset += end
+
+    def _apply(self, record: Dict[str, Any]):
+        if record["op"] == "upsert":
+            row = record["row"]
+            while len(self.ids) <= row:
+                self.ids.append(None)
+                self.metadata.append(None)
+            previous = self.ids[row]
+            if previous is not None and self.id_to_row.get(previous) == row:
+                del self.id_to_row[previous]
+            self.ids[row] = record["id"]
+            self.metadata[row] = record.get("metadata") or {}
+            self.id_to_row[record["id"]] = row
+            self.live[row] = True
+        elif record["op"] == "delete":
+            row = self.id_to_row.pop(record["id"], None)
+            if row is not None:
+                self.live[row] = False
+                self.metadata[row] = None
+
+    def _append_log(self, records: List[Dict[str, Any]]):
+        """Write records to the log (file lock held and log refreshed)."""
+        with open(self.log_path, "ab") as f:
+            for record in records:
+                f.write((json.dumps(record, default=str) + "\n").encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+            stat = os.fstat(f.fileno())
+            self._log_id = (stat.st_dev, stat.st_ino)
+            self._offset = f.tell()
+
+    # --- operations ---
+
+    @property
+    def count(self) -> int:
+        return len(self.id_to_row)
+
+    def upsert(self, vectors: List[Dict[str, Any]]) -> int:
+        if not vectors:
+            return 0
+
+        # A repeated ID keeps its last vector, so it gets a single row
+        vectors = list({v['id']: v for v in vectors}.values())
+
+        values = np.asarray([v['values'] for v in vectors], dtype=np.float32)
+        if values.ndim != 2 or values.shape[1] != self.dimension:
+            raise ValueError(f"Expected vectors of dimension {self.dimension}, got {values.shape[-1]}")
+
+        norms = np.linalg.norm(values, axis=1, keepdims=True)
+        values = values / np.where(norms == 0, 1, norms)
+
+        with self.lock, file_lock(self.lock_path):
+            self._refresh()
+            rows = []
+            new_rows = 0
+            for v in vectors:
+                row = self.id_to_row.get(v['id'])
+                if row is None:
+                    row = len(self.ids) + new_rows
+                    new_rows += 1
+                rows.append(row)
+
+            needed = len(self.ids) + new_rows
+            if needed > self.capacity:
+                capacity = self.capacity
+                while capacity < needed:
+                    capacity *= 2
+                self._open_matrix(capacity)
+
+            records = []
+            for v, row, vec in zip(vectors, rows, values):
+                if row >= len(self.ids):
+                    self.ids.append(None)
+                    self.metadata.append(None)
+                self.matrix[row] = vec
+                self.ids[row] = v['id']
+                self.metadata[row] = v.get('metadata') or {}
+                self.id_to_row[v['id']] = row
+                self.live[row] = True
+                records.append({"op": "upsert", "id": v['id'], "row": row, "metadata": self.metadata[row]})
+
+            self.matrix.flush()
+            self._append_log(records)
+
+        return len(vectors)
+
+    def delete(self, ids: List[str]):
+        with self.lock, file_lock(self.lock_path):
+            self._refresh()
+            records = []
+            for vector_id in ids:
+                row = self.id_to_row.pop(vector_id, None)
+                if row is None:
+                    continue
+                self.live[row] = False
+                self.metadata[row] = None
+                records.append({"op": "delete", "id": vector_id})
+
+            if records:
+                self._append_log(records)
+
+            # Reclaim space once most rows are dead
+            if len(self.ids) > self.INITIAL_CAPACITY and self.count < len(self.ids) // 2:
+                self._rewrite()
+
+    def _scores(self, query: np.ndarray, rows: int) -> np.ndarray:
+        """Cosine scores for the first `rows` rows, computed in blocks."""
+        scores = np.empty(rows, dtype=np.float32)
+        for start in range(0, rows, self.SCORE_BLOCK_ROWS):
+            end = min(start + self.SCORE_BLOCK_ROWS, rows)
+            block = self.matrix[start:end]
+            if block.dtype != np.float32:
+                block = block.astype(np.float32)
+            scores[start:end] = block @ query
+        return scores
+
+    def query(
+        self,
+        vector: List[float],
+        top_k: int,
+        filter: Optional[Dict[str, Any]],
+        include_metadata: bool
+    ) -> List[Dict[str, Any]]:
+        query = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+
+        with self.lock:
+            self._refresh()
+            rows = len(self.ids)
+            if rows == 0 or top_k <= 0:
+                return []
+
+            scores = self._scores(query, rows)
+            scores[~self.live[:rows]] = -np.inf
+
+            # Check the best candidates first; widen to a full ordering only
+            # when a selective filter rejects too many of them.
+            candidate_count = min(rows, top_k if not filter else max(top_k * 8, 64))
+            while True:
+                if candidate_count < rows:
+                    candidates = np.argpartition(-scores, candidate_count - 1)[:candidate_count]
+                else:
+                    candidates = np.arange(rows)
+                candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+                results = []
+                for row in candidates:
+                    if not np.isfinite(scores[row]):
+                        break
+                    metadata = self.metadata[row]
+                    if filter and not matches_filter(metadata, filter):
+                        continue
+                    results.append({
+                        'id': self.ids[row],
+                        'score': float(scores[row]),
+                        'metadata': dict(metadata) if include_metadata else {}
+                    })
+                    if len(results) >= top_k:
+                        break
+
+                if len(results) >= top_k or candidate_count >= rows:
+                    return results
+                candidate_count = rows
+
+    def fetch(self, ids: List[str]) -> List[Dict[str, Any]]:
+        with self.lock:
+            self._refresh()
+            rows = [(vector_id, self.id_to_row[vector_id]) for vector_id in ids if vector_id in self.id_to_row]
+            return [
+                {
+                    "id": vector_id,
+                    "values": np.asarray(self.matrix[row], dtype=np.float32).tolist(),
+                    "metadata": dict(self.metadata[row])
+                }
+                for vector_id, row in rows
+            ]
+
+    def list_ids(self, prefix: Optional[str] = None) -> Iterator[str]:
+        with self.lock:
+            self._refresh()
+            ids = list(self.id_to_row.keys())
+        for vector_id in ids:
+            if prefix is None or vector_id.startswith(prefix):
+                yield vector_id
+
+    def compact(self):
+        """Rewrite the matrix and log with live rows only."""
+        with self.lock, file_lock(self.lock_path):
+            # Include what other processes appended, so none of it is lost
+            self._refresh()
+            self._rewrite()
+
+    def _rewrite(self):
+        """Rewrite the matrix and log (file lock held and log refreshed)."""
+        live_rows = [row for row in range(len(self.ids)) if self.live[row]]
+        capacity = max(self.INITIAL_CAPACITY, len(live_rows))
+
+        tmp_matrix_path = self.matrix_path.with_suffix(".tmp")
+        tmp_log_path = self.log_path.with_suffix(".tmp")
+
+        new_matrix = np.memmap(tmp_matrix_path, dtype=self.dtype, mode="w+", shape=(capacity, self.dimension))
+        ids, metadata = [], []
+        with open(tmp_log_path, "w", encoding="utf-8") as f:
+            for new_row, row in enumerate(live_rows):
+                new_matrix[new_row] = self.matrix[row]
+                ids.append(self.ids[row])
+                metadata.append(self.metadata[row])
+                f.write(json.dumps({"op": "upsert", "id": self.ids[row], "row": new_row, "metadata": self.metadata[row]}, default=str) + "\n")
+        new_matrix.flush()
+        del new_matrix
+
+        self.matrix = None
+        os.replace(tmp_matrix_path, self.matrix_path)
+        os.replace(tmp_log_path, self.log_path)
+
+        self.ids = ids
+        self.metadata = metadata
+        self.id_to_row = {vector_id: row for row, vector_id in enumerate(ids)}
+        self.live = np.concatenate([np.ones(len(ids), dtype=bool), np.zeros(capacity - len(ids), dtype=bool)])
+        self._open_matrix(capacity)
+
+        stat = os.stat(self.log_path)
+        self._log_id = (stat.st_dev, stat.st_ino)
+        self._offset = stat.st_size
+
+        logger.info(f"Compacted local namespace {self.path.name}: {len(ids)} live vectors")
+
+
+class LocalVectorStore(VectorStore):
+    """
+    Vector store kept on local disk and searched with vectorized NumPy.
+
+    Each namespace is a directory holding a memory-mapped float32 (or
+    float16) matrix and a JSON-lines record log with IDs and metadata.
+    Search is an exact cosine top-k scan with metadata filtering.
+    """
+
+    DEFAULT_NAMESPACE = "__default__"
+
+    def __init__(self, path: str, dimension: int, dtype: str = "float32"):
+        """
+        Initialize local vector store.
+
+        Args:
+            path: Directory holding one subdirectory per namespace
+            dimension: Embedding dimension
+            dtype: Storage precision, 'float32' or 'float16'
+        """
+        if dtype not in ("float32", "float16"):
+            raise ValueError(f"Unsupported local vector store dtype: {dtype}")
+
+        self.path = Path(path)
+        self.dimension = dimension
+        self.dtype = np.dtype(dtype)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        self._namespaces: Dict[str, _LocalNamespace] = {}
+        self._lock = threading.Lock()
+
+        logger.info(f"Initialized LocalVectorStore at {self.path} ({dtype}, dim={dimension})")
+
+    @classmethod
+    def _dir_name(cls, namespace: Optional[str]) -> str:
+        if not namespace:
+            return cls.DEFAULT_NAMESPACE
+        return re.sub(r"[^A-Za-z0-9_.-]", "_", namespace)
+
+    def _namespace(self, namespace: Optional[str], create: bool = True) -> Optional[_LocalNamespace]:
+        name = self._dir_name(namespace)
+        with self._lock:
+            ns = self._namespaces.get(name)
+            if ns is None:
+                if not create and not (self.path / name).is_dir():
+                    return None
+                ns = _LocalNamespace(self.path / name, self.dimension, self.dtype)
+                self._namespaces[name] = ns
+            return ns
+
+    def upsert(self, vectors: List[Dict[str, Any]], namespace: Optional[str] = None) -> int:
+        return self._namespace(namespace).upsert(vectors)
+
+    def query(
+        self,
+        vector: List[float],
+        top_k: int = 5,
+        namespace: Optional[str] = None,
+        filter: Optional[Dict[str, Any]] = None,
+        include_metadata: bool = True
+    ) -> List[Dict[str, Any]]:
+        ns = self._namespace(namespace, create=False)
+        if ns is None:
+            return []
+        return ns.query(vector, top_k, filter, include_metadata)
+
+    def delete(self, ids: List[str], namespace: Optional[str] = None) -> None:
+        ns = self._namespace(namespace, create=False)
+        if ns is not None:
+            ns.delete(ids)
+
+    def list_ids(self, namespace: Optional[str] = None, prefix: Optional[str] = None) -> Iterator[str]:
+        """Iterate vector IDs in a namespace, optionally by ID prefix."""
+        ns = self._namespace(namespace, create=False)
+        if ns is None:
+            return iter(())
+        return ns.list_ids(prefix)
+
+    def fetch(self, ids: List[str], namespace: Optional[str] = None) -> List[Dict[str, Any]]:
+        ns = self._namespace(namespace, create=False)
+        if ns is None:
+            return []
+        return ns.fetch(ids)
+
+    def compact(self, namespace: Optional[str] = None):
+        """Rewrite a namespace's files without deleted rows."""
+        ns = self._namespace(namespace, create=False)
+        if ns is not None:
+            ns.compact()
+
+    def describe_stats(self) -> Dict[str, Any]:
+        namespaces = {}
+        for entry in sorted(self.path.iterdir()):
+            if not entry.is_dir():
+                continue
+            ns = self._namespace(entry.name)
+            name = "" if entry.name == self.DEFAULT_NAMESPACE else entry.name
+            namespaces[name] = {"vector_count": ns.count}
+
+        return {
+            "total_vectors": sum(ns["vector_count"] for ns in namespaces.values()),
+            "dimension": self.dimension,
+            "namespaces": namespaces
+        }
@@ -37,6 +37,28 @@ app.include_router(dashboard.router, prefix=f"{settings.API_V1_STR}")
 app.include_router(users.router, prefix=f"{settings.API_V1_STR}")
 app.include_router(notifications.router, prefix=f"{settings.API_V1_STR}")
 
+@app.on_event("startup")
+async def start_ingestion_workers():
+    from backend.app.services.ingestion_jobs import get_ingestion_runner
+    from backend.app.services.vector_gc import get_vector_gc
+
+    await get_ingestion_runner().start()
+    get_vector_gc().start()
+
+@app.on_event("shutdown")
+async def shutdown_knowledge_base():
+    from backend.app.core.async_knowledge_base import close_async_knowledge_base
+    from backend.app.services.ingestion_jobs import get_ingestion_runner
+    from backend.app.services.vector_gc import get_vector_gc
+    from backend.app.utils.document_processor import shutdown_extraction_executor
+    from backend.app.services.llm_service import close_llm_service
+
+    await get_vector_gc().stop()
+    await get_ingestion_runner().stop()
+    await close_async_knowledge_base()
+    shutdown_extraction_executor()
+    await close_llm_service()
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to the ECOWAS Summit TWG Support System API"}
@@ -3,7 +3,7 @@ import enum
 from datetime import datetime
 from typing import List, Optional
 from decimal import Decimal
-from sqlalchemy import String, DateTime, Enum, ForeignKey, Column, Table, Text, Numeric, Float, Boolean, JSON, Uuid
+from sqlalchemy import String, DateTime, Enum, ForeignKey, Column, Table, Text, Numeric, Float, Boolean, JSON, Uuid, Integer, BigInteger
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 try:
@@ -65,6 +65,13 @@ class NotificationType(str, enum.Enum):
     DOCUMENT = "document"
     TASK = "task"
 
+class IngestionJobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
 # --- Association Tables ---
 
 twg_members = Table(
@@ -239,6 +246,8 @@ class Document(Base):
     file_name: Mapped[str] = mapped_column(String(255))
     file_path: Mapped[str] = mapped_column(String(512))
     file_type: Mapped[str] = mapped_column(String(255))  # MIME type can be long
+    file_size: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)  # bytes
+    file_sha256: Mapped[Optional[str]] = mapped_column(String(64), nullable=True, index=True)
     uploaded_by_id: Mapped[uuid.UUID] = mapped_column(Uuid, ForeignKey("users.id", ondelete="CASCADE"))
     is_confidential: Mapped[bool] = mapped_column(Boolean, default=False)
     metadata_json: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
@@ -247,6 +256,24 @@ class Document(Base):
     # Relationships
     twg: Mapped[Optional["TWG"]] = relationship(back_populates="documents")
 
+class IngestionJob(Base):
+    __tablename__ = "ingestion_jobs"
+
+    id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=uuid.uuid4)
+    document_id: Mapped[uuid.UUID] = mapped_column(Uuid, ForeignKey("documents.id", ondelete="CASCADE"), index=True)
+    created_by_id: Mapped[uuid.UUID] = mapped_column(Uuid, ForeignKey("users.id", ondelete="CASCADE"))
+    batch_id: Mapped[Optional[uuid.UUID]] = mapped_column(Uuid, nullable=True, index=True)  # set for bulk ingests
+    status: Mapped[IngestionJobStatus] = mapped_column(Enum(IngestionJobStatus), default=IngestionJobStatus.QUEUED, index=True)
+    namespace: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    chunks_total: Mapped[int] = mapped_column(Integer, default=0)
+    chunks_embedded: Mapped[int] = mapped_column(Integer, default=0)
+    chunks_upserted: Mapped[int] = mapped_column(Integer, default=0)
+    cancel_requested: Mapped[bool] = mapped_column(Boolean, default=False)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
 class RefreshToken(Base):
     __tablename__ = "refresh_tokens"
     
@@ -58,6 +58,13 @@ class NotificationType(str, enum.Enum):
     DOCUMENT = "document"
     TASK = "task"
 
+class IngestionJobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
 # --- Base Schema ---
 
 class SchemaBase(BaseModel):
@@ -205,9 +212,36 @@ class DocumentCreate(DocumentBase):
 class DocumentRead(DocumentBase):
     id: uuid.UUID
     file_path: str
+    file_size: Optional[int] = None
+    file_sha256: Optional[str] = None
     uploaded_by_id: uuid.UUID
     created_at: datetime
 
+class IngestionJobRead(SchemaBase):
+    id: uuid.UUID
+    document_id: uuid.UUID
+    created_by_id: uuid.UUID
+    batch_id: Optional[uuid.UUID] = None
+    status: IngestionJobStatus
+    namespace: Optional[str] = None
+    chunks_total: int = 0
+    chunks_embedded: int = 0
+    chunks_upserted: int = 0
+    cancel_requested: bool = False
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+class BulkIngestRejection(SchemaBase):
+    document_id: uuid.UUID
+    reason: str
+
+class BulkIngestRead(SchemaBase):
+    batch_id: uuid.UUID
+    jobs: List[IngestionJobRead]
+    rejected: List[BulkIngestRejection] = []
+
 # --- Notification Schemas ---
 
 class NotificationBase(SchemaBase):
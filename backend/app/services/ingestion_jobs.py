@@ -0,0 +1,464 @@
+"""
+Ingestion Job Runner
+
+Runs document ingestion (extraction, chunking, embedding, upsert) in
+background asyncio workers instead of inside the HTTP request. Jobs are
+persisted in the ingestion_jobs table, report chunk-level progress and can
+be cancelled between batches. Jobs created together by a bulk ingest share
+a batch_id and are run as one packed upsert per namespace. A document whose
+content was already ingested under another document copies those vectors
+instead of being extracted and embedded again.
+"""
+
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import and_, or_, select, update
+
+from backend.app.core.database import AsyncSessionLocal
+from backend.app.models.models import Document, IngestionJob, IngestionJobStatus
+
+TERMINAL_STATUSES = (
+    IngestionJobStatus.SUCCEEDED,
+    IngestionJobStatus.FAILED,
+    IngestionJobStatus.CANCELLED,
+)
+
+
+class IngestionJobCancelled(Exception):
+    """Raised inside a running job when cancellation was requested."""
+
+
+def document_namespace(db_doc: Document) -> str:
+    """Namespace a document's chunks are ingested into."""
+    return f"twg-{db_doc.twg_id}" if db_doc.twg_id else "twg-general"
+
+
+async def prepare_document_chunks(
+    db_doc: Document,
+    processor: Any
+) -> Tuple[List[Dict[str, Any]], str]:
+    """
+    Extract and chunk a stored document for upsert.
+
+    Args:
+        db_doc: Document row
+        processor: DocumentProcessor used for extraction
+
+    Returns:
+        Tuple of (documents with 'id', 'text' and 'metadata'; namespace)
+    """
+    processed = await processor.aprocess_document(
+        db_doc.file_path,
+        additional_metadata={
+            'twg_id': str(db_doc.twg_id),
+            'doc_id': str(db_doc.id),
+            'file_name': db_doc.file_name
+        },
+        file_sha256=db_doc.file_sha256
+    )
+
+    if processed['status'] != 'success':
+        raise RuntimeError(f"Processing failed: {processed.get('error')}")
+
+    documents = [
+        {
+            'id': f"{db_doc.id}_chunk_{i}",
+            'text': chunk['text'],
+            'metadata': chunk['metadata']
+        }
+        for i, chunk in enumerate(processed['chunks'])
+    ]
+    return documents, document_namespace(db_doc)
+
+
+class IngestionJobRunner:
+    """
+    Pool of asyncio workers consuming queued ingestion jobs.
+
+    Jobs are claimed with a conditional QUEUED -> RUNNING update, so a job
+    is run once even when several application processes share the table.
+    Progress is written at most every `progress_interval` seconds, and the
+    job's cancel flag is read back at the same time. A job still RUNNING
+    `stale_after` seconds after it started is assumed to have been
+    orphaned by a process that stopped or crashed: it no longer blocks new
+    ingests of its document and is requeued when a runner starts.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        progress_interval: float = 1.0,
+        session_factory=AsyncSessionLocal,
+        processor: Any = None,
+        knowledge_base: Any = None,
+        stale_after: float = 3600.0
+    ):
+        self.workers = workers
+        self.progress_interval = progress_interval
+        self.stale_after = stale_after
+        self.session_factory = session_factory
+        self._processor = processor
+        self._knowledge_base = knowledge_base
+
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+        self._cancelled: set = set()
+
+    async def start(self):
+        """Start the workers and queue jobs left over from a previous run."""
+        if self._tasks:
+            return
+
+        self._tasks = [
+            asyncio.create_task(self._worker(i), name=f"ingestion-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+        try:
+            async with self.session_factory() as db:
+                requeued = await db.execute(
+                    update(IngestionJob)
+                    .where(
+                        IngestionJob.status == IngestionJobStatus.RUNNING,
+                        IngestionJob.started_at < self._stale_before()
+                    )
+                    .values(status=IngestionJobStatus.QUEUED, started_at=None)
+                )
+                await db.commit()
+                if requeued.rowcount:
+                    logger.warning(f"Requeued {requeued.rowcount} orphaned running ingestion jobs")
+
+                result = await db.execute(
+                    select(IngestionJob.id)
+                    .where(IngestionJob.status == IngestionJobStatus.QUEUED)
+                    .order_by(IngestionJob.created_at)
+                )
+                pending = result.scalars().all()
+        except Exception as e:
+            logger.warning(f"Could not load queued ingestion jobs: {e}")
+            pending = []
+
+        for job_id in pending:
+            self.queue.put_nowait(job_id)
+
+        logger.info(f"Started {self.workers} ingestion workers ({len(pending)} queued jobs)")
+
+    async def stop(self):
+        """Stop the workers; running jobs stay RUNNING until they are requeued as stale."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _stale_before(self) -> datetime:
+        return datetime.utcnow() - timedelta(seconds=self.stale_after)
+
+    def active_condition(self):
+        """
+        Filter matching jobs that block a new ingest of their document:
+        queued jobs and running jobs that are not stale.
+        """
+        return or_(
+            IngestionJob.status == IngestionJobStatus.QUEUED,
+            and_(
+                IngestionJob.status == IngestionJobStatus.RUNNING,
+                IngestionJob.started_at >= self._stale_before()
+            )
+        )
+
+    async def submit(self, job_id: uuid.UUID):
+        """Queue a job created in the QUEUED state."""
+        await self.queue.put(job_id)
+
+    async def cancel(self, db, job: IngestionJob) -> IngestionJob:
+        """
+        Request cancellation of a job.
+
+        A queued job is cancelled at once; a running job stops at its next
+        progress check.
+
+        Args:
+            db: Database session
+            job: Job to cancel
+
+        Returns:
+            The updated job
+        """
+        if job.status in TERMINAL_STATUSES:
+            return job
+
+        job.cancel_requested = True
+        if job.status == IngestionJobStatus.QUEUED:
+            job.status = IngestionJobStatus.CANCELLED
+            job.finished_at = datetime.utcnow()
+        else:
+            # Stops at the next batch if the job runs in this process
+            self._cancelled.add(job.id)
+
+        await db.commit()
+        await db.refresh(job)
+        return job
+
+    async def _worker(self, index: int):
+        while True:
+            job_id = await self.queue.get()
+            try:
+                await self.run_job(job_id)
+            except Exception as e:
+                logger.error(f"Ingestion worker {index} failed on job {job_id}: {e}")
+            finally:
+                self.queue.task_done()
+
+    async def _get_processor(self):
+        if self._processor is None:
+            from backend.app.utils.document_processor import get_document_processor
+            self._processor = get_document_processor()
+        return self._processor
+
+    async def _get_knowledge_base(self):
+        if self._knowledge_base is None:
+            from backend.app.core.async_knowledge_base import get_async_knowledge_base
+            self._knowledge_base = await get_async_knowledge_base()
+        return self._knowledge_base
+
+    async def run_job(self, job_id: uuid.UUID):
+        """
+        Run one job to completion, failure or cancellation.
+
+        A job that belongs to a bulk batch is run together with every other
+        queued job of the batch (see _run_jobs).
+
+        Args:
+            job_id: ID of a QUEUED job (other states are skipped)
+        """
+        async with self.session_factory() as db:
+            claimed = await db.execute(
+                update(IngestionJob)
+                .where(IngestionJob.id == job_id, IngestionJob.status == IngestionJobStatus.QUEUED)
+                .values(status=IngestionJobStatus.RUNNING, started_at=datetime.utcnow())
+            )
+            await db.commit()
+            if claimed.rowcount == 0:
+                return
+
+            jobs = [await db.get(IngestionJob, job_id)]
+            if jobs[0].batch_id is not None:
+                result = await db.execute(
+                    update(IngestionJob)
+                    .where(
+                        IngestionJob.batch_id == jobs[0].batch_id,
+                        IngestionJob.status == IngestionJobStatus.QUEUED
+                    )
+                    .values(status=IngestionJobStatus.RUNNING, started_at=datetime.utcnow())
+                    .returning(IngestionJob.id)
+                )
+                batch_ids = result.scalars().all()
+                await db.commit()
+                for other_id in batch_ids:
+                    jobs.append(await db.get(IngestionJob, other_id))
+
+            await self._run_jobs(db, jobs)
+
+    async def _run_jobs(self, db, jobs: List[IngestionJob]):
+        """
+        Extract claimed jobs' documents concurrently, then upsert the
+        chunks of all jobs sharing a namespace in one packed call, so
+        batches are full and repeated chunks are embedded once.
+
+        Each job's progress is its share of the packed upsert. Cancelling
+        any job of a namespace group stops the whole group.
+        """
+        values: Dict[uuid.UUID, Dict[str, Any]] = {job.id: {} for job in jobs}
+        last_write = time.monotonic()
+
+        async def write_progress(group: List[uuid.UUID], force: bool = False):
+            nonlocal last_write
+            if any(job_id in self._cancelled for job_id in group):
+                raise IngestionJobCancelled()
+            if not force and time.monotonic() - last_write < self.progress_interval:
+                return
+
+            for job_id, job_values in values.items():
+                if job_values:
+                    await db.execute(update(IngestionJob).where(IngestionJob.id == job_id).values(**job_values))
+            await db.commit()
+            last_write = time.monotonic()
+
+            result = await db.execute(
+                select(IngestionJob.cancel_requested).where(IngestionJob.id.in_(group))
+            )
+            if any(result.scalars().all()):
+                raise IngestionJobCancelled()
+
+        processor = await self._get_processor()
+        db_docs = [await db.get(Document, job.document_id) for job in jobs]
+        docs_by_job = {job.id: db_doc for job, db_doc in zip(jobs, db_docs)}
+
+        to_prepare = []
+        for job, db_doc in zip(jobs, db_docs):
+            copied = await self._copy_duplicate(db, db_doc) if db_doc is not None else None
+            if copied is None:
+                to_prepare.append((job, db_doc))
+                continue
+            count, namespace = copied
+            values[job.id].update(
+                status=IngestionJobStatus.SUCCEEDED,
+                namespace=namespace,
+                chunks_total=count,
+                chunks_embedded=count,
+                chunks_upserted=count
+            )
+
+        prepared = await asyncio.gather(
+            *(self._prepare(db_doc, processor) for _, db_doc in to_prepare),
+            return_exceptions=True
+        )
+
+        groups: Dict[str, List[Tuple[uuid.UUID, List[Dict[str, Any]]]]] = {}
+        for (job, _), outcome in zip(to_prepare, prepared):
+            if isinstance(outcome, Exception):
+                values[job.id].update(status=IngestionJobStatus.FAILED, error=str(outcome))
+                logger.error(f"Ingestion job {job.id} failed: {outcome}")
+                continue
+            documents, namespace = outcome
+            values[job.id].update(namespace=namespace, chunks_total=len(documents))
+            groups.setdefault(namespace, []).append((job.id, documents))
+
+        try:
+            for namespace, members in groups.items():
+                group = [job_id for job_id, _ in members]
+                documents = [doc for _, docs in members for doc in docs]
+
+                async def on_progress(progress: Dict[str, int], members=members, group=group):
+                    offset = 0
+                    for job_id, docs in members:
+                        values[job_id]['chunks_embedded'] = min(max(progress['embedded'] - offset, 0), len(docs))
+                        values[job_id]['chunks_upserted'] = min(max(progress['upserted'] - offset, 0), len(docs))
+                        offset += len(docs)
+                    await write_progress(group)
+
+                try:
+                    await write_progress(group, force=True)
+                    kb = await self._get_knowledge_base()
+                    await kb.upsert(documents=documents, namespace=namespace, on_progress=on_progress)
+                    status, error = IngestionJobStatus.SUCCEEDED, None
+                    logger.info(
+                        f"Ingestion of {len(group)} document(s) upserted {len(documents)} chunks into {namespace}"
+                    )
+                except IngestionJobCancelled:
+                    status, error = IngestionJobStatus.CANCELLED, None
+                    logger.info(f"Ingestion job(s) {group} cancelled")
+                except Exception as e:
+                    status, error = IngestionJobStatus.FAILED, str(e)
+                    logger.error(f"Ingestion job(s) {group} failed: {e}")
+
+                if status != IngestionJobStatus.SUCCEEDED:
+                    await self._purge_partial(db, [docs_by_job[job_id] for job_id in group])
+
+                for job_id in group:
+                    values[job_id].update(status=status, error=error)
+        finally:
+            for job_id in values:
+                self._cancelled.discard(job_id)
+
+        finished_at = datetime.utcnow()
+        for job_id, job_values in values.items():
+            await db.execute(
+                update(IngestionJob)
+                .where(IngestionJob.id == job_id)
+                .values(**job_values, finished_at=finished_at)
+            )
+        await db.commit()
+
+    async def _purge_partial(self, db, db_docs: List[Document]):
+        """
+        Delete the chunks a cancelled or failed upsert already wrote.
+
+        Otherwise half of each document stays searchable, and reconciliation
+        never collects it because the documents still exist.
+        """
+        from backend.app.services.vector_gc import purge_document_vectors
+
+        try:
+            await purge_document_vectors(db, db_docs, self._knowledge_base)
+        except Exception as e:
+            logger.warning(f"Could not purge partial ingestion of {len(db_docs)} document(s): {e}")
+
+    async def _copy_duplicate(self, db, db_doc: Document) -> Optional[Tuple[int, str]]:
+        """
+        Reuse the vectors of an ingested document with the same content.
+
+        Returns:
+            Tuple of (vectors copied, namespace), or None when there is no
+            ingested duplicate (or copying failed) and the document must be
+            processed
+        """
+        if not db_doc.file_sha256:
+            return None
+
+        result = await db.execute(
+            select(IngestionJob.document_id, IngestionJob.namespace)
+            .join(Document, Document.id == IngestionJob.document_id)
+            .where(
+                Document.file_sha256 == db_doc.file_sha256,
+                Document.id != db_doc.id,
+                IngestionJob.status == IngestionJobStatus.SUCCEEDED,
+                IngestionJob.chunks_total > 0
+            )
+            .order_by(IngestionJob.finished_at.desc())
+            .limit(1)
+        )
+        source = result.first()
+        if source is None:
+            return None
+
+        source_id, source_namespace = source
+        namespace = document_namespace(db_doc)
+        try:
+            kb = await self._get_knowledge_base()
+            count = await kb.copy_document(
+                str(source_id),
+                str(db_doc.id),
+                source_namespace,
+                namespace,
+                {'twg_id': str(db_doc.twg_id), 'doc_id': str(db_doc.id), 'file_name': db_doc.file_name}
+            )
+        except Exception as e:
+            logger.warning(f"Could not copy vectors of duplicate {source_id} to {db_doc.id}: {e}")
+            return None
+
+        if count == 0:
+            return None
+        logger.info(f"Reused {count} vectors of duplicate document {source_id} for {db_doc.id}")
+        return count, namespace
+
+    @staticmethod
+    async def _prepare(db_doc: Optional[Document], processor: Any) -> Tuple[List[Dict[str, Any]], str]:
+        if db_doc is None:
+            raise RuntimeError("Document not found")
+        return await prepare_document_chunks(db_doc, processor)
+
+
+# Singleton instance
+_runner: Optional[IngestionJobRunner] = None
+
+
+def get_ingestion_runner() -> IngestionJobRunner:
+    """Get singleton instance of IngestionJobRunner."""
+    global _runner
+
+    if _runner is None:
+        from backend.app.core.config import settings
+
+        _runner = IngestionJobRunner(
+            workers=settings.INGESTION_JOB_WORKERS,
+            progress_interval=settings.INGESTION_JOB_PROGRESS_INTERVAL,
+            stale_after=settings.INGESTION_JOB_STALE_AFTER
+        )
+
+    return _runner
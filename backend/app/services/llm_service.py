@@ -6,15 +6,21 @@ or OpenAI API based on configuration.
 """
 
 import requests
+import httpx
+import asyncio
+import functools
 import json
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, AsyncIterator
 from loguru import logger
 from backend.app.core.config import settings
+from backend.app.core.llm_cache import LLMResponseCache
+from backend.app.core.single_flight import SingleFlight
 
 try:
-    from openai import OpenAI
+    from openai import OpenAI, AsyncOpenAI
 except ImportError:
     OpenAI = None
+    AsyncOpenAI = None
 
 
 class LLMService:
@@ -25,31 +31,71 @@ class LLMService:
     def chat_with_history(self, messages: List[Dict[str, str]], system_prompt: Optional[str] = None, **kwargs) -> str:
         raise NotImplementedError
 
+    async def achat(self, prompt: str, system_prompt: Optional[str] = None, **kwargs) -> str:
+        """Async chat; services without a native async client run chat in a thread."""
+        return await asyncio.to_thread(self.chat, prompt, system_prompt, **kwargs)
+
+    async def achat_with_history(self, messages: List[Dict[str, str]], system_prompt: Optional[str] = None, **kwargs) -> str:
+        """Async chat_with_history; runs the sync call in a thread by default."""
+        return await asyncio.to_thread(self.chat_with_history, messages, system_prompt, **kwargs)
+
+    async def astream(self, prompt: str, system_prompt: Optional[str] = None, **kwargs) -> AsyncIterator[str]:
+        """Stream a chat response as text deltas; yields the whole response by default."""
+        yield await self.achat(prompt, system_prompt, **kwargs)
+
+    async def astream_with_history(self, messages: List[Dict[str, str]], system_prompt: Optional[str] = None, **kwargs) -> AsyncIterator[str]:
+        """Stream a chat_with_history response as text deltas; yields the whole response by default."""
+        yield await self.achat_with_history(messages, system_prompt, **kwargs)
+
+    async def aclose(self):
+        """Release pooled connections of the async client."""
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get service statistics (caching and coalescing layers add theirs)."""
+        return {}
+
 
 class OllamaLLMService(LLMService):
     """Service for interacting with local Ollama LLM"""
 
+    provider = "ollama"
+
     def __init__(
         self,
         base_url: str = "http://localhost:11434",
         model: str = "qwen2.5:0.5b",
         temperature: float = 0.7,
-        timeout: int = 120
+        timeout: int = 120,
+        max_connections: int = 20
     ):
         self.base_url = base_url.rstrip("/")
         self.model = model
         self.temperature = temperature
         self.timeout = timeout
+        self.max_connections = max_connections
         self.api_endpoint = f"{self.base_url}/api/generate"
+        self._async_client: Optional[httpx.AsyncClient] = None
 
         logger.info(f"Initialized Ollama LLM Service: {self.model} @ {self.base_url}")
 
-    def chat(self, prompt: str, system_prompt: Optional[str] = None, temperature: Optional[float] = None, max_tokens: int = 1000) -> str:
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """Pooled async HTTP client, created on first use inside the event loop."""
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                )
+            )
+        return self._async_client
+
+    def _chat_payload(self, prompt: str, system_prompt: Optional[str], temperature: Optional[float], max_tokens: int) -> Dict[str, Any]:
         full_prompt = prompt
         if system_prompt:
             full_prompt = f"{system_prompt}\n\nUser: {prompt}\n\nAssistant:"
 
-        payload = {
+        return {
             "model": self.model,
             "prompt": full_prompt,
             "stream": False,
@@ -59,15 +105,7 @@ class OllamaLLMService(LLMService):
             }
         }
 
-        try:
-            response = requests.post(self.api_endpoint, json=payload, timeout=self.timeout)
-            response.raise_for_status()
-            return response.json().get("response", "").strip()
-        except Exception as e:
-            logger.error(f"Ollama API error: {e}")
-            raise Exception(f"Ollama Error: {str(e)}")
-
-    def chat_with_history(self, messages: List[Dict[str, str]], system_prompt: Optional[str] = None, temperature: Optional[float] = None) -> str:
+    def _history_payload(self, messages: List[Dict[str, str]], system_prompt: Optional[str], temperature: Optional[float]) -> Dict[str, Any]:
         conversation = ""
         if system_prompt:
             conversation = f"{system_prompt}\n\n"
@@ -79,7 +117,7 @@ class OllamaLLMService(LLMService):
 
         conversation += "Assistant:"
 
-        payload = {
+        return {
             "model": self.model,
             "prompt": conversation,
             "stream": False,
@@ -88,6 +126,20 @@ class OllamaLLMService(LLMService):
             }
         }
 
+    def chat(self, prompt: str, system_prompt: Optional[str] = None, temperature: Optional[float] = None, max_tokens: int = 1000) -> str:
+        payload = self._chat_payload(prompt, system_prompt, temperature, max_tokens)
+
+        try:
+            response = requests.post(self.api_endpoint, json=payload, timeout=self.timeout)
+            response.raise_for_status()
+            return response.json().get("response", "").strip()
+        except Exception as e:
+            logger.error(f"Ollama API error: {e}")
+            raise Exception(f"Ollama Error: {str(e)}")
+
+    def chat_with_history(self, messages: List[Dict[str, str]], system_prompt: Optional[str] = None, temperature: Optional[float] = None) -> str:
+        payload = self._history_payload(messages, system_prompt, temperature)
+
         try:
             response = requests.post(self.api_endpoint, json=payload, timeout=self.timeout)
             response.raise_for_status()
@@ -96,24 +148,129 @@ class OllamaLLMService(LLMService):
             logger.error(f"Ollama History error: {e}")
             raise Exception(f"Ollama Error: {str(e)}")
 
+    async def achat(self, prompt: str, system_prompt: Optional[str] = None, temperature: Optional[float] = None, max_tokens: int = 1000) -> str:
+        payload = self._chat_payload(prompt, system_prompt, temperature, max_tokens)
+
+        try:
+            response = await self._get_async_client().post(self.api_endpoint, json=payload)
+            response.raise_for_status()
+            return response.json().get("response", "").strip()
+        except Exception as e:
+            logger.error(f"Ollama API error: {e}")
+            raise Exception(f"Ollama Error: {str(e)}")
+
+    async def achat_with_history(self, messages: List[Dict[str, str]], system_prompt: Optional[str] = None, temperature: Optional[float] = None) -> str:
+        payload = self._history_payload(messages, system_prompt, temperature)
+
+        try:
+            response = await self._get_async_client().post(self.api_endpoint, json=payload)
+            response.raise_for_status()
+            return response.json().get("response", "").strip()
+        except Exception as e:
+            logger.error(f"Ollama History error: {e}")
+            raise Exception(f"Ollama Error: {str(e)}")
+
+    async def _astream_payload(self, payload: Dict[str, Any], label: str) -> AsyncIterator[str]:
+        """POST a generate request with streaming on and yield each token as it arrives."""
+        payload = {**payload, "stream": True}
+        started = False
+
+        try:
+            async with self._get_async_client().stream("POST", self.api_endpoint, json=payload) as response:
+                response.raise_for_status()
+                # Ollama streams one JSON object per line
+                async for line in response.aiter_lines():
+                    if not line.strip():
+                        continue
+                    data = json.loads(line)
+                    if data.get("error"):
+                        raise Exception(data["error"])
+                    token = data.get("response", "")
+                    if not started:
+                        # Match the stripped non-streaming response
+                        token = token.lstrip()
+                        started = bool(token)
+                    if token:
+                        yield token
+                    if data.get("done"):
+                        break
+        except Exception as e:
+            logger.error(f"{label} error: {e}")
+            raise Exception(f"Ollama Error: {str(e)}")
+
+    async def astream(self, prompt: str, system_prompt: Optional[str] = None, temperature: Optional[float] = None, max_tokens: int = 1000) -> AsyncIterator[str]:
+        payload = self._chat_payload(prompt, system_prompt, temperature, max_tokens)
+        async for token in self._astream_payload(payload, "Ollama API"):
+            yield token
+
+    async def astream_with_history(self, messages: List[Dict[str, str]], system_prompt: Optional[str] = None, temperature: Optional[float] = None) -> AsyncIterator[str]:
+        payload = self._history_payload(messages, system_prompt, temperature)
+        async for token in self._astream_payload(payload, "Ollama History"):
+            yield token
+
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
 
 class OpenAILLMService(LLMService):
     """Service for interacting with OpenAI API"""
 
-    def __init__(self, api_key: str, model: str = "gpt-4-turbo-preview", temperature: float = 0.7):
+    provider = "openai"
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gpt-4-turbo-preview",
+        temperature: float = 0.7,
+        timeout: int = 600,
+        max_connections: int = 20
+    ):
         if not OpenAI:
             raise ImportError("openai package not installed. Run 'pip install openai'")
         
         self.client = OpenAI(api_key=api_key)
+        # Shares one pooled HTTP client across all concurrent requests
+        self.async_client = AsyncOpenAI(
+            api_key=api_key,
+            timeout=timeout,
+            http_client=httpx.AsyncClient(
+                timeout=timeout,
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections
+                )
+            )
+        )
         self.model = model
         self.temperature = temperature
         logger.info(f"Initialized OpenAI LLM Service: {self.model}")
 
-    def chat(self, prompt: str, system_prompt: Optional[str] = None, temperature: Optional[float] = None, max_tokens: int = 2000) -> str:
+    @staticmethod
+    def _chat_messages(prompt: str, system_prompt: Optional[str]) -> List[Dict[str, str]]:
         messages = []
         if system_prompt:
             messages.append({"role": "system", "content": system_prompt})
         messages.append({"role": "user", "content": prompt})
+        return messages
+
+    @staticmethod
+    def _history_messages(messages: List[Dict[str, str]], system_prompt: Optional[str]) -> List[Dict[str, str]]:
+        full_messages = []
+        if system_prompt:
+            full_messages.append({"role": "system", "content": system_prompt})
+        
+        # Ensure correct role names for OpenAI
+        for m in messages:
+            role = m.get("role", "user")
+            if role not in ["system", "user", "assistant"]:
+                role = "user"
+            full_messages.append({"role": role, "content": m.get("content", "")})
+        return full_messages
+
+    def chat(self, prompt: str, system_prompt: Optional[str] = None, temperature: Optional[float] = None, max_tokens: int = 2000) -> str:
+        messages = self._chat_messages(prompt, system_prompt)
 
         try:
             response = self.client.chat.completions.create(
@@ -128,16 +285,7 @@ class OpenAILLMService(LLMService):
             raise Exception(f"OpenAI Error: {str(e)}")
 
     def chat_with_history(self, messages: List[Dict[str, str]], system_prompt: Optional[str] = None, temperature: Optional[float] = None) -> str:
-        full_messages = []
-        if system_prompt:
-            full_messages.append({"role": "system", "content": system_prompt})
-        
-        # Ensure correct role names for OpenAI
-        for m in messages:
-            role = m.get("role", "user")
-            if role not in ["system", "user", "assistant"]:
-                role = "user"
-            full_messages.append({"role": role, "content": m.get("content", "")})
+        full_messages = self._history_messages(messages, system_prompt)
 
         try:
             response = self.client.chat.completions.create(
@@ -150,11 +298,297 @@ class OpenAILLMService(LLMService):
             logger.error(f"OpenAI History error: {e}")
             raise Exception(f"OpenAI Error: {str(e)}")
 
+    async def achat(self, prompt: str, system_prompt: Optional[str] = None, temperature: Optional[float] = None, max_tokens: int = 2000) -> str:
+        messages = self._chat_messages(prompt, system_prompt)
+
+        try:
+            response = await self.async_client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature if temperature is not None else self.temperature,
+                max_tokens=max_tokens
+            )
+            return response.choices[0].message.content.strip()
+        except Exception as e:
+            logger.error(f"OpenAI API error: {e}")
+            raise Exception(f"OpenAI Error: {str(e)}")
+
+    async def achat_with_history(self, messages: List[Dict[str, str]], system_prompt: Optional[str] = None, temperature: Optional[float] = None) -> str:
+        full_messages = self._history_messages(messages, system_prompt)
+
+        try:
+            response = await self.async_client.chat.completions.create(
+                model=self.model,
+                messages=full_messages,
+                temperature=temperature if temperature is not None else self.temperature
+            )
+            return response.choices[0].message.content.strip()
+        except Exception as e:
+            logger.error(f"OpenAI History error: {e}")
+            raise Exception(f"OpenAI Error: {str(e)}")
+
+    async def _astream_messages(self, label: str, **request: Any) -> AsyncIterator[str]:
+        """Create a streaming completion and yield each content delta."""
+        started = False
+
+        try:
+            stream = await self.async_client.chat.completions.create(model=self.model, stream=True, **request)
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                token = chunk.choices[0].delta.content or ""
+                if not started:
+                    token = token.lstrip()
+                    started = bool(token)
+                if token:
+                    yield token
+        except Exception as e:
+            logger.error(f"{label} error: {e}")
+            raise Exception(f"OpenAI Error: {str(e)}")
+
+    async def astream(self, prompt: str, system_prompt: Optional[str] = None, temperature: Optional[float] = None, max_tokens: int = 2000) -> AsyncIterator[str]:
+        async for token in self._astream_messages(
+            "OpenAI API",
+            messages=self._chat_messages(prompt, system_prompt),
+            temperature=temperature if temperature is not None else self.temperature,
+            max_tokens=max_tokens
+        ):
+            yield token
+
+    async def astream_with_history(self, messages: List[Dict[str, str]], system_prompt: Optional[str] = None, temperature: Optional[float] = None) -> AsyncIterator[str]:
+        async for token in self._astream_messages(
+            "OpenAI History",
+            messages=self._history_messages(messages, system_prompt),
+            temperature=temperature if temperature is not None else self.temperature
+        ):
+            yield token
+
+    async def aclose(self):
+        await self.async_client.close()
+
+
+def _effective_temperature(service: LLMService, temperature: Optional[float]) -> float:
+    return service.temperature if temperature is None else temperature
+
+
+def _fingerprint(service: LLMService, system_prompt: Optional[str], messages: List[Dict[str, str]], temperature: Optional[float], max_tokens: Optional[int]) -> str:
+    """Fingerprint of a call to `service` (see LLMResponseCache.make_key)."""
+    return LLMResponseCache.make_key(
+        getattr(service, "provider", type(service).__name__),
+        service.model,
+        system_prompt,
+        messages,
+        _effective_temperature(service, temperature),
+        max_tokens
+    )
+
+
+def _call_options(temperature: Optional[float], max_tokens: Optional[int] = None) -> Dict[str, Any]:
+    # Leave max_tokens unset so the wrapped service applies its own default
+    options: Dict[str, Any] = {"temperature": temperature}
+    if max_tokens is not None:
+        options["max_tokens"] = max_tokens
+    return options
+
+
+class CachedLLMService(LLMService):
+    """
+    Serves repeated LLM calls from an LLMResponseCache.
+
+    Wraps another service and exposes the same sync, async and streaming
+    methods. Cache hits on a streaming call are yielded as one piece; a
+    streamed miss is stored once the stream completes. Other attributes
+    (model, temperature, ...) are read from the wrapped service.
+    """
+
+    def __init__(self, service: LLMService, cache: LLMResponseCache):
+        self.service = service
+        self.cache = cache
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.service, name)
+
+    def _key(self, system_prompt: Optional[str], messages: List[Dict[str, str]], temperature: Optional[float], max_tokens: Optional[int]) -> Optional[str]:
+        """Cache key of a call, or None if it must not be cached."""
+        if not self.cache.cacheable(_effective_temperature(self.service, temperature)):
+            return None
+        return _fingerprint(self.service, system_prompt, messages, temperature, max_tokens)
+
+    def chat(self, prompt: str, system_prompt: Optional[str] = None, temperature: Optional[float] = None, max_tokens: Optional[int] = None) -> str:
+        key = self._key(system_prompt, [{"role": "user", "content": prompt}], temperature, max_tokens)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        response = self.service.chat(prompt, system_prompt, **_call_options(temperature, max_tokens))
+        if key is not None:
+            self.cache.set(key, response)
+        return response
+
+    def chat_with_history(self, messages: List[Dict[str, str]], system_prompt: Optional[str] = None, temperature: Optional[float] = None) -> str:
+        key = self._key(system_prompt, messages, temperature, None)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        response = self.service.chat_with_history(messages, system_prompt, **_call_options(temperature))
+        if key is not None:
+            self.cache.set(key, response)
+        return response
+
+    async def achat(self, prompt: str, system_prompt: Optional[str] = None, temperature: Optional[float] = None, max_tokens: Optional[int] = None) -> str:
+        key = self._key(system_prompt, [{"role": "user", "content": prompt}], temperature, max_tokens)
+        if key is not None:
+            cached = await self.cache.aget(key)
+            if cached is not None:
+                return cached
+
+        response = await self.service.achat(prompt, system_prompt, **_call_options(temperature, max_tokens))
+        if key is not None:
+            await self.cache.aset(key, response)
+        return response
+
+    async def achat_with_history(self, messages: List[Dict[str, str]], system_prompt: Optional[str] = None, temperature: Optional[float] = None) -> str:
+        key = self._key(system_prompt, messages, temperature, None)
+        if key is not None:
+            cached = await self.cache.aget(key)
+            if cached is not None:
+                return cached
+
+        response = await self.service.achat_with_history(messages, system_prompt, **_call_options(temperature))
+        if key is not None:
+            await self.cache.aset(key, response)
+        return response
+
+    async def _astream_cached(self, key: Optional[str], stream: AsyncIterator[str]) -> AsyncIterator[str]:
+        if key is not None:
+            cached = await self.cache.aget(key)
+            if cached is not None:
+                yield cached
+                return
+
+        pieces = []
+        async for piece in stream:
+            pieces.append(piece)
+            yield piece
+        if key is not None:
+            await self.cache.aset(key, "".join(pieces).strip())
+
+    def astream(self, prompt: str, system_prompt: Optional[str] = None, temperature: Optional[float] = None, max_tokens: Optional[int] = None) -> AsyncIterator[str]:
+        key = self._key(system_prompt, [{"role": "user", "content": prompt}], temperature, max_tokens)
+        # The wrapped stream only starts (and calls the LLM) on a miss
+        return self._astream_cached(key, self.service.astream(prompt, system_prompt, **_call_options(temperature, max_tokens)))
+
+    def astream_with_history(self, messages: List[Dict[str, str]], system_prompt: Optional[str] = None, temperature: Optional[float] = None) -> AsyncIterator[str]:
+        key = self._key(system_prompt, messages, temperature, None)
+        return self._astream_cached(key, self.service.astream_with_history(messages, system_prompt, **_call_options(temperature)))
+
+    async def aclose(self):
+        await self.service.aclose()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get response cache statistics."""
+        return {**self.service.get_stats(), "response_cache": self.cache.get_stats()}
+
+
+class CoalescingLLMService(LLMService):
+    """
+    Shares one generation among concurrent identical LLM calls.
+
+    Wraps another service (typically the CachedLLMService, so a coalesced
+    generation is also cached once). Calls with the same fingerprint that
+    overlap in time wait for the generation already in flight instead of
+    starting their own; streaming subscribers receive every delta of the
+    shared stream. Calls sampled above `max_temperature` are not shared,
+    so deliberately varied generations stay independent.
+    """
+
+    def __init__(self, service: LLMService, max_temperature: float = 0.7):
+        self.service = service
+        self.max_temperature = max_temperature
+        self.flights = SingleFlight()
+        self.bypassed = 0
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.service, name)
+
+    def _key(self, system_prompt: Optional[str], messages: List[Dict[str, str]], temperature: Optional[float], max_tokens: Optional[int]) -> Optional[str]:
+        """Fingerprint of a call, or None if it must run on its own."""
+        if _effective_temperature(self.service, temperature) > self.max_temperature:
+            self.bypassed += 1
+            return None
+        return _fingerprint(self.service, system_prompt, messages, temperature, max_tokens)
+
+    def chat(self, prompt: str, system_prompt: Optional[str] = None, temperature: Optional[float] = None, max_tokens: Optional[int] = None) -> str:
+        key = self._key(system_prompt, [{"role": "user", "content": prompt}], temperature, max_tokens)
+        call = functools.partial(self.service.chat, prompt, system_prompt, **_call_options(temperature, max_tokens))
+        return call() if key is None else self.flights.do(key, call)
+
+    def chat_with_history(self, messages: List[Dict[str, str]], system_prompt: Optional[str] = None, temperature: Optional[float] = None) -> str:
+        key = self._key(system_prompt, messages, temperature, None)
+        call = functools.partial(self.service.chat_with_history, messages, system_prompt, **_call_options(temperature))
+        return call() if key is None else self.flights.do(key, call)
+
+    async def achat(self, prompt: str, system_prompt: Optional[str] = None, temperature: Optional[float] = None, max_tokens: Optional[int] = None) -> str:
+        key = self._key(system_prompt, [{"role": "user", "content": prompt}], temperature, max_tokens)
+        call = functools.partial(self.service.achat, prompt, system_prompt, **_call_options(temperature, max_tokens))
+        return await (call() if key is None else self.flights.ado(key, call))
+
+    async def achat_with_history(self, messages: List[Dict[str, str]], system_prompt: Optional[str] = None, temperature: Optional[float] = None) -> str:
+        key = self._key(system_prompt, messages, temperature, None)
+        call = functools.partial(self.service.achat_with_history, messages, system_prompt, **_call_options(temperature))
+        return await (call() if key is None else self.flights.ado(key, call))
+
+    def astream(self, prompt: str, system_prompt: Optional[str] = None, temperature: Optional[float] = None, max_tokens: Optional[int] = None) -> AsyncIterator[str]:
+        key = self._key(system_prompt, [{"role": "user", "content": prompt}], temperature, max_tokens)
+        stream = functools.partial(self.service.astream, prompt, system_prompt, **_call_options(temperature, max_tokens))
+        return stream() if key is None else self.flights.astream(key, stream)
+
+    def astream_with_history(self, messages: List[Dict[str, str]], system_prompt: Optional[str] = None, temperature: Optional[float] = None) -> AsyncIterator[str]:
+        key = self._key(system_prompt, messages, temperature, None)
+        stream = functools.partial(self.service.astream_with_history, messages, system_prompt, **_call_options(temperature))
+        return stream() if key is None else self.flights.astream(key, stream)
+
+    async def aclose(self):
+        await self.service.aclose()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get coalescing statistics (and those of the wrapped service)."""
+        return {
+            **self.service.get_stats(),
+            "coalescing": {**self.flights.get_stats(), "bypassed": self.bypassed, "max_temperature": self.max_temperature}
+        }
+
 
 # Singleton instance
 _llm_service = None
 
 
+def create_llm_cache_from_config() -> Optional[LLMResponseCache]:
+    """
+    Create the LLM response cache from application configuration.
+
+    Returns:
+        LLMResponseCache instance, or None if LLM_CACHE_TTL is 0
+    """
+    if settings.LLM_CACHE_TTL <= 0:
+        return None
+
+    redis_client = None
+    if settings.LLM_CACHE_USE_REDIS:
+        from backend.app.services.redis_factory import create_redis_client_from_config
+        redis_client = create_redis_client_from_config(decode_responses=True)
+
+    return LLMResponseCache(
+        ttl=settings.LLM_CACHE_TTL,
+        max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+        max_temperature=settings.LLM_CACHE_MAX_TEMPERATURE,
+        redis_client=redis_client
+    )
+
+
 def get_llm_service() -> LLMService:
     """
     Get or create the LLM service singleton based on configuration.
@@ -167,7 +601,9 @@ def get_llm_service() -> LLMService:
             _llm_service = OpenAILLMService(
                 api_key=settings.OPENAI_API_KEY,
                 model=getattr(settings, "OPENAI_MODEL", "gpt-4-turbo-preview"),
-                temperature=settings.LLM_TEMPERATURE
+                temperature=settings.LLM_TEMPERATURE,
+                timeout=settings.LLM_TIMEOUT,
+                max_connections=settings.LLM_MAX_CONNECTIONS
             )
         else:
             if provider == "openai":
@@ -177,7 +613,22 @@ def get_llm_service() -> LLMService:
                 base_url=settings.OLLAMA_BASE_URL,
                 model=settings.OLLAMA_MODEL,
                 temperature=settings.LLM_TEMPERATURE,
-                timeout=settings.LLM_TIMEOUT
+                timeout=settings.LLM_TIMEOUT,
+                max_connections=settings.LLM_MAX_CONNECTIONS
             )
+
+        cache = create_llm_cache_from_config()
+        if cache is not None:
+            _llm_service = CachedLLMService(_llm_service, cache)
+        if settings.LLM_COALESCE_REQUESTS:
+            _llm_service = CoalescingLLMService(_llm_service, max_temperature=settings.LLM_COALESCE_MAX_TEMPERATURE)
     return _llm_service
 
+
+async def close_llm_service():
+    """Close the pooled async clients of the LLM service (called on application shutdown)."""
+    global _llm_service
+    if _llm_service is not None:
+        await _llm_service.aclose()
+        _llm_service = None
+
@@ -6,6 +6,7 @@ Factory functions to create Redis memory service from configuration.
 
 from typing import Optional
 from loguru import logger
+import redis
 
 from backend.app.services.redis_memory import RedisMemoryService, get_redis_memory
 from backend.app.core.config import get_settings
@@ -43,6 +44,48 @@ def create_redis_memory_from_config() -> Optional[RedisMemoryService]:
         return None
 
 
+def create_redis_client_from_config(decode_responses: bool = False) -> Optional[redis.Redis]:
+    """
+    Create a raw Redis client from application configuration.
+
+    Used by caches that store their own (often binary) values and only need
+    a connection, not the memory service API.
+
+    Args:
+        decode_responses: Whether to decode responses to str
+
+    Returns:
+        Connected Redis client or None if connection fails
+    """
+    try:
+        settings = get_settings()
+
+        if settings.REDIS_URL:
+            client = redis.from_url(
+                settings.REDIS_URL,
+                decode_responses=decode_responses,
+                max_connections=settings.REDIS_MAX_CONNECTIONS,
+                socket_connect_timeout=5
+            )
+        else:
+            client = redis.Redis(
+                host=settings.REDIS_HOST,
+                port=settings.REDIS_PORT,
+                db=settings.REDIS_DB,
+                password=settings.REDIS_PASSWORD if settings.REDIS_PASSWORD else None,
+                decode_responses=decode_responses,
+                max_connections=settings.REDIS_MAX_CONNECTIONS,
+                socket_connect_timeout=5
+            )
+
+        client.ping()
+        return client
+
+    except Exception as e:
+        logger.warning(f"Redis client unavailable: {e}")
+        return None
+
+
 def test_redis_connection() -> bool:
     """
     Test Redis connection using configuration settings.
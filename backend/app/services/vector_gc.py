@@ -0,0 +1,218 @@
+"""
+Vector Garbage Collection
+
+Removes the chunk vectors of deleted documents from the knowledge base.
+Vectors are purged when a document is deleted; a periodic reconciliation
+pass also compares the index with the documents table and purges chunks
+whose document no longer exists (e.g. deleted while its ingestion was
+still running, or before purge-on-delete existed).
+"""
+
+import asyncio
+import uuid
+from typing import Any, Dict, Iterable, List, Optional
+
+from loguru import logger
+from sqlalchemy import select
+
+from backend.app.core.database import AsyncSessionLocal
+from backend.app.core.knowledge_base import DELETE_BATCH_SIZE
+from backend.app.models.models import Document, IngestionJob
+from backend.app.services.ingestion_jobs import document_namespace
+
+# Documents looked up per query when reconciling
+RECONCILE_LOOKUP_BATCH = 500
+
+
+def chunk_document_id(vector_id: str) -> Optional[uuid.UUID]:
+    """
+    Document ID of a '{doc_id}_chunk_{i}' vector.
+
+    Returns:
+        The document UUID, or None for vectors not created from an uploaded
+        document (e.g. ingested by the CLI script under a file name)
+    """
+    doc_id, sep, _ = vector_id.partition("_chunk_")
+    if not sep:
+        return None
+    try:
+        return uuid.UUID(doc_id)
+    except ValueError:
+        return None
+
+
+async def purge_document_vectors(db, db_docs: Iterable[Document], knowledge_base: Any = None) -> int:
+    """
+    Delete the chunk vectors of documents about to be deleted, or whose
+    ingestion stopped partway.
+
+    Must run before the rows are deleted: the namespaces recorded on the
+    documents' ingestion jobs are searched as well as the current TWG
+    namespace. Failures are logged and left to reconciliation, so they
+    never block the delete.
+
+    Args:
+        db: Database session
+        db_docs: Documents whose vectors are purged
+        knowledge_base: AsyncKnowledgeBase (defaults to the singleton)
+
+    Returns:
+        Number of vectors deleted
+    """
+    db_docs = list(db_docs)
+    if not db_docs:
+        return 0
+
+    by_namespace: Dict[str, set] = {}
+    for db_doc in db_docs:
+        by_namespace.setdefault(document_namespace(db_doc), set()).add(str(db_doc.id))
+
+    result = await db.execute(
+        select(IngestionJob.document_id, IngestionJob.namespace)
+        .where(
+            IngestionJob.document_id.in_([db_doc.id for db_doc in db_docs]),
+            IngestionJob.namespace.is_not(None)
+        )
+        .distinct()
+    )
+    for doc_id, namespace in result.all():
+        by_namespace.setdefault(namespace, set()).add(str(doc_id))
+
+    try:
+        if knowledge_base is None:
+            from backend.app.core.async_knowledge_base import get_async_knowledge_base
+            knowledge_base = await get_async_knowledge_base()
+
+        deleted = 0
+        for namespace, doc_ids in by_namespace.items():
+            deleted += await knowledge_base.purge_documents(sorted(doc_ids), namespace)
+    except Exception as e:
+        logger.warning(f"Could not purge vectors of {len(db_docs)} document(s): {e}")
+        return 0
+
+    logger.info(f"Purged {deleted} vectors of {len(db_docs)} document(s)")
+    return deleted
+
+
+async def reconcile_vectors(
+    session_factory=AsyncSessionLocal,
+    knowledge_base: Any = None,
+    compact: bool = True
+) -> Dict[str, Any]:
+    """
+    Purge chunk vectors whose document no longer exists.
+
+    Every namespace is listed; vectors whose ID names a document missing
+    from the documents table are deleted, and namespaces that lost
+    vectors are compacted.
+
+    Args:
+        session_factory: Async session factory
+        knowledge_base: KnowledgeBase (defaults to the singleton)
+        compact: Reclaim storage of the deleted vectors afterwards
+
+    Returns:
+        Dict with scanned and reclaimed vector counts
+    """
+    if knowledge_base is None:
+        from backend.app.core.knowledge_base import get_knowledge_base
+        knowledge_base = await asyncio.to_thread(get_knowledge_base)
+
+    report = {
+        "namespaces_scanned": 0,
+        "vectors_scanned": 0,
+        "vectors_reclaimed": 0,
+        "orphaned_documents": 0,
+        "namespaces": {}
+    }
+
+    for namespace in await asyncio.to_thread(knowledge_base.list_namespaces):
+        try:
+            ids = await asyncio.to_thread(knowledge_base.list_ids, namespace or None)
+        except NotImplementedError:
+            logger.warning("Vector store cannot list IDs; skipping reconciliation")
+            break
+
+        chunks: Dict[uuid.UUID, List[str]] = {}
+        for vector_id in ids:
+            doc_id = chunk_document_id(vector_id)
+            if doc_id is not None:
+                chunks.setdefault(doc_id, []).append(vector_id)
+
+        orphaned = await _missing_documents(session_factory, list(chunks))
+        reclaimed = [vector_id for doc_id in orphaned for vector_id in chunks[doc_id]]
+
+        report["namespaces_scanned"] += 1
+        report["vectors_scanned"] += len(ids)
+        report["orphaned_documents"] += len(orphaned)
+        if reclaimed:
+            for i in range(0, len(reclaimed), DELETE_BATCH_SIZE):
+                await asyncio.to_thread(
+                    knowledge_base.delete_documents, reclaimed[i:i + DELETE_BATCH_SIZE], namespace or None
+                )
+            if compact:
+                await asyncio.to_thread(knowledge_base.compact, namespace or None)
+            report["vectors_reclaimed"] += len(reclaimed)
+            report["namespaces"][namespace] = len(reclaimed)
+
+    logger.info(
+        f"Vector reconciliation reclaimed {report['vectors_reclaimed']} of {report['vectors_scanned']} vectors "
+        f"({report['orphaned_documents']} deleted documents, {report['namespaces_scanned']} namespaces)"
+    )
+    return report
+
+
+async def _missing_documents(session_factory, doc_ids: List[uuid.UUID]) -> List[uuid.UUID]:
+    missing = []
+    async with session_factory() as db:
+        for i in range(0, len(doc_ids), RECONCILE_LOOKUP_BATCH):
+            batch = doc_ids[i:i + RECONCILE_LOOKUP_BATCH]
+            result = await db.execute(select(Document.id).where(Document.id.in_(batch)))
+            existing = set(result.scalars().all())
+            missing.extend(doc_id for doc_id in batch if doc_id not in existing)
+    return missing
+
+
+class VectorGarbageCollector:
+    """Runs reconcile_vectors every `interval` seconds in the background."""
+
+    def __init__(self, interval: float, session_factory=AsyncSessionLocal):
+        self.interval = interval
+        self.session_factory = session_factory
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the periodic task (disabled when the interval is 0)."""
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run(), name="vector-gc")
+
+    async def stop(self):
+        """Stop the periodic task."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await reconcile_vectors(self.session_factory)
+            except Exception as e:
+                logger.error(f"Vector reconciliation failed: {e}")
+
+
+# Singleton instance
+_collector: Optional[VectorGarbageCollector] = None
+
+
+def get_vector_gc() -> VectorGarbageCollector:
+    """Get singleton instance of VectorGarbageCollector."""
+    global _collector
+
+    if _collector is None:
+        from backend.app.core.config import settings
+
+        _collector = VectorGarbageCollector(interval=settings.VECTOR_GC_INTERVAL)
+
+    return _collector
@@ -8,24 +8,41 @@ including semantic search, context retrieval, and document discovery.
 from typing import List, Dict, Any, Optional
 import logging
 from backend.app.core.knowledge_base import get_knowledge_base
+from backend.app.core.lexical_index import is_keyword_query
+from backend.app.utils.context_packer import get_context_packer
 
 logger = logging.getLogger(__name__)
 
+# Search results considered when packing agent context
+CONTEXT_CANDIDATES = 15
+
 
 def search_knowledge_base(
     query: str,
     twg: Optional[str] = None,
     top_k: int = 5,
-    min_score: float = 0.7
+    min_score: float = 0.7,
+    mode: str = "auto"
 ) -> List[Dict[str, Any]]:
     """
     Search the knowledge base for relevant information.
     
+    In 'auto' mode, keyword queries (acronyms, protocol numbers, quoted
+    phrases, single terms) are answered from the lexical index without an
+    embedding call, falling back to hybrid search if nothing matches;
+    other queries use hybrid search.
+    
+    In 'hybrid' mode (and so in 'auto' with a lexical index) each result's
+    'score' is a reciprocal rank fusion value of at most about 0.03, not a
+    similarity. Compare cutoffs against 'vector_score', as min_score does
+    here, never against 'score'.
+    
     Args:
         query: Search query
         twg: Optional TWG filter (e.g., 'energy', 'agriculture')
         top_k: Number of results to return
-        min_score: Minimum similarity score threshold
+        min_score: Minimum similarity score threshold (applies to vector scores)
+        mode: 'auto', 'vector', 'lexical' or 'hybrid'
         
     Returns:
         List of relevant documents with scores
@@ -41,18 +58,30 @@ def search_knowledge_base(
         if twg:
             filter_dict['twg'] = twg
         
+        search_args = {
+            "query": query,
+            "namespace": namespace,
+            "top_k": top_k,
+            "filter": filter_dict if filter_dict else None
+        }
+        
+        if mode == "auto":
+            mode = "hybrid" if kb.lexical_index is not None else "vector"
+            if mode == "hybrid" and is_keyword_query(query):
+                # Keyword fast path: exact-term hits need no embedding
+                results = kb.search(**search_args, mode="lexical")
+                if results:
+                    logger.info(f"Keyword search for '{query}': {len(results)} results")
+                    return results
+        
         # Search
-        results = kb.search(
-            query=query,
-            namespace=namespace,
-            top_k=top_k,
-            filter=filter_dict if filter_dict else None
-        )
+        mode = kb.resolve_search_mode(mode)
+        results = kb.search(**search_args, mode=mode)
         
-        # Filter by minimum score
+        # Filter by minimum score (similarity cutoff; lexical matches pass)
         filtered_results = [
             r for r in results 
-            if r['score'] >= min_score
+            if kb.passes_min_score(r, min_score, mode)
         ]
         
         logger.info(f"Knowledge search for '{query}': {len(filtered_results)} results")
@@ -72,49 +101,31 @@ def get_relevant_context(
     Get relevant context for an agent query.
     
     This function retrieves and formats context from the knowledge base
-    to be used in agent prompts.
+    to be used in agent prompts. Overlapping chunks of a document are
+    merged, sources are diversified with MMR, and the context is fitted
+    to max_tokens as counted by the context tokenizer.
     
     Args:
         query: Agent query
         twg: Optional TWG filter
-        max_tokens: Maximum tokens for context
+        max_tokens: Token budget for the context
         
     Returns:
         Formatted context string
     """
     try:
-        # Search knowledge base
-        results = search_knowledge_base(query, twg=twg, top_k=5)
+        # Search knowledge base; extra candidates leave room for merging and MMR
+        results = search_knowledge_base(query, twg=twg, top_k=CONTEXT_CANDIDATES)
         
         if not results:
             return "No relevant context found in knowledge base."
         
-        # Format context
-        context_parts = []
-        total_length = 0
-        
-        for i, result in enumerate(results, 1):
-            metadata = result.get('metadata', {})
-            text = metadata.get('text', '')
-            source = metadata.get('filename', 'Unknown')
-            score = result.get('score', 0)
-            
-            # Estimate token count (rough: 1 token ≈ 4 chars)
-            text_tokens = len(text) // 4
-            
-            if total_length + text_tokens > max_tokens:
-                break
-            
-            context_part = f"""
-[Source {i}: {source} (Relevance: {score:.2f})]
-{text}
-"""
-            context_parts.append(context_part)
-            total_length += text_tokens
+        context, stats = get_context_packer().pack(results, max_tokens)
         
-        context = "\n---\n".join(context_parts)
-        
-        logger.info(f"Retrieved context: {len(context_parts)} sources, ~{total_length} tokens")
+        logger.info(
+            f"Retrieved context: {stats['sources']} sources from {stats['chunks']} chunks "
+            f"({stats['merged']} merged), {stats['tokens']} tokens"
+        )
         return context
         
     except Exception as e:
@@ -204,7 +215,10 @@ def get_knowledge_base_stats() -> Dict[str, Any]:
             "status": health.get("status"),
             "total_vectors": health.get("total_vectors", 0),
             "namespaces": namespaces,
-            "namespace_count": len(namespaces)
+            "namespace_count": len(namespaces),
+            "embedding_cache": health.get("embedding_cache"),
+            "search_cache": health.get("search_cache"),
+            "lexical_index": health.get("lexical_index")
         }
         
         logger.info(f"Knowledge base stats: {stats}")
@@ -223,7 +237,8 @@ KNOWLEDGE_TOOLS = [
         "parameters": {
             "query": "The search query",
             "twg": "Optional TWG filter (energy, agriculture, minerals, digital, protocol, resource_mobilization)",
-            "top_k": "Number of results (default: 5)"
+            "top_k": "Number of results (default: 5)",
+            "mode": "Search mode: auto, vector, lexical or hybrid (default: auto)"
         },
         "function": search_knowledge_base
     },
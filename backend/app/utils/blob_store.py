@@ -0,0 +1,148 @@
+"""
+Content-Addressed Blob Store
+
+This module stores uploaded files once per content digest. Documents that
+upload the same bytes share one blob; a blob is reference counted by the
+Document rows whose file_path points at it and removed with the last one.
+Storing a blob and recording its reference, or checking its references and
+removing it, happen under a lock so the two cannot interleave.
+"""
+
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+from contextlib import asynccontextmanager
+from pathlib import Path
+import asyncio
+import os
+import uuid
+import logging
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking
+    fcntl = None
+
+from backend.app.utils.upload_writer import write_upload
+
+logger = logging.getLogger(__name__)
+
+
+class BlobStore:
+    """
+    Files stored as '<root>/<digest[:2]>/<digest><ext>'.
+
+    The file extension is part of the key because text extraction picks
+    the extractor by extension.
+    """
+
+    def __init__(self, root: str):
+        """
+        Initialize blob store.
+
+        Args:
+            root: Directory holding the blobs
+        """
+        self.root = Path(root)
+        self.tmp_dir = self.root / "tmp"
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def path_for(self, digest: str, file_name: str) -> str:
+        """Blob path of content with this digest uploaded under file_name."""
+        ext = Path(file_name or "").suffix.lower()
+        return str(self.root / digest[:2] / f"{digest}{ext}")
+
+    @asynccontextmanager
+    async def lock(self, path: str) -> AsyncIterator[None]:
+        """
+        Hold the lock covering a blob, within this process and across processes.
+
+        Locks are per directory, so one lock file covers every blob in a
+        shard and lock files are never removed.
+
+        Args:
+            path: Blob path (or any stored file path)
+        """
+        lock_path = os.path.join(os.path.dirname(path), ".lock")
+        local = self._locks.setdefault(lock_path, asyncio.Lock())
+        async with local:
+            os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+            with open(lock_path, "a") as f:
+                # Polled rather than blocking a thread, so a cancelled waiter
+                # cannot end up holding the lock
+                while fcntl is not None:
+                    try:
+                        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        break
+                    except BlockingIOError:
+                        await asyncio.sleep(0.01)
+                yield
+                # Closing the file releases the flock
+
+    async def store_upload(
+        self,
+        upload: Any,
+        max_bytes: int,
+        register: Optional[Callable[[str, int, str, bool], Awaitable[Any]]] = None
+    ) -> Tuple[str, int, str, bool]:
+        """
+        Stream an upload into the store.
+
+        The upload is written and hashed in one pass to a temporary file,
+        which becomes the blob or is dropped if the blob already exists.
+
+        Args:
+            upload: Starlette UploadFile
+            max_bytes: Size limit (see write_upload)
+            register: Coroutine function recording the reference to the
+                blob, called with the returned tuple while the blob's lock
+                is held, so a concurrent release cannot remove the blob
+                before the reference exists. If it raises, a blob this
+                upload created is removed again
+
+        Returns:
+            Tuple of (blob path, size in bytes, hex SHA-256 digest, whether
+            the content was already stored)
+        """
+        tmp_path = str(self.tmp_dir / uuid.uuid4().hex)
+        size, digest = await write_upload(upload, tmp_path, max_bytes)
+        path = self.path_for(digest, upload.filename)
+
+        def commit() -> bool:
+            if os.path.exists(path):
+                os.remove(tmp_path)
+                return True
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+            return False
+
+        async with self.lock(path):
+            existed = await asyncio.to_thread(commit)
+            if existed:
+                logger.info(f"Upload matches stored blob {path}")
+            if register is not None:
+                try:
+                    await register(path, size, digest, existed)
+                except BaseException:
+                    if not existed:
+                        # Nothing references the new blob; drop it while still locked
+                        await asyncio.to_thread(os.remove, path)
+                    raise
+        return path, size, digest, existed
+
+    async def release(self, path: str, is_referenced: Callable[[], Awaitable[bool]]) -> bool:
+        """
+        Remove a blob unless something still references it.
+
+        Args:
+            path: Blob path
+            is_referenced: Coroutine function checking for remaining
+                references, called while the blob's lock is held
+
+        Returns:
+            True if the file was removed
+        """
+        async with self.lock(path):
+            if await is_referenced() or not os.path.exists(path):
+                return False
+            await asyncio.to_thread(os.remove, path)
+            return True
@@ -0,0 +1,285 @@
+"""
+Context Packing
+
+This module assembles search results into an agent prompt context: chunks
+of the same document that overlap or are adjacent are merged back into
+one passage, passages are ordered by maximal marginal relevance so the
+context covers several sources, and the result is fitted to a token
+budget counted with a real tokenizer.
+"""
+
+from typing import List, Dict, Any, Optional, Tuple, Union
+import os
+import logging
+
+from backend.app.core.lexical_index import tokenize
+
+logger = logging.getLogger(__name__)
+
+SEPARATOR = "\n---\n"
+
+
+def _join_overlapping(first: str, second: str) -> str:
+    """
+    Join two texts whose ends overlap by whole words.
+
+    Chunks without character offsets share `chunk_overlap` words; the
+    longest suffix of `first` that is a prefix of `second` is kept once.
+    """
+    first_words = first.split()
+    second_words = second.split()
+    if not first_words or not second_words:
+        return first or second
+
+    longest = 0
+    for start in range(max(0, len(first_words) - len(second_words)), len(first_words)):
+        if first_words[start] != second_words[0]:
+            continue
+        size = len(first_words) - start
+        if first_words[start:] == second_words[:size]:
+            longest = size
+            break
+
+    rest = second_words[longest:]
+    return f"{first} {' '.join(rest)}" if rest else first
+
+
+class ContextPacker:
+    """
+    Builds a token-budgeted context string from search results.
+
+    Relevance for MMR is the result score scaled to the best score;
+    redundancy is the term overlap (Jaccard) between passages, and
+    passages of the same document count as at least
+    SAME_SOURCE_SIMILARITY alike, so other sources get a turn.
+    """
+
+    SAME_SOURCE_SIMILARITY = 0.3
+
+    def __init__(
+        self,
+        tokenizer: Optional[Union[str, Any]] = None,
+        mmr_lambda: float = 0.7,
+        min_fragment_tokens: int = 50
+    ):
+        """
+        Initialize context packer.
+
+        Args:
+            tokenizer: tiktoken encoding, or the name of one (e.g.
+                'cl100k_base'); None estimates 4 characters per token
+            mmr_lambda: Weight of relevance against novelty (1.0 = relevance only)
+            min_fragment_tokens: Smallest truncated passage worth adding
+                when the next passage does not fit whole
+        """
+        if isinstance(tokenizer, str):
+            import tiktoken
+            tokenizer = tiktoken.get_encoding(tokenizer)
+        self.tokenizer = tokenizer
+        self.mmr_lambda = mmr_lambda
+        self.min_fragment_tokens = min_fragment_tokens
+
+    def count_tokens(self, text: str) -> int:
+        """Count the tokens of a text."""
+        if self.tokenizer is None:
+            return (len(text) + 3) // 4
+        return len(self.tokenizer.encode(text, disallowed_special=()))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Cut a text to at most max_tokens tokens."""
+        if max_tokens <= 0:
+            return ""
+        if self.tokenizer is None:
+            return text[:max_tokens * 4]
+        tokens = self.tokenizer.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        return self.tokenizer.decode(tokens[:max_tokens])
+
+    def merge(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Merge overlapping and adjacent chunks of the same document.
+
+        Chunks with 'char_start'/'char_end' metadata are merged when their
+        spans touch or overlap; chunks without offsets when their
+        'chunk_index' values are consecutive.
+
+        Args:
+            results: Search results with the chunk text in metadata['text']
+
+        Returns:
+            Passages with 'text', 'source', 'doc_key', 'score' and
+            'chunks' (merged result count), best first
+        """
+        by_document: Dict[str, List[Dict[str, Any]]] = {}
+        for result in results:
+            metadata = result.get('metadata') or {}
+            if not metadata.get('text'):
+                continue
+            doc_key = str(
+                metadata.get('doc_id') or metadata.get('source_file')
+                or metadata.get('filename') or result['id']
+            )
+            by_document.setdefault(doc_key, []).append(result)
+
+        passages = []
+        for doc_key, chunks in by_document.items():
+            chunks.sort(key=lambda r: (
+                r['metadata'].get('char_start', -1),
+                r['metadata'].get('chunk_index', -1)
+            ))
+
+            current = None
+            for chunk in chunks:
+                metadata = chunk['metadata']
+                start, end = metadata.get('char_start'), metadata.get('char_end')
+                index = metadata.get('chunk_index')
+
+                if current is not None and start is not None and current['end'] is not None and start <= current['end']:
+                    if end > current['end']:
+                        current['text'] += metadata['text'][current['end'] - start:]
+                        current['end'] = end
+                elif current is not None and start is None and index is not None and index == current['index'] + 1:
+                    current['text'] = _join_overlapping(current['text'], metadata['text'])
+                else:
+                    current = {
+                        'text': metadata['text'],
+                        'source': metadata.get('filename') or metadata.get('file_name') or 'Unknown',
+                        'doc_key': doc_key,
+                        'score': chunk.get('score', 0),
+                        'chunks': 0,
+                        'end': end,
+                        'index': index
+                    }
+                    passages.append(current)
+
+                current['score'] = max(current['score'], chunk.get('score', 0))
+                current['chunks'] += 1
+                if index is not None:
+                    current['index'] = index
+
+        for passage in passages:
+            del passage['end'], passage['index']
+        passages.sort(key=lambda p: p['score'], reverse=True)
+        return passages
+
+    def order(self, passages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Order passages by maximal marginal relevance.
+
+        Args:
+            passages: Merged passages
+
+        Returns:
+            The same passages, most relevant-and-novel first
+        """
+        if len(passages) <= 1:
+            return list(passages)
+
+        best = max(p['score'] for p in passages)
+        relevance = [p['score'] / best if best > 0 else 1.0 for p in passages]
+        terms = [set(tokenize(p['text'])) for p in passages]
+
+        def similarity(i: int, j: int) -> float:
+            union = terms[i] | terms[j]
+            overlap = len(terms[i] & terms[j]) / len(union) if union else 0.0
+            if passages[i]['doc_key'] == passages[j]['doc_key']:
+                return max(overlap, self.SAME_SOURCE_SIMILARITY)
+            return overlap
+
+        remaining = list(range(len(passages)))
+        redundancy = [0.0] * len(passages)
+        ordered = []
+        while remaining:
+            pick = max(
+                remaining,
+                key=lambda i: self.mmr_lambda * relevance[i] - (1 - self.mmr_lambda) * redundancy[i]
+            )
+            remaining.remove(pick)
+            ordered.append(passages[pick])
+            for i in remaining:
+                redundancy[i] = max(redundancy[i], similarity(i, pick))
+        return ordered
+
+    def pack(self, results: List[Dict[str, Any]], max_tokens: int) -> Tuple[str, Dict[str, Any]]:
+        """
+        Build a context of at most max_tokens tokens.
+
+        Passages are added in MMR order; one that does not fit is cut to
+        the remaining budget if at least min_fragment_tokens remain, and
+        skipped otherwise so a shorter one may still fit.
+
+        Args:
+            results: Search results
+            max_tokens: Token budget of the whole context
+
+        Returns:
+            Tuple of (context, stats with 'sources', 'chunks', 'merged' and 'tokens')
+        """
+        passages = self.order(self.merge(results))
+        separator_tokens = self.count_tokens(SEPARATOR)
+
+        parts = []
+        used = 0
+        chunks = 0
+        for passage in passages:
+            header = f"\n[Source {len(parts) + 1}: {passage['source']} (Relevance: {passage['score']:.2f})]\n"
+            overhead = self.count_tokens(header) + 1 + (separator_tokens if parts else 0)
+            text_tokens = self.count_tokens(passage['text'])
+
+            remaining = max_tokens - used - overhead
+            if text_tokens <= remaining:
+                text = passage['text']
+            elif remaining >= self.min_fragment_tokens:
+                text = self.truncate(passage['text'], remaining)
+                text_tokens = remaining
+            else:
+                continue
+
+            parts.append(f"{header}{text}\n")
+            used += overhead + text_tokens
+            chunks += passage['chunks']
+
+        context = SEPARATOR.join(parts)
+        # Merges across part boundaries can only shrink the count, but be exact
+        tokens = self.count_tokens(context)
+        if tokens > max_tokens:
+            context = self.truncate(context, max_tokens)
+            tokens = self.count_tokens(context)
+
+        return context, {
+            'sources': len(parts),
+            'chunks': chunks,
+            'merged': chunks - len(parts),
+            'tokens': tokens
+        }
+
+
+_context_packer: Optional[ContextPacker] = None
+
+
+def get_context_packer() -> ContextPacker:
+    """
+    Get ContextPacker instance with default settings.
+
+    Returns:
+        ContextPacker instance
+    """
+    global _context_packer
+
+    if _context_packer is None:
+        tokenizer = None
+        encoding_name = os.getenv("CONTEXT_TOKENIZER", "cl100k_base")
+        if encoding_name:
+            try:
+                import tiktoken
+                tokenizer = tiktoken.get_encoding(encoding_name)
+            except Exception as e:
+                logger.warning(f"Could not load tokenizer '{encoding_name}', using estimates: {e}")
+
+        _context_packer = ContextPacker(
+            tokenizer=tokenizer,
+            mmr_lambda=float(os.getenv("CONTEXT_MMR_LAMBDA", "0.7"))
+        )
+
+    return _context_packer
@@ -5,20 +5,40 @@ This module provides utilities for processing various document formats,
 extracting text, and preparing documents for embedding and indexing.
 """
 
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Iterator, Iterable
+from collections import deque
 import os
 import re
+import itertools
+import functools
+import time
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
 from pathlib import Path
 import logging
 from datetime import datetime
 
 # Document processing libraries
 import PyPDF2
+import docx
 from docx import Document as DocxDocument
 import pandas as pd
 
+from backend.app.utils.text_chunker import TextChunker
+from backend.app.utils.extraction_cache import ExtractionCache, get_extraction_cache
+from backend.app.utils.ingest_manifest import file_digest
+
 logger = logging.getLogger(__name__)
 
+# Patterns used by the streaming cleaner (same rules as clean_text)
+_NEWLINE_RUNS = re.compile(r'\n{3,}')
+_SPACE_RUNS = re.compile(r' {2,}')
+_SPECIAL_CHARS = re.compile(r'[^\w\s\.\,\!\?\-\:\;\(\)\[\]\{\}\"\'\/]')
+
+# Read size for plain text files in streaming extraction
+TEXT_READ_BLOCK = 64 * 1024
+
 
 class DocumentProcessor:
     """
@@ -43,11 +63,19 @@ class DocumentProcessor:
         '.csv': 'csv'
     }
     
+    # Bump when a change to the extractors changes the text they produce
+    EXTRACTOR_VERSION = 1
+    
+    # File types slow enough to parse that their text is worth caching
+    CACHED_FILE_TYPES = {'pdf', 'docx', 'excel', 'csv'}
+    
     def __init__(
         self,
         chunk_size: int = 1000,
         chunk_overlap: int = 200,
-        max_chunks_per_doc: int = 100
+        max_chunks_per_doc: int = 100,
+        tokenizer: Optional[Any] = None,
+        extraction_cache: Optional[ExtractionCache] = None
     ):
         """
         Initialize document processor.
@@ -56,10 +84,24 @@ class DocumentProcessor:
             chunk_size: Target size for text chunks (in tokens)
             chunk_overlap: Overlap between chunks (in tokens)
             max_chunks_per_doc: Maximum chunks per document
+            tokenizer: Optional tiktoken encoding (or its name); when set,
+                chunks are cut by TextChunker on exact token counts
+            extraction_cache: Optional cache of extracted text, consulted
+                before parsing PDF, DOCX and Excel files
         """
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
         self.max_chunks_per_doc = max_chunks_per_doc
+        self.extraction_cache = extraction_cache
+        
+        self.text_chunker = None
+        if tokenizer is not None:
+            self.text_chunker = TextChunker(
+                chunk_size=chunk_size,
+                chunk_overlap=chunk_overlap,
+                max_chunks=max_chunks_per_doc,
+                tokenizer=tokenizer
+            )
     
     def is_supported(self, file_path: str) -> bool:
         """
@@ -107,20 +149,133 @@ class DocumentProcessor:
             logger.error(f"Error extracting text from {file_path}: {e}")
             raise
     
-    def _extract_from_pdf(self, file_path: str) -> str:
-        """Extract text from PDF file."""
-        text = []
+    def iter_text(self, file_path: str) -> Iterator[str]:
+        """
+        Extract text from a document as a stream of pieces.
+        
+        PDFs are read page by page and text files block by block, so only
+        one page or block is held at a time. Joining the pieces gives the
+        same text as extract_text.
+        
+        Args:
+            file_path: Path to document
+        
+        Yields:
+            Consecutive pieces of the extracted text
+        """
+        ext = Path(file_path).suffix.lower()
+        
+        if not self.is_supported(file_path):
+            raise ValueError(f"Unsupported file type: {ext}")
+        
+        file_type = self.SUPPORTED_EXTENSIONS[ext]
+        
+        try:
+            if file_type == 'pdf':
+                yield from self._iter_pdf_pages(file_path)
+            elif file_type in ['text', 'markdown']:
+                with open(file_path, 'r', encoding='utf-8') as file:
+                    for block in iter(lambda: file.read(TEXT_READ_BLOCK), ''):
+                        yield block
+            else:
+                yield self.extract_text(file_path)
+        
+        except Exception as e:
+            logger.error(f"Error extracting text from {file_path}: {e}")
+            raise
+    
+    def extractor_version(self, file_path: str) -> str:
+        """
+        Version of the extractor for a file, as used in extraction cache keys.
+        
+        Includes the parsing library's version, since upgrading it can
+        change the extracted text.
+        """
+        file_type = self.SUPPORTED_EXTENSIONS[Path(file_path).suffix.lower()]
+        if file_type == 'pdf':
+            library = PyPDF2.__version__
+        elif file_type == 'docx':
+            library = getattr(docx, '__version__', '')
+        elif file_type in ['excel', 'csv']:
+            library = pd.__version__
+        else:
+            library = ''
+        return f"{file_type}-{self.EXTRACTOR_VERSION}-{library}"
+    
+    def iter_cached_text(self, file_path: str, file_sha256: Optional[str] = None) -> Iterator[str]:
+        """
+        Extract text like iter_text, going through the extraction cache.
+        
+        On a hit the cached text is decompressed and yielded piece by piece.
+        On a miss each piece is compressed into the cache as it passes
+        through, and the entry is kept once extraction completes; a consumer
+        that stops early stores nothing. Either way no more than a piece of
+        the text is held at a time.
+        
+        Args:
+            file_path: Path to document
+            file_sha256: SHA-256 of the file, if already known
         
+        Yields:
+            Consecutive pieces of the extracted text
+        """
+        cache = self.extraction_cache
+        ext = Path(file_path).suffix.lower()
+        if cache is None or self.SUPPORTED_EXTENSIONS.get(ext) not in self.CACHED_FILE_TYPES:
+            yield from self.iter_text(file_path)
+            return
+        
+        digest = file_sha256 or file_digest(file_path)
+        version = self.extractor_version(file_path)
+        # Characters already yielded from a cache entry that turned out corrupt
+        skip = 0
+        reader = cache.reader(digest, version)
+        if reader is not None:
+            logger.info(f"Using cached extraction of {file_path}")
+            try:
+                for piece in reader:
+                    yield piece
+                    skip += len(piece)
+            finally:
+                reader.close()
+            if not reader.corrupt:
+                return
+            logger.warning(f"Extracting {file_path} again after {skip} cached characters")
+        
+        writer = cache.writer(digest, version)
+        completed = False
+        try:
+            for piece in self.iter_text(file_path):
+                writer.write(piece)
+                if skip >= len(piece):
+                    skip -= len(piece)
+                    continue
+                yield piece[skip:]
+                skip = 0
+            completed = True
+        finally:
+            if completed:
+                writer.commit()
+            else:
+                writer.discard()
+    
+    def _iter_pdf_pages(self, file_path: str) -> Iterator[str]:
+        """Yield the text of each PDF page, with page separators."""
         with open(file_path, 'rb') as file:
             pdf_reader = PyPDF2.PdfReader(file)
             
-            for page_num in range(len(pdf_reader.pages)):
-                page = pdf_reader.pages[page_num]
+            first = True
+            for page in pdf_reader.pages:
                 page_text = page.extract_text()
                 if page_text:
-                    text.append(page_text)
-        
-        return '\n\n'.join(text)
+                    if not first:
+                        yield '\n\n'
+                    yield page_text
+                    first = False
+    
+    def _extract_from_pdf(self, file_path: str) -> str:
+        """Extract text from PDF file."""
+        return ''.join(self._iter_pdf_pages(file_path))
     
     def _extract_from_docx(self, file_path: str) -> str:
         """Extract text from Word document."""
@@ -231,6 +386,145 @@ class DocumentProcessor:
         
         return chunks
     
+    def iter_clean_text(self, pieces: Iterable[str]) -> Iterator[str]:
+        """
+        Clean a stream of text pieces incrementally.
+        
+        Applies the same rules as clean_text. Trailing newlines, spaces and
+        whitespace are held back at each step, so runs that cross a piece
+        boundary are handled as if the text were one string.
+        
+        Args:
+            pieces: Consecutive pieces of raw text
+        
+        Yields:
+            Consecutive pieces of cleaned text
+        """
+        newlines = ''  # trailing '\n' run not yet collapsed
+        spaces = ''  # trailing ' ' run not yet collapsed
+        whitespace = ''  # trailing whitespace, dropped if nothing follows
+        started = False
+        
+        def clean(piece: str, final: bool = False) -> str:
+            nonlocal newlines, spaces, whitespace, started
+            
+            text = newlines + piece
+            kept = text if final else text.rstrip('\n')
+            newlines = text[len(kept):]
+            text = spaces + _NEWLINE_RUNS.sub('\n\n', kept)
+            
+            kept = text if final else text.rstrip(' ')
+            spaces = text[len(kept):]
+            text = _SPECIAL_CHARS.sub('', _SPACE_RUNS.sub(' ', kept))
+            
+            if not started:
+                text = text.lstrip()
+                started = bool(text)
+            body = text.rstrip()
+            if not body:
+                whitespace += text
+                return ''
+            text, whitespace = whitespace + body, text[len(body):]
+            return text
+        
+        for piece in pieces:
+            cleaned = clean(piece)
+            if cleaned:
+                yield cleaned
+        
+        cleaned = clean('', final=True)
+        if cleaned:
+            yield cleaned
+    
+    def iter_chunks(
+        self,
+        pieces: Iterable[str],
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Split a stream of text pieces into overlapping chunks.
+        
+        Produces the same chunks as chunk_text on the joined text, keeping
+        only about one chunk's worth of words in memory. 'total_chunks' is
+        not known while streaming and is left at 0.
+        
+        Args:
+            pieces: Consecutive pieces of (cleaned) text
+            metadata: Optional metadata to attach to each chunk
+        
+        Yields:
+            Chunks with metadata
+        """
+        words_per_chunk = self.chunk_size // 4
+        overlap_words = self.chunk_overlap // 4
+        step = words_per_chunk - overlap_words
+        if step <= 0:
+            raise ValueError(
+                f"Chunks would not advance: chunk_overlap ({self.chunk_overlap}) must be "
+                f"smaller than chunk_size ({self.chunk_size}) in words (tokens // 4)"
+            )
+        
+        window: deque = deque()
+        partial = ''
+        emitted = 0
+        
+        def drain(final: bool) -> Iterator[Dict[str, Any]]:
+            nonlocal emitted
+            while window and (final or len(window) >= words_per_chunk):
+                chunk_text = ' '.join(itertools.islice(window, words_per_chunk))
+                
+                if len(chunk_text.strip()) > 50:  # Minimum chunk size
+                    yield {
+                        'text': chunk_text,
+                        'metadata': {
+                            **(metadata or {}),
+                            'chunk_index': emitted,
+                            'total_chunks': 0
+                        }
+                    }
+                    emitted += 1
+                    if emitted >= self.max_chunks_per_doc:
+                        logger.warning(f"Reached max chunks limit: {self.max_chunks_per_doc}")
+                        return
+                
+                for _ in range(min(step, len(window))):
+                    window.popleft()
+        
+        for piece in pieces:
+            text = partial + piece
+            words = text.split()
+            # A word cut at the end of a piece continues in the next one
+            partial = words.pop() if words and not text[-1].isspace() else ''
+            window.extend(words)
+            
+            yield from drain(final=False)
+            if emitted >= self.max_chunks_per_doc:
+                return
+        
+        if partial:
+            window.append(partial)
+        yield from drain(final=True)
+    
+    def iter_document_chunks(
+        self,
+        file_path: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream a document from extraction to chunks.
+        
+        Peak memory depends on the chunk size and the largest page, not on
+        the size of the document.
+        
+        Args:
+            file_path: Path to document
+            metadata: Optional metadata to attach to each chunk
+        
+        Yields:
+            Chunks with metadata ('total_chunks' left at 0)
+        """
+        yield from self.iter_chunks(self.iter_clean_text(self.iter_text(file_path)), metadata)
+    
     def extract_metadata(self, file_path: str) -> Dict[str, Any]:
         """
         Extract metadata from file.
@@ -257,27 +551,31 @@ class DocumentProcessor:
     def process_document(
         self,
         file_path: str,
-        additional_metadata: Optional[Dict[str, Any]] = None
+        additional_metadata: Optional[Dict[str, Any]] = None,
+        retain_text: bool = False,
+        file_sha256: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Complete document processing pipeline.
         
+        Text is streamed from extraction through cleaning to chunking, so
+        the full text of the document is only held in memory when
+        `retain_text` is set. Extracted text is read from and written to
+        the extraction cache, if the processor has one.
+        
         Args:
             file_path: Path to document
             additional_metadata: Additional metadata to attach
-            
+            retain_text: Also return 'raw_text' and 'cleaned_text'
+            file_sha256: SHA-256 of the file, if already known (saves
+                hashing it for the extraction cache)
+        
         Returns:
             Dict with processed document data
         """
         logger.info(f"Processing document: {file_path}")
         
         try:
-            # Extract text
-            raw_text = self.extract_text(file_path)
-            
-            # Clean text
-            cleaned_text = self.clean_text(raw_text)
-            
             # Extract file metadata
             file_metadata = self.extract_metadata(file_path)
             
@@ -287,21 +585,31 @@ class DocumentProcessor:
                 **(additional_metadata or {})
             }
             
-            # Chunk text
-            chunks = self.chunk_text(cleaned_text, metadata)
+            if self.text_chunker is not None:
+                # Token-accurate chunking needs the whole text in one buffer
+                raw_text = ''.join(self.iter_cached_text(file_path, file_sha256))
+                cleaned_text = self.text_chunker.normalize(raw_text)
+                chunks = self.text_chunker.chunk(cleaned_text, metadata)
+                return self._processed_result(
+                    file_path, chunks, metadata,
+                    (raw_text, cleaned_text) if retain_text else None
+                )
             
-            result = {
-                'file_path': file_path,
-                'raw_text': raw_text,
-                'cleaned_text': cleaned_text,
-                'chunks': chunks,
-                'metadata': metadata,
-                'chunk_count': len(chunks),
-                'status': 'success'
-            }
+            raw_pieces = self.iter_cached_text(file_path, file_sha256)
+            if retain_text:
+                raw_text = ''.join(raw_pieces)
+                cleaned_text = self.clean_text(raw_text)
+                raw_pieces = [raw_text]
+            
+            # Extract, clean and chunk in one streaming pass
+            chunks = list(self.iter_chunks(self.iter_clean_text(raw_pieces), metadata))
+            for chunk in chunks:
+                chunk['metadata']['total_chunks'] = len(chunks)
             
-            logger.info(f"Processed {file_path}: {len(chunks)} chunks created")
-            return result
+            return self._processed_result(
+                file_path, chunks, metadata,
+                (raw_text, cleaned_text) if retain_text else None
+            )
             
         except Exception as e:
             logger.error(f"Error processing document {file_path}: {e}")
@@ -311,10 +619,64 @@ class DocumentProcessor:
                 'error': str(e)
             }
     
+    def _processed_result(
+        self,
+        file_path: str,
+        chunks: List[Dict[str, Any]],
+        metadata: Dict[str, Any],
+        texts: Optional[Tuple[str, str]] = None
+    ) -> Dict[str, Any]:
+        """Build the process_document result; `texts` is (raw, cleaned) when retained."""
+        result = {
+            'file_path': file_path,
+            'chunks': chunks,
+            'metadata': metadata,
+            'chunk_count': len(chunks),
+            'status': 'success'
+        }
+        if texts is not None:
+            result['raw_text'], result['cleaned_text'] = texts
+        
+        logger.info(f"Processed {file_path}: {len(chunks)} chunks created")
+        return result
+    
+    async def aprocess_document(
+        self,
+        file_path: str,
+        additional_metadata: Optional[Dict[str, Any]] = None,
+        file_sha256: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Run process_document in the extraction process pool.
+        
+        PDF/DOCX/Excel parsing is CPU-bound and holds the GIL, so it runs in
+        a separate process to keep the event loop responsive.
+        
+        Args:
+            file_path: Path to document
+            additional_metadata: Additional metadata to attach
+            file_sha256: SHA-256 of the file, if already known
+            
+        Returns:
+            Dict with processed document data
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            get_extraction_executor(),
+            functools.partial(
+                self.process_document,
+                file_path,
+                additional_metadata,
+                file_sha256=file_sha256
+            )
+        )
+    
     def batch_process(
         self,
         file_paths: List[str],
-        additional_metadata: Optional[Dict[str, Any]] = None
+        additional_metadata: Optional[Dict[str, Any]] = None,
+        workers: int = 1,
+        timeout: Optional[float] = None
     ) -> List[Dict[str, Any]]:
         """
         Process multiple documents.
@@ -322,20 +684,157 @@ class DocumentProcessor:
         Args:
             file_paths: List of file paths
             additional_metadata: Metadata to attach to all documents
+            workers: Number of worker processes; 1 processes in this process
+            timeout: Per-file timeout in seconds (worker processes only)
             
         Returns:
-            List of processed document results
+            List of processed document results, in the order of `file_paths`
         """
-        results = []
-        
-        for file_path in file_paths:
-            result = self.process_document(file_path, additional_metadata)
-            results.append(result)
+        if workers > 1:
+            by_path = {}
+            for result in self.iter_process(file_paths, additional_metadata, workers, timeout):
+                by_path.setdefault(result['file_path'], result)
+            results = [by_path[file_path] for file_path in file_paths]
+        else:
+            results = []
+            for file_path in file_paths:
+                result = self.process_document(file_path, additional_metadata)
+                results.append(result)
         
         successful = sum(1 for r in results if r['status'] == 'success')
         logger.info(f"Batch processed {len(file_paths)} documents: {successful} successful")
         
         return results
+    
+    def iter_process(
+        self,
+        file_paths: List[str],
+        additional_metadata: Optional[Dict[str, Any]] = None,
+        workers: Optional[int] = None,
+        timeout: Optional[float] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Process documents in a pool of worker processes.
+        
+        Results are yielded as soon as each file finishes, so callers can
+        embed and upsert one document while others are still being parsed.
+        A file still running after `timeout` seconds is reported as failed;
+        since a stuck worker cannot be interrupted, the pool is then
+        replaced and the other in-flight files are resubmitted.
+        
+        Args:
+            file_paths: List of file paths
+            additional_metadata: Metadata to attach to all documents
+            workers: Number of worker processes (default: DOCUMENT_EXTRACTION_WORKERS)
+            timeout: Per-file timeout in seconds (None waits indefinitely)
+            
+        Yields:
+            Processed document results, in completion order
+        """
+        workers = max(1, workers or _default_extraction_workers())
+        queue = deque(file_paths)
+        # Only `workers` files are submitted at once, so submission time
+        # is close to the time a worker picks the file up.
+        running: Dict[Future, Tuple[str, float]] = {}
+        executor = _new_process_pool(workers)
+        
+        try:
+            while queue or running:
+                while queue and len(running) < workers:
+                    file_path = queue.popleft()
+                    future = executor.submit(self.process_document, file_path, additional_metadata)
+                    running[future] = (file_path, time.monotonic())
+                
+                wait_timeout = None
+                if timeout is not None:
+                    oldest = min(started for _, started in running.values())
+                    wait_timeout = max(0.0, oldest + timeout - time.monotonic())
+                
+                done, _ = wait(list(running), timeout=wait_timeout, return_when=FIRST_COMPLETED)
+                
+                broken = False
+                for future in done:
+                    file_path, _ = running.pop(future)
+                    try:
+                        yield future.result()
+                    except Exception as e:
+                        # A crashed worker breaks the whole pool
+                        broken = True
+                        logger.error(f"Worker failed processing {file_path}: {e}")
+                        yield {'file_path': file_path, 'status': 'failed', 'error': str(e)}
+                
+                expired = []
+                if timeout is not None:
+                    now = time.monotonic()
+                    expired = [
+                        future for future, (_, started) in running.items()
+                        if now - started >= timeout
+                    ]
+                    for future in expired:
+                        file_path, _ = running.pop(future)
+                        logger.error(f"Timed out processing {file_path} after {timeout}s")
+                        yield {
+                            'file_path': file_path,
+                            'status': 'failed',
+                            'error': f"Timed out after {timeout}s"
+                        }
+                
+                if broken or expired:
+                    for file_path, _ in reversed(list(running.values())):
+                        queue.appendleft(file_path)
+                    running.clear()
+                    _terminate_process_pool(executor)
+                    executor = _new_process_pool(workers)
+        finally:
+            _terminate_process_pool(executor)
+
+
+def _default_extraction_workers() -> int:
+    return int(os.getenv("DOCUMENT_EXTRACTION_WORKERS", "2"))
+
+
+def _new_process_pool(workers: int) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+def _terminate_process_pool(executor: ProcessPoolExecutor):
+    """Shut down a pool without waiting, killing workers that are still busy."""
+    # ProcessPoolExecutor has no public way to stop a running task
+    for process in list((getattr(executor, "_processes", None) or {}).values()):
+        if process.is_alive():
+            process.terminate()
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Shared process pool for async extraction
+_extraction_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_extraction_executor() -> ProcessPoolExecutor:
+    """
+    Get the process pool used for CPU-bound extraction from async code.
+    
+    Uses the 'spawn' start method so workers never inherit locks held by
+    server threads at fork time.
+    
+    Returns:
+        ProcessPoolExecutor instance
+    """
+    global _extraction_executor
+    if _extraction_executor is None:
+        _extraction_executor = _new_process_pool(max(1, _default_extraction_workers()))
+    return _extraction_executor
+
+
+def shutdown_extraction_executor():
+    """Shut down the extraction process pool (called on application shutdown)."""
+    global _extraction_executor
+    if _extraction_executor is not None:
+        _extraction_executor.shutdown(wait=False, cancel_futures=True)
+        _extraction_executor = None
 
 
 def get_document_processor() -> DocumentProcessor:
@@ -349,8 +848,19 @@ def get_document_processor() -> DocumentProcessor:
     chunk_overlap = int(os.getenv("CHUNK_OVERLAP", "200"))
     max_chunks = int(os.getenv("MAX_CHUNKS_PER_DOC", "100"))
     
+    tokenizer = None
+    encoding_name = os.getenv("CHUNK_TOKENIZER", "")
+    if encoding_name:
+        try:
+            import tiktoken
+            tokenizer = tiktoken.get_encoding(encoding_name)
+        except Exception as e:
+            logger.warning(f"Could not load tokenizer '{encoding_name}', using word estimates: {e}")
+    
     return DocumentProcessor(
         chunk_size=chunk_size,
         chunk_overlap=chunk_overlap,
-        max_chunks_per_doc=max_chunks
+        max_chunks_per_doc=max_chunks,
+        tokenizer=tokenizer,
+        extraction_cache=get_extraction_cache()
     )
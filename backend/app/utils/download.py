@@ -0,0 +1,236 @@
+"""
+Document Download Helpers
+
+This module implements HTTP validators and partial content for document
+downloads: strong ETags from the stored SHA-256 digest, conditional GET
+(If-None-Match / If-Modified-Since), single byte-range requests, and a
+short-lived cache of per-user access decisions.
+"""
+
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from urllib.parse import quote
+import asyncio
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Bytes read per step when streaming a byte range
+RANGE_CHUNK_SIZE = 256 * 1024
+
+
+class RangeNotSatisfiable(Exception):
+    """Raised when a Range header selects no bytes of the file."""
+
+
+def make_etag(digest: str) -> str:
+    """Strong ETag for content with this SHA-256 digest."""
+    return f'"{digest}"'
+
+
+def http_date(value: datetime) -> str:
+    """Format a (naive UTC or aware) datetime as an HTTP date."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def content_disposition(file_name: str) -> str:
+    """Attachment header value, as FileResponse builds it."""
+    quoted = quote(file_name)
+    if quoted != file_name:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{file_name}"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    tags = [tag.strip() for tag in header.split(",")]
+    # Weak comparison, as If-None-Match requires
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+def is_not_modified(
+    headers: Any,
+    etag: Optional[str],
+    last_modified: Optional[datetime]
+) -> bool:
+    """
+    Evaluate conditional GET headers.
+
+    If-None-Match takes precedence; If-Modified-Since is only consulted
+    when the request carries no If-None-Match.
+
+    Args:
+        headers: Request headers
+        etag: Current ETag of the file (None if unknown)
+        last_modified: Last modification time of the file
+
+    Returns:
+        True if a 304 Not Modified response should be sent
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag is not None and _etag_matches(if_none_match, etag)
+
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        # HTTP dates have whole-second precision
+        return last_modified.replace(microsecond=0) <= since
+
+    return False
+
+
+def parse_range(
+    headers: Any,
+    size: int,
+    etag: Optional[str],
+    last_modified: Optional[datetime]
+) -> Optional[Tuple[int, int]]:
+    """
+    Select the byte range requested by a Range header.
+
+    Only a single 'bytes=' range is served; multi-range requests, unknown
+    units and an If-Range that no longer matches get the full file.
+
+    Args:
+        headers: Request headers
+        size: File size in bytes
+        etag: Current ETag of the file
+        last_modified: Last modification time of the file
+
+    Returns:
+        Inclusive (start, end) offsets, or None for the full file
+
+    Raises:
+        RangeNotSatisfiable: If the range starts beyond the end of the file
+    """
+    header = headers.get("range")
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+
+    if_range = headers.get("if-range")
+    if if_range is not None:
+        if if_range.startswith('"') or if_range.startswith("W/"):
+            if etag is None or if_range != etag:
+                return None
+        elif last_modified is None or if_range != http_date(last_modified):
+            return None
+
+    first, _, last = header[len("bytes="):].strip().partition("-")
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+        else:
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length == 0:
+                raise RangeNotSatisfiable()
+            start, end = max(0, size - length), size - 1
+    except ValueError:
+        return None
+
+    if start >= size or start > end:
+        raise RangeNotSatisfiable()
+    return start, min(end, size - 1)
+
+
+async def iter_file_range(
+    path: str,
+    start: int,
+    end: int,
+    chunk_size: int = RANGE_CHUNK_SIZE
+) -> AsyncIterator[bytes]:
+    """
+    Stream bytes start..end (inclusive) of a file without blocking.
+
+    Args:
+        path: File path
+        start: First byte offset
+        end: Last byte offset
+        chunk_size: Bytes read per step
+
+    Yields:
+        File content chunks
+    """
+    f = await asyncio.to_thread(open, path, "rb")
+    try:
+        await asyncio.to_thread(f.seek, start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await asyncio.to_thread(f.read, min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        await asyncio.to_thread(f.close)
+
+
+class DownloadAccessCache:
+    """
+    TTL cache of download descriptors per (user, document).
+
+    An entry records that the user may download the document together
+    with what the response needs (path, name, type, ETag, date),
+    so repeat downloads skip the document lookup and access check.
+
+    Invalidation is local to the process; deleting a document drops its
+    entries here, and the TTL bounds staleness across workers and TWG
+    membership changes.
+    """
+
+    def __init__(self, ttl: int = 60, max_entries: int = 4096):
+        """
+        Initialize download access cache.
+
+        Args:
+            ttl: Time-to-live of an access decision in seconds (0 disables caching)
+            max_entries: Maximum number of cached decisions
+        """
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[Tuple[Any, Any], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: Any, doc_id: Any) -> Optional[Dict[str, Any]]:
+        """Get the cached descriptor, or None on a miss."""
+        if self.ttl <= 0:
+            return None
+
+        with self._lock:
+            entry = self._entries.get((user_id, doc_id))
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[(user_id, doc_id)]
+                return None
+            self._entries.move_to_end((user_id, doc_id))
+            return entry[1]
+
+    def put(self, user_id: Any, doc_id: Any, descriptor: Dict[str, Any]):
+        """Remember that a user may download a document."""
+        if self.ttl <= 0:
+            return
+
+        with self._lock:
+            self._entries[(user_id, doc_id)] = (time.monotonic() + self.ttl, descriptor)
+            self._entries.move_to_end((user_id, doc_id))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, doc_id: Any):
+        """Drop every user's entry for a document."""
+        with self._lock:
+            for key in [key for key in self._entries if key[1] == doc_id]:
+                del self._entries[key]
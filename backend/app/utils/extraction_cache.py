@@ -0,0 +1,339 @@
+"""
+Extraction Cache
+
+This module keeps the raw text extracted from source documents on disk,
+keyed by the file's SHA-256 digest and the extractor version, so chunking
+settings can change and documents can be re-ingested without parsing the
+PDF, DOCX or Excel file again. Entries are written and read in pieces, so
+a large document's text is never held in memory whole.
+"""
+
+from typing import Optional, List, Tuple, Iterator, BinaryIO
+from pathlib import Path
+import codecs
+import hashlib
+import os
+import uuid
+import zlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+ENTRY_SUFFIX = ".z"
+
+# Eviction trims the cache to this fraction of its maximum size, so the
+# next few writes do not each trigger a directory scan
+EVICTION_LOW_WATER = 0.9
+
+# Bytes read from an entry, and at most bytes of text decompressed, per piece
+READ_SIZE = 64 * 1024
+
+
+class _EntryReader:
+    """
+    Iterates over the decompressed text of an entry in pieces.
+
+    An entry that turns out to be corrupt partway is removed and ends the
+    iteration early with `corrupt` set, after the pieces read before it.
+    """
+
+    def __init__(self, path: Path, file: BinaryIO):
+        self.path = path
+        self.file = file
+        self.corrupt = False
+
+    def __iter__(self) -> Iterator[str]:
+        decompressor = zlib.decompressobj()
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        try:
+            with self.file:
+                data = b""
+                while not decompressor.eof:
+                    if not data:
+                        data = self.file.read(READ_SIZE)
+                        if not data:
+                            raise zlib.error("entry is truncated")
+                    text = decoder.decode(decompressor.decompress(data, READ_SIZE))
+                    data = decompressor.unconsumed_tail
+                    if text:
+                        yield text
+                text = decoder.decode(b"", final=True)
+                if text:
+                    yield text
+        except (OSError, zlib.error, UnicodeDecodeError) as e:
+            logger.warning(f"Dropping unreadable extraction cache entry {self.path}: {e}")
+            ExtractionCache._remove(self.path)
+            self.corrupt = True
+
+    def close(self):
+        """Stop reading."""
+        self.file.close()
+
+
+class _EntryWriter:
+    """Compresses text pieces into a temporary file that becomes an entry."""
+
+    def __init__(self, cache: "ExtractionCache", path: Path):
+        self.cache = cache
+        self.path = path
+        self.tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{uuid.uuid4().hex}.tmp")
+        self.compressor = zlib.compressobj(cache.compression_level)
+        self.size = 0
+        self.file: Optional[BinaryIO] = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self.file = open(self.tmp_path, "wb")
+        except OSError as e:
+            logger.warning(f"Could not write extraction cache entry {path}: {e}")
+
+    def _emit(self, data: bytes):
+        if not data or self.file is None:
+            return
+        self.size += len(data)
+        if self.size > self.cache.max_bytes:
+            # Would not fit in the cache at all
+            self.discard()
+            return
+        try:
+            self.file.write(data)
+        except OSError as e:
+            logger.warning(f"Could not write extraction cache entry {self.path}: {e}")
+            self.discard()
+
+    def write(self, text: str):
+        """Compress and append a piece of the text."""
+        if self.file is not None:
+            self._emit(self.compressor.compress(text.encode("utf-8")))
+
+    def commit(self):
+        """Finish the entry and move it into place atomically."""
+        if self.file is None:
+            return
+        self._emit(self.compressor.flush())
+        if self.file is None:
+            return
+        try:
+            self.file.close()
+            self.file = None
+            os.replace(self.tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not write extraction cache entry {self.path}: {e}")
+            self.discard()
+            return
+        self.cache._added(self.size)
+
+    def discard(self):
+        """Drop the partial entry."""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        ExtractionCache._remove(self.tmp_path)
+
+
+class ExtractionCache:
+    """
+    zlib-compressed extracted text in '<cache_dir>/<key[:2]>/<key>.z'.
+
+    Entries are written atomically, so several ingestion processes can
+    share one cache directory. Reads touch the entry's modification time
+    and eviction removes the least recently used entries once the cache
+    grows beyond `max_bytes`.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 2 * 1024 ** 3, compression_level: int = 6):
+        """
+        Initialize extraction cache.
+
+        Args:
+            cache_dir: Directory holding the entries
+            max_bytes: Maximum total size of the (compressed) entries
+            compression_level: zlib compression level
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.compression_level = compression_level
+        # Size of the cache as last scanned plus what this process wrote since
+        self._size: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(digest: str, version: str) -> str:
+        """Cache key of a file digest and extractor version."""
+        return hashlib.sha256(f"{digest}:{version}".encode("utf-8")).hexdigest()
+
+    def _path(self, digest: str, version: str) -> Path:
+        key = self.key(digest, version)
+        return self.cache_dir / key[:2] / f"{key}{ENTRY_SUFFIX}"
+
+    def get(self, digest: str, version: str) -> Optional[str]:
+        """
+        Get the extracted text of a file.
+
+        Args:
+            digest: SHA-256 digest of the source file
+            version: Extractor version that produced the text
+
+        Returns:
+            Extracted text, or None on a miss
+        """
+        path = self._path(digest, version)
+        try:
+            data = path.read_bytes()
+            text = zlib.decompress(data).decode("utf-8")
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, zlib.error, UnicodeDecodeError) as e:
+            logger.warning(f"Dropping unreadable extraction cache entry {path}: {e}")
+            self._remove(path)
+            self.misses += 1
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass  # evicted by another process in the meantime
+        self.hits += 1
+        return text
+
+    def reader(self, digest: str, version: str) -> Optional[_EntryReader]:
+        """
+        Open the extracted text of a file for reading in pieces.
+
+        Args:
+            digest: SHA-256 digest of the source file
+            version: Extractor version that produced the text
+
+        Returns:
+            Reader iterating over consecutive pieces of the text (see
+            _EntryReader for entries that turn out to be corrupt), or None
+            on a miss
+        """
+        path = self._path(digest, version)
+        try:
+            file = open(path, "rb")
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except OSError as e:
+            logger.warning(f"Could not open extraction cache entry {path}: {e}")
+            self.misses += 1
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass  # evicted by another process in the meantime
+        self.hits += 1
+        return _EntryReader(path, file)
+
+    def writer(self, digest: str, version: str) -> _EntryWriter:
+        """
+        Start storing the extracted text of a file piece by piece.
+
+        Nothing is visible to readers until the writer's commit(); discard()
+        drops what was written.
+
+        Args:
+            digest: SHA-256 digest of the source file
+            version: Extractor version that produced the text
+
+        Returns:
+            Writer with write(piece), commit() and discard()
+        """
+        return _EntryWriter(self, self._path(digest, version))
+
+    def put(self, digest: str, version: str, text: str):
+        """
+        Store the extracted text of a file.
+
+        Args:
+            digest: SHA-256 digest of the source file
+            version: Extractor version that produced the text
+            text: Extracted text
+        """
+        writer = self.writer(digest, version)
+        writer.write(text)
+        writer.commit()
+
+    def _added(self, size: int):
+        """Account for a new entry, evicting if the cache grew too large."""
+        if self._size is None:
+            self._size = self.size()
+        else:
+            self._size += size
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def _entries(self) -> List[Tuple[float, int, Path]]:
+        """(mtime, size, path) of every entry."""
+        entries = []
+        if not self.cache_dir.is_dir():
+            return entries
+        for path in self.cache_dir.glob(f"*/*{ENTRY_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def size(self) -> int:
+        """Total size of the entries in bytes."""
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self) -> int:
+        """
+        Remove least recently used entries until the cache fits.
+
+        Returns:
+            Number of entries removed
+        """
+        entries = sorted(self._entries(), key=lambda entry: entry[0])
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * EVICTION_LOW_WATER
+
+        removed = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            if self._remove(path):
+                total -= size
+                removed += 1
+
+        self._size = total
+        if removed:
+            logger.info(f"Evicted {removed} extraction cache entries ({total} bytes kept)")
+        return removed
+
+    def clear(self):
+        """Remove every entry."""
+        for _, _, path in self._entries():
+            self._remove(path)
+        self._size = 0
+
+    @staticmethod
+    def _remove(path: Path) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+
+def get_extraction_cache() -> Optional[ExtractionCache]:
+    """
+    Get ExtractionCache instance with default settings.
+
+    Returns:
+        ExtractionCache instance, or None if EXTRACTION_CACHE_DIR is empty
+    """
+    cache_dir = os.getenv("EXTRACTION_CACHE_DIR", "./data/extraction_cache")
+    if not cache_dir:
+        return None
+
+    return ExtractionCache(
+        cache_dir,
+        max_bytes=int(os.getenv("EXTRACTION_CACHE_MAX_BYTES", str(2 * 1024 ** 3)))
+    )
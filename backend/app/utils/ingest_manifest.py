@@ -0,0 +1,163 @@
+"""
+Ingestion Manifest
+
+This module records what has been ingested into the knowledge base, per source
+document and per chunk, so re-ingestion can skip unchanged files, upsert only
+new or changed chunks, and delete vectors that no longer have a source.
+"""
+
+from typing import List, Dict, Any, Optional, Tuple
+from pathlib import Path
+from datetime import datetime
+import hashlib
+import json
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Chunk metadata that changes without the chunk itself changing
+VOLATILE_METADATA_KEYS = {"total_chunks", "created_at", "modified_at", "file_size"}
+
+
+def file_digest(file_path: str, block_size: int = 1024 * 1024) -> str:
+    """
+    Compute the SHA-256 digest of a file.
+
+    Args:
+        file_path: Path to file
+        block_size: Read size in bytes
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def chunk_hash(text: str, metadata: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Compute the content hash of a chunk.
+
+    Covers the chunk text and its stable metadata, so a chunk is re-upserted
+    when either changes. Volatile fields such as total_chunks are excluded,
+    otherwise appending one chunk would invalidate every chunk of a document.
+
+    Args:
+        text: Chunk text
+        metadata: Chunk metadata
+
+    Returns:
+        Hex digest
+    """
+    stable = {
+        key: value for key, value in (metadata or {}).items()
+        if key not in VOLATILE_METADATA_KEYS
+    }
+    payload = json.dumps({"text": text, "metadata": stable}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class IngestManifest:
+    """
+    JSON manifest of ingested documents and their chunks.
+
+    Layout:
+        {"version": 1, "documents": {doc_key: {
+            "namespace", "twg", "file_sha256", "updated_at",
+            "chunks": [{"index", "hash", "vector_id"}, ...]}}}
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: str):
+        """
+        Load (or start) a manifest.
+
+        Args:
+            path: Path of the manifest JSON file
+        """
+        self.path = Path(path)
+        self.documents: Dict[str, Dict[str, Any]] = {}
+
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.documents = data.get("documents", {})
+            logger.info(f"Loaded ingest manifest with {len(self.documents)} documents from {self.path}")
+
+    def get(self, doc_key: str) -> Optional[Dict[str, Any]]:
+        """Get the manifest entry for a document."""
+        return self.documents.get(doc_key)
+
+    def diff_chunks(
+        self,
+        doc_key: str,
+        chunks: List[Dict[str, Any]]
+    ) -> Tuple[List[int], List[str]]:
+        """
+        Compare new chunks with the manifest entry for a document.
+
+        Args:
+            doc_key: Document key
+            chunks: New chunks as dicts with 'index', 'hash' and 'vector_id'
+
+        Returns:
+            Tuple of (indexes of new or changed chunks, orphaned vector IDs)
+        """
+        previous = self.documents.get(doc_key, {}).get("chunks", [])
+        previous_by_id = {chunk["vector_id"]: chunk["hash"] for chunk in previous}
+        new_ids = {chunk["vector_id"] for chunk in chunks}
+
+        changed = [
+            chunk["index"] for chunk in chunks
+            if previous_by_id.get(chunk["vector_id"]) != chunk["hash"]
+        ]
+        orphaned = [vector_id for vector_id in previous_by_id if vector_id not in new_ids]
+        return changed, orphaned
+
+    def record(
+        self,
+        doc_key: str,
+        namespace: Optional[str],
+        twg: Optional[str],
+        file_sha256: str,
+        chunks: List[Dict[str, Any]]
+    ):
+        """
+        Record the current state of a document.
+
+        Args:
+            doc_key: Document key
+            namespace: Namespace the vectors live in
+            twg: TWG identifier
+            file_sha256: Digest of the source file
+            chunks: Chunks as dicts with 'index', 'hash' and 'vector_id'
+        """
+        self.documents[doc_key] = {
+            "namespace": namespace,
+            "twg": twg,
+            "file_sha256": file_sha256,
+            "updated_at": datetime.utcnow().isoformat(),
+            "chunks": chunks
+        }
+
+    def remove(self, doc_key: str) -> Optional[Dict[str, Any]]:
+        """Remove and return a document's entry."""
+        return self.documents.pop(doc_key, None)
+
+    def documents_under(self, directory: str) -> List[str]:
+        """List document keys whose source file is inside a directory."""
+        root = os.path.abspath(directory) + os.sep
+        return [key for key in self.documents if key.startswith(root)]
+
+    def save(self):
+        """Write the manifest atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": self.VERSION, "documents": self.documents}, f)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,170 @@
+"""
+Offset-Based Text Chunking
+
+This module provides a text normalizer and a chunker that returns chunk
+boundaries as character offsets into one buffer, instead of splitting text
+into word lists and re-joining overlapping slices.
+"""
+
+from typing import List, Dict, Any, Optional, Tuple, Union
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Same rules as DocumentProcessor.clean_text, as one deletion pattern: the
+# third and later newlines of a run, every space followed by another space,
+# and special characters. Lookarounds see the original text, so runs are
+# found exactly as the separate passes find them.
+_NOISE = re.compile(r'(?<=\n\n)\n| (?= )|[^\w\s\.\,\!\?\-\:\;\(\)\[\]\{\}\"\'\/]')
+
+
+class TextChunker:
+    """
+    Splits text into overlapping chunks described by character offsets.
+
+    Without a tokenizer, sizes are estimated in words like
+    DocumentProcessor.chunk_text (chunk_size // 4 words per chunk). With a
+    tiktoken encoding, chunk_size and chunk_overlap are exact token counts.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        max_chunks: int = 100,
+        tokenizer: Optional[Union[str, Any]] = None,
+        min_chunk_chars: int = 50
+    ):
+        """
+        Initialize chunker.
+
+        Args:
+            chunk_size: Target size for chunks (in tokens)
+            chunk_overlap: Overlap between chunks (in tokens)
+            max_chunks: Maximum chunks per text
+            tokenizer: tiktoken encoding, or the name of one (e.g. 'cl100k_base')
+            min_chunk_chars: Chunks spanning this many characters or fewer
+                are dropped
+        """
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.max_chunks = max_chunks
+        self.min_chunk_chars = min_chunk_chars
+
+        if isinstance(tokenizer, str):
+            import tiktoken
+            tokenizer = tiktoken.get_encoding(tokenizer)
+        self.tokenizer = tokenizer
+
+        # Word-estimate mode: one pattern matches a whole chunk, the other
+        # skips ahead by the chunk step, both starting at a word boundary
+        words_per_chunk = max(1, chunk_size // 4)
+        step = max(1, words_per_chunk - chunk_overlap // 4)
+        self._window = re.compile(r'(?:\S++\s++){0,%d}+\S++' % (words_per_chunk - 1))
+        self._advance = re.compile(r'(?:\S++\s++){%d}' % step)
+
+    def normalize(self, text: str) -> str:
+        """
+        Clean extracted text.
+
+        Produces the same result as DocumentProcessor.clean_text in a
+        single pass over the text.
+
+        Args:
+            text: Raw extracted text
+
+        Returns:
+            Cleaned text
+        """
+        return _NOISE.sub('', text).strip()
+
+    def split(self, text: str) -> List[Tuple[int, int]]:
+        """
+        Compute chunk boundaries.
+
+        Args:
+            text: Normalized text
+
+        Returns:
+            List of (start, end) character offsets into `text`
+        """
+        if self.tokenizer is not None:
+            return self._split_tokens(text)
+        return self._split_words(text)
+
+    def _split_words(self, text: str) -> List[Tuple[int, int]]:
+        spans = []
+        pos = len(text) - len(text.lstrip())
+        limit = len(text.rstrip())
+
+        while pos < limit and len(spans) < self.max_chunks:
+            end = self._window.match(text, pos, limit).end()
+            if end - pos > self.min_chunk_chars:
+                spans.append((pos, end))
+
+            advance = self._advance.match(text, pos, limit)
+            if advance is None:
+                break
+            pos = advance.end()
+
+        return spans
+
+    def _split_tokens(self, text: str) -> List[Tuple[int, int]]:
+        tokens = self.tokenizer.encode(text, disallowed_special=())
+        _, offsets = self.tokenizer.decode_with_offsets(tokens)
+        step = max(1, self.chunk_size - self.chunk_overlap)
+
+        spans = []
+        for i in range(0, len(tokens), step):
+            start = offsets[i]
+            end = offsets[i + self.chunk_size] if i + self.chunk_size < len(tokens) else len(text)
+
+            # Trim whitespace at the edges without copying the text
+            while start < end and text[start].isspace():
+                start += 1
+            while end > start and text[end - 1].isspace():
+                end -= 1
+
+            if end - start > self.min_chunk_chars:
+                spans.append((start, end))
+                if len(spans) >= self.max_chunks:
+                    break
+
+            if i + self.chunk_size >= len(tokens):
+                break
+
+        return spans
+
+    def chunk(
+        self,
+        text: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Split normalized text into chunks with metadata.
+
+        Args:
+            text: Normalized text
+            metadata: Optional metadata to attach to each chunk
+
+        Returns:
+            List of chunks; metadata includes 'char_start' and 'char_end'
+        """
+        spans = self.split(text)
+        if len(spans) >= self.max_chunks:
+            logger.warning(f"Reached max chunks limit: {self.max_chunks}")
+
+        return [
+            {
+                'text': text[start:end],
+                'metadata': {
+                    **(metadata or {}),
+                    'chunk_index': i,
+                    'total_chunks': len(spans),
+                    'char_start': start,
+                    'char_end': end
+                }
+            }
+            for i, (start, end) in enumerate(spans)
+        ]
@@ -0,0 +1,85 @@
+"""
+Streaming Upload Writer
+
+This module writes uploaded files to disk in chunks without blocking the
+event loop, enforcing a size limit and computing the SHA-256 digest and
+size in the same pass over the bytes.
+"""
+
+from typing import Any, Tuple
+import asyncio
+import hashlib
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Bytes read from the upload and written per step
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class UploadTooLarge(Exception):
+    """Raised when an upload exceeds the size limit."""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(f"Upload exceeds the maximum size of {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+async def write_upload(
+    upload: Any,
+    file_path: str,
+    max_bytes: int,
+    chunk_size: int = UPLOAD_CHUNK_SIZE
+) -> Tuple[int, str]:
+    """
+    Stream an upload to disk, hashing it on the way.
+
+    The file is written under a temporary name and moved into place once
+    complete, so a rejected or failed upload never leaves a partial file
+    at `file_path`. Disk writes and hashing run in a worker thread.
+
+    Args:
+        upload: Starlette UploadFile (anything with async read(size))
+        file_path: Destination path
+        max_bytes: Size limit; larger uploads raise UploadTooLarge
+        chunk_size: Bytes per read/write step
+
+    Returns:
+        Tuple of (size in bytes, hex SHA-256 digest)
+    """
+    known_size = getattr(upload, "size", None)
+    if known_size is not None and known_size > max_bytes:
+        raise UploadTooLarge(max_bytes)
+
+    tmp_path = f"{file_path}.part"
+    digest = hashlib.sha256()
+    size = 0
+
+    def write_chunk(f, chunk: bytes):
+        digest.update(chunk)
+        f.write(chunk)
+
+    f = await asyncio.to_thread(open, tmp_path, "wb")
+    try:
+        while True:
+            chunk = await upload.read(chunk_size)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLarge(max_bytes)
+            await asyncio.to_thread(write_chunk, f, chunk)
+
+        await asyncio.to_thread(f.close)
+        await asyncio.to_thread(os.replace, tmp_path, file_path)
+    except BaseException:
+        await asyncio.to_thread(f.close)
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    logger.info(f"Stored upload {file_path} ({size} bytes)")
+    return size, digest.hexdigest()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Chunking Benchmark
+
+Compare DocumentProcessor.clean_text + chunk_text with the offset-based
+TextChunker on a corpus of documents (or a synthetic corpus).
+
+Usage:
+    python scripts/benchmark_chunking.py
+    python scripts/benchmark_chunking.py --source ./data/documents --repeat 5
+    python scripts/benchmark_chunking.py --synthetic-mb 50 --chunk-size 500 --chunk-overlap 50
+"""
+
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import List, Callable, Dict, Any
+import logging
+
+# Add the repository root to path (the app imports itself as backend.app)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from backend.app.utils.document_processor import DocumentProcessor
+from backend.app.utils.text_chunker import TextChunker
+
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+VOCABULARY = (
+    "energy power pool interconnection tariff agriculture fertilizer minerals "
+    "mining digital broadband protocol summit ECOWAS member states financing "
+    "investment regional integration policy framework implementation"
+).split()
+
+
+def synthetic_corpus(size_mb: float, doc_mb: float, seed: int = 42) -> List[str]:
+    """Generate policy-like documents with the noise clean_text removes."""
+    rng = random.Random(seed)
+    documents = []
+    target = int(size_mb * 1024 * 1024)
+    doc_target = int(doc_mb * 1024 * 1024)
+    total = 0
+
+    while total < target:
+        paragraphs = []
+        size = 0
+        while size < doc_target:
+            words = [rng.choice(VOCABULARY) for _ in range(rng.randint(30, 120))]
+            paragraph = rng.choice([" ", "  "]).join(words) + rng.choice([".", " •", " ©", "!"])
+            paragraphs.append(paragraph)
+            size += len(paragraph) + 4
+        doc = "\n\n\n\n".join(paragraphs)
+        documents.append(doc)
+        total += len(doc)
+
+    return documents
+
+
+def load_corpus(source: str, processor: DocumentProcessor) -> List[str]:
+    """Extract raw text from every supported file under a directory."""
+    documents = []
+    for path in sorted(Path(source).rglob('*')):
+        if path.is_file() and processor.is_supported(str(path)):
+            try:
+                documents.append(processor.extract_text(str(path)))
+            except Exception as e:
+                logger.warning(f"Skipping {path}: {e}")
+    return documents
+
+
+def measure(run: Callable[[], int], repeat: int) -> Dict[str, Any]:
+    """Best-of-N wall time, plus peak traced memory of one extra run."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        chunks = run()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {'seconds': min(times), 'chunks': chunks, 'peak_mb': peak / 1024 / 1024}
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description='Benchmark legacy chunking against TextChunker'
+    )
+    parser.add_argument('--source', type=str, help='Directory of documents to use as corpus')
+    parser.add_argument('--synthetic-mb', type=float, default=20, help='Size of synthetic corpus (default: 20)')
+    parser.add_argument('--doc-mb', type=float, default=2, help='Size of each synthetic document (default: 2)')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='Chunk size in tokens (default: 1000)')
+    parser.add_argument('--chunk-overlap', type=int, default=200, help='Chunk overlap in tokens (default: 200)')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per implementation (default: 3)')
+    args = parser.parse_args()
+
+    # No chunk limit, so both implementations process every document fully
+    processor = DocumentProcessor(
+        chunk_size=args.chunk_size,
+        chunk_overlap=args.chunk_overlap,
+        max_chunks_per_doc=sys.maxsize
+    )
+    chunker = TextChunker(
+        chunk_size=args.chunk_size,
+        chunk_overlap=args.chunk_overlap,
+        max_chunks=sys.maxsize
+    )
+
+    documents = load_corpus(args.source, processor) if args.source else synthetic_corpus(args.synthetic_mb, args.doc_mb)
+    corpus_mb = sum(len(doc) for doc in documents) / 1024 / 1024
+    if not documents:
+        print("No documents to benchmark")
+        sys.exit(1)
+
+    def legacy() -> int:
+        return sum(len(processor.chunk_text(processor.clean_text(doc))) for doc in documents)
+
+    def offsets() -> int:
+        return sum(len(chunker.chunk(chunker.normalize(doc))) for doc in documents)
+
+    results = {
+        'legacy (clean_text + chunk_text)': measure(legacy, args.repeat),
+        'TextChunker (normalize + chunk)': measure(offsets, args.repeat),
+    }
+
+    print("\n" + "="*60)
+    print("CHUNKING BENCHMARK")
+    print("="*60)
+    print(f"Documents: {len(documents)} ({corpus_mb:.1f} MB)")
+    print(f"Chunk size/overlap: {args.chunk_size}/{args.chunk_overlap}")
+    for name, result in results.items():
+        print(f"\n{name}")
+        print(f"  Time: {result['seconds']:.3f}s ({corpus_mb / result['seconds']:.1f} MB/s)")
+        print(f"  Chunks: {result['chunks']}")
+        print(f"  Peak memory: {result['peak_mb']:.1f} MB")
+
+    legacy_result, new_result = results.values()
+    print(f"\nSpeedup: {legacy_result['seconds'] / new_result['seconds']:.2f}x")
+    print("="*60)
+
+
+if __name__ == '__main__':
+    main()
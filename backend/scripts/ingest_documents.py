@@ -7,6 +7,10 @@ Batch ingest documents into the Pinecone knowledge base.
 Usage:
     python scripts/ingest_documents.py --source ./data/documents --twg energy
     python scripts/ingest_documents.py --file ./policy.pdf --twg agriculture
+    python scripts/ingest_documents.py --source ./data/documents --twg energy --incremental
+    python scripts/ingest_documents.py --source ./data/documents --twg energy --workers 8
+    python scripts/ingest_documents.py --source ./data/documents --twg energy --bulk
+    python scripts/ingest_documents.py --source ./data/documents --twg energy --no-extraction-cache
     python scripts/ingest_documents.py --reindex
 """
 
@@ -14,7 +18,7 @@ import argparse
 import sys
 import os
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 import logging
 from tqdm import tqdm
 from dotenv import load_dotenv
@@ -27,6 +31,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from app.core.knowledge_base import get_knowledge_base
 from app.utils.document_processor import get_document_processor
+from app.utils.ingest_manifest import IngestManifest, file_digest, chunk_hash
 
 # Setup logging
 logging.basicConfig(
@@ -36,21 +41,57 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+DEFAULT_MANIFEST_PATH = './data/ingest_manifest.json'
+
+# Pinecone accepts at most 1000 IDs per delete request
+DELETE_BATCH_SIZE = 1000
+
+
 class DocumentIngester:
     """Handles batch document ingestion."""
     
-    def __init__(self, dry_run: bool = False):
+    def __init__(
+        self,
+        dry_run: bool = False,
+        incremental: bool = False,
+        manifest_path: str = DEFAULT_MANIFEST_PATH,
+        workers: int = 1,
+        timeout: Optional[float] = None,
+        bulk: bool = False,
+        extraction_cache: bool = True
+    ):
         """
         Initialize ingester.
         
         Args:
             dry_run: If True, don't actually upload to Pinecone
+            incremental: If True, only upsert new or changed chunks and delete
+                orphaned vectors, tracked through the ingest manifest
+            manifest_path: Path of the ingest manifest (incremental mode)
+            workers: Worker processes for text extraction in directory
+                ingestion; 1 extracts in this process
+            timeout: Per-file extraction timeout in seconds (workers > 1)
+            bulk: If True, directory ingestion packs the chunks of all files
+                into one upsert, so batches are full and repeated chunks are
+                embedded once
+            extraction_cache: If True, reuse text extracted by earlier runs
+                (EXTRACTION_CACHE_DIR), so re-chunking skips parsing
         """
         self.dry_run = dry_run
         self.kb = get_knowledge_base()
         self.processor = get_document_processor()
+        if not extraction_cache:
+            self.processor.extraction_cache = None
+        self.manifest = IngestManifest(manifest_path) if incremental else None
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.bulk = bulk
         
-        logger.info(f"Initialized DocumentIngester (dry_run={dry_run})")
+        logger.info(
+            f"Initialized DocumentIngester (dry_run={dry_run}, incremental={incremental}, "
+            f"workers={self.workers}, bulk={bulk}, "
+            f"extraction_cache={self.processor.extraction_cache is not None})"
+        )
     
     def scan_directory(self, directory: str) -> List[str]:
         """
@@ -92,37 +133,95 @@ class DocumentIngester:
         """
         try:
             logger.info(f"Ingesting: {file_path}")
+            namespace = namespace or f"twg-{twg}"
+            
+            digest, unchanged = self._check_unchanged(file_path, twg, namespace)
+            if unchanged:
+                return unchanged
             
             # Process document
             result = self.processor.process_document(
                 file_path,
-                additional_metadata={'twg': twg}
+                additional_metadata={'twg': twg},
+                file_sha256=digest
             )
             
+        except Exception as e:
+            logger.error(f"Error ingesting {file_path}: {e}")
+            return {
+                'file_path': file_path,
+                'status': 'failed',
+                'error': str(e)
+            }
+        
+        return self.ingest_processed(result, twg, namespace, digest)
+    
+    def _check_unchanged(
+        self,
+        file_path: str,
+        twg: str,
+        namespace: str
+    ) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """
+        Compare a file with the manifest (incremental mode).
+        
+        Returns:
+            Tuple of (file digest, 'unchanged' result if the file can be skipped)
+        """
+        if self.manifest is None:
+            return None, None
+        
+        digest = file_digest(file_path)
+        entry = self.manifest.get(os.path.abspath(file_path))
+        if (
+            entry
+            and entry['file_sha256'] == digest
+            and entry['namespace'] == namespace
+            and entry['twg'] == twg
+        ):
+            logger.info(f"Unchanged since last ingest, skipping: {file_path}")
+            return digest, {
+                'file_path': file_path,
+                'status': 'unchanged',
+                'chunks': len(entry['chunks']),
+                'vectors_upserted': 0,
+                'vectors_deleted': 0
+            }
+        
+        return digest, None
+    
+    def ingest_processed(
+        self,
+        result: Dict[str, Any],
+        twg: str,
+        namespace: str,
+        digest: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Embed and upload an already processed document.
+        
+        Args:
+            result: Result of DocumentProcessor.process_document
+            twg: TWG identifier
+            namespace: Pinecone namespace
+            digest: SHA-256 of the file (incremental mode)
+            
+        Returns:
+            Dict with ingestion result
+        """
+        file_path = result['file_path']
+        
+        try:
             if result['status'] != 'success':
                 return result
             
-            # Prepare documents for Pinecone
-            chunks = result['chunks']
-            documents = []
+            documents = self._build_documents(result, twg)
             
-            file_id = Path(file_path).stem
-            
-            for i, chunk in enumerate(chunks):
-                doc = {
-                    'id': f"{file_id}_chunk_{i}",
-                    'text': chunk['text'],
-                    'metadata': {
-                        **chunk['metadata'],
-                        'twg': twg,
-                        'source_file': file_path
-                    }
-                }
-                documents.append(doc)
+            if self.manifest is not None:
+                return self._sync_file(file_path, twg, namespace, digest, documents)
             
             # Upload to Pinecone
             if not self.dry_run:
-                namespace = namespace or f"twg-{twg}"
                 upsert_result = self.kb.upsert_documents(
                     documents=documents,
                     namespace=namespace
@@ -152,6 +251,243 @@ class DocumentIngester:
                 'error': str(e)
             }
     
+    def _build_documents(self, result: Dict[str, Any], twg: str) -> List[Dict[str, Any]]:
+        """Prepare a processed document's chunks for Pinecone."""
+        file_path = result['file_path']
+        file_id = Path(file_path).stem
+        
+        return [
+            {
+                'id': f"{file_id}_chunk_{i}",
+                'text': chunk['text'],
+                'metadata': {
+                    **chunk['metadata'],
+                    'twg': twg,
+                    'source_file': file_path
+                }
+            }
+            for i, chunk in enumerate(result['chunks'])
+        ]
+    
+    def _sync_file(
+        self,
+        file_path: str,
+        twg: str,
+        namespace: str,
+        digest: str,
+        documents: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Bring one file's vectors in line with its current chunks.
+        
+        Only chunks whose content hash differs from the manifest are
+        embedded and upserted; vectors of chunks that no longer exist are
+        deleted.
+        
+        Args:
+            file_path: Path to file
+            twg: TWG identifier
+            namespace: Pinecone namespace
+            digest: SHA-256 of the file
+            documents: Chunks prepared for upsert
+            
+        Returns:
+            Dict with ingestion result
+        """
+        chunks, changed, orphaned, orphaned_namespace = self._plan_sync(file_path, namespace, documents)
+        
+        if self.dry_run:
+            logger.info(
+                f"[DRY RUN] Would upsert {len(changed)} and delete {len(orphaned)} vectors"
+            )
+            return {
+                'file_path': file_path,
+                'status': 'dry_run',
+                'chunks': len(documents),
+                'vectors_upserted': len(changed),
+                'vectors_deleted': len(orphaned)
+            }
+        
+        upserted = 0
+        if changed:
+            upsert_result = self.kb.upsert_documents(
+                documents=[documents[i] for i in changed],
+                namespace=namespace
+            )
+            upserted = upsert_result['total_upserted']
+        
+        deleted = self._delete_vectors(orphaned, orphaned_namespace)
+        
+        self.manifest.record(os.path.abspath(file_path), namespace, twg, digest, chunks)
+        self.manifest.save()
+        
+        logger.info(
+            f"Synced {file_path}: {upserted} upserted, "
+            f"{len(documents) - len(changed)} unchanged, {deleted} deleted"
+        )
+        return {
+            'file_path': file_path,
+            'status': 'success',
+            'chunks': len(documents),
+            'vectors_upserted': upserted,
+            'vectors_deleted': deleted
+        }
+    
+    def _plan_sync(
+        self,
+        file_path: str,
+        namespace: str,
+        documents: List[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, Any]], List[int], List[str], str]:
+        """
+        Diff a file's chunks against the manifest.
+        
+        Returns:
+            Tuple of (manifest chunk entries, indices of documents to upsert,
+            orphaned vector IDs, namespace of the orphaned vectors)
+        """
+        doc_key = os.path.abspath(file_path)
+        chunks = [
+            {
+                'index': i,
+                'hash': chunk_hash(doc['text'], doc['metadata']),
+                'vector_id': doc['id']
+            }
+            for i, doc in enumerate(documents)
+        ]
+        
+        entry = self.manifest.get(doc_key)
+        if entry and entry['namespace'] != namespace:
+            # Moved to another namespace: everything old is orphaned
+            orphaned = [chunk['vector_id'] for chunk in entry['chunks']]
+            return chunks, list(range(len(documents))), orphaned, entry['namespace']
+        
+        changed, orphaned = self.manifest.diff_chunks(doc_key, chunks)
+        return chunks, changed, orphaned, namespace
+    
+    def ingest_bulk(
+        self,
+        results: List[Dict[str, Any]],
+        twg: str,
+        namespace: str,
+        digests: Optional[Dict[str, str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Embed and upload many processed documents in one packed upsert.
+        
+        Chunks of all documents are concatenated, so every embedding and
+        upsert batch is full, and chunks repeated across documents are
+        embedded once. Each chunk still gets its own vector, so documents
+        can be re-synced or deleted independently.
+        
+        Args:
+            results: Results of DocumentProcessor.process_document
+            twg: TWG identifier
+            namespace: Pinecone namespace
+            digests: SHA-256 per file path (incremental mode)
+            
+        Returns:
+            One ingestion result per document, in input order
+        """
+        digests = digests or {}
+        outcomes: List[Optional[Dict[str, Any]]] = []
+        pending = []
+        packed = []
+        seen_texts = set()
+        
+        for result in results:
+            if result['status'] != 'success':
+                outcomes.append(result)
+                continue
+            
+            file_path = result['file_path']
+            documents = self._build_documents(result, twg)
+            if self.manifest is not None:
+                chunks, changed, orphaned, orphaned_namespace = self._plan_sync(file_path, namespace, documents)
+            else:
+                chunks, changed, orphaned, orphaned_namespace = None, list(range(len(documents))), [], namespace
+            
+            duplicates = 0
+            for i in changed:
+                if documents[i]['text'] in seen_texts:
+                    duplicates += 1
+                seen_texts.add(documents[i]['text'])
+                packed.append(documents[i])
+            
+            pending.append((len(outcomes), file_path, documents, chunks, changed, orphaned, orphaned_namespace))
+            outcomes.append({
+                'file_path': file_path,
+                'status': 'dry_run' if self.dry_run else 'success',
+                'chunks': len(documents),
+                'vectors_upserted': len(changed),
+                'vectors_deleted': len(orphaned),
+                'duplicate_chunks': duplicates
+            })
+        
+        if self.dry_run:
+            logger.info(f"[DRY RUN] Would upsert {len(packed)} vectors from {len(pending)} documents")
+            return outcomes
+        
+        if packed:
+            try:
+                upsert_result = self.kb.upsert_documents(documents=packed, namespace=namespace)
+            except Exception as e:
+                logger.error(f"Bulk upsert into {namespace} failed: {e}")
+                for index, file_path, *_ in pending:
+                    outcomes[index] = {'file_path': file_path, 'status': 'failed', 'error': str(e)}
+                return outcomes
+            
+            logger.info(
+                f"Bulk upserted {upsert_result['total_upserted']} vectors from {len(pending)} documents "
+                f"in {upsert_result['batches']} batches ({upsert_result['embeddings_reused']} embeddings reused)"
+            )
+        
+        if self.manifest is not None:
+            for index, file_path, documents, chunks, changed, orphaned, orphaned_namespace in pending:
+                self._delete_vectors(orphaned, orphaned_namespace)
+                self.manifest.record(os.path.abspath(file_path), namespace, twg, digests.get(file_path), chunks)
+            self.manifest.save()
+        
+        return outcomes
+    
+    def _delete_vectors(self, ids: List[str], namespace: str) -> int:
+        """Delete vectors in batches; returns the number deleted."""
+        for i in range(0, len(ids), DELETE_BATCH_SIZE):
+            self.kb.delete_documents(ids[i:i + DELETE_BATCH_SIZE], namespace=namespace)
+        return len(ids)
+    
+    def purge_documents(self, doc_keys: List[str]) -> int:
+        """
+        Delete the vectors of documents whose source file is gone.
+        
+        Args:
+            doc_keys: Manifest keys of the removed documents
+            
+        Returns:
+            Number of vectors deleted
+        """
+        by_namespace: Dict[str, List[str]] = {}
+        for doc_key in doc_keys:
+            entry = self.manifest.get(doc_key)
+            if entry:
+                by_namespace.setdefault(entry['namespace'], []).extend(
+                    chunk['vector_id'] for chunk in entry['chunks']
+                )
+        
+        if self.dry_run:
+            return sum(len(ids) for ids in by_namespace.values())
+        
+        deleted = 0
+        for namespace, ids in by_namespace.items():
+            deleted += self._delete_vectors(ids, namespace)
+        
+        for doc_key in doc_keys:
+            self.manifest.remove(doc_key)
+        self.manifest.save()
+        
+        logger.info(f"Purged {deleted} vectors of {len(doc_keys)} removed documents")
+        return deleted
+    
     def ingest_directory(
         self,
         directory: str,
@@ -185,11 +521,10 @@ class DocumentIngester:
         failed = 0
         total_chunks = 0
         
-        for file_path in tqdm(files, desc="Ingesting documents"):
-            result = self.ingest_file(file_path, twg, namespace)
+        for result in self._ingest_files(files, twg, namespace):
             results.append(result)
             
-            if result['status'] == 'success':
+            if result['status'] in ('success', 'unchanged'):
                 successful += 1
                 total_chunks += result.get('chunks', 0)
             elif result['status'] == 'failed':
@@ -205,26 +540,130 @@ class DocumentIngester:
             'results': results
         }
         
+        if self.bulk:
+            summary['duplicate_chunks'] = sum(r.get('duplicate_chunks', 0) for r in results)
+        
+        if self.manifest is not None:
+            scanned = {os.path.abspath(file_path) for file_path in files}
+            removed = [
+                doc_key for doc_key in self.manifest.documents_under(directory)
+                if doc_key not in scanned
+            ]
+            summary['unchanged'] = sum(1 for r in results if r['status'] == 'unchanged')
+            summary['vectors_upserted'] = sum(r.get('vectors_upserted', 0) for r in results)
+            summary['vectors_deleted'] = (
+                sum(r.get('vectors_deleted', 0) for r in results)
+                + self.purge_documents(removed)
+            )
+            summary['documents_removed'] = len(removed)
+        
         logger.info(f"Ingestion complete: {successful}/{len(files)} successful")
         return summary
     
+    def _ingest_files(
+        self,
+        files: List[str],
+        twg: str,
+        namespace: str = None
+    ):
+        """
+        Ingest files, yielding each result as it completes.
+        
+        With more than one worker, extraction runs in a process pool and
+        each document is embedded and uploaded as soon as it is extracted.
+        In bulk mode all documents are extracted first and uploaded
+        together (see ingest_bulk).
+        """
+        if self.workers <= 1 and not self.bulk:
+            for file_path in tqdm(files, desc="Ingesting documents"):
+                yield self.ingest_file(file_path, twg, namespace)
+            return
+        
+        namespace = namespace or f"twg-{twg}"
+        digests = {}
+        to_process = []
+        
+        for file_path in files:
+            try:
+                digest, unchanged = self._check_unchanged(file_path, twg, namespace)
+            except Exception as e:
+                logger.error(f"Error ingesting {file_path}: {e}")
+                yield {'file_path': file_path, 'status': 'failed', 'error': str(e)}
+                continue
+            
+            if unchanged:
+                yield unchanged
+            else:
+                digests[file_path] = digest
+                to_process.append(file_path)
+        
+        if self.workers > 1:
+            processed = self.processor.iter_process(
+                to_process,
+                additional_metadata={'twg': twg},
+                workers=self.workers,
+                timeout=self.timeout
+            )
+        else:
+            processed = (
+                self.processor.process_document(
+                    file_path,
+                    additional_metadata={'twg': twg},
+                    file_sha256=digests.get(file_path)
+                )
+                for file_path in to_process
+            )
+        processed = tqdm(processed, total=len(to_process), desc="Extracting documents" if self.bulk else "Ingesting documents")
+        
+        if self.bulk:
+            yield from self.ingest_bulk(list(processed), twg, namespace, digests)
+            return
+        
+        for result in processed:
+            yield self.ingest_processed(result, twg, namespace, digests.get(result['file_path']))
+    
     def reindex_all(self) -> Dict[str, Any]:
         """
         Re-index entire knowledge base.
         
-        This would typically:
-        1. Fetch all documents from database
-        2. Re-process and re-embed them
-        3. Update Pinecone index
+        Re-syncs every document recorded in the ingest manifest: changed
+        files are re-processed incrementally and the vectors of files that
+        no longer exist are deleted.
         
         Returns:
             Dict with re-indexing summary
         """
-        logger.warning("Re-indexing not yet implemented")
-        return {
-            'status': 'not_implemented',
-            'message': 'Re-indexing feature coming soon'
+        if self.manifest is None:
+            logger.warning("Re-indexing requires the ingest manifest (--incremental)")
+            return {
+                'status': 'not_implemented',
+                'message': 'Re-indexing requires --incremental'
+            }
+        
+        results = []
+        removed = []
+        for doc_key, entry in tqdm(list(self.manifest.documents.items()), desc="Re-indexing documents"):
+            if os.path.exists(doc_key):
+                results.append(self.ingest_file(doc_key, entry['twg'], entry['namespace']))
+            else:
+                removed.append(doc_key)
+        
+        vectors_deleted = self.purge_documents(removed)
+        
+        summary = {
+            'status': 'completed',
+            'total_files': len(results),
+            'successful': sum(1 for r in results if r['status'] in ('success', 'unchanged')),
+            'failed': sum(1 for r in results if r['status'] == 'failed'),
+            'unchanged': sum(1 for r in results if r['status'] == 'unchanged'),
+            'vectors_upserted': sum(r.get('vectors_upserted', 0) for r in results),
+            'vectors_deleted': vectors_deleted + sum(r.get('vectors_deleted', 0) for r in results),
+            'documents_removed': len(removed),
+            'results': results
         }
+        
+        logger.info(f"Re-indexing complete: {summary['successful']}/{len(results)} successful")
+        return summary
 
 
 def main():
@@ -266,6 +705,45 @@ def main():
         help='Re-index entire knowledge base'
     )
     
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Only upsert new or changed chunks and delete orphaned vectors'
+    )
+    
+    parser.add_argument(
+        '--manifest',
+        type=str,
+        default=DEFAULT_MANIFEST_PATH,
+        help=f'Ingest manifest path for --incremental (default: {DEFAULT_MANIFEST_PATH})'
+    )
+    
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Worker processes for text extraction (default: 1)'
+    )
+    
+    parser.add_argument(
+        '--timeout',
+        type=float,
+        default=float(os.getenv('DOCUMENT_EXTRACTION_TIMEOUT', '300')),
+        help='Per-file extraction timeout in seconds when --workers > 1 (default: 300)'
+    )
+    
+    parser.add_argument(
+        '--bulk',
+        action='store_true',
+        help='Pack the chunks of all files into one upsert (directory ingestion)'
+    )
+    
+    parser.add_argument(
+        '--no-extraction-cache',
+        action='store_true',
+        help='Parse every file again instead of reusing cached extracted text'
+    )
+    
     parser.add_argument(
         '--dry-run',
         action='store_true',
@@ -275,7 +753,15 @@ def main():
     args = parser.parse_args()
     
     # Initialize ingester
-    ingester = DocumentIngester(dry_run=args.dry_run)
+    ingester = DocumentIngester(
+        dry_run=args.dry_run,
+        incremental=args.incremental or args.reindex,
+        manifest_path=args.manifest,
+        workers=args.workers,
+        timeout=args.timeout,
+        bulk=args.bulk,
+        extraction_cache=not args.no_extraction_cache
+    )
     
     # Execute ingestion
     if args.reindex:
@@ -314,8 +800,18 @@ def main():
         print(f"File: {result.get('file_path')}")
         print(f"Status: {result.get('status')}")
         print(f"Chunks: {result.get('chunks', 0)}")
-        if result.get('status') == 'success':
+        if result.get('status') in ['success', 'unchanged']:
             print(f"Vectors Upserted: {result.get('vectors_upserted', 0)}")
+        if 'vectors_deleted' in result:
+            print(f"Vectors Deleted: {result.get('vectors_deleted', 0)}")
+    
+    elif args.reindex:
+        print(f"Total Files: {result.get('total_files', 0)}")
+        print(f"Successful: {result.get('successful', 0)}")
+        print(f"Failed: {result.get('failed', 0)}")
+        print(f"Unchanged: {result.get('unchanged', 0)}")
+        print(f"Vectors Upserted: {result.get('vectors_upserted', 0)}")
+        print(f"Vectors Deleted: {result.get('vectors_deleted', 0)}")
     
     elif args.source:
         print(f"Directory: {result.get('directory')}")
@@ -323,11 +819,17 @@ def main():
         print(f"Successful: {result.get('successful', 0)}")
         print(f"Failed: {result.get('failed', 0)}")
         print(f"Total Chunks: {result.get('total_chunks', 0)}")
+        if 'duplicate_chunks' in result:
+            print(f"Duplicate Chunks: {result.get('duplicate_chunks', 0)}")
+        if 'vectors_deleted' in result:
+            print(f"Unchanged: {result.get('unchanged', 0)}")
+            print(f"Vectors Upserted: {result.get('vectors_upserted', 0)}")
+            print(f"Vectors Deleted: {result.get('vectors_deleted', 0)}")
     
     print("="*60)
     
     # Exit with appropriate code
-    if result.get('status') in ['success', 'completed', 'dry_run']:
+    if result.get('status') in ['success', 'completed', 'dry_run', 'unchanged']:
         sys.exit(0)
     else:
         sys.exit(1)
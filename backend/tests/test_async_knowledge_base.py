@@ -0,0 +1,91 @@
+"""
+Tests for the Async Knowledge Base Facade
+
+Unit tests for non-blocking upsert, search and delete over the local
+vector store.
+"""
+
+import pytest
+from app.core.async_knowledge_base import AsyncKnowledgeBase
+from app.core.knowledge_base import KnowledgeBase
+from app.core.embedding_cache import EmbeddingCache
+from app.core.search_cache import SearchResultCache
+from app.core.vector_store import LocalVectorStore
+
+
+class FakeAsyncEmbedder:
+    """Maps known words to fixed directions."""
+
+    AXES = {"solar": [1.0, 0.0, 0.0], "maize": [0.0, 1.0, 0.0], "fibre": [0.0, 0.0, 1.0]}
+
+    def __init__(self):
+        self.calls = []
+
+    async def embed(self, texts):
+        self.calls.append(list(texts))
+        return [self.AXES[text.split()[0]] for text in texts]
+
+    async def aclose(self):
+        pass
+
+
+@pytest.fixture
+def akb(tmp_path):
+    kb = KnowledgeBase(
+        vector_store=LocalVectorStore(path=str(tmp_path), dimension=3),
+        embedding_model="m",
+        dimension=3,
+        embedding_client=object(),
+        embedding_cache=EmbeddingCache(model="m", dimension=3),
+        search_cache=SearchResultCache(ttl=60)
+    )
+    return AsyncKnowledgeBase(kb=kb, embedding_client=FakeAsyncEmbedder())
+
+
+async def test_upsert_and_search(akb):
+    documents = [
+        {"id": "d1_chunk_0", "text": "solar mini-grids", "metadata": {"twg": "energy"}},
+        {"id": "d2_chunk_0", "text": "maize yields", "metadata": {"twg": "agriculture"}},
+    ]
+    result = await akb.upsert(documents, namespace="twg-general", batch_size=1)
+
+    assert result["total_upserted"] == 2
+    assert result["batches"] == 2
+    assert set(result["timings"]) == {"embed", "upsert", "backpressure_wait", "total"}
+
+    results = await akb.search("solar", namespace="twg-general", top_k=1)
+    assert results[0]["id"] == "d1_chunk_0"
+
+
+async def test_search_results_refresh_after_delete(akb):
+    await akb.upsert([{"id": "d1_chunk_0", "text": "solar plan"}], namespace="twg-general")
+    assert len(await akb.search("solar", namespace="twg-general")) == 1
+    # Second call is served from the embedding and search caches
+    assert len(await akb.search("solar", namespace="twg-general")) == 1
+    assert akb.kb.search_cache.get_stats()["hits"] == 1
+
+    await akb.delete(["d1_chunk_0"], namespace="twg-general")
+    assert await akb.search("solar", namespace="twg-general") == []
+
+
+async def test_embeddings_shared_with_sync_cache(akb):
+    await akb.generate_embeddings(["fibre backbone", "fibre backbone"])
+    await akb.generate_embeddings(["fibre backbone"])
+
+    assert akb.embedding_client.calls == [["fibre backbone"]]
+
+
+async def test_search_namespaces_merges_by_score(akb):
+    await akb.upsert([{"id": "e_chunk_0", "text": "solar parks"}], namespace="twg-energy")
+    await akb.upsert([{"id": "a_chunk_0", "text": "maize solar dryers"}], namespace="twg-agriculture")
+    await akb.upsert([{"id": "g_chunk_0", "text": "fibre links"}], namespace="twg-general")
+    akb.embedding_client.calls.clear()
+
+    results = await akb.search_namespaces(
+        "solar", ["twg-energy", "twg-agriculture", "twg-general", "twg-energy"], top_k=3, min_score=0.5
+    )
+
+    # One embedding for the whole fan-out; the orthogonal match is cut off
+    assert akb.embedding_client.calls == [["solar"]]
+    assert [(r["id"], r["namespace"]) for r in results] == [("e_chunk_0", "twg-energy")]
+    assert await akb.search_namespaces("solar", []) == []
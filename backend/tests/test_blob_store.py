@@ -0,0 +1,96 @@
+"""
+Tests for the Content-Addressed Blob Store
+
+Unit tests for storing uploads once per digest and releasing them.
+"""
+
+import asyncio
+import hashlib
+import io
+import os
+import pytest
+from app.utils.blob_store import BlobStore
+
+
+class FakeUpload:
+    def __init__(self, data, filename):
+        self.file = io.BytesIO(data)
+        self.filename = filename
+        self.size = len(data)
+
+    async def read(self, size=-1):
+        return self.file.read(size)
+
+
+async def test_duplicate_upload_reuses_blob(tmp_path):
+    store = BlobStore(str(tmp_path))
+    data = b"%PDF-1.7 communique"
+    digest = hashlib.sha256(data).hexdigest()
+
+    path, size, sha, existed = await store.store_upload(FakeUpload(data, "Communique.PDF"), max_bytes=1000)
+    assert (size, sha, existed) == (len(data), digest, False)
+    assert path == str(tmp_path / digest[:2] / f"{digest}.pdf")
+
+    again, _, _, existed = await store.store_upload(FakeUpload(data, "copy.pdf"), max_bytes=1000)
+    assert again == path and existed
+    assert list((tmp_path / "tmp").iterdir()) == []
+
+    other, _, _, existed = await store.store_upload(FakeUpload(data, "communique.txt"), max_bytes=1000)
+    assert other != path and not existed
+
+
+async def test_release_keeps_referenced_blobs(tmp_path):
+    store = BlobStore(str(tmp_path))
+    path, _, _, _ = await store.store_upload(FakeUpload(b"minutes", "minutes.txt"), max_bytes=1000)
+
+    async def referenced():
+        return True
+
+    async def unreferenced():
+        return False
+
+    assert not await store.release(path, referenced)
+    assert await store.release(path, unreferenced)
+    assert not await store.release(path, unreferenced)
+
+
+async def test_release_waits_for_an_upload_recording_its_reference(tmp_path):
+    store = BlobStore(str(tmp_path))
+    data = b"%PDF-1.7 communique"
+    path, _, _, _ = await store.store_upload(FakeUpload(data, "a.pdf"), max_bytes=1000)
+    references = []
+    registering = asyncio.Event()
+
+    async def register(path, size, digest, existed):
+        registering.set()
+        await asyncio.sleep(0.05)
+        references.append(path)
+
+    async def is_referenced():
+        return bool(references)
+
+    upload = asyncio.ensure_future(store.store_upload(FakeUpload(data, "b.pdf"), 1000, register=register))
+    await registering.wait()
+
+    # Another worker's delete checks references only once the upload's row exists
+    assert not await BlobStore(str(tmp_path)).release(path, is_referenced)
+    assert (await upload)[3]
+    assert os.path.exists(path)
+
+
+async def test_new_blob_is_removed_when_registering_fails(tmp_path):
+    store = BlobStore(str(tmp_path))
+    data = b"%PDF-1.7 communique"
+
+    async def failing_register(path, size, digest, existed):
+        raise RuntimeError("insert failed")
+
+    with pytest.raises(RuntimeError):
+        await store.store_upload(FakeUpload(data, "a.pdf"), 1000, register=failing_register)
+    assert not os.path.exists(store.path_for(hashlib.sha256(data).hexdigest(), "a.pdf"))
+
+    # A blob that was already stored stays, since other documents reference it
+    path, _, _, _ = await store.store_upload(FakeUpload(data, "a.pdf"), max_bytes=1000)
+    with pytest.raises(RuntimeError):
+        await store.store_upload(FakeUpload(data, "b.pdf"), 1000, register=failing_register)
+    assert os.path.exists(path)
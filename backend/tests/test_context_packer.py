@@ -0,0 +1,80 @@
+"""
+Tests for the Context Packer
+
+Unit tests for merging overlapping chunks, MMR ordering across sources and
+fitting the context to a token budget.
+"""
+
+import re
+from app.utils.context_packer import ContextPacker, _join_overlapping
+from app.utils.text_chunker import TextChunker
+
+TEXT = " ".join(f"word{i}" for i in range(120))
+
+
+class WordTokenizer:
+    """Stands in for a tiktoken encoding: one token per word, with its leading space."""
+
+    def encode(self, text, disallowed_special=()):
+        return re.findall(r"\s*\S+|\s+$", text)
+
+    def decode(self, tokens):
+        return "".join(tokens)
+
+
+def result(id, text, score, **metadata):
+    return {"id": id, "score": score, "metadata": {"text": text, **metadata}}
+
+
+def test_offset_chunks_are_merged_into_one_passage():
+    chunks = TextChunker(chunk_size=160, chunk_overlap=40, min_chunk_chars=0).chunk(TEXT, {"doc_id": "a"})
+    results = [result(f"a_chunk_{i}", c["text"], 0.9 - i / 10, **c["metadata"]) for i, c in enumerate(chunks)]
+
+    passages = ContextPacker().merge(results[::-1])
+
+    assert len(passages) == 1
+    assert passages[0]["text"] == TEXT
+    assert passages[0]["chunks"] == len(chunks)
+    assert passages[0]["score"] == 0.9
+
+
+def test_consecutive_chunks_without_offsets_drop_repeated_words():
+    assert _join_overlapping("a b c d", "c d e f") == "a b c d e f"
+    assert _join_overlapping("a b", "c d") == "a b c d"
+
+    passages = ContextPacker().merge([
+        result("x_chunk_0", "a b c d", 0.8, source_file="x.pdf", chunk_index=0),
+        result("x_chunk_1", "c d e f", 0.7, source_file="x.pdf", chunk_index=1),
+        result("x_chunk_3", "h i", 0.6, source_file="x.pdf", chunk_index=3),
+    ])
+    assert [p["text"] for p in passages] == ["a b c d e f", "h i"]
+
+
+def test_mmr_prefers_a_new_source_over_a_near_duplicate():
+    packer = ContextPacker(mmr_lambda=0.5)
+    ordered = packer.order(packer.merge([
+        result("a_chunk_0", "wapp tariffs harmonised trade grids", 0.95, doc_id="a", chunk_index=0),
+        result("a_chunk_5", "wapp tariffs harmonised trade grids region", 0.9, doc_id="a", chunk_index=5),
+        result("b_chunk_0", "cocoa yields smallholder farmers", 0.8, doc_id="b", chunk_index=0),
+    ]))
+
+    assert [p["doc_key"] for p in ordered] == ["a", "b", "a"]
+
+
+def test_pack_fills_budget_exactly_with_tokenizer():
+    packer = ContextPacker(tokenizer=WordTokenizer(), min_fragment_tokens=5)
+    results = [
+        result("a_chunk_0", " ".join(["alpha"] * 30), 0.9, doc_id="a", filename="a.pdf"),
+        result("b_chunk_0", " ".join(["beta"] * 30), 0.8, doc_id="b", filename="b.pdf"),
+    ]
+
+    context, stats = packer.pack(results, max_tokens=60)
+
+    assert stats["tokens"] == packer.count_tokens(context) <= 60
+    assert stats["sources"] == 2
+    assert "[Source 1: a.pdf (Relevance: 0.90)]" in context
+    assert context.count("alpha") == 30
+    assert 0 < context.count("beta") < 30
+
+    context, stats = packer.pack(results, max_tokens=20)
+    assert stats["sources"] == 1 and stats["tokens"] <= 20
@@ -0,0 +1,90 @@
+"""
+Tests for the Document Processor
+
+Unit tests for streaming extraction and chunking, and for batch processing
+in worker processes: completion-order streaming, input-order batch results
+and per-file timeouts.
+"""
+
+import time
+import pytest
+from app.utils import document_processor
+from app.utils.document_processor import DocumentProcessor
+
+PARAGRAPH = "The West African Power Pool coordinates cross-border electricity trade. " * 5
+
+
+class SlowProcessor(DocumentProcessor):
+    def process_document(self, file_path, additional_metadata=None):
+        if "slow" in file_path:
+            time.sleep(30)
+        return super().process_document(file_path, additional_metadata)
+
+
+def write_docs(tmp_path, names):
+    paths = []
+    for name in names:
+        path = tmp_path / name
+        path.write_text(PARAGRAPH)
+        paths.append(str(path))
+    return paths
+
+
+def test_batch_process_with_workers_keeps_input_order(tmp_path):
+    paths = write_docs(tmp_path, ["a.txt", "b.txt", "c.txt"])
+
+    results = DocumentProcessor().batch_process(paths, {"twg": "energy"}, workers=2)
+
+    assert [r["file_path"] for r in results] == paths
+    assert all(r["status"] == "success" for r in results)
+    assert results[0]["chunks"][0]["metadata"]["twg"] == "energy"
+
+
+def test_iter_process_times_out_stuck_file(tmp_path):
+    paths = write_docs(tmp_path, ["slow.txt", "a.txt", "b.txt"])
+
+    started = time.monotonic()
+    results = list(SlowProcessor().iter_process(paths, workers=2, timeout=3))
+
+    assert time.monotonic() - started < 25
+    by_path = {r["file_path"]: r for r in results}
+    assert len(results) == 3
+    assert by_path[paths[0]]["status"] == "failed"
+    assert "Timed out" in by_path[paths[0]]["error"]
+    assert by_path[paths[1]]["status"] == "success"
+    assert by_path[paths[2]]["status"] == "success"
+
+
+def test_streaming_pipeline_matches_whole_text(tmp_path, monkeypatch):
+    # Small read blocks so words, space runs and newline runs span blocks
+    monkeypatch.setattr(document_processor, "TEXT_READ_BLOCK", 7)
+    text = "  Heading @@ one\n\n\n\nThe  WAPP   market*  opens. " + PARAGRAPH + "\n\n\n  tail  "
+    path = tmp_path / "report.txt"
+    path.write_text(text)
+    processor = DocumentProcessor(chunk_size=100, chunk_overlap=20)
+
+    streamed = "".join(processor.iter_clean_text(processor.iter_text(str(path))))
+    assert streamed == processor.clean_text(text)
+
+    chunks = processor.process_document(str(path))["chunks"]
+    expected = processor.chunk_text(processor.clean_text(text))
+    assert [c["text"] for c in chunks] == [c["text"] for c in expected]
+    assert all(c["metadata"]["total_chunks"] == len(expected) for c in chunks)
+
+
+def test_iter_chunks_rejects_overlap_that_never_advances():
+    # 100 // 4 == 103 // 4: the window would not move
+    processor = DocumentProcessor(chunk_size=100, chunk_overlap=103)
+
+    with pytest.raises(ValueError):
+        list(processor.iter_chunks([PARAGRAPH]))
+
+def test_process_document_retains_text_only_on_request(tmp_path):
+    path = write_docs(tmp_path, ["a.txt"])[0]
+    processor = DocumentProcessor()
+
+    assert "raw_text" not in processor.process_document(path)
+
+    result = processor.process_document(path, retain_text=True)
+    assert result["raw_text"] == PARAGRAPH
+    assert result["cleaned_text"] == PARAGRAPH.strip()
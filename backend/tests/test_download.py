@@ -0,0 +1,80 @@
+"""
+Tests for Document Download Helpers
+
+Unit tests for conditional GET, byte-range parsing, ranged streaming and
+the download access cache.
+"""
+
+from datetime import datetime, timedelta
+import pytest
+from app.utils.download import (
+    DownloadAccessCache, RangeNotSatisfiable, http_date, is_not_modified,
+    iter_file_range, make_etag, parse_range
+)
+
+ETAG = make_etag("ab" * 32)
+CREATED = datetime(2026, 1, 15, 9, 30, 12, 500000)
+
+
+def test_if_none_match_takes_precedence():
+    assert is_not_modified({"if-none-match": ETAG}, ETAG, CREATED)
+    assert is_not_modified({"if-none-match": f'"other", W/{ETAG}'}, ETAG, CREATED)
+    assert not is_not_modified(
+        {"if-none-match": '"other"', "if-modified-since": http_date(CREATED)}, ETAG, CREATED
+    )
+    assert not is_not_modified({"if-none-match": ETAG}, None, CREATED)
+
+
+def test_if_modified_since():
+    assert is_not_modified({"if-modified-since": http_date(CREATED)}, ETAG, CREATED)
+    assert not is_not_modified({"if-modified-since": http_date(CREATED - timedelta(seconds=1))}, ETAG, CREATED)
+    assert not is_not_modified({"if-modified-since": "yesterday"}, ETAG, CREATED)
+    assert not is_not_modified({}, ETAG, CREATED)
+
+
+@pytest.mark.parametrize("header,expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=900-", (900, 999)),
+    ("bytes=-100", (900, 999)),
+    ("bytes=950-5000", (950, 999)),
+    ("bytes=0-1,5-9", None),
+    ("items=0-1", None),
+    ("bytes=a-b", None),
+])
+def test_parse_range(header, expected):
+    assert parse_range({"range": header}, 1000, ETAG, CREATED) == expected
+
+
+def test_unsatisfiable_range_and_if_range():
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range({"range": "bytes=1000-"}, 1000, ETAG, CREATED)
+
+    assert parse_range({"range": "bytes=10-", "if-range": ETAG}, 1000, ETAG, CREATED) == (10, 999)
+    assert parse_range({"range": "bytes=10-", "if-range": '"stale"'}, 1000, ETAG, CREATED) is None
+    assert parse_range({"range": "bytes=10-", "if-range": http_date(CREATED)}, 1000, ETAG, CREATED) == (10, 999)
+
+
+async def test_iter_file_range(tmp_path):
+    path = tmp_path / "report.pdf"
+    path.write_bytes(bytes(range(256)) * 8)
+
+    chunks = [chunk async for chunk in iter_file_range(str(path), 100, 1099, chunk_size=256)]
+
+    assert b"".join(chunks) == path.read_bytes()[100:1100]
+    assert len(chunks) == 4
+
+
+def test_access_cache_expiry_eviction_and_invalidation():
+    cache = DownloadAccessCache(ttl=60, max_entries=2)
+    cache.put("u1", "d1", {"file_path": "a"})
+    cache.put("u2", "d1", {"file_path": "a"})
+    assert cache.get("u1", "d1") == {"file_path": "a"}
+
+    cache.put("u1", "d2", {"file_path": "b"})
+    assert cache.get("u2", "d1") is None  # least recently used
+
+    cache.invalidate("d1")
+    assert cache.get("u1", "d1") is None
+    assert cache.get("u1", "d2") is not None
+
+    assert DownloadAccessCache(ttl=0).get("u1", "d2") is None
@@ -0,0 +1,98 @@
+"""
+Tests for the Embedding Cache
+
+Unit tests for content-addressed keys, LRU eviction, the Redis tier and
+cache use in the knowledge base.
+"""
+
+import pytest
+from app.core.embedding_cache import EmbeddingCache
+from app.core.knowledge_base import KnowledgeBase
+from app.core.vector_store import VectorStore
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the Redis commands the cache uses."""
+
+    def __init__(self):
+        self.store = {}
+
+    def mget(self, keys):
+        return [self.store.get(k) for k in keys]
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def set(self, key, value, ex=None):
+        self.store[key] = value
+
+    def execute(self):
+        return []
+
+
+class CountingEmbedder:
+    def __init__(self):
+        self.calls = []
+
+    def embed(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(t)), 1.0] for t in texts]
+
+
+def test_key_depends_on_model_and_dimension():
+    """Keys differ across models/dimensions but ignore whitespace changes"""
+    cache = EmbeddingCache(model="nomic-embed-text", dimension=768)
+    other_model = EmbeddingCache(model="mxbai-embed-large", dimension=768)
+    other_dim = EmbeddingCache(model="nomic-embed-text", dimension=1024)
+
+    key = cache.make_key("Energy  access\nplan ")
+    assert key == cache.make_key("Energy access plan")
+    assert key != other_model.make_key("Energy access plan")
+    assert key != other_dim.make_key("Energy access plan")
+
+
+def test_lru_eviction():
+    """Oldest entries are evicted once max_entries is reached"""
+    cache = EmbeddingCache(model="m", dimension=2, max_entries=2)
+    cache.set_many(["a", "b"], [[1.0, 0.0], [0.0, 1.0]])
+    cache.get_many(["a"])  # touch "a" so "b" is least recently used
+    cache.set_many(["c"], [[1.0, 1.0]])
+
+    assert cache.get_many(["a", "b", "c"]) == [[1.0, 0.0], None, [1.0, 1.0]]
+    stats = cache.get_stats()
+    assert stats["entries"] == 2
+    assert stats["hits"] == 3
+    assert stats["misses"] == 1
+
+
+def test_redis_tier_shared_between_caches():
+    """A second process-local cache finds entries through Redis"""
+    redis_client = FakeRedis()
+    writer = EmbeddingCache(model="m", dimension=2, redis_client=redis_client)
+    reader = EmbeddingCache(model="m", dimension=2, redis_client=redis_client)
+
+    writer.set_many(["hello"], [[0.5, 0.25]])
+
+    assert reader.get_many(["hello"]) == [[0.5, 0.25]]
+    assert reader.get_stats()["redis_hits"] == 1
+    # Promoted into the local tier
+    assert reader.get_many(["hello"]) == [[0.5, 0.25]]
+    assert reader.get_stats()["hits"] == 1
+
+
+def test_generate_embeddings_only_embeds_uncached_texts():
+    """The knowledge base embeds only new, distinct texts"""
+    kb = KnowledgeBase(
+        vector_store=VectorStore(),
+        embedding_model="m",
+        dimension=2,
+        embedding_client=CountingEmbedder(),
+        embedding_cache=EmbeddingCache(model="m", dimension=2)
+    )
+
+    first = kb.generate_embeddings(["alpha", "beta", "alpha"])
+    second = kb.generate_embeddings(["alpha", "gamma"])
+
+    assert first == [[5.0, 1.0], [4.0, 1.0], [5.0, 1.0]]
+    assert second == [[5.0, 1.0], [5.0, 1.0]]
+    assert kb.embedding_client.calls == [["alpha", "beta"], ["gamma"]]
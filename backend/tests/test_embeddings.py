@@ -0,0 +1,92 @@
+"""
+Tests for the Ollama Embedding Client
+
+Unit tests for batching, ordering, fallback and latency reporting.
+"""
+
+import threading
+import pytest
+from app.core.embeddings import OllamaEmbeddingClient
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None, text=""):
+        self.status_code = status_code
+        self._payload = payload or {}
+        self.text = text
+
+    def json(self):
+        return self._payload
+
+
+class FakeSession:
+    """Stands in for requests.Session and records every call."""
+
+    def __init__(self, batch_endpoint=True):
+        self.batch_endpoint = batch_endpoint
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def post(self, url, json=None, timeout=None):
+        with self.lock:
+            self.calls.append((url, json))
+
+        if url.endswith("/api/embed"):
+            if not self.batch_endpoint:
+                return FakeResponse(404, text="404 page not found")
+            return FakeResponse(200, {"embeddings": [[float(len(t))] for t in json["input"]]})
+
+        return FakeResponse(200, {"embedding": [float(len(json["prompt"]))]})
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def client():
+    client = OllamaEmbeddingClient(batch_size=3, max_concurrency=2)
+    client.session = FakeSession()
+    yield client
+    client.close()
+
+
+def test_embed_batches_texts(client):
+    """Texts are sent in batches of batch_size through /api/embed"""
+    texts = ["a" * i for i in range(1, 8)]
+    embeddings = client.embed(texts)
+
+    assert embeddings == [[float(i)] for i in range(1, 8)]
+    assert len(client.session.calls) == 3
+    assert all(url.endswith("/api/embed") for url, _ in client.session.calls)
+
+
+def test_embed_empty_list(client):
+    """No requests are made for an empty input"""
+    assert client.embed([]) == []
+    assert client.session.calls == []
+
+
+def test_embed_truncates_long_texts(client):
+    """Texts longer than the model limit are truncated"""
+    embeddings = client.embed(["x" * (OllamaEmbeddingClient.MAX_TEXT_CHARS + 100)])
+    assert embeddings == [[float(OllamaEmbeddingClient.MAX_TEXT_CHARS)]]
+
+
+def test_legacy_endpoint_fallback(client):
+    """Older Ollama servers without /api/embed use /api/embeddings"""
+    client.session = FakeSession(batch_endpoint=False)
+    embeddings = client.embed(["ab", "abc"])
+
+    assert embeddings == [[2.0], [3.0]]
+    assert client._use_legacy_endpoint is True
+
+
+def test_batch_latency_stats(client):
+    """Per-batch latency is recorded"""
+    client.embed(["a", "b", "c", "d"])
+    stats = client.get_stats()
+
+    assert stats["total_batches"] == 2
+    assert stats["total_texts"] == 4
+    assert len(stats["recent_batches"]) == 2
+    assert all("latency_ms" in batch for batch in stats["recent_batches"])
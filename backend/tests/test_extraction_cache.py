@@ -0,0 +1,165 @@
+"""
+Tests for the Extraction Cache
+
+Unit tests for storing, streaming and evicting cached extracted text, and
+for the document processor reusing it instead of parsing files again.
+"""
+
+import os
+import time
+import tracemalloc
+from app.utils.extraction_cache import ExtractionCache, ENTRY_SUFFIX, READ_SIZE
+from app.utils.document_processor import DocumentProcessor
+
+ROWS = "country,project,capacity_mw\n" + "".join(f"Ghana,Solar {i},{i * 10}\n" for i in range(40))
+
+
+class CountingProcessor(DocumentProcessor):
+    extractions = 0
+
+    def _extract_from_excel(self, file_path):
+        CountingProcessor.extractions += 1
+        return super()._extract_from_excel(file_path)
+
+
+def test_get_put_and_versioning(tmp_path):
+    cache = ExtractionCache(str(tmp_path))
+
+    assert cache.get("ab" * 32, "pdf-1") is None
+    cache.put("ab" * 32, "pdf-1", "Cocoa yields " * 100)
+
+    assert cache.get("ab" * 32, "pdf-1") == "Cocoa yields " * 100
+    assert cache.get("ab" * 32, "pdf-2") is None
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert cache.size() < len("Cocoa yields " * 100)
+
+
+def test_corrupt_entry_is_a_miss(tmp_path):
+    cache = ExtractionCache(str(tmp_path))
+    cache.put("cd" * 32, "pdf-1", "text")
+    path = cache._path("cd" * 32, "pdf-1")
+    path.write_bytes(b"not zlib")
+
+    assert cache.get("cd" * 32, "pdf-1") is None
+    assert not path.exists()
+
+
+def test_eviction_removes_least_recently_used(tmp_path):
+    cache = ExtractionCache(str(tmp_path), max_bytes=10 ** 6)
+    for i in range(3):
+        cache.put(f"{i:064x}", "pdf-1", os.urandom(300).hex())
+        past = time.time() - 100 + i
+        os.utime(cache._path(f"{i:064x}", "pdf-1"), (past, past))
+    assert cache.get(f"{0:064x}", "pdf-1") is not None  # now the most recent
+
+    cache.max_bytes = cache.size() - 1
+    cache.evict()
+
+    assert cache.get(f"{1:064x}", "pdf-1") is None
+    assert cache.get(f"{0:064x}", "pdf-1") is not None
+    assert cache.size() <= cache.max_bytes
+
+
+def test_processor_reuses_cached_text_across_chunk_settings(tmp_path):
+    path = tmp_path / "projects.csv"
+    path.write_text(ROWS)
+    cache = ExtractionCache(str(tmp_path / "cache"))
+    CountingProcessor.extractions = 0
+
+    first = CountingProcessor(chunk_size=200, chunk_overlap=40, extraction_cache=cache).process_document(str(path))
+    second = CountingProcessor(chunk_size=400, chunk_overlap=80, extraction_cache=cache).process_document(str(path))
+    uncached = DocumentProcessor(chunk_size=400, chunk_overlap=80).process_document(str(path))
+
+    assert CountingProcessor.extractions == 1
+    assert first["status"] == second["status"] == "success"
+    assert second["chunks"] == uncached["chunks"]
+    assert first["chunk_count"] > second["chunk_count"]
+
+
+def test_text_files_bypass_the_cache(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("Digital public infrastructure " * 20)
+    cache = ExtractionCache(str(tmp_path / "cache"))
+
+    DocumentProcessor(extraction_cache=cache).process_document(str(path))
+
+    assert cache.size() == 0 and cache.misses == 0
+
+
+class StreamingProcessor(DocumentProcessor):
+    """Extracts `count` generated pieces of `size` characters."""
+
+    def __init__(self, count, size, **kwargs):
+        super().__init__(**kwargs)
+        self.count = count
+        self.size = size
+        self.extractions = 0
+
+    def iter_text(self, file_path):
+        self.extractions += 1
+        for i in range(self.count):
+            line = f"Page {i}: power pool tariffs "
+            yield (line * (self.size // len(line) + 1))[:self.size]
+
+
+def test_miss_holds_one_piece_at_a_time(tmp_path):
+    path = tmp_path / "report.csv"
+    path.write_text("placeholder")
+    cache = ExtractionCache(str(tmp_path / "cache"))
+    processor = StreamingProcessor(count=40, size=1_000_000, extraction_cache=cache)
+
+    tracemalloc.start()
+    total = sum(len(piece) for piece in processor.iter_cached_text(str(path)))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert total == 40 * 1_000_000
+    # The piece being generated, its UTF-8 encoding and the compressor's
+    # state; never the 40 MB of text seen so far
+    assert peak < 5 * 1_000_000
+    assert cache.size() > 0
+
+
+def test_hit_is_read_back_in_pieces(tmp_path):
+    path = tmp_path / "report.csv"
+    path.write_text("placeholder")
+    cache = ExtractionCache(str(tmp_path / "cache"))
+    processor = StreamingProcessor(count=20, size=50_000, extraction_cache=cache)
+    expected = "".join(processor.iter_text(str(path)))
+
+    assert "".join(processor.iter_cached_text(str(path))) == expected
+    pieces = list(processor.iter_cached_text(str(path)))
+
+    assert "".join(pieces) == expected
+    assert len(pieces) > 1 and max(len(piece) for piece in pieces) <= READ_SIZE
+    assert processor.extractions == 2  # the direct call and the miss
+
+
+def test_consumer_stopping_early_stores_nothing(tmp_path):
+    path = tmp_path / "report.csv"
+    path.write_text("placeholder")
+    cache = ExtractionCache(str(tmp_path / "cache"))
+    pieces = StreamingProcessor(count=10, size=1000, extraction_cache=cache).iter_cached_text(str(path))
+
+    next(pieces)
+    pieces.close()
+
+    assert cache.size() == 0
+    assert [p for p in (tmp_path / "cache").rglob("*") if p.is_file()] == []
+
+
+def test_truncated_entry_falls_back_to_extraction(tmp_path):
+    path = tmp_path / "report.csv"
+    path.write_text("placeholder")
+    cache = ExtractionCache(str(tmp_path / "cache"))
+    processor = StreamingProcessor(count=20, size=50_000, extraction_cache=cache)
+    expected = "".join(processor.iter_cached_text(str(path)))
+
+    entry = next((tmp_path / "cache").rglob(f"*{ENTRY_SUFFIX}"))
+    entry.write_bytes(entry.read_bytes()[:entry.stat().st_size // 2])
+
+    # The cached part is yielded, then extraction resumes where it stopped
+    assert "".join(processor.iter_cached_text(str(path))) == expected
+    assert processor.extractions == 2
+    assert "".join(processor.iter_cached_text(str(path))) == expected
+    assert processor.extractions == 2
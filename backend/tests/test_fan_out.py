@@ -0,0 +1,257 @@
+"""
+Tests for Concurrent Agent Fan-Out
+
+Unit tests for the sync and async fan-out engines and the supervisor's
+multi-agent consultation built on them.
+"""
+
+import asyncio
+import threading
+import time
+import pytest
+from app.agents.base_agent import BaseAgent
+from app.agents.fan_out import fan_out, afan_out
+from app.agents.supervisor import SupervisorAgent
+from app.agents.supervisor_with_tools import SupervisorWithTools
+from app.core.llm_cache import LLMResponseCache
+from app.services.llm_service import LLMService, CachedLLMService
+
+
+class FakeAgent:
+    """Agent whose sync and async chats take `delay` seconds."""
+
+    def __init__(self, name, delay=0.2, fail=False, tracker=None):
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.tracker = tracker
+        self.temperatures = []
+
+    def _answer(self, query):
+        if self.fail:
+            raise RuntimeError(f"{self.name} is down")
+        return f"{self.name}: {query}"
+
+    def chat(self, query, temperature=None):
+        self.temperatures.append(temperature)
+        if self.tracker:
+            self.tracker.enter()
+        try:
+            time.sleep(self.delay)
+            return self._answer(query)
+        finally:
+            if self.tracker:
+                self.tracker.leave()
+
+    async def achat(self, query, temperature=None):
+        self.temperatures.append(temperature)
+        if self.tracker:
+            self.tracker.enter()
+        try:
+            await asyncio.sleep(self.delay)
+            return self._answer(query)
+        finally:
+            if self.tracker:
+                self.tracker.leave()
+
+
+class ConcurrencyTracker:
+    """Records the highest number of agents generating at once."""
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def enter(self):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+
+    def leave(self):
+        with self._lock:
+            self.active -= 1
+
+
+class CountingLLM(LLMService):
+    """LLM whose replies count the generations it ran."""
+
+    provider = "fake"
+    model = "tiny"
+    temperature = 0.7
+
+    def __init__(self):
+        self.calls = 0
+
+    def chat(self, prompt, system_prompt=None, temperature=None, max_tokens=1000):
+        self.calls += 1
+        return f"reply {self.calls}"
+
+
+def agents_named(*names, **kwargs):
+    return {name: FakeAgent(name, **kwargs) for name in names}
+
+
+class TestFanOut:
+    """Sync fan-out over a thread pool"""
+
+    def test_agents_run_concurrently(self):
+        agents = agents_named("energy", "agriculture", "minerals", delay=0.3)
+
+        start = time.monotonic()
+        responses, failures = fan_out(agents, "status?", max_parallel=3)
+        elapsed = time.monotonic() - start
+
+        assert responses == {name: f"{name}: status?" for name in agents}
+        assert failures == {}
+        assert elapsed < 0.6
+
+    def test_max_parallel_is_respected(self):
+        tracker = ConcurrencyTracker()
+        agents = agents_named("a", "b", "c", "d", "e", delay=0.1, tracker=tracker)
+
+        responses, _ = fan_out(agents, "q", max_parallel=2)
+
+        assert len(responses) == 5
+        assert tracker.peak == 2
+
+    def test_timeout_returns_partial_results(self):
+        agents = agents_named("energy", "minerals", delay=0.05)
+        agents["digital"] = FakeAgent("digital", delay=1.0)
+
+        start = time.monotonic()
+        responses, failures = fan_out(agents, "q", max_parallel=3, timeout=0.3)
+        elapsed = time.monotonic() - start
+
+        assert set(responses) == {"energy", "minerals"}
+        assert failures["digital"].startswith("timeout")
+        assert elapsed < 0.8
+
+    def test_failure_is_reported_not_raised(self):
+        agents = agents_named("energy", "agriculture", delay=0.01)
+        agents["agriculture"].fail = True
+
+        responses, failures = fan_out(agents, "q")
+
+        assert list(responses) == ["energy"]
+        assert failures == {"agriculture": "agriculture is down"}
+
+    def test_responses_keep_agent_order(self):
+        agents = {
+            "slow": FakeAgent("slow", delay=0.2),
+            "medium": FakeAgent("medium", delay=0.1),
+            "fast": FakeAgent("fast", delay=0.0)
+        }
+
+        responses, _ = fan_out(agents, "q", max_parallel=3)
+
+        assert list(responses) == ["slow", "medium", "fast"]
+
+    def test_no_agents(self):
+        assert fan_out({}, "q", timeout=1) == ({}, {})
+
+
+class TestAsyncFanOut:
+    """Async fan-out on one event loop"""
+
+    async def test_agents_run_concurrently(self):
+        agents = agents_named("energy", "agriculture", "minerals", delay=0.3)
+
+        start = time.monotonic()
+        responses, failures = await afan_out(agents, "status?", max_parallel=3)
+        elapsed = time.monotonic() - start
+
+        assert list(responses) == ["energy", "agriculture", "minerals"]
+        assert failures == {}
+        assert elapsed < 0.6
+
+    async def test_max_parallel_is_respected(self):
+        tracker = ConcurrencyTracker()
+        agents = agents_named("a", "b", "c", "d", "e", delay=0.05, tracker=tracker)
+
+        responses, _ = await afan_out(agents, "q", max_parallel=2)
+
+        assert len(responses) == 5
+        assert tracker.peak == 2
+
+    async def test_timeout_is_per_agent_and_cancels(self):
+        tracker = ConcurrencyTracker()
+        agents = agents_named("a", "b", delay=0.2, tracker=tracker)
+        agents["stuck"] = FakeAgent("stuck", delay=5.0, tracker=tracker)
+
+        # With one slot, "b" waits for "a"; its timeout must not start until it runs
+        responses, failures = await afan_out(agents, "q", max_parallel=1, timeout=0.3)
+
+        assert set(responses) == {"a", "b"}
+        assert failures["stuck"].startswith("timeout")
+        assert tracker.active == 0
+
+
+class TestSupervisorFanOut:
+    """Supervisor consultation through the fan-out"""
+
+    @pytest.fixture
+    def supervisor(self):
+        supervisor = SupervisorAgent(keep_history=False)
+        supervisor.max_parallel_agents = 3
+        supervisor.agent_timeout = 0.3
+        supervisor.register_agent("energy", FakeAgent("energy", delay=0.1))
+        supervisor.register_agent("minerals", FakeAgent("minerals", delay=0.1))
+        supervisor.register_agent("digital", FakeAgent("digital", delay=1.0))
+        return supervisor
+
+    def test_consult_multiple_agents_skips_unregistered(self, supervisor):
+        responses = supervisor.consult_multiple_agents("q", ["energy", "minerals", "unknown"])
+
+        assert responses == {"energy": "energy: q", "minerals": "minerals: q"}
+
+    async def test_aconsult_multiple_agents(self, supervisor):
+        start = time.monotonic()
+        responses = await supervisor.aconsult_multiple_agents("q", ["energy", "minerals"])
+
+        assert set(responses) == {"energy", "minerals"}
+        assert time.monotonic() - start < 0.2
+
+    def test_temperature_reaches_every_agent(self, supervisor):
+        supervisor.delegate_to_agents("q", ["energy", "minerals"], temperature=0.0)
+
+        assert supervisor._agent_registry["energy"].temperatures == [0.0]
+        assert supervisor._agent_registry["minerals"].temperatures == [0.0]
+
+    async def test_async_temperature_reaches_every_agent(self):
+        agents = agents_named("energy", "minerals", delay=0.01)
+
+        await afan_out(agents, "q", temperature=0.0)
+
+        assert [agent.temperatures for agent in agents.values()] == [[0.0], [0.0]]
+
+    def test_repeated_status_collection_is_served_from_the_cache(self):
+        supervisor = SupervisorAgent(keep_history=False)
+        llm = CountingLLM()
+        # Default cache settings: only greedy (temperature 0) calls are cached
+        cached = CachedLLMService(llm, LLMResponseCache())
+        for agent_id in ["energy", "minerals"]:
+            agent = BaseAgent(agent_id, keep_history=False)
+            agent.llm = cached
+            supervisor.register_agent(agent_id, agent)
+
+        first = supervisor.collect_twg_status()
+        assert supervisor.collect_twg_status() == first
+        assert llm.calls == 2
+        assert cached.get_stats()["response_cache"]["hits"] == 2
+
+    def test_collect_twg_status_marks_timeouts(self, supervisor):
+        statuses = supervisor.collect_twg_status(["energy", "digital"])
+
+        assert statuses["energy"].startswith("energy:")
+        assert statuses["digital"].startswith("[Timed out:")
+
+    async def test_chat_with_tools_delegates_to_relevant_agent(self):
+        supervisor = SupervisorWithTools(keep_history=False)
+        supervisor.register_agent("energy", FakeAgent("energy", delay=0.01))
+
+        response = await supervisor.chat_with_tools("What is the power pool status?")
+
+        assert response == "[Consulted ENERGY TWG]\n\nenergy: What is the power pool status?"
+        pieces = [piece async for piece in supervisor.stream_chat_with_tools("What is the power pool status?")]
+        assert pieces == [response]
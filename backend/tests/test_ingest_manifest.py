@@ -0,0 +1,59 @@
+"""
+Tests for the Ingest Manifest
+
+Unit tests for chunk hashing, change detection between runs and manifest
+persistence.
+"""
+
+import os
+from app.utils.ingest_manifest import IngestManifest, chunk_hash, file_digest
+
+
+def make_chunks(texts, prefix="policy"):
+    return [
+        {"index": i, "hash": chunk_hash(text, {"twg": "energy"}), "vector_id": f"{prefix}_chunk_{i}"}
+        for i, text in enumerate(texts)
+    ]
+
+
+def test_chunk_hash_ignores_volatile_metadata():
+    base = chunk_hash("WAPP interconnection", {"twg": "energy", "total_chunks": 3})
+    assert chunk_hash("WAPP interconnection", {"twg": "energy", "total_chunks": 4}) == base
+    assert chunk_hash("WAPP interconnection", {"twg": "digital", "total_chunks": 3}) != base
+    assert chunk_hash("WAPP interconnections", {"twg": "energy", "total_chunks": 3}) != base
+
+
+def test_diff_detects_changed_and_orphaned_chunks(tmp_path):
+    manifest = IngestManifest(str(tmp_path / "manifest.json"))
+    manifest.record("/docs/policy.pdf", "twg-energy", "energy", "abc", make_chunks(["a", "b", "c"]))
+
+    changed, orphaned = manifest.diff_chunks("/docs/policy.pdf", make_chunks(["a", "B"]))
+
+    assert changed == [1]
+    assert orphaned == ["policy_chunk_2"]
+
+
+def test_unknown_document_is_all_new(tmp_path):
+    manifest = IngestManifest(str(tmp_path / "manifest.json"))
+
+    changed, orphaned = manifest.diff_chunks("/docs/new.pdf", make_chunks(["a", "b"]))
+
+    assert changed == [0, 1]
+    assert orphaned == []
+
+
+def test_manifest_round_trip(tmp_path):
+    path = tmp_path / "data" / "manifest.json"
+    source = tmp_path / "docs" / "policy.txt"
+    source.parent.mkdir()
+    source.write_text("Regional energy policy")
+
+    manifest = IngestManifest(str(path))
+    manifest.record(str(source), "twg-energy", "energy", file_digest(str(source)), make_chunks(["a"]))
+    manifest.save()
+
+    reloaded = IngestManifest(str(path))
+    assert reloaded.get(str(source))["file_sha256"] == file_digest(str(source))
+    assert reloaded.documents_under(str(tmp_path / "docs")) == [str(source)]
+    assert reloaded.documents_under(str(tmp_path / "doc")) == []
+    assert not os.path.exists(str(path.with_suffix(".tmp")))
@@ -0,0 +1,251 @@
+"""
+Tests for Ingestion Jobs
+
+Unit tests for the background ingestion job runner: progress reporting,
+failures, cancellation, packed bulk batches and reuse of duplicate uploads,
+against an in-memory SQLite database.
+"""
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from app.services.ingestion_jobs import IngestionJobRunner, IngestionJob, IngestionJobStatus, Document
+
+
+class FakeProcessor:
+    def __init__(self, chunks=5, error=None):
+        self.chunks = chunks
+        self.error = error
+        self.calls = 0
+
+    async def aprocess_document(self, file_path, additional_metadata=None, file_sha256=None):
+        self.calls += 1
+        if self.error:
+            return {"status": "error", "error": self.error}
+        return {
+            "status": "success",
+            "chunks": [{"text": f"chunk {i}", "metadata": dict(additional_metadata)} for i in range(self.chunks)]
+        }
+
+
+class FakeKnowledgeBase:
+    """Reports progress per 2-chunk batch; can pause after the first batch."""
+
+    def __init__(self, fail_after=None):
+        self.upserted = []
+        self.stored = {}
+        self.calls = 0
+        self.fail_after = fail_after
+        self.paused = None
+        self.resume = asyncio.Event()
+        self.copies = []
+
+    async def upsert(self, documents, namespace=None, on_progress=None):
+        self.calls += 1
+        for i in range(0, len(documents), 2):
+            batch = documents[i:i + 2]
+            self.upserted.extend(doc["id"] for doc in batch)
+            self.stored.setdefault(namespace, set()).update(doc["id"] for doc in batch)
+            if self.fail_after is not None and len(self.upserted) >= self.fail_after:
+                raise RuntimeError("vector store unavailable")
+            await on_progress({"embedded": i + len(batch), "upserted": i + len(batch)})
+            if self.paused is not None:
+                self.paused.set()
+                await self.resume.wait()
+        return {"total_upserted": len(documents)}
+
+    async def purge_documents(self, doc_ids, namespace):
+        ids = self.stored.get(namespace, set())
+        purged = {vid for vid in ids if vid.partition("_chunk_")[0] in doc_ids}
+        ids -= purged
+        return len(purged)
+
+    async def copy_document(self, source_doc_id, target_doc_id, source_namespace, target_namespace, metadata):
+        self.copies.append((source_doc_id, target_doc_id, target_namespace))
+        return 5
+
+
+@pytest.fixture
+async def session_factory():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(IngestionJob.metadata.create_all)
+    yield async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def create_job(session_factory, batch_id=None, file_sha256=None):
+    async with session_factory() as db:
+        doc = Document(
+            file_name="minutes.pdf",
+            file_path="/tmp/minutes.pdf",
+            file_type="application/pdf",
+            file_sha256=file_sha256,
+            uploaded_by_id=uuid.uuid4()
+        )
+        db.add(doc)
+        await db.flush()
+        job = IngestionJob(document_id=doc.id, created_by_id=doc.uploaded_by_id, batch_id=batch_id)
+        db.add(job)
+        await db.commit()
+        return job.id, doc.id
+
+
+async def load(session_factory, job_id):
+    async with session_factory() as db:
+        return await db.get(IngestionJob, job_id)
+
+
+async def test_job_reports_progress_and_succeeds(session_factory):
+    kb = FakeKnowledgeBase()
+    runner = IngestionJobRunner(session_factory=session_factory, processor=FakeProcessor(), knowledge_base=kb)
+    job_id, doc_id = await create_job(session_factory)
+
+    await runner.run_job(job_id)
+
+    job = await load(session_factory, job_id)
+    assert job.status == IngestionJobStatus.SUCCEEDED
+    assert (job.chunks_total, job.chunks_embedded, job.chunks_upserted) == (5, 5, 5)
+    assert job.namespace == "twg-general"
+    assert job.started_at and job.finished_at
+    assert kb.upserted[0] == f"{doc_id}_chunk_0"
+
+    # A finished job is not claimed again
+    await runner.run_job(job_id)
+    assert len(kb.upserted) == 5
+
+
+async def test_failed_extraction_marks_job_failed(session_factory):
+    runner = IngestionJobRunner(
+        session_factory=session_factory,
+        processor=FakeProcessor(error="corrupt PDF"),
+        knowledge_base=FakeKnowledgeBase()
+    )
+    job_id, _ = await create_job(session_factory)
+
+    await runner.run_job(job_id)
+
+    job = await load(session_factory, job_id)
+    assert job.status == IngestionJobStatus.FAILED
+    assert "corrupt PDF" in job.error
+
+
+async def test_cancel_running_and_queued_jobs(session_factory):
+    kb = FakeKnowledgeBase()
+    kb.paused = asyncio.Event()
+    runner = IngestionJobRunner(
+        workers=1,
+        progress_interval=0,
+        session_factory=session_factory,
+        processor=FakeProcessor(chunks=6),
+        knowledge_base=kb
+    )
+    running_id, _ = await create_job(session_factory)
+    queued_id, _ = await create_job(session_factory)
+
+    await runner.start()
+    await asyncio.wait_for(kb.paused.wait(), 5)
+
+    async with session_factory() as db:
+        await runner.cancel(db, await db.get(IngestionJob, running_id))
+        queued = await runner.cancel(db, await db.get(IngestionJob, queued_id))
+    assert queued.status == IngestionJobStatus.CANCELLED
+
+    kb.resume.set()
+    await asyncio.wait_for(runner.queue.join(), 5)
+    await runner.stop()
+
+    job = await load(session_factory, running_id)
+    assert job.status == IngestionJobStatus.CANCELLED
+    # Stopped at the first progress check after cancellation, before chunks 4-5
+    assert job.chunks_upserted == 4
+    assert len(kb.upserted) == 4
+    # The chunks written before the cancellation are not left searchable
+    assert kb.stored["twg-general"] == set()
+
+
+async def test_failed_upsert_purges_written_chunks(session_factory):
+    kb = FakeKnowledgeBase(fail_after=2)
+    runner = IngestionJobRunner(session_factory=session_factory, processor=FakeProcessor(chunks=6), knowledge_base=kb)
+    job_id, doc_id = await create_job(session_factory)
+
+    await runner.run_job(job_id)
+
+    job = await load(session_factory, job_id)
+    assert job.status == IngestionJobStatus.FAILED
+    assert kb.upserted == [f"{doc_id}_chunk_0", f"{doc_id}_chunk_1"]
+    assert kb.stored["twg-general"] == set()
+
+
+async def test_batch_jobs_share_one_packed_upsert(session_factory):
+    kb = FakeKnowledgeBase()
+    runner = IngestionJobRunner(session_factory=session_factory, processor=FakeProcessor(chunks=3), knowledge_base=kb)
+    batch_id = uuid.uuid4()
+    first_id, first_doc = await create_job(session_factory, batch_id)
+    second_id, second_doc = await create_job(session_factory, batch_id)
+
+    await runner.run_job(first_id)
+
+    # 6 chunks in 3 full batches, instead of 2 + 1 per document
+    assert kb.calls == 1
+    assert kb.upserted == [f"{first_doc}_chunk_{i}" for i in range(3)] + [f"{second_doc}_chunk_{i}" for i in range(3)]
+    for job_id in (first_id, second_id):
+        job = await load(session_factory, job_id)
+        assert job.status == IngestionJobStatus.SUCCEEDED
+        assert (job.chunks_total, job.chunks_embedded, job.chunks_upserted) == (3, 3, 3)
+
+    # The second job was claimed by the first run
+    await runner.run_job(second_id)
+    assert kb.calls == 1
+
+
+async def test_duplicate_upload_copies_vectors_instead_of_processing(session_factory):
+    kb = FakeKnowledgeBase()
+    processor = FakeProcessor()
+    runner = IngestionJobRunner(session_factory=session_factory, processor=processor, knowledge_base=kb)
+    original_id, original_doc = await create_job(session_factory, file_sha256="ab" * 32)
+    await runner.run_job(original_id)
+
+    duplicate_id, duplicate_doc = await create_job(session_factory, file_sha256="ab" * 32)
+    await runner.run_job(duplicate_id)
+
+    assert processor.calls == 1
+    assert kb.copies == [(str(original_doc), str(duplicate_doc), "twg-general")]
+    job = await load(session_factory, duplicate_id)
+    assert job.status == IngestionJobStatus.SUCCEEDED
+    assert (job.chunks_total, job.chunks_upserted) == (5, 5)
+
+
+async def test_orphaned_running_job_is_requeued_on_start(session_factory):
+    kb = FakeKnowledgeBase()
+    runner = IngestionJobRunner(
+        session_factory=session_factory,
+        processor=FakeProcessor(chunks=2),
+        knowledge_base=kb,
+        stale_after=60
+    )
+    orphan_id, _ = await create_job(session_factory)
+    recent_id, _ = await create_job(session_factory)
+    async with session_factory() as db:
+        orphan = await db.get(IngestionJob, orphan_id)
+        orphan.status = IngestionJobStatus.RUNNING
+        orphan.started_at = datetime.utcnow() - timedelta(hours=2)
+        recent = await db.get(IngestionJob, recent_id)
+        recent.status = IngestionJobStatus.RUNNING
+        recent.started_at = datetime.utcnow()
+        await db.commit()
+
+        # The orphan no longer blocks a new ingest of its document
+        result = await db.execute(select(IngestionJob.id).where(runner.active_condition()))
+        assert result.scalars().all() == [recent_id]
+
+    await runner.start()
+    await asyncio.wait_for(runner.queue.join(), timeout=5)
+    await runner.stop()
+
+    assert (await load(session_factory, orphan_id)).status == IngestionJobStatus.SUCCEEDED
+    # Still running elsewhere, so left alone
+    assert (await load(session_factory, recent_id)).status == IngestionJobStatus.RUNNING
@@ -0,0 +1,131 @@
+"""
+Tests for the Knowledge Base
+
+Unit tests for batched, pipelined upserts against an in-memory vector store,
+including embedding reuse for chunks repeated across documents and copying
+the vectors of a duplicate document.
+"""
+
+import threading
+import time
+import pytest
+from app.core.knowledge_base import KnowledgeBase
+from app.core.vector_store import VectorStore, LocalVectorStore
+
+
+class SlowStore(VectorStore):
+    """Records upsert order and how many upserts overlap with embedding."""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.batches = []
+        self.active = threading.Event()
+
+    def upsert(self, vectors, namespace=None):
+        self.active.set()
+        time.sleep(self.delay)
+        self.batches.append([v["id"] for v in vectors])
+        self.active.clear()
+        return len(vectors)
+
+
+class SlowEmbedder:
+    def __init__(self, store, delay=0.05):
+        self.store = store
+        self.delay = delay
+        self.overlapped = 0
+        self.embedded = []
+
+    def embed(self, texts):
+        self.embedded.extend(texts)
+        time.sleep(self.delay)
+        if self.store.active.is_set():
+            self.overlapped += 1
+        return [[1.0, 0.0] for _ in texts]
+
+
+def make_kb(window):
+    store = SlowStore()
+    kb = KnowledgeBase(
+        vector_store=store,
+        embedding_model="m",
+        dimension=2,
+        embedding_client=SlowEmbedder(store),
+        pipeline_window=window
+    )
+    return kb, store
+
+
+def documents(n):
+    return [{"id": f"doc_chunk_{i}", "text": f"chunk {i}"} for i in range(n)]
+
+
+def test_sequential_upsert():
+    kb, store = make_kb(window=0)
+    result = kb.upsert_documents(documents(5), batch_size=2)
+
+    assert result["total_upserted"] == 5
+    assert result["batches"] == 3
+    assert result["pipeline_window"] == 0
+    assert kb.embedding_client.overlapped == 0
+    assert store.batches == [["doc_chunk_0", "doc_chunk_1"], ["doc_chunk_2", "doc_chunk_3"], ["doc_chunk_4"]]
+
+
+def test_pipelined_upsert_overlaps_stages_in_order():
+    kb, store = make_kb(window=2)
+    result = kb.upsert_documents(documents(8), batch_size=2)
+
+    assert result["total_upserted"] == 8
+    assert kb.embedding_client.overlapped > 0
+    assert [batch[0] for batch in store.batches] == ["doc_chunk_0", "doc_chunk_2", "doc_chunk_4", "doc_chunk_6"]
+    assert result["timings"]["total"] < result["timings"]["embed"] + result["timings"]["upsert"]
+
+
+def test_pipelined_upsert_propagates_store_errors():
+    kb, store = make_kb(window=2)
+
+    def failing_upsert(vectors, namespace=None):
+        raise RuntimeError("index unavailable")
+
+    store.upsert = failing_upsert
+    with pytest.raises(RuntimeError):
+        kb.upsert_documents(documents(4), batch_size=2)
+
+
+def test_repeated_chunks_are_embedded_once():
+    kb, store = make_kb(window=0)
+    kb.embedding_client.delay = store.delay = 0
+    shared = "Annex: list of member states"
+    docs = [
+        {"id": "a_chunk_0", "text": "minutes a"},
+        {"id": "a_chunk_1", "text": shared},
+        {"id": "b_chunk_0", "text": shared},
+        {"id": "b_chunk_1", "text": "minutes b"},
+        {"id": "c_chunk_0", "text": shared},
+    ]
+
+    result = kb.upsert_documents(docs, batch_size=2)
+
+    assert kb.embedding_client.embedded.count(shared) == 1
+    assert result["embeddings_reused"] == 2
+    # Every chunk keeps its own vector
+    assert [id for batch in store.batches for id in batch] == [doc["id"] for doc in docs]
+
+
+def test_copy_document_reuses_stored_vectors(tmp_path):
+    store = LocalVectorStore(path=str(tmp_path), dimension=2)
+    kb = KnowledgeBase(vector_store=store, embedding_model="m", dimension=2, embedding_client=SlowEmbedder(SlowStore(), delay=0))
+    kb.upsert_documents(
+        [{"id": f"src_chunk_{i}", "text": f"chunk {i}", "metadata": {"doc_id": "src"}} for i in range(3)],
+        namespace="twg-a"
+    )
+    embedded = len(kb.embedding_client.embedded)
+
+    copied = kb.copy_document("src", "dup", "twg-a", "twg-b", {"doc_id": "dup"}, batch_size=2)
+
+    assert copied == 3
+    assert len(kb.embedding_client.embedded) == embedded
+    assert sorted(kb.list_ids("twg-b")) == ["dup_chunk_0", "dup_chunk_1", "dup_chunk_2"]
+    [vector] = store.fetch(["dup_chunk_1"], namespace="twg-b")
+    assert vector["metadata"] == {"text": "chunk 1", "doc_id": "dup"}
+    assert vector["values"] == store.fetch(["src_chunk_1"], namespace="twg-a")[0]["values"]
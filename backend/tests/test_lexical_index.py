@@ -0,0 +1,149 @@
+"""
+Tests for the Lexical Index
+
+Unit tests for BM25 ranking, persistence, keyword query detection and
+lexical/hybrid search through the knowledge base.
+"""
+
+import pytest
+from app.core.knowledge_base import KnowledgeBase
+from app.core.lexical_index import LexicalIndex, tokenize, is_keyword_query, reciprocal_rank_fusion
+from app.core.vector_store import LocalVectorStore
+
+CHUNKS = [
+    {"id": "protocol_chunk_0", "text": "Supplementary Protocol A/SP.1/12/01 on democracy and good governance.",
+     "metadata": {"twg": "protocol"}},
+    {"id": "energy_chunk_0", "text": "The WAPP interconnection links national grids across the region.",
+     "metadata": {"twg": "energy"}},
+    {"id": "energy_chunk_1", "text": "Regional grids and electricity trade require harmonised tariffs.",
+     "metadata": {"twg": "energy"}},
+]
+
+
+class CountingEmbedder:
+    def __init__(self):
+        self.calls = 0
+
+    def embed(self, texts):
+        self.calls += 1
+        return [[1.0, float("grid" in text)] for text in texts]
+
+
+def test_tokenize_keeps_identifiers_whole():
+    terms = tokenize("Protocol A/SP.1/12/01 of the WAPP")
+    assert "a/sp.1/12/01" in terms
+    assert "sp" in terms
+    assert "wapp" in terms
+    assert "the" not in terms
+
+
+def test_bm25_ranks_exact_terms(tmp_path):
+    index = LexicalIndex(str(tmp_path))
+    index.upsert(CHUNKS, namespace="twg-all")
+
+    assert index.search("A/SP.1/12/01", namespace="twg-all")[0]["id"] == "protocol_chunk_0"
+    assert [r["id"] for r in index.search("regional grids", namespace="twg-all")][0] == "energy_chunk_1"
+    assert index.search("grids", namespace="twg-all", filter={"twg": "protocol"}) == []
+    assert index.search("grids", namespace="twg-other") == []
+
+
+def test_index_persists_upserts_and_deletes(tmp_path):
+    index = LexicalIndex(str(tmp_path))
+    index.upsert(CHUNKS, namespace="twg-energy")
+    index.delete(["energy_chunk_0"], namespace="twg-energy")
+    index.upsert([{**CHUNKS[1], "id": "energy_chunk_1", "text": "WAPP tariffs"}], namespace="twg-energy")
+
+    reloaded = LexicalIndex(str(tmp_path))
+    assert [r["id"] for r in reloaded.search("wapp", namespace="twg-energy")] == ["energy_chunk_1"]
+    assert reloaded.get_stats()["twg-energy"]["documents"] == 2
+
+    reloaded._namespace("twg-energy").compact()
+    compacted = LexicalIndex(str(tmp_path))
+    assert [r["id"] for r in compacted.search("wapp", namespace="twg-energy")] == ["energy_chunk_1"]
+    assert compacted.get_stats() == reloaded.get_stats()
+
+
+@pytest.mark.parametrize("query,expected", [
+    ("WAPP", True),
+    ("A/SP.1/12/01", True),
+    ('"harmonised tariffs for cross-border trade"', True),
+    ("protocol 2024 ratification", True),
+    ("how can member states finance regional energy projects", False),
+    ("regional grid financing", False),
+])
+def test_is_keyword_query(query, expected):
+    assert is_keyword_query(query) is expected
+
+
+def test_reciprocal_rank_fusion_keeps_source_scores():
+    fused = reciprocal_rank_fusion({
+        "vector": [{"id": "a", "score": 0.9}, {"id": "b", "score": 0.8}],
+        "lexical": [{"id": "b", "score": 7.0}, {"id": "c", "score": 3.0}],
+    }, top_k=3)
+
+    assert [r["id"] for r in fused] == ["b", "a", "c"]
+    assert fused[0]["vector_score"] == 0.8 and fused[0]["lexical_score"] == 7.0
+    assert fused[1]["lexical_score"] is None
+
+
+def test_knowledge_base_lexical_and_hybrid_search(tmp_path):
+    embedder = CountingEmbedder()
+    kb = KnowledgeBase(
+        vector_store=LocalVectorStore(path=str(tmp_path / "vectors"), dimension=2),
+        embedding_model="m",
+        dimension=2,
+        embedding_client=embedder,
+        lexical_index=LexicalIndex(str(tmp_path / "lexical"))
+    )
+    kb.upsert_documents(CHUNKS, namespace="twg-all")
+    calls = embedder.calls
+
+    lexical = kb.search("WAPP", namespace="twg-all", mode="lexical")
+    assert embedder.calls == calls
+    assert lexical[0]["id"] == "energy_chunk_0"
+    assert lexical[0]["metadata"]["text"] == CHUNKS[1]["text"]
+
+    hybrid = kb.search("WAPP grids", namespace="twg-all", top_k=3, mode="hybrid")
+    assert hybrid[0]["id"] == "energy_chunk_0"
+    assert {r["id"] for r in hybrid} == {c["id"] for c in CHUNKS}
+
+    kb.delete_documents(["energy_chunk_0"], namespace="twg-all")
+    assert kb.search("WAPP", namespace="twg-all", mode="lexical") == []
+
+
+def test_hybrid_falls_back_to_vector_without_index(tmp_path):
+    kb = KnowledgeBase(
+        vector_store=LocalVectorStore(path=str(tmp_path), dimension=2),
+        embedding_model="m",
+        dimension=2,
+        embedding_client=CountingEmbedder()
+    )
+    assert kb.resolve_search_mode("hybrid") == "vector"
+    with pytest.raises(ValueError):
+        kb.resolve_search_mode("lexical")
+
+
+def test_writes_from_another_process_are_seen(tmp_path):
+    api = LexicalIndex(str(tmp_path))
+    ingester = LexicalIndex(str(tmp_path))
+    assert api.search("wapp", namespace="twg-energy") == []
+
+    ingester.upsert(CHUNKS, namespace="twg-energy")
+    assert api.search("wapp", namespace="twg-energy")[0]["id"] == "energy_chunk_0"
+
+    ingester.delete(["energy_chunk_0"], namespace="twg-energy")
+    assert api.search("wapp", namespace="twg-energy") == []
+
+
+def test_compaction_keeps_records_of_other_processes(tmp_path):
+    api = LexicalIndex(str(tmp_path))
+    ingester = LexicalIndex(str(tmp_path))
+    api.upsert(CHUNKS[:1], namespace="twg-all")
+    ingester.upsert(CHUNKS[1:], namespace="twg-all")
+
+    api._namespace("twg-all").compact()
+
+    reloaded = LexicalIndex(str(tmp_path))
+    assert {r["id"] for r in reloaded.search("grids", namespace="twg-all")} == {"energy_chunk_0", "energy_chunk_1"}
+    # The other process notices the rewrite and reloads it
+    assert ingester.search("A/SP.1/12/01", namespace="twg-all")[0]["id"] == "protocol_chunk_0"
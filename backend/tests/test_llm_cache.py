@@ -0,0 +1,130 @@
+"""
+Tests for the LLM Response Cache
+
+Unit tests for call fingerprinting, TTL expiry, the temperature opt-out,
+the Redis tier and the caching LLM service wrapper.
+"""
+
+import time
+import pytest
+from app.core.llm_cache import LLMResponseCache
+from app.services.llm_service import LLMService, CachedLLMService
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, ex=None):
+        self.store[key] = value
+
+
+class CountingLLM(LLMService):
+    provider = "fake"
+    model = "tiny"
+    temperature = 0.2
+
+    def __init__(self):
+        self.calls = 0
+
+    def chat(self, prompt, system_prompt=None, temperature=None, max_tokens=1000):
+        self.calls += 1
+        return f"reply {self.calls} to {prompt}"
+
+    def chat_with_history(self, messages, system_prompt=None, temperature=None):
+        self.calls += 1
+        return f"reply {self.calls}"
+
+    async def achat(self, prompt, system_prompt=None, temperature=None, max_tokens=1000):
+        return self.chat(prompt, system_prompt, temperature, max_tokens)
+
+    async def astream(self, prompt, system_prompt=None, temperature=None, max_tokens=1000):
+        self.calls += 1
+        for piece in ["Status: ", "on ", "track"]:
+            yield piece
+
+
+MESSAGES = [{"role": "user", "content": "Energy TWG status?"}]
+
+
+def test_key_covers_every_input():
+    base = dict(provider="ollama", model="m", system_prompt="s", messages=MESSAGES, temperature=0.0, max_tokens=100)
+    key = LLMResponseCache.make_key(**base)
+
+    assert key == LLMResponseCache.make_key(**base)
+    for change in [
+        {"provider": "openai"}, {"model": "m2"}, {"system_prompt": "t"},
+        {"messages": [{"role": "assistant", "content": "Energy TWG status?"}]},
+        {"temperature": 0.1}, {"max_tokens": 200},
+    ]:
+        assert LLMResponseCache.make_key(**{**base, **change}) != key
+
+
+def test_ttl_and_lru_bounds():
+    cache = LLMResponseCache(ttl=1, max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.set("c", "3")
+
+    assert cache.get("a") is None
+    assert cache.get("c") == "3"
+
+    cache._entries["c"] = (time.monotonic() - 1, "3")
+    assert cache.get("c") is None
+    assert cache.get_stats()["hits"] == 1
+
+
+def test_redis_tier_is_shared_between_workers():
+    redis = FakeRedis()
+    LLMResponseCache(redis_client=redis).set("k", "shared answer")
+
+    other = LLMResponseCache(redis_client=redis)
+    assert other.get("k") == "shared answer"
+    assert other.get("k") == "shared answer"
+    assert (other.redis_hits, other.hits) == (1, 1)
+
+
+def test_wrapper_serves_repeats_and_bypasses_high_temperature():
+    llm = CountingLLM()
+    service = CachedLLMService(llm, LLMResponseCache(max_temperature=0.5))
+
+    first = service.chat("Energy TWG status?", system_prompt="brief")
+    assert service.chat("Energy TWG status?", system_prompt="brief") == first
+    assert service.chat("Energy TWG status?", system_prompt="detailed") != first
+    assert llm.calls == 2
+
+    service.chat("Energy TWG status?", system_prompt="brief", temperature=0.9)
+    service.chat("Energy TWG status?", system_prompt="brief", temperature=0.9)
+    assert llm.calls == 4
+
+    stats = service.get_stats()["response_cache"]
+    assert stats["hits"] == 1 and stats["bypassed"] == 2 and stats["hit_rate"] == pytest.approx(1 / 3, abs=1e-4)
+    assert service.model == "tiny"
+
+
+async def test_wrapper_async_and_streaming_share_entries():
+    llm = CountingLLM()
+    service = CachedLLMService(llm, LLMResponseCache(max_temperature=0.5))
+
+    streamed = [piece async for piece in service.astream("Minerals?")]
+    assert streamed == ["Status: ", "on ", "track"]
+
+    assert [piece async for piece in service.astream("Minerals?")] == ["Status: on track"]
+    assert await service.achat("Minerals?") == "Status: on track"
+    assert llm.calls == 1
+
+
+def test_sampled_calls_bypass_the_cache_by_default():
+    llm = CountingLLM()
+    service = CachedLLMService(llm, LLMResponseCache())
+
+    service.chat("Energy TWG status?")
+    service.chat("Energy TWG status?")
+    service.chat("Energy TWG status?", temperature=0.0)
+    service.chat("Energy TWG status?", temperature=0.0)
+
+    assert llm.calls == 3
+    assert service.get_stats()["response_cache"]["bypassed"] == 2
@@ -0,0 +1,154 @@
+"""
+Tests for the Async LLM Service Layer
+
+Unit tests for the pooled async Ollama client and the async agent chat
+path, including concurrent conversations on one event loop.
+"""
+
+import asyncio
+import json
+import time
+import httpx
+import pytest
+from app.services.llm_service import LLMService, OllamaLLMService
+from app.agents.base_agent import BaseAgent
+
+
+class SlowLLM(LLMService):
+    """Async generation that takes a while, recording what it was sent."""
+
+    def __init__(self, delay=0.2):
+        self.delay = delay
+        self.calls = []
+
+    async def achat(self, prompt, system_prompt=None, temperature=None):
+        self.calls.append(("chat", prompt))
+        await asyncio.sleep(self.delay)
+        return f"answer to {prompt}"
+
+    async def achat_with_history(self, messages, system_prompt=None, temperature=None):
+        self.calls.append(("history", [m["content"] for m in messages]))
+        await asyncio.sleep(self.delay)
+        return f"answer to {messages[-1]['content']}"
+
+
+def ollama_with(handler):
+    service = OllamaLLMService(base_url="http://ollama.test", model="qwen2.5:0.5b")
+    service._async_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return service
+
+
+async def test_ollama_achat_posts_generate_payload():
+    requests = []
+
+    def handler(request):
+        requests.append(json.loads(request.content))
+        return httpx.Response(200, json={"response": "  Solar capacity grew.  "})
+
+    service = ollama_with(handler)
+    reply = await service.achat("How did solar grow?", system_prompt="You are Energy Martin.", max_tokens=50)
+    await service.aclose()
+
+    assert reply == "Solar capacity grew."
+    assert requests[0]["prompt"] == "You are Energy Martin.\n\nUser: How did solar grow?\n\nAssistant:"
+    assert requests[0]["stream"] is False
+    assert requests[0]["options"]["num_predict"] == 50
+
+
+async def test_ollama_achat_with_history_raises_on_http_error():
+    service = ollama_with(lambda request: httpx.Response(503, json={"error": "busy"}))
+
+    with pytest.raises(Exception, match="Ollama Error"):
+        await service.achat_with_history([{"role": "user", "content": "hi"}])
+
+
+async def test_default_async_methods_run_sync_chat_in_a_thread():
+    class SyncLLM(LLMService):
+        def chat(self, prompt, system_prompt=None, **kwargs):
+            return f"sync {prompt}"
+
+    assert await SyncLLM().achat("ping") == "sync ping"
+
+
+async def test_agent_achat_keeps_history():
+    agent = BaseAgent("energy", keep_history=True)
+    agent.llm = SlowLLM(delay=0)
+
+    await agent.achat("first")
+    await agent.achat("second")
+
+    assert agent.llm.calls == [("chat", "first"), ("history", ["first", "answer to first", "second"])]
+    assert len(agent.get_history()) == 4
+
+
+async def test_agents_serve_conversations_concurrently():
+    llm = SlowLLM(delay=0.2)
+    agents = [BaseAgent("energy") for _ in range(5)]
+    for agent in agents:
+        agent.llm = llm
+
+    started = time.monotonic()
+    replies = await asyncio.gather(*(agent.achat(f"q{i}") for i, agent in enumerate(agents)))
+
+    assert replies == [f"answer to q{i}" for i in range(5)]
+    assert time.monotonic() - started < 0.6
+
+
+async def test_concurrent_turns_on_one_agent_keep_history_paired():
+    llm = SlowLLM(delay=0.1)
+    agent = BaseAgent("supervisor", keep_history=True)
+    agent.llm = llm
+    await agent.achat("q-earlier")
+
+    await asyncio.gather(agent.achat("q-alice"), agent.achat("q-bob"))
+
+    # Neither prompt contains the other's unanswered question
+    prompts = [contents for kind, contents in llm.calls if kind == "history"]
+    assert ["q-earlier", "answer to q-earlier", "q-bob"] in prompts
+    assert ["q-earlier", "answer to q-earlier", "q-alice"] in prompts
+    history = [m["content"] for m in agent.get_history()]
+    assert history[2:] in (
+        ["q-alice", "answer to q-alice", "q-bob", "answer to q-bob"],
+        ["q-bob", "answer to q-bob", "q-alice", "answer to q-alice"]
+    )
+
+async def test_ollama_astream_yields_tokens_as_they_arrive():
+    requests = []
+
+    def handler(request):
+        requests.append(json.loads(request.content))
+        lines = [
+            {"response": " Cocoa", "done": False},
+            {"response": " yields", "done": False},
+            {"response": " rose.", "done": False},
+            {"response": "", "done": True},
+        ]
+        return httpx.Response(200, content="\n".join(json.dumps(line) for line in lines).encode())
+
+    service = ollama_with(handler)
+    tokens = [token async for token in service.astream("Cocoa?")]
+
+    assert tokens == ["Cocoa", " yields", " rose."]
+    assert requests[0]["stream"] is True
+
+
+async def test_agent_astream_chat_records_full_response():
+    class StreamingLLM(SlowLLM):
+        async def astream(self, prompt, system_prompt=None, temperature=None):
+            for token in ["Grid ", "interconnection ", "expanded."]:
+                yield token
+
+    agent = BaseAgent("energy", keep_history=True)
+    agent.llm = StreamingLLM()
+
+    deltas = [delta async for delta in agent.astream_chat("WAPP status?")]
+
+    assert deltas == ["Grid ", "interconnection ", "expanded."]
+    assert agent.get_history()[-1] == {"role": "assistant", "content": "Grid interconnection expanded."}
+
+
+async def test_agent_astream_chat_falls_back_to_whole_response():
+    agent = BaseAgent("energy")
+    agent.llm = SlowLLM(delay=0)
+
+    assert [delta async for delta in agent.astream_chat("q")] == ["answer to q"]
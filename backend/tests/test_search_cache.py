@@ -0,0 +1,96 @@
+"""
+Tests for the Search Result Cache
+
+Unit tests for TTL expiry, per-namespace invalidation and cache use in
+knowledge base search.
+"""
+
+import time
+from app.core.search_cache import SearchResultCache
+from app.core.knowledge_base import KnowledgeBase
+from app.core.vector_store import VectorStore
+
+
+class CountingStore(VectorStore):
+    def __init__(self):
+        self.queries = 0
+
+    def query(self, vector, top_k=5, namespace=None, filter=None, include_metadata=True):
+        self.queries += 1
+        return [{"id": "doc_chunk_0", "score": 0.9, "metadata": {"text": "WAPP"}}]
+
+    def upsert(self, vectors, namespace=None):
+        return len(vectors)
+
+    def delete(self, ids, namespace=None):
+        pass
+
+
+class FixedEmbedder:
+    def embed(self, texts):
+        return [[0.1, 0.2] for _ in texts]
+
+
+def make_kb():
+    return KnowledgeBase(
+        vector_store=CountingStore(),
+        embedding_model="m",
+        dimension=2,
+        embedding_client=FixedEmbedder(),
+        search_cache=SearchResultCache(ttl=60)
+    )
+
+
+def test_key_includes_filter_and_top_k():
+    """Different filters or top_k values do not share entries"""
+    base = SearchResultCache.make_key([0.1, 0.2], 5, {"twg": "energy"})
+    assert base == SearchResultCache.make_key([0.1, 0.2], 5, {"twg": "energy"})
+    assert base != SearchResultCache.make_key([0.1, 0.2], 10, {"twg": "energy"})
+    assert base != SearchResultCache.make_key([0.1, 0.2], 5, {"twg": "digital"})
+    assert base != SearchResultCache.make_key([0.1, 0.3], 5, {"twg": "energy"})
+
+
+def test_ttl_expiry():
+    """Entries are not served after their TTL"""
+    cache = SearchResultCache(ttl=1)
+    cache.set("twg-energy", "k", [{"id": "a"}], cache.generation("twg-energy"))
+    assert cache.get("twg-energy", "k") == [{"id": "a"}]
+
+    cache._entries[("twg-energy", "k")] = (time.monotonic() - 1, [{"id": "a"}])
+    assert cache.get("twg-energy", "k") is None
+
+
+def test_invalidation_is_per_namespace():
+    """Writes to one namespace leave other namespaces cached"""
+    cache = SearchResultCache(ttl=60)
+    cache.set("twg-energy", "k", [{"id": "a"}], 0)
+    cache.set("twg-digital", "k", [{"id": "b"}], 0)
+
+    cache.invalidate_namespace("twg-energy")
+
+    assert cache.get("twg-energy", "k") is None
+    assert cache.get("twg-digital", "k") == [{"id": "b"}]
+
+
+def test_results_from_before_a_write_are_not_stored():
+    """A query that started before an invalidation cannot repopulate the cache"""
+    cache = SearchResultCache(ttl=60)
+    generation = cache.generation("twg-energy")
+    cache.invalidate_namespace("twg-energy")
+    cache.set("twg-energy", "k", [{"id": "stale"}], generation)
+
+    assert cache.get("twg-energy", "k") is None
+
+
+def test_search_uses_cache_until_namespace_written():
+    """Repeated searches skip the index until an upsert or delete"""
+    kb = make_kb()
+
+    first = kb.search("WAPP", namespace="twg-energy")
+    second = kb.search("WAPP", namespace="twg-energy")
+    assert first == second
+    assert kb.vector_store.queries == 1
+
+    kb.delete_documents(["doc_chunk_0"], namespace="twg-energy")
+    kb.search("WAPP", namespace="twg-energy")
+    assert kb.vector_store.queries == 2
@@ -0,0 +1,292 @@
+"""
+Tests for Single-Flight Call Coalescing
+
+Unit tests for sharing in-flight blocking calls, coroutines and token
+streams, and for the coalescing LLM service wrapper.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from app.core.single_flight import SingleFlight, StreamCancelled
+from app.core.llm_cache import LLMResponseCache
+from app.services.llm_service import LLMService, CachedLLMService, CoalescingLLMService
+
+
+class SlowLLM(LLMService):
+    """Generations that take `delay` seconds, counting how many ran."""
+
+    provider = "fake"
+    model = "tiny"
+    temperature = 0.2
+
+    def __init__(self, delay=0.2, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+        self.closed_streams = 0
+
+    def _reply(self, prompt):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("ollama is down")
+        return f"reply {self.calls} to {prompt}"
+
+    def chat(self, prompt, system_prompt=None, temperature=None, max_tokens=1000):
+        time.sleep(self.delay)
+        return self._reply(prompt)
+
+    async def achat(self, prompt, system_prompt=None, temperature=None, max_tokens=1000):
+        await asyncio.sleep(self.delay)
+        return self._reply(prompt)
+
+    async def astream(self, prompt, system_prompt=None, temperature=None, max_tokens=1000):
+        self.calls += 1
+        try:
+            for piece in ["Status: ", "on ", "track"]:
+                await asyncio.sleep(self.delay / 3)
+                yield piece
+            if self.fail:
+                raise RuntimeError("stream broke")
+        finally:
+            self.closed_streams += 1
+
+
+async def collect(stream):
+    return [piece async for piece in stream]
+
+
+class TestSingleFlight:
+    """Coalescing primitives"""
+
+    def test_concurrent_blocking_calls_share_one_run(self):
+        flights = SingleFlight()
+        runs = []
+
+        def call():
+            runs.append(1)
+            time.sleep(0.2)
+            return "answer"
+
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            results = list(pool.map(lambda _: flights.do("k", call), range(5)))
+
+        assert results == ["answer"] * 5
+        assert len(runs) == 1
+        assert flights.get_stats()["shared_calls"] == 4
+        assert flights.in_flight() == 0
+
+    def test_blocking_error_reaches_every_caller(self):
+        flights = SingleFlight()
+        started = threading.Event()
+
+        def call():
+            started.set()
+            time.sleep(0.1)
+            raise ValueError("boom")
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            first = pool.submit(flights.do, "k", call)
+            started.wait()
+            second = pool.submit(flights.do, "k", call)
+            for future in (first, second):
+                with pytest.raises(ValueError):
+                    future.result()
+
+    def test_finished_calls_are_not_reused(self):
+        flights = SingleFlight()
+        counter = iter(range(10))
+
+        assert flights.do("k", lambda: next(counter)) == 0
+        assert flights.do("k", lambda: next(counter)) == 1
+
+    async def test_concurrent_coroutines_share_one_run(self):
+        flights = SingleFlight()
+        runs = []
+
+        async def call():
+            runs.append(1)
+            await asyncio.sleep(0.1)
+            return "answer"
+
+        results = await asyncio.gather(*(flights.ado("k", call) for _ in range(10)))
+
+        assert results == ["answer"] * 10
+        assert len(runs) == 1
+        assert flights.get_stats()["coalesce_rate"] == 0.9
+
+    async def test_one_caller_cancelling_does_not_cancel_others(self):
+        flights = SingleFlight()
+
+        async def call():
+            await asyncio.sleep(0.2)
+            return "answer"
+
+        impatient = asyncio.ensure_future(flights.ado("k", call))
+        patient = asyncio.ensure_future(flights.ado("k", call))
+        await asyncio.sleep(0.05)
+        impatient.cancel()
+
+        assert await patient == "answer"
+        assert flights.get_stats()["abandoned"] == 0
+
+    async def test_call_is_cancelled_when_every_caller_leaves(self):
+        flights = SingleFlight()
+        finished = []
+
+        async def call():
+            await asyncio.sleep(0.2)
+            finished.append(1)
+
+        caller = asyncio.ensure_future(flights.ado("k", call))
+        await asyncio.sleep(0.05)
+        caller.cancel()
+        await asyncio.sleep(0.3)
+
+        assert finished == []
+        assert flights.get_stats()["abandoned"] == 1
+        assert flights.in_flight() == 0
+
+    async def test_stream_subscribers_share_deltas(self):
+        flights = SingleFlight()
+        llm = SlowLLM(delay=0.15)
+
+        first = asyncio.ensure_future(collect(flights.astream("k", lambda: llm.astream("q"))))
+        await asyncio.sleep(0.08)
+        # Joins after the first delta; still receives the whole stream
+        second = asyncio.ensure_future(collect(flights.astream("k", lambda: llm.astream("q"))))
+
+        assert await first == ["Status: ", "on ", "track"]
+        assert await second == ["Status: ", "on ", "track"]
+        assert llm.calls == 1
+        assert flights.get_stats()["shared_streams"] == 1
+
+    async def test_stream_error_reaches_every_subscriber(self):
+        flights = SingleFlight()
+        llm = SlowLLM(delay=0.03, fail=True)
+
+        results = await asyncio.gather(
+            *(collect(flights.astream("k", lambda: llm.astream("q"))) for _ in range(2)),
+            return_exceptions=True
+        )
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert llm.calls == 1
+
+    async def test_abandoned_stream_is_closed(self):
+        flights = SingleFlight()
+        llm = SlowLLM(delay=0.6)
+
+        stream = flights.astream("k", lambda: llm.astream("q"))
+        assert await stream.__anext__() == "Status: "
+        await stream.aclose()
+        await asyncio.sleep(0.05)
+
+        assert llm.closed_streams == 1
+        assert flights.get_stats()["abandoned"] == 1
+        assert flights.in_flight() == 0
+
+    async def test_caller_right_after_abandonment_starts_afresh(self):
+        flights = SingleFlight()
+        runs = []
+
+        async def call():
+            runs.append(1)
+            await asyncio.sleep(0.1)
+            return f"answer {len(runs)}"
+
+        abandoned = asyncio.ensure_future(flights.ado("k", call))
+        await asyncio.sleep(0.02)
+        abandoned.cancel()
+        while not abandoned.done():
+            await asyncio.sleep(0)
+
+        # The cancelled call may still be unwinding; it must not be joined
+        assert await flights.ado("k", call) == "answer 2"
+        assert len(runs) == 2
+
+    async def test_subscriber_right_after_abandonment_gets_whole_stream(self):
+        flights = SingleFlight()
+        llm = SlowLLM(delay=0.15)
+
+        stream = flights.astream("k", lambda: llm.astream("q"))
+        assert await stream.__anext__() == "Status: "
+        await stream.aclose()
+
+        assert await collect(flights.astream("k", lambda: llm.astream("q"))) == ["Status: ", "on ", "track"]
+        assert llm.calls == 2
+
+    async def test_cancelled_stream_is_an_error_for_attached_subscribers(self):
+        flights = SingleFlight()
+        llm = SlowLLM(delay=0.6)
+
+        subscriber = asyncio.ensure_future(collect(flights.astream("k", lambda: llm.astream("q"))))
+        await asyncio.sleep(0.3)
+        flights._streams["k"].task.cancel()
+
+        with pytest.raises(StreamCancelled):
+            await subscriber
+
+
+class TestCoalescingLLMService:
+    """Coalescing wrapper around an LLM service"""
+
+    async def test_identical_calls_share_a_generation(self):
+        llm = SlowLLM(delay=0.1)
+        service = CoalescingLLMService(llm)
+
+        results = await asyncio.gather(*(service.achat("Energy TWG status?") for _ in range(5)))
+
+        assert len(set(results)) == 1
+        assert llm.calls == 1
+
+    async def test_different_prompts_are_not_shared(self):
+        llm = SlowLLM(delay=0.1)
+        service = CoalescingLLMService(llm)
+
+        await asyncio.gather(service.achat("a"), service.achat("b"), service.achat("a", system_prompt="s"))
+
+        assert llm.calls == 3
+
+    async def test_high_temperature_calls_run_on_their_own(self):
+        llm = SlowLLM(delay=0.05)
+        service = CoalescingLLMService(llm, max_temperature=0.7)
+
+        await asyncio.gather(*(service.achat("q", temperature=0.9) for _ in range(3)))
+
+        assert llm.calls == 3
+        assert service.get_stats()["coalescing"]["bypassed"] == 3
+
+    def test_sync_chat_is_coalesced(self):
+        llm = SlowLLM(delay=0.2)
+        service = CoalescingLLMService(llm)
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            results = list(pool.map(lambda _: service.chat("q"), range(3)))
+
+        assert len(set(results)) == 1
+        assert llm.calls == 1
+
+    async def test_streams_are_coalesced(self):
+        llm = SlowLLM(delay=0.1)
+        service = CoalescingLLMService(llm)
+
+        results = await asyncio.gather(*(collect(service.astream("q")) for _ in range(3)))
+
+        assert results == [["Status: ", "on ", "track"]] * 3
+        assert llm.calls == 1
+
+    async def test_stats_include_wrapped_cache(self):
+        llm = SlowLLM(delay=0.05)
+        service = CoalescingLLMService(CachedLLMService(llm, LLMResponseCache(max_temperature=0.5)))
+
+        await asyncio.gather(service.achat("q"), service.achat("q"))
+        await service.achat("q")
+
+        stats = service.get_stats()
+        assert llm.calls == 1
+        assert stats["coalescing"]["shared_calls"] == 1
+        assert stats["response_cache"]["hits"] == 1
+        assert service.model == "tiny"
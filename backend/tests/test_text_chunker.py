@@ -0,0 +1,86 @@
+"""
+Tests for the Offset-Based Text Chunker
+
+Unit tests for normalization, word-estimate and tokenizer-based chunk
+boundaries, and use of the chunker by the document processor.
+"""
+
+import re
+from app.utils.document_processor import DocumentProcessor
+from app.utils.text_chunker import TextChunker
+
+TEXT = (
+    "  ECOWAS  energy ministers @ Abuja\n\n\n\nThe West African Power Pool (WAPP) "
+    "coordinates cross-border electricity trade; tariffs #harmonised. "
+) * 30
+
+
+class WordTokenizer:
+    """Stands in for a tiktoken encoding: one token per word, with its leading space."""
+
+    def encode(self, text, disallowed_special=()):
+        self.pieces = re.findall(r"\s*\S+|\s+$", text)
+        return list(range(len(self.pieces)))
+
+    def decode_with_offsets(self, tokens):
+        offsets, pos = [], 0
+        for token in tokens:
+            offsets.append(pos)
+            pos += len(self.pieces[token])
+        return "".join(self.pieces[t] for t in tokens), offsets
+
+
+def test_normalize_matches_clean_text():
+    assert TextChunker().normalize(TEXT) == DocumentProcessor().clean_text(TEXT)
+
+
+def test_normalize_matches_clean_text_around_removed_characters():
+    processor, chunker = DocumentProcessor(), TextChunker()
+    for text in ["a @ b", "a  @  b", "\n\n@\n\n", "x\n\n\n\n \n\n\ny", "\t@ a ©", "•  •", ""]:
+        assert chunker.normalize(text) == processor.clean_text(text)
+
+
+def test_word_chunks_match_legacy_chunking():
+    processor = DocumentProcessor(chunk_size=100, chunk_overlap=20, max_chunks_per_doc=1000)
+    chunker = TextChunker(chunk_size=100, chunk_overlap=20, max_chunks=1000)
+    text = chunker.normalize(TEXT)
+
+    chunks = chunker.chunk(text, {"twg": "energy"})
+    legacy = processor.chunk_text(text)
+
+    assert [" ".join(c["text"].split()) for c in chunks] == [c["text"] for c in legacy]
+    for chunk in chunks:
+        meta = chunk["metadata"]
+        assert text[meta["char_start"]:meta["char_end"]] == chunk["text"]
+        assert meta["total_chunks"] == len(chunks)
+        assert meta["twg"] == "energy"
+
+
+def test_token_budget_and_overlap():
+    chunker = TextChunker(chunk_size=40, chunk_overlap=10, max_chunks=1000, tokenizer=WordTokenizer())
+    text = chunker.normalize(TEXT)
+
+    spans = chunker.split(text)
+    words = [text[start:end].split() for start, end in spans]
+
+    assert all(len(chunk) <= 40 for chunk in words)
+    assert all(len(chunk) == 40 for chunk in words[:-1])
+    assert words[1][:10] == words[0][-10:]
+    assert " ".join(w for chunk in words for w in chunk[:30]).startswith(" ".join(text.split()[:60]))
+
+
+def test_max_chunks_limit():
+    chunker = TextChunker(chunk_size=40, chunk_overlap=10, max_chunks=3)
+    assert len(chunker.split(chunker.normalize(TEXT))) == 3
+
+
+def test_processor_uses_tokenizer(tmp_path):
+    path = tmp_path / "minutes.txt"
+    path.write_text(TEXT)
+    processor = DocumentProcessor(chunk_size=40, chunk_overlap=10, tokenizer=WordTokenizer())
+
+    result = processor.process_document(str(path), {"twg": "energy"})
+
+    assert result["status"] == "success"
+    assert all(len(c["text"].split()) <= 40 for c in result["chunks"])
+    assert result["chunks"][1]["metadata"]["char_start"] > 0
@@ -0,0 +1,56 @@
+"""
+Tests for the Streaming Upload Writer
+
+Unit tests for chunked writing, on-the-fly hashing and the size limit.
+"""
+
+import hashlib
+import io
+import pytest
+from app.utils.upload_writer import write_upload, UploadTooLarge
+
+
+class FakeUpload:
+    """Async reader like Starlette's UploadFile; size may be unknown."""
+
+    def __init__(self, data, size=None):
+        self.file = io.BytesIO(data)
+        self.size = size
+        self.reads = 0
+
+    async def read(self, size=-1):
+        self.reads += 1
+        return self.file.read(size)
+
+
+async def test_writes_in_chunks_and_hashes(tmp_path):
+    data = b"ECOWAS summit minutes\n" * 1000
+    upload = FakeUpload(data)
+    path = tmp_path / "minutes.txt"
+
+    size, digest = await write_upload(upload, str(path), max_bytes=len(data), chunk_size=4096)
+
+    assert size == len(data)
+    assert digest == hashlib.sha256(data).hexdigest()
+    assert path.read_bytes() == data
+    assert upload.reads > 1
+
+
+async def test_known_size_over_limit_is_rejected_before_reading(tmp_path):
+    upload = FakeUpload(b"x" * 100, size=100)
+
+    with pytest.raises(UploadTooLarge):
+        await write_upload(upload, str(tmp_path / "big.bin"), max_bytes=99)
+
+    assert upload.reads == 0
+    assert list(tmp_path.iterdir()) == []
+
+
+async def test_streamed_size_over_limit_leaves_no_file(tmp_path):
+    upload = FakeUpload(b"x" * 10000)
+
+    with pytest.raises(UploadTooLarge):
+        await write_upload(upload, str(tmp_path / "big.bin"), max_bytes=5000, chunk_size=1024)
+
+    assert upload.reads <= 5
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,101 @@
+"""
+Tests for Vector Garbage Collection
+
+Unit tests for purging the vectors of deleted documents and for
+reconciling the index against the documents table.
+"""
+
+import uuid
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from app.core.async_knowledge_base import AsyncKnowledgeBase
+from app.core.knowledge_base import KnowledgeBase
+from app.core.vector_store import LocalVectorStore
+from app.services.vector_gc import purge_document_vectors, reconcile_vectors, chunk_document_id, Document, IngestionJob
+
+
+class FixedEmbedder:
+    def embed(self, texts):
+        return [[1.0, 0.0] for _ in texts]
+
+
+@pytest.fixture
+async def session_factory():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Document.metadata.create_all)
+    yield async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.fixture
+def kb(tmp_path):
+    return KnowledgeBase(
+        vector_store=LocalVectorStore(path=str(tmp_path), dimension=2),
+        embedding_model="m",
+        dimension=2,
+        embedding_client=FixedEmbedder()
+    )
+
+
+async def create_document(session_factory):
+    async with session_factory() as db:
+        doc = Document(
+            file_name="minutes.pdf",
+            file_path="/tmp/minutes.pdf",
+            file_type="application/pdf",
+            uploaded_by_id=uuid.uuid4()
+        )
+        db.add(doc)
+        await db.commit()
+        return doc
+
+
+def ingest(kb, doc_id, chunks, namespace="twg-general"):
+    kb.upsert_documents(
+        [{"id": f"{doc_id}_chunk_{i}", "text": f"chunk {i}"} for i in range(chunks)],
+        namespace=namespace
+    )
+
+
+def test_chunk_document_id():
+    doc_id = uuid.uuid4()
+    assert chunk_document_id(f"{doc_id}_chunk_3") == doc_id
+    assert chunk_document_id("policy_chunk_0") is None
+    assert chunk_document_id(str(doc_id)) is None
+
+
+async def test_purge_covers_current_and_job_namespaces(session_factory, kb):
+    doc = await create_document(session_factory)
+    other = await create_document(session_factory)
+    ingest(kb, doc.id, 3)
+    ingest(kb, doc.id, 2, namespace="twg-old")
+    ingest(kb, other.id, 2)
+
+    async with session_factory() as db:
+        db.add(IngestionJob(document_id=doc.id, created_by_id=doc.uploaded_by_id, namespace="twg-old"))
+        await db.commit()
+        deleted = await purge_document_vectors(db, [doc], AsyncKnowledgeBase(kb, embedding_client=None))
+
+    assert deleted == 5
+    assert kb.list_ids("twg-old") == []
+    assert sorted(kb.list_ids("twg-general")) == [f"{other.id}_chunk_0", f"{other.id}_chunk_1"]
+
+
+async def test_reconcile_reclaims_vectors_of_deleted_documents(session_factory, kb):
+    kept = await create_document(session_factory)
+    ingest(kb, kept.id, 2)
+    ingest(kb, uuid.uuid4(), 3)
+    ingest(kb, uuid.uuid4(), 1, namespace="twg-energy")
+    kb.upsert_documents([{"id": "policy_chunk_0", "text": "from the CLI"}], namespace="twg-general")
+
+    report = await reconcile_vectors(session_factory, kb)
+
+    assert report["vectors_scanned"] == 7
+    assert report["vectors_reclaimed"] == 4
+    assert report["orphaned_documents"] == 2
+    assert report["namespaces"] == {"twg-general": 3, "twg-energy": 1}
+    assert sorted(kb.list_ids("twg-general")) == [f"{kept.id}_chunk_0", f"{kept.id}_chunk_1", "policy_chunk_0"]
+
+    again = await reconcile_vectors(session_factory, kb)
+    assert again["vectors_reclaimed"] == 0
@@ -0,0 +1,137 @@
+"""
+Tests for the Local Vector Store
+
+Unit tests for the NumPy-backed vector index: cosine top-k search,
+metadata filtering, deletes, growth and persistence.
+"""
+
+import pytest
+from app.core.vector_store import LocalVectorStore, matches_filter
+
+
+def unit(*values):
+    return list(values)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return LocalVectorStore(path=str(tmp_path / "vectors"), dimension=3)
+
+
+def test_query_returns_top_k_by_cosine(store):
+    """Results are ordered by cosine similarity"""
+    store.upsert([
+        {"id": "a", "values": unit(1, 0, 0), "metadata": {"twg": "energy"}},
+        {"id": "b", "values": unit(0, 1, 0), "metadata": {"twg": "digital"}},
+        {"id": "c", "values": unit(2, 1, 0), "metadata": {"twg": "energy"}},
+    ], namespace="twg-energy")
+
+    results = store.query(unit(1, 0, 0), top_k=2, namespace="twg-energy")
+
+    assert [r["id"] for r in results] == ["a", "c"]
+    assert results[0]["score"] == pytest.approx(1.0)
+    assert results[1]["metadata"] == {"twg": "energy"}
+
+
+def test_query_with_metadata_filter(store):
+    """Only rows matching the filter are returned"""
+    store.upsert([
+        {"id": f"v{i}", "values": unit(1, i / 100, 0), "metadata": {"twg": "energy" if i % 10 == 0 else "digital"}}
+        for i in range(200)
+    ])
+
+    results = store.query(unit(1, 0, 0), top_k=5, filter={"twg": "energy"})
+
+    assert len(results) == 5
+    assert all(r["metadata"]["twg"] == "energy" for r in results)
+
+
+def test_upsert_replaces_and_delete_removes(store):
+    """Upserting an existing ID overwrites it; deleted IDs are not returned"""
+    store.upsert([{"id": "a", "values": unit(1, 0, 0), "metadata": {"v": 1}}])
+    store.upsert([{"id": "a", "values": unit(0, 1, 0), "metadata": {"v": 2}}])
+    store.upsert([{"id": "b", "values": unit(1, 0, 0)}])
+
+    results = store.query(unit(0, 1, 0), top_k=1)
+    assert results[0]["id"] == "a"
+    assert results[0]["metadata"] == {"v": 2}
+
+    store.delete(["a"])
+    assert [r["id"] for r in store.query(unit(0, 1, 0), top_k=5)] == ["b"]
+    assert store.describe_stats()["total_vectors"] == 1
+
+
+def test_persistence_and_growth(tmp_path):
+    """Vectors beyond the initial capacity survive a reload"""
+    path = str(tmp_path / "vectors")
+    store = LocalVectorStore(path=path, dimension=3, dtype="float16")
+    vectors = [{"id": f"v{i}", "values": unit(1, i, 0), "metadata": {"i": i}} for i in range(1499)]
+    vectors.append({"id": "v1499", "values": unit(0, 0, 1), "metadata": {"i": 1499}})
+    store.upsert(vectors, namespace="twg-general")
+    store.delete(["v0"], namespace="twg-general")
+
+    reloaded = LocalVectorStore(path=path, dimension=3, dtype="float16")
+    stats = reloaded.describe_stats()
+
+    assert stats["namespaces"] == {"twg-general": {"vector_count": 1499}}
+    results = reloaded.query(unit(0, 0, 1), top_k=1, namespace="twg-general")
+    assert results[0]["id"] == "v1499"
+    assert results[0]["metadata"] == {"i": 1499}
+
+
+def test_compact_keeps_live_vectors(store):
+    """Compaction drops deleted rows and keeps search results intact"""
+    store.upsert([{"id": f"v{i}", "values": unit(1, i, 0)} for i in range(10)])
+    store.delete([f"v{i}" for i in range(5)])
+    store.compact()
+
+    assert sorted(store.list_ids()) == [f"v{i}" for i in range(5, 10)]
+    assert store.query(unit(0, 1, 0), top_k=1)[0]["id"] == "v9"
+
+
+def test_dimension_mismatch_raises(store):
+    with pytest.raises(ValueError):
+        store.upsert([{"id": "a", "values": [1.0, 0.0]}])
+
+
+def test_repeated_id_in_one_batch_keeps_last(store):
+    """A batch repeating a new ID stores it once, with its last vector"""
+    store.upsert([
+        {"id": "a", "values": unit(1, 0, 0), "metadata": {"v": 1}},
+        {"id": "a", "values": unit(0, 1, 0), "metadata": {"v": 2}},
+    ])
+
+    results = store.query(unit(1, 1, 0), top_k=5)
+
+    assert [(r["id"], r["metadata"]) for r in results] == [("a", {"v": 2})]
+
+
+def test_writers_in_two_processes_do_not_collide(tmp_path):
+    """Stores sharing a directory see each other's writes and allocate distinct rows"""
+    api = LocalVectorStore(path=str(tmp_path / "vectors"), dimension=3)
+    ingester = LocalVectorStore(path=str(tmp_path / "vectors"), dimension=3)
+    api.query(unit(1, 0, 0), namespace="twg-energy")
+
+    ingester.upsert([{"id": "a", "values": unit(1, 0, 0)}], namespace="twg-energy")
+    api.upsert([{"id": "b", "values": unit(0, 1, 0)}], namespace="twg-energy")
+    ingester.upsert([{"id": f"g{i}", "values": unit(0, 0, 1)} for i in range(1500)], namespace="twg-energy")
+
+    assert api.query(unit(1, 0, 0), top_k=1, namespace="twg-energy")[0]["id"] == "a"
+    assert ingester.query(unit(0, 1, 0), top_k=1, namespace="twg-energy")[0]["id"] == "b"
+    assert len(api.query(unit(0, 0, 1), top_k=2000, namespace="twg-energy")) == 1502
+
+    ingester.delete([f"g{i}" for i in range(1500)], namespace="twg-energy")
+    api.upsert([{"id": "c", "values": unit(1, 1, 0)}], namespace="twg-energy")
+
+    reloaded = LocalVectorStore(path=str(tmp_path / "vectors"), dimension=3)
+    assert sorted(r["id"] for r in reloaded.query(unit(1, 1, 1), top_k=10, namespace="twg-energy")) == ["a", "b", "c"]
+
+
+def test_matches_filter_operators():
+    metadata = {"twg": "energy", "year": 2024, "tags": ["wapp", "grid"]}
+
+    assert matches_filter(metadata, {"twg": {"$in": ["energy", "digital"]}})
+    assert matches_filter(metadata, {"year": {"$gte": 2024}, "tags": "wapp"})
+    assert matches_filter(metadata, {"$or": [{"twg": "digital"}, {"year": 2024}]})
+    assert not matches_filter(metadata, {"twg": {"$ne": "energy"}})
+    assert not matches_filter(metadata, {"missing": {"$exists": True}})
@@ -12,6 +12,7 @@ export interface StreamEvent {
     message?: any;
     error?: string;
     result?: any;
+    content?: string;
 }
 
 export interface StreamingState {
@@ -19,6 +20,7 @@ export interface StreamingState {
     currentStatus: string | null;
     currentTool: string | null;
     error: string | null;
+    partialResponse: string;
 }
 
 export function useStreamingChat() {
@@ -27,6 +29,7 @@ export function useStreamingChat() {
         currentStatus: null,
         currentTool: null,
         error: null,
+        partialResponse: '',
     });
 
     const eventSourceRef = useRef<EventSource | null>(null);
@@ -52,6 +55,7 @@ export function useStreamingChat() {
                 currentStatus: 'Connecting...',
                 currentTool: null,
                 error: null,
+                partialResponse: '',
             });
 
             try {
@@ -154,6 +158,13 @@ export function useStreamingChat() {
                                         }));
                                         break;
 
+                                    case 'delta':
+                                        setStreamingState((prev) => ({
+                                            ...prev,
+                                            partialResponse: prev.partialResponse + (event.content || ''),
+                                        }));
+                                        break;
+
                                     case 'response':
                                         onComplete(event.message);
                                         break;
@@ -172,6 +183,7 @@ export function useStreamingChat() {
                                             currentStatus: null,
                                             currentTool: null,
                                             error: null,
+                                            partialResponse: '',
                                         });
                                         break;
                                 }
@@ -215,6 +227,7 @@ export function useStreamingChat() {
             currentStatus: null,
             currentTool: null,
             error: null,
+            partialResponse: '',
         });
     }, []);
 
@@ -1,6 +1,6 @@
 import { useState, useEffect, useRef } from 'react'
 import ModernLayout from '../../layouts/ModernLayout'
-import documentService, { Document, SearchResult } from '../../services/documentService'
+import documentService, { Document, IngestionJob, SearchResult } from '../../services/documentService'
 
 
 export default function DocumentLibrary() {
@@ -22,6 +22,7 @@ export default function DocumentLibrary() {
     const [showUploadModal, setShowUploadModal] = useState(false)
     const [uploadStep, setUploadStep] = useState<'initial' | 'ready_to_ingest' | 'ingesting' | 'complete'>('initial')
     const [uploadedDocId, setUploadedDocId] = useState<string | null>(null)
+    const [ingestProgress, setIngestProgress] = useState<IngestionJob | null>(null)
     const [selectedFile, setSelectedFile] = useState<File | null>(null)
     const [selectedTwgId, setSelectedTwgId] = useState<string>('')
     const [isConfidential, setIsConfidential] = useState(false)
@@ -94,21 +95,35 @@ export default function DocumentLibrary() {
 
         try {
             setUploadStep('ingesting')
-            await documentService.ingestDocument(uploadedDocId)
-            setUploadStep('complete')
+            // The ingest request only queues a job; wait for its outcome
+            const job = await documentService.waitForIngestionJob(
+                await documentService.ingestDocument(uploadedDocId),
+                setIngestProgress
+            )
+            if (job.status === 'succeeded') {
+                setUploadStep('complete')
+            } else {
+                alert(`Ingestion ${job.status}${job.error ? `: ${job.error}` : ''}. You can retry from the list.`)
+                setUploadStep('ready_to_ingest') // Allow retry
+            }
         } catch (error) {
             console.error('Ingestion failed:', error)
             alert('Ingestion failed. You can retry from the list.')
             setUploadStep('ready_to_ingest') // Allow retry
+        } finally {
+            setIngestProgress(null)
         }
     }
 
     const handleIngest = async (docId: string) => {
         try {
             setIngesting(docId)
-            await documentService.ingestDocument(docId)
-            // Optionally update UI to show it's ingested
-            alert('Document successfully ingested into the Knowledge Base RAG!')
+            const job = await documentService.waitForIngestionJob(await documentService.ingestDocument(docId))
+            if (job.status === 'succeeded') {
+                alert('Document successfully ingested into the Knowledge Base RAG!')
+            } else {
+                alert(`Ingestion ${job.status}${job.error ? `: ${job.error}` : ''}`)
+            }
         } catch (error) {
             console.error('Ingestion failed:', error)
             alert('Failed to ingest document. Check logs.')
@@ -646,6 +661,11 @@ export default function DocumentLibrary() {
                                     <div>
                                         <h4 className="text-lg font-black text-[#0d121b] dark:text-white animate-pulse">Processing Vectors...</h4>
                                         <p className="text-sm text-[#4c669a] mt-2 font-medium">Reading content, generating embeddings, and updating Pinecone index.</p>
+                                        {ingestProgress && ingestProgress.chunks_total > 0 && (
+                                            <p className="text-xs text-[#8a9dbd] mt-2 font-bold">
+                                                {ingestProgress.chunks_upserted} / {ingestProgress.chunks_total} chunks indexed
+                                            </p>
+                                        )}
                                     </div>
                                 </div>
                             )}
@@ -7,6 +7,8 @@ export interface Document {
     file_name: string;
     file_path: string;
     file_type: string;
+    file_size: number | null;
+    file_sha256: string | null;
     uploaded_by_id: string;
     is_confidential: boolean;
     metadata_json: Record<string, any> | null;
@@ -14,10 +16,27 @@ export interface Document {
     uploaded_by?: User;
 }
 
-export interface IngestionResponse {
-    status: string;
-    chunks_ingested: number;
-    namespace: string;
+export interface IngestionJob {
+    id: string;
+    document_id: string;
+    created_by_id: string;
+    status: 'queued' | 'running' | 'succeeded' | 'failed' | 'cancelled';
+    namespace: string | null;
+    chunks_total: number;
+    chunks_embedded: number;
+    chunks_upserted: number;
+    cancel_requested: boolean;
+    batch_id: string | null;
+    error: string | null;
+    created_at: string;
+    started_at: string | null;
+    finished_at: string | null;
+}
+
+export interface BulkIngestion {
+    batch_id: string;
+    jobs: IngestionJob[];
+    rejected: { document_id: string; reason: string }[];
 }
 
 export interface SearchResult {
@@ -80,8 +99,42 @@ export const documentService = {
         window.URL.revokeObjectURL(url);
     },
 
-    ingestDocument: async (docId: string): Promise<IngestionResponse> => {
-        const response = await api.post<IngestionResponse>(`/documents/${docId}/ingest`);
+    ingestDocument: async (docId: string): Promise<IngestionJob> => {
+        const response = await api.post<IngestionJob>(`/documents/${docId}/ingest`);
+        return response.data;
+    },
+
+    bulkIngestDocuments: async (docIds: string[]): Promise<BulkIngestion> => {
+        const response = await api.post<BulkIngestion>('/documents/bulk-ingest', docIds);
+        return response.data;
+    },
+
+    getIngestionBatch: async (batchId: string): Promise<IngestionJob[]> => {
+        const response = await api.get<IngestionJob[]>(`/documents/ingest-batches/${batchId}`);
+        return response.data;
+    },
+
+    getIngestionJob: async (jobId: string): Promise<IngestionJob> => {
+        const response = await api.get<IngestionJob>(`/documents/ingest-jobs/${jobId}`);
+        return response.data;
+    },
+
+    // Poll a job until it succeeds, fails or is cancelled
+    waitForIngestionJob: async (
+        job: IngestionJob,
+        onProgress?: (job: IngestionJob) => void,
+        intervalMs: number = 1000
+    ): Promise<IngestionJob> => {
+        while (job.status === 'queued' || job.status === 'running') {
+            onProgress?.(job);
+            await new Promise((resolve) => setTimeout(resolve, intervalMs));
+            job = await documentService.getIngestionJob(job.id);
+        }
+        return job;
+    },
+
+    cancelIngestionJob: async (jobId: string): Promise<IngestionJob> => {
+        const response = await api.post<IngestionJob>(`/documents/ingest-jobs/${jobId}/cancel`);
         return response.data;
     },
 